@@ -307,6 +307,10 @@ PUBLIC_API_GET_PATHS = {
     '/api/system_health',
     '/api/monitoring/radio',
 }
+# Public like /api/boundaries; tile responses are sent with Cache-Control: public
+PUBLIC_API_GET_PREFIXES = (
+    '/api/tiles/',
+)
 CSRF_SESSION_KEY = '_csrf_token'
 CSRF_HEADER_NAME = 'X-CSRF-Token'
 CSRF_PROTECTED_METHODS = {'POST', 'PUT', 'PATCH', 'DELETE'}
@@ -927,7 +931,10 @@ def before_request():
         normalized_path = request.path.rstrip('/') or '/'
         if (
             request.method in {'GET', 'HEAD', 'OPTIONS'}
-            and normalized_path in PUBLIC_API_GET_PATHS
+            and (
+                normalized_path in PUBLIC_API_GET_PATHS
+                or normalized_path.startswith(PUBLIC_API_GET_PREFIXES)
+            )
         ):
             return
 
@@ -0,0 +1,251 @@
+"""
+EAS Station - Emergency Alert System
+Copyright (c) 2025 Timothy Kramer (KR8MER)
+
+This file is part of EAS Station.
+
+EAS Station is dual-licensed software:
+- GNU Affero General Public License v3 (AGPL-3.0) for open-source use
+- Commercial License for proprietary use
+
+You should have received a copy of both licenses with this software.
+For more information, see LICENSE and LICENSE-COMMERCIAL files.
+
+IMPORTANT: This software cannot be rebranded or have attribution removed.
+See NOTICE file for complete terms.
+
+Repository: https://github.com/KR8MER/eas-station
+"""
+
+from __future__ import annotations
+
+"""Keyset pagination and cached counts for the alert list.
+
+OFFSET pagination makes the database walk and discard every row before the
+requested page, and the page count needs a ``COUNT(*)`` over the whole
+filtered result, so both grow with the size of the alert history.  The alert
+list instead pages on ``(sent, id)``: each page link carries an opaque cursor
+naming the last (or first) row shown, and the next page is the rows strictly
+after it in that order, read straight off the ``idx_cap_alerts_sent_id``
+index.
+
+Totals are cached per filter for a minute.  On PostgreSQL a result the
+planner estimates at ``ESTIMATE_THRESHOLD`` rows or more is reported with the
+planner's row estimate, flagged approximate, instead of being counted.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import load_only
+
+from .cache import cache
+from .extensions import db
+from .models import CAPAlert
+
+logger = logging.getLogger(__name__)
+
+ESTIMATE_THRESHOLD = 10_000
+COUNT_CACHE_SECONDS = 60
+
+# Columns the alert list renders; raw_json, description, geometry and the
+# rest stay in the database
+LIST_COLUMNS = (
+    CAPAlert.id,
+    CAPAlert.identifier,
+    CAPAlert.sent,
+    CAPAlert.expires,
+    CAPAlert.status,
+    CAPAlert.event,
+    CAPAlert.severity,
+    CAPAlert.source,
+    CAPAlert.headline,
+    CAPAlert.area_desc,
+)
+
+Cursor = Tuple[datetime, int]
+
+
+def encode_cursor(alert: Any) -> str:
+    """Opaque page cursor for ``alert``'s position in the ``(sent, id)`` order."""
+    raw = f"{alert.sent.isoformat()}|{alert.id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: Optional[str]) -> Optional[Cursor]:
+    """Position named by a cursor, or None if it is missing or malformed."""
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        sent, alert_id = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8").split("|")
+        return datetime.fromisoformat(sent), int(alert_id)
+    except (ValueError, UnicodeError):
+        return None
+
+
+@dataclass
+class KeysetPage:
+    """One page of alerts with cursors to its neighbours."""
+
+    items: List[CAPAlert]
+    page: int
+    per_page: int
+    total: int
+    total_is_estimate: bool
+    next_cursor: Optional[str]
+    prev_cursor: Optional[str]
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self) -> bool:
+        return self.prev_cursor is not None
+
+    @property
+    def next_num(self) -> Optional[int]:
+        return self.page + 1 if self.has_next else None
+
+    @property
+    def prev_num(self) -> Optional[int]:
+        return max(1, self.page - 1) if self.has_prev else None
+
+    @property
+    def pages(self) -> int:
+        pages = (self.total + self.per_page - 1) // self.per_page if self.per_page > 0 else 1
+        # Estimates may undercount; never claim fewer pages than we can reach
+        return max(pages, self.page + (1 if self.has_next else 0))
+
+
+def paginate_keyset(
+    query,
+    *,
+    per_page: int,
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+    page: int = 1,
+    total: Tuple[int, bool] = (0, False),
+) -> KeysetPage:
+    """Fetch one page of ``query`` (unordered) newest first.
+
+    Args:
+        query: Filtered CAPAlert query
+        per_page: Rows per page
+        after: Cursor of the last row of the previous page (next-page link)
+        before: Cursor of the first row of the following page (previous-page link)
+        page: Position of the page, carried in links for display only
+        total: ``(count, is_estimate)`` as returned by ``count_alerts``
+
+    Without a cursor, ``page`` greater than one falls back to OFFSET so links
+    made before cursors existed keep working.
+    """
+    key = tuple_(CAPAlert.sent, CAPAlert.id)
+    query = query.options(load_only(*LIST_COLUMNS))
+    after_position = decode_cursor(after)
+    before_position = decode_cursor(before) if after_position is None else None
+
+    if before_position is not None:
+        rows = (
+            query.filter(key > before_position)
+            .order_by(CAPAlert.sent.asc(), CAPAlert.id.asc())
+            .limit(per_page + 1)
+            .all()
+        )
+        items = list(reversed(rows[:per_page]))
+        more_before = len(rows) > per_page
+        return KeysetPage(
+            items=items,
+            page=page if more_before else 1,
+            per_page=per_page,
+            total=total[0],
+            total_is_estimate=total[1],
+            next_cursor=encode_cursor(items[-1]) if items else None,
+            prev_cursor=encode_cursor(items[0]) if items and more_before else None,
+        )
+
+    ordered = query.order_by(CAPAlert.sent.desc(), CAPAlert.id.desc())
+    if after_position is not None:
+        ordered = ordered.filter(key < after_position)
+    elif page > 1:
+        ordered = ordered.offset((page - 1) * per_page)
+
+    rows = ordered.limit(per_page + 1).all()
+    items = rows[:per_page]
+    has_earlier = after_position is not None or page > 1
+    return KeysetPage(
+        items=items,
+        page=page if has_earlier else 1,
+        per_page=per_page,
+        total=total[0],
+        total_is_estimate=total[1],
+        next_cursor=encode_cursor(items[-1]) if len(rows) > per_page else None,
+        prev_cursor=encode_cursor(items[0]) if items and has_earlier else None,
+    )
+
+
+def count_alerts(query, filters: Any, *, estimate_threshold: int = ESTIMATE_THRESHOLD) -> Tuple[int, bool]:
+    """Total rows of ``query``, cached per ``filters`` (any JSON-serialisable value).
+
+    Returns:
+        Tuple of (count, whether it is a planner estimate)
+    """
+    digest = hashlib.sha1(json.dumps(filters, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    cache_key = f"alerts_count_{digest}"
+    try:
+        cached = cache.get(cache_key)
+    except Exception:  # cache not initialised (CLI tools, tests)
+        cached = None
+    if cached is not None:
+        return cached[0], cached[1]
+
+    result: Tuple[int, bool]
+    estimate = _planner_estimate(query)
+    if estimate is not None and estimate >= estimate_threshold:
+        result = (estimate, True)
+    else:
+        result = (query.order_by(None).count(), False)
+
+    try:
+        cache.set(cache_key, list(result), timeout=COUNT_CACHE_SECONDS)
+    except Exception:
+        pass
+    return result
+
+
+def _planner_estimate(query) -> Optional[int]:
+    """PostgreSQL's row estimate for ``query``, or None on other databases."""
+    bind = db.session.get_bind()
+    if bind.dialect.name != "postgresql":
+        return None
+    try:
+        compiled = query.order_by(None).statement.compile(dialect=bind.dialect)
+        plan = db.session.connection().exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+        ).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except Exception as exc:
+        # A failed statement aborts the PostgreSQL transaction
+        db.session.rollback()
+        logger.debug("Could not estimate alert count: %s", exc)
+        return None
+
+
+__all__ = [
+    "ESTIMATE_THRESHOLD",
+    "KeysetPage",
+    "LIST_COLUMNS",
+    "count_alerts",
+    "decode_cursor",
+    "encode_cursor",
+    "paginate_keyset",
+]
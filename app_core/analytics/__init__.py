@@ -30,6 +30,7 @@ from app_core.analytics.models import MetricSnapshot, TrendRecord, AnomalyRecord
 from app_core.analytics.aggregator import MetricsAggregator
 from app_core.analytics.trend_analyzer import TrendAnalyzer
 from app_core.analytics.anomaly_detector import AnomalyDetector
+from app_core.analytics.online_detector import OnlineAnomalyDetector
 from app_core.analytics.scheduler import (
     AnalyticsScheduler,
     get_scheduler,
@@ -44,6 +45,7 @@ __all__ = [
     "MetricsAggregator",
     "TrendAnalyzer",
     "AnomalyDetector",
+    "OnlineAnomalyDetector",
     "AnalyticsScheduler",
     "get_scheduler",
     "start_scheduler",
@@ -27,13 +27,19 @@ This module provides functionality to aggregate metrics from various sources:
 - Receiver status and availability
 - GPIO activation patterns
 - Compliance metrics
+
+Windows are aligned to UTC hour/day/week boundaries and aggregated inside the
+database: one grouped ``date_trunc`` query per source table returns count,
+mean, min, max and standard deviation for every window at once.  Each
+category resumes from its high-water mark (the newest window already stored),
+and snapshots are written with a bulk upsert keyed on the window.
 """
 
 import logging
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Tuple
 
-from sqlalchemy import func
+from sqlalchemy import case, func, literal_column, select
 
 from app_core.extensions import db
 from app_core.models import (
@@ -44,11 +50,36 @@ from app_core.models import (
     RadioReceiverStatus,
 )
 from app_core.analytics.models import MetricSnapshot
+from app_core.analytics.series import as_utc
 from app_core.eas_storage import collect_compliance_log_entries
 from app_utils import utc_now
 
 logger = logging.getLogger(__name__)
 
+# Aggregation period -> (date_trunc unit, window length)
+_PERIOD_UNITS: Dict[str, Tuple[str, timedelta]] = {
+    "hourly": ("hour", timedelta(hours=1)),
+    "daily": ("day", timedelta(days=1)),
+    "weekly": ("week", timedelta(weeks=1)),
+}
+
+_UPSERT_BATCH_SIZE = 500
+_UPSERT_UPDATE_COLUMNS = (
+    "snapshot_time",
+    "window_end",
+    "value",
+    "min_value",
+    "max_value",
+    "avg_value",
+    "stddev_value",
+    "sample_count",
+    "created_at",
+)
+
+
+def _optional_float(value: Any) -> Optional[float]:
+    return None if value is None else float(value)
+
 
 class MetricsAggregator:
     """Aggregates metrics from various sources into time-series snapshots."""
@@ -118,103 +149,66 @@ class MetricsAggregator:
         - Average delivery latency
         - Alert volume (count)
         """
-        snapshot_count = 0
         now = utc_now()
-        window_start = now - timedelta(hours=lookback_hours)
-
-        # Get time windows to aggregate
-        windows = self._get_time_windows(window_start, now, aggregation_period)
-
-        for win_start, win_end in windows:
-            # Check if snapshot already exists
-            if self._snapshot_exists(
-                "alert_delivery",
-                "delivery_success_rate",
-                win_end,
-                aggregation_period,
-            ):
-                continue
-
-            # Query delivery reports in this window
-            reports = AlertDeliveryReport.query.filter(
-                AlertDeliveryReport.generated_at >= win_start,
-                AlertDeliveryReport.generated_at < win_end,
-            ).all()
-
-            if not reports:
-                continue
-
-            # Calculate success rate
-            total_alerts = sum(r.total_alerts for r in reports)
-            delivered = sum(r.delivered_alerts for r in reports)
-            success_rate = (delivered / total_alerts * 100) if total_alerts > 0 else 0
+        since = self._aggregation_start("alert_delivery", aggregation_period, lookback_hours, now)
+
+        report_rate = case(
+            (
+                AlertDeliveryReport.total_alerts > 0,
+                AlertDeliveryReport.delivered_alerts * 100.0 / AlertDeliveryReport.total_alerts,
+            ),
+            else_=0.0,
+        )
+        windows = self._query_windows(
+            AlertDeliveryReport.generated_at,
+            since,
+            now,
+            aggregation_period,
+            func.count(AlertDeliveryReport.id).label("reports"),
+            func.sum(AlertDeliveryReport.total_alerts).label("total_alerts"),
+            func.sum(AlertDeliveryReport.delivered_alerts).label("delivered"),
+            func.min(report_rate).label("min_rate"),
+            func.max(report_rate).label("max_rate"),
+            func.avg(AlertDeliveryReport.average_latency_seconds).label("avg_latency"),
+            func.min(AlertDeliveryReport.average_latency_seconds).label("min_latency"),
+            func.max(AlertDeliveryReport.average_latency_seconds).label("max_latency"),
+            func.count(AlertDeliveryReport.average_latency_seconds).label("latency_count"),
+        )
 
-            # Calculate average latency
-            latencies = [
-                r.average_latency_seconds for r in reports if r.average_latency_seconds is not None
-            ]
-            avg_latency = (sum(latencies) / len(latencies)) * 1000 if latencies else 0  # Convert to ms
+        snapshots = []
+        for row in windows:
+            win_start, win_end = self._window_bounds(row.bucket, aggregation_period, now)
+            total_alerts = row.total_alerts or 0
+            success_rate = (row.delivered / total_alerts * 100) if total_alerts > 0 else 0
 
-            # Create success rate snapshot
-            snapshot = MetricSnapshot(
-                metric_category="alert_delivery",
-                metric_name="delivery_success_rate",
-                snapshot_time=win_end,
-                window_start=win_start,
-                window_end=win_end,
-                aggregation_period=aggregation_period,
+            snapshots.append(self._snapshot_values(
+                "alert_delivery", "delivery_success_rate", win_start, win_end, aggregation_period,
                 value=success_rate,
-                min_value=min(
-                    (r.delivered_alerts / r.total_alerts * 100)
-                    if r.total_alerts > 0
-                    else 0
-                    for r in reports
-                ),
-                max_value=max(
-                    (r.delivered_alerts / r.total_alerts * 100)
-                    if r.total_alerts > 0
-                    else 0
-                    for r in reports
-                ),
+                min_value=row.min_rate,
+                max_value=row.max_rate,
                 avg_value=success_rate,
-                sample_count=len(reports),
-            )
-            db.session.add(snapshot)
-            snapshot_count += 1
+                sample_count=row.reports,
+            ))
 
-            # Create average latency snapshot
+            # Convert to milliseconds
+            avg_latency = float(row.avg_latency) * 1000 if row.latency_count else 0
             if avg_latency > 0:
-                latencies_ms = [l * 1000 for l in latencies]  # Convert to milliseconds
-                snapshot = MetricSnapshot(
-                    metric_category="alert_delivery",
-                    metric_name="avg_delivery_latency_ms",
-                    snapshot_time=win_end,
-                    window_start=win_start,
-                    window_end=win_end,
-                    aggregation_period=aggregation_period,
+                snapshots.append(self._snapshot_values(
+                    "alert_delivery", "avg_delivery_latency_ms", win_start, win_end, aggregation_period,
                     value=avg_latency,
-                    min_value=min(latencies_ms),
-                    max_value=max(latencies_ms),
+                    min_value=row.min_latency * 1000,
+                    max_value=row.max_latency * 1000,
                     avg_value=avg_latency,
-                    sample_count=len(latencies),
-                )
-                db.session.add(snapshot)
-                snapshot_count += 1
+                    sample_count=row.latency_count,
+                ))
 
-            # Create alert volume snapshot
-            snapshot = MetricSnapshot(
-                metric_category="alert_delivery",
-                metric_name="alert_volume",
-                snapshot_time=win_end,
-                window_start=win_start,
-                window_end=win_end,
-                aggregation_period=aggregation_period,
-                value=float(total_alerts),
-                sample_count=len(reports),
-            )
-            db.session.add(snapshot)
-            snapshot_count += 1
+            snapshots.append(self._snapshot_values(
+                "alert_delivery", "alert_volume", win_start, win_end, aggregation_period,
+                value=total_alerts,
+                sample_count=row.reports,
+            ))
 
+        snapshot_count = self._upsert_snapshots(snapshots)
         db.session.commit()
         return snapshot_count
 
@@ -230,95 +224,69 @@ class MetricsAggregator:
         - Silence detection rate
         - Signal level (RMS)
         """
-        snapshot_count = 0
         now = utc_now()
-        window_start = now - timedelta(hours=lookback_hours)
+        since = self._aggregation_start("audio_health", aggregation_period, lookback_hours, now)
 
-        windows = self._get_time_windows(window_start, now, aggregation_period)
-
-        for win_start, win_end in windows:
-            if self._snapshot_exists(
-                "audio_health",
-                "avg_health_score",
-                win_end,
+        health_windows = self._query_windows(
+            AudioHealthStatus.timestamp,
+            since,
+            now,
+            aggregation_period,
+            func.count(AudioHealthStatus.id).label("samples"),
+            func.avg(AudioHealthStatus.health_score).label("avg_health"),
+            func.min(AudioHealthStatus.health_score).label("min_health"),
+            func.max(AudioHealthStatus.health_score).label("max_health"),
+            func.stddev_samp(AudioHealthStatus.health_score).label("stddev_health"),
+            func.sum(case((AudioHealthStatus.silence_detected.is_(True), 1), else_=0)).label("silent"),
+        )
+        level_windows = {
+            row.bucket: row
+            for row in self._query_windows(
+                AudioSourceMetrics.timestamp,
+                since,
+                now,
                 aggregation_period,
-            ):
-                continue
-
-            # Query audio health status in this window
-            health_records = AudioHealthStatus.query.filter(
-                AudioHealthStatus.timestamp >= win_start,
-                AudioHealthStatus.timestamp < win_end,
-            ).all()
-
-            if not health_records:
-                continue
-
-            # Calculate average health score
-            health_scores = [r.health_score for r in health_records]
-            avg_health = sum(health_scores) / len(health_scores)
-
-            snapshot = MetricSnapshot(
-                metric_category="audio_health",
-                metric_name="avg_health_score",
-                snapshot_time=win_end,
-                window_start=win_start,
-                window_end=win_end,
-                aggregation_period=aggregation_period,
-                value=avg_health,
-                min_value=min(health_scores),
-                max_value=max(health_scores),
-                avg_value=avg_health,
-                stddev_value=self._calculate_stddev(health_scores),
-                sample_count=len(health_records),
-            )
-            db.session.add(snapshot)
-            snapshot_count += 1
-
-            # Calculate silence detection rate
-            silence_count = sum(1 for r in health_records if r.silence_detected)
-            silence_rate = (silence_count / len(health_records) * 100)
-
-            snapshot = MetricSnapshot(
-                metric_category="audio_health",
-                metric_name="silence_detection_rate",
-                snapshot_time=win_end,
-                window_start=win_start,
-                window_end=win_end,
-                aggregation_period=aggregation_period,
-                value=silence_rate,
-                sample_count=len(health_records),
+                func.count(AudioSourceMetrics.rms_level_db).label("samples"),
+                func.avg(AudioSourceMetrics.rms_level_db).label("avg_rms"),
+                func.min(AudioSourceMetrics.rms_level_db).label("min_rms"),
+                func.max(AudioSourceMetrics.rms_level_db).label("max_rms"),
+                func.stddev_samp(AudioSourceMetrics.rms_level_db).label("stddev_rms"),
             )
-            db.session.add(snapshot)
-            snapshot_count += 1
-
-            # Query audio metrics for signal levels
-            audio_metrics = AudioSourceMetrics.query.filter(
-                AudioSourceMetrics.timestamp >= win_start,
-                AudioSourceMetrics.timestamp < win_end,
-            ).all()
-
-            if audio_metrics:
-                rms_levels = [m.rms_level_db for m in audio_metrics]
-                avg_rms = sum(rms_levels) / len(rms_levels)
-
-                snapshot = MetricSnapshot(
-                    metric_category="audio_health",
-                    metric_name="avg_signal_level_db",
-                    snapshot_time=win_end,
-                    window_start=win_start,
-                    window_end=win_end,
-                    aggregation_period=aggregation_period,
-                    value=avg_rms,
-                    min_value=min(rms_levels),
-                    max_value=max(rms_levels),
-                    avg_value=avg_rms,
-                    stddev_value=self._calculate_stddev(rms_levels),
-                    sample_count=len(audio_metrics),
-                )
-                db.session.add(snapshot)
-                snapshot_count += 1
-
+        }
+
+        snapshots = []
+        for row in health_windows:
+            win_start, win_end = self._window_bounds(row.bucket, aggregation_period, now)
+
+            snapshots.append(self._snapshot_values(
+                "audio_health", "avg_health_score", win_start, win_end, aggregation_period,
+                value=row.avg_health,
+                min_value=row.min_health,
+                max_value=row.max_health,
+                avg_value=row.avg_health,
+                stddev_value=row.stddev_health,
+                sample_count=row.samples,
+            ))
+
+            snapshots.append(self._snapshot_values(
+                "audio_health", "silence_detection_rate", win_start, win_end, aggregation_period,
+                value=row.silent / row.samples * 100,
+                sample_count=row.samples,
+            ))
+
+            levels = level_windows.get(row.bucket)
+            if levels is not None and levels.samples:
+                snapshots.append(self._snapshot_values(
+                    "audio_health", "avg_signal_level_db", win_start, win_end, aggregation_period,
+                    value=levels.avg_rms,
+                    min_value=levels.min_rms,
+                    max_value=levels.max_rms,
+                    avg_value=levels.avg_rms,
+                    stddev_value=levels.stddev_rms,
+                    sample_count=levels.samples,
+                ))
+
+        snapshot_count = self._upsert_snapshots(snapshots)
         db.session.commit()
         return snapshot_count
 
@@ -331,49 +299,30 @@ class MetricsAggregator:
 
         Metrics collected:
         - Receiver availability rate
-        - Average signal quality
         """
-        snapshot_count = 0
         now = utc_now()
-        window_start = now - timedelta(hours=lookback_hours)
-
-        windows = self._get_time_windows(window_start, now, aggregation_period)
+        since = self._aggregation_start("receiver_status", aggregation_period, lookback_hours, now)
 
-        for win_start, win_end in windows:
-            if self._snapshot_exists(
-                "receiver_status",
-                "availability_rate",
-                win_end,
-                aggregation_period,
-            ):
-                continue
-
-            # Query receiver status in this window
-            status_records = RadioReceiverStatus.query.filter(
-                RadioReceiverStatus.timestamp >= win_start,
-                RadioReceiverStatus.timestamp < win_end,
-            ).all()
-
-            if not status_records:
-                continue
-
-            # Calculate availability rate (percentage of time receiver was active)
-            active_count = sum(1 for r in status_records if r.is_active)
-            availability_rate = (active_count / len(status_records) * 100)
-
-            snapshot = MetricSnapshot(
-                metric_category="receiver_status",
-                metric_name="availability_rate",
-                snapshot_time=win_end,
-                window_start=win_start,
-                window_end=win_end,
-                aggregation_period=aggregation_period,
-                value=availability_rate,
-                sample_count=len(status_records),
-            )
-            db.session.add(snapshot)
-            snapshot_count += 1
+        windows = self._query_windows(
+            RadioReceiverStatus.reported_at,
+            since,
+            now,
+            aggregation_period,
+            func.count(RadioReceiverStatus.id).label("samples"),
+            func.sum(case((RadioReceiverStatus.locked.is_(True), 1), else_=0)).label("locked"),
+        )
 
+        snapshots = []
+        for row in windows:
+            win_start, win_end = self._window_bounds(row.bucket, aggregation_period, now)
+            # Availability rate: percentage of status reports with the receiver locked
+            snapshots.append(self._snapshot_values(
+                "receiver_status", "availability_rate", win_start, win_end, aggregation_period,
+                value=row.locked / row.samples * 100,
+                sample_count=row.samples,
+            ))
+
+        snapshot_count = self._upsert_snapshots(snapshots)
         db.session.commit()
         return snapshot_count
 
@@ -388,67 +337,42 @@ class MetricsAggregator:
         - Activation count
         - Average activation duration
         """
-        snapshot_count = 0
         now = utc_now()
-        window_start = now - timedelta(hours=lookback_hours)
-
-        windows = self._get_time_windows(window_start, now, aggregation_period)
-
-        for win_start, win_end in windows:
-            if self._snapshot_exists(
-                "gpio_activity",
-                "activation_count",
-                win_end,
-                aggregation_period,
-            ):
-                continue
+        since = self._aggregation_start("gpio_activity", aggregation_period, lookback_hours, now)
 
-            # Query GPIO activations in this window
-            activations = GPIOActivationLog.query.filter(
-                GPIOActivationLog.activated_at >= win_start,
-                GPIOActivationLog.activated_at < win_end,
-            ).all()
-
-            if not activations:
-                continue
-
-            # Create activation count snapshot
-            snapshot = MetricSnapshot(
-                metric_category="gpio_activity",
-                metric_name="activation_count",
-                snapshot_time=win_end,
-                window_start=win_start,
-                window_end=win_end,
-                aggregation_period=aggregation_period,
-                value=float(len(activations)),
-                sample_count=len(activations),
-            )
-            db.session.add(snapshot)
-            snapshot_count += 1
-
-            # Calculate average duration
-            durations = [
-                a.duration_seconds for a in activations if a.duration_seconds is not None
-            ]
-            if durations:
-                avg_duration = sum(durations) / len(durations)
-
-                snapshot = MetricSnapshot(
-                    metric_category="gpio_activity",
-                    metric_name="avg_activation_duration",
-                    snapshot_time=win_end,
-                    window_start=win_start,
-                    window_end=win_end,
-                    aggregation_period=aggregation_period,
-                    value=avg_duration,
-                    min_value=min(durations),
-                    max_value=max(durations),
-                    avg_value=avg_duration,
-                    sample_count=len(durations),
-                )
-                db.session.add(snapshot)
-                snapshot_count += 1
+        windows = self._query_windows(
+            GPIOActivationLog.activated_at,
+            since,
+            now,
+            aggregation_period,
+            func.count(GPIOActivationLog.id).label("activations"),
+            func.avg(GPIOActivationLog.duration_seconds).label("avg_duration"),
+            func.min(GPIOActivationLog.duration_seconds).label("min_duration"),
+            func.max(GPIOActivationLog.duration_seconds).label("max_duration"),
+            func.count(GPIOActivationLog.duration_seconds).label("durations"),
+        )
 
+        snapshots = []
+        for row in windows:
+            win_start, win_end = self._window_bounds(row.bucket, aggregation_period, now)
+
+            snapshots.append(self._snapshot_values(
+                "gpio_activity", "activation_count", win_start, win_end, aggregation_period,
+                value=row.activations,
+                sample_count=row.activations,
+            ))
+
+            if row.durations:
+                snapshots.append(self._snapshot_values(
+                    "gpio_activity", "avg_activation_duration", win_start, win_end, aggregation_period,
+                    value=row.avg_duration,
+                    min_value=row.min_duration,
+                    max_value=row.max_duration,
+                    avg_value=row.avg_duration,
+                    sample_count=row.durations,
+                ))
+
+        snapshot_count = self._upsert_snapshots(snapshots)
         db.session.commit()
         return snapshot_count
 
@@ -582,21 +506,153 @@ class MetricsAggregator:
 
         return query.first() is not None
 
-    def _calculate_stddev(self, values: List[float]) -> Optional[float]:
-        """Calculate standard deviation of values.
+    def _period_unit(self, aggregation_period: str) -> Tuple[str, timedelta]:
+        """Return the ``date_trunc`` unit and window length for a period."""
+        try:
+            return _PERIOD_UNITS[aggregation_period]
+        except KeyError:
+            raise ValueError(f"Invalid aggregation period: {aggregation_period}") from None
+
+    def _window_floor(self, moment: datetime, aggregation_period: str) -> datetime:
+        """Start of the UTC window containing ``moment`` (matches ``date_trunc``)."""
+        self._period_unit(aggregation_period)
+        moment = as_utc(moment).replace(minute=0, second=0, microsecond=0)
+        if aggregation_period in ("daily", "weekly"):
+            moment = moment.replace(hour=0)
+        if aggregation_period == "weekly":
+            moment -= timedelta(days=moment.weekday())
+        return moment
+
+    def _aggregation_start(
+        self,
+        category: str,
+        aggregation_period: str,
+        lookback_hours: int,
+        now: datetime,
+    ) -> datetime:
+        """Where to resume aggregating ``category``: the high-water mark.
+
+        The newest window already stored is recomputed (it may have been
+        partial, or rows may have arrived late); everything before it is left
+        alone.  The mark is floored to the period, since snapshots written
+        before windows were aligned may start mid-window.  Without any
+        snapshots yet, start ``lookback_hours`` back.
+        """
+        high_water_mark = db.session.query(func.max(MetricSnapshot.window_start)).filter(
+            MetricSnapshot.metric_category == category,
+            MetricSnapshot.aggregation_period == aggregation_period,
+        ).scalar()
+        if high_water_mark is not None:
+            return self._window_floor(high_water_mark, aggregation_period)
+        return self._window_floor(now - timedelta(hours=lookback_hours), aggregation_period)
+
+    def _query_windows(
+        self,
+        time_column,
+        since: datetime,
+        until: datetime,
+        aggregation_period: str,
+        *aggregates,
+    ) -> List[Any]:
+        """Run one grouped query: ``aggregates`` per UTC window of ``time_column``.
 
-        Args:
-            values: List of numeric values
+        Rows carry a ``bucket`` column (window start) and are ordered by it;
+        windows without any rows are absent.
+        """
+        unit, _ = self._period_unit(aggregation_period)
+        # Literal arguments so GROUP BY repeats the exact select expression
+        bucket = func.date_trunc(
+            literal_column(f"'{unit}'"),
+            func.timezone(literal_column("'UTC'"), time_column),
+            type_=db.DateTime,
+        ).label("bucket")
+        query = (
+            select(bucket, *aggregates)
+            .where(time_column >= since, time_column < until)
+            .group_by(bucket)
+            .order_by(bucket)
+        )
+        return db.session.execute(query).all()
+
+    def _window_bounds(
+        self,
+        bucket: datetime,
+        aggregation_period: str,
+        now: datetime,
+    ) -> Tuple[datetime, datetime]:
+        """Window start/end for a bucket; the current window ends at ``now``."""
+        _, delta = self._period_unit(aggregation_period)
+        win_start = as_utc(bucket)
+        return win_start, min(win_start + delta, now)
+
+    def _snapshot_values(
+        self,
+        category: str,
+        name: str,
+        win_start: datetime,
+        win_end: datetime,
+        aggregation_period: str,
+        value: Any,
+        min_value: Any = None,
+        max_value: Any = None,
+        avg_value: Any = None,
+        stddev_value: Any = None,
+        sample_count: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Column values for one ``MetricSnapshot`` row."""
+        return {
+            "metric_category": category,
+            "metric_name": name,
+            "snapshot_time": win_end,
+            "window_start": win_start,
+            "window_end": win_end,
+            "aggregation_period": aggregation_period,
+            # avg() over integer columns comes back as Decimal on PostgreSQL
+            "value": float(value),
+            "min_value": _optional_float(min_value),
+            "max_value": _optional_float(max_value),
+            "avg_value": _optional_float(avg_value),
+            "stddev_value": _optional_float(stddev_value),
+            "sample_count": int(sample_count) if sample_count is not None else None,
+            "created_at": utc_now(),
+        }
+
+    def _upsert_snapshots(self, snapshots: List[Dict[str, Any]]) -> int:
+        """Insert or replace snapshots in bulk, keyed on their window.
 
         Returns:
-            Standard deviation or None if insufficient data
+            Number of snapshots written
         """
-        if len(values) < 2:
-            return None
+        if not snapshots:
+            return 0
+
+        dialect = db.session.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            raise RuntimeError(f"Snapshot upsert is not supported on {dialect}")
+
+        table = MetricSnapshot.__table__
+        for offset in range(0, len(snapshots), _UPSERT_BATCH_SIZE):
+            statement = insert(table).values(snapshots[offset:offset + _UPSERT_BATCH_SIZE])
+            statement = statement.on_conflict_do_update(
+                index_elements=[
+                    table.c.metric_category,
+                    table.c.metric_name,
+                    table.c.aggregation_period,
+                    table.c.window_start,
+                    func.coalesce(table.c.entity_id, literal_column("''")),
+                ],
+                set_={
+                    column: statement.excluded[column]
+                    for column in _UPSERT_UPDATE_COLUMNS
+                },
+            )
+            db.session.execute(statement)
 
-        mean = sum(values) / len(values)
-        variance = sum((x - mean) ** 2 for x in values) / (len(values) - 1)
-        return variance ** 0.5
+        return len(snapshots)
 
 
 __all__ = ["MetricsAggregator"]
@@ -29,13 +29,26 @@ This module provides functionality to detect anomalies in time-series metrics:
 """
 
 import logging
+from collections import defaultdict
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 
-from sqlalchemy import and_
+import numpy as np
+from sqlalchemy import and_, tuple_
 
 from app_core.extensions import db
-from app_core.analytics.models import MetricSnapshot, TrendRecord, AnomalyRecord
+from app_core.analytics.models import TrendRecord, AnomalyRecord
+from app_core.analytics.series import (
+    SeriesKey,
+    SnapshotSeries,
+    as_utc,
+    batch_mean_stddev,
+    batch_min_max,
+    batch_percentile_rank,
+    distinct_series_keys,
+    load_snapshot_series,
+    pad_series,
+)
 from app_utils import utc_now
 
 logger = logging.getLogger(__name__)
@@ -63,6 +76,8 @@ class AnomalyDetector:
     ) -> int:
         """Detect anomalies for all metrics or specified categories.
 
+        Every series is loaded with one query and checked in one batch.
+
         Args:
             baseline_days: Number of days to use for baseline calculation
             metric_categories: Optional list of categories to check
@@ -70,38 +85,17 @@ class AnomalyDetector:
         Returns:
             Number of anomalies detected
         """
-        # Get unique metric combinations
-        query = db.session.query(
-            MetricSnapshot.metric_category,
-            MetricSnapshot.metric_name,
-            MetricSnapshot.entity_id,
-        ).distinct()
-
-        if metric_categories:
-            query = query.filter(MetricSnapshot.metric_category.in_(metric_categories))
-
-        metrics = query.all()
-
-        anomaly_count = 0
-        for category, name, entity_id in metrics:
-            try:
-                anomalies = self.detect_metric_anomalies(
-                    metric_category=category,
-                    metric_name=name,
-                    baseline_days=baseline_days,
-                    entity_id=entity_id,
-                )
-                anomaly_count += len(anomalies)
-            except Exception as e:
-                self.logger.error(
-                    "Failed to detect anomalies for %s.%s: %s",
-                    category,
-                    name,
-                    str(e),
-                )
+        keys = distinct_series_keys(metric_categories)
 
-        self.logger.info("Detected %d anomalies", anomaly_count)
-        return anomaly_count
+        try:
+            anomalies = self.detect_series_anomalies(keys, baseline_days=baseline_days)
+        except Exception as e:
+            db.session.rollback()
+            self.logger.error("Failed to detect anomalies: %s", str(e))
+            return 0
+
+        self.logger.info("Detected %d anomalies", len(anomalies))
+        return len(anomalies)
 
     def detect_metric_anomalies(
         self,
@@ -123,224 +117,152 @@ class AnomalyDetector:
         Returns:
             List of detected AnomalyRecord objects
         """
-        now = utc_now()
-        baseline_start = now - timedelta(days=baseline_days)
-        check_start = now - timedelta(hours=lookback_hours)
-
-        # Get baseline snapshots (excluding the recent period we're checking)
-        baseline_query = MetricSnapshot.query.filter(
-            and_(
-                MetricSnapshot.metric_category == metric_category,
-                MetricSnapshot.metric_name == metric_name,
-                MetricSnapshot.snapshot_time >= baseline_start,
-                MetricSnapshot.snapshot_time < check_start,
-            )
+        anomalies = self.detect_series_anomalies(
+            [(metric_category, metric_name, entity_id)],
+            baseline_days=baseline_days,
+            lookback_hours=lookback_hours,
         )
 
-        if entity_id:
-            baseline_query = baseline_query.filter(MetricSnapshot.entity_id == entity_id)
-
-        baseline_snapshots = baseline_query.order_by(MetricSnapshot.snapshot_time).all()
-
-        if len(baseline_snapshots) < 5:
-            self.logger.debug(
-                "Insufficient baseline data for anomaly detection: %s.%s (only %d points)",
+        if anomalies:
+            self.logger.info(
+                "Detected %d anomalies for %s.%s",
+                len(anomalies),
                 metric_category,
                 metric_name,
-                len(baseline_snapshots),
             )
+
+        return anomalies
+
+    def detect_series_anomalies(
+        self,
+        keys: Sequence[SeriesKey],
+        baseline_days: int = 7,
+        lookback_hours: int = 24,
+    ) -> List[AnomalyRecord]:
+        """Detect anomalies in many metric series at once.
+
+        Each series' recent points (the last ``lookback_hours``) are checked
+        against its baseline (the ``baseline_days`` before them) for Z-score
+        outliers and period-over-period spikes and drops, and its two latest
+        trend records for a reversal.  Series with fewer than five baseline
+        points or a constant baseline are skipped.
+
+        Args:
+            keys: (category, name, entity_id) of each series to check
+            baseline_days: Number of days for baseline calculation
+            lookback_hours: How far back to check for new anomalies
+
+        Returns:
+            List of detected AnomalyRecord objects, grouped by series in the
+            order of ``keys``
+        """
+        now = utc_now()
+        baseline_start = now - timedelta(days=baseline_days)
+        check_start = now - timedelta(hours=lookback_hours)
+
+        # One query for every series; split each at the start of the checked period
+        split = [
+            snapshot_series.split(check_start)
+            for snapshot_series in load_snapshot_series(keys, baseline_start, now)
+        ]
+        if not split:
             return []
 
-        # Calculate baseline statistics
-        baseline_values = [s.value for s in baseline_snapshots]
-        baseline_mean = sum(baseline_values) / len(baseline_values)
-        baseline_stddev = self._calculate_stddev(baseline_values)
+        baseline_values, baseline_lengths = pad_series([baseline.values for baseline, _ in split])
+        baseline_mean, baseline_stddev = batch_mean_stddev(baseline_values, baseline_lengths)
+        baseline_min, baseline_max = batch_min_max(baseline_values, baseline_lengths)
 
-        if baseline_stddev is None or baseline_stddev == 0:
+        # A constant baseline has no spread to measure deviations against
+        usable = np.flatnonzero((baseline_lengths >= 5) & (baseline_max > baseline_min))
+        if len(usable) < len(split):
             self.logger.debug(
-                "Zero standard deviation for %s.%s, skipping anomaly detection",
-                metric_category,
-                metric_name,
+                "Skipping anomaly detection for %d series with too little or constant baseline data",
+                len(split) - len(usable),
             )
+        if not len(usable):
             return []
 
-        # Get recent snapshots to check
-        check_query = MetricSnapshot.query.filter(
-            and_(
-                MetricSnapshot.metric_category == metric_category,
-                MetricSnapshot.metric_name == metric_name,
-                MetricSnapshot.snapshot_time >= check_start,
-                MetricSnapshot.snapshot_time <= now,
-            )
+        checks = [split[row][1] for row in usable]
+        check_values, check_lengths = pad_series([check.values for check in checks])
+        mean = baseline_mean[usable]
+        stddev = baseline_stddev[usable]
+
+        # Z-score outliers
+        with np.errstate(invalid="ignore"):
+            z_scores = (check_values - mean[:, None]) / stddev[:, None]
+            outliers = np.abs(z_scores) >= self.Z_SCORE_THRESHOLD_LOW
+        outlier_rows, outlier_cols = np.nonzero(outliers)
+        percentiles = batch_percentile_rank(
+            check_values[outlier_rows, outlier_cols],
+            usable[outlier_rows],
+            baseline_values,
+            baseline_lengths,
         )
 
-        if entity_id:
-            check_query = check_query.filter(MetricSnapshot.entity_id == entity_id)
-
-        check_snapshots = check_query.order_by(MetricSnapshot.snapshot_time).all()
-
-        anomalies = []
-
-        # Check for Z-score based outliers
-        for snapshot in check_snapshots:
-            # Check if anomaly already recorded
-            if self._anomaly_exists(
-                metric_category,
-                metric_name,
-                snapshot.snapshot_time,
-                entity_id,
-            ):
-                continue
-
-            z_score = (snapshot.value - baseline_mean) / baseline_stddev
-            abs_z_score = abs(z_score)
-
-            # Classify severity based on Z-score
-            if abs_z_score >= self.Z_SCORE_THRESHOLD_CRITICAL:
-                severity = "critical"
-                anomaly_type = "outlier"
-            elif abs_z_score >= self.Z_SCORE_THRESHOLD_HIGH:
-                severity = "high"
-                anomaly_type = "outlier"
-            elif abs_z_score >= self.Z_SCORE_THRESHOLD_MEDIUM:
-                severity = "medium"
-                anomaly_type = "outlier"
-            elif abs_z_score >= self.Z_SCORE_THRESHOLD_LOW:
-                severity = "low"
-                anomaly_type = "outlier"
-            else:
-                continue  # Not an anomaly
-
-            # Calculate additional metrics
-            deviation = snapshot.value - baseline_mean
-            expected_min = baseline_mean - (3 * baseline_stddev)
-            expected_max = baseline_mean + (3 * baseline_stddev)
-
-            # Calculate percentile (simplified)
-            percentile = self._calculate_percentile(snapshot.value, baseline_values)
-
-            # Create description
-            direction = "above" if z_score > 0 else "below"
-            description = (
-                f"{metric_name} is {abs(deviation):.2f} {direction} baseline "
-                f"(Z-score: {z_score:.2f})"
+        # Spikes and drops between consecutive checked points
+        previous = check_values[:, :-1]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            percent_changes = np.divide(
+                check_values[:, 1:] - previous,
+                np.abs(previous),
+                out=np.full(previous.shape, np.nan),
+                where=previous != 0,
             )
+            jumps = np.abs(percent_changes) >= self.SPIKE_DROP_THRESHOLD
+        jump_rows, jump_cols = np.nonzero(jumps)
+
+        outliers_by_row = defaultdict(list)
+        for row, col, percentile in zip(outlier_rows.tolist(), outlier_cols.tolist(), percentiles.tolist()):
+            outliers_by_row[row].append((col, percentile))
+        jumps_by_row = defaultdict(list)
+        for row, col in zip(jump_rows.tolist(), jump_cols.tolist()):
+            jumps_by_row[row].append(col + 1)
+
+        trend_breaks = self._find_trend_breaks([check.key for check in checks], now)
+        seen = self._recorded_anomalies(
+            [check.key for check in checks],
+            min(check_start, now - timedelta(days=7)),
+        )
 
-            anomaly = AnomalyRecord(
-                metric_category=metric_category,
-                metric_name=metric_name,
-                detected_at=now,
-                metric_time=snapshot.snapshot_time,
-                entity_id=entity_id,
-                entity_type=snapshot.entity_type,
-                anomaly_type=anomaly_type,
-                severity=severity,
-                observed_value=snapshot.value,
-                expected_value=baseline_mean,
-                expected_min=expected_min,
-                expected_max=expected_max,
-                deviation=deviation,
-                z_score=z_score,
-                percentile=percentile,
-                confidence=min(abs_z_score / 4.0, 1.0),  # Scale to 0-1
-                baseline_window_days=baseline_days,
-                baseline_mean=baseline_mean,
-                baseline_stddev=baseline_stddev,
-                description=description,
-            )
+        anomalies: List[AnomalyRecord] = []
 
-            db.session.add(anomaly)
+        def record(anomaly: AnomalyRecord) -> None:
+            seen.add(anomaly.metric_category, anomaly.metric_name, anomaly.metric_time, anomaly.entity_id)
             anomalies.append(anomaly)
 
-        # Check for spikes and drops (sudden changes)
-        if len(check_snapshots) >= 2:
-            for i in range(1, len(check_snapshots)):
-                prev_snapshot = check_snapshots[i - 1]
-                curr_snapshot = check_snapshots[i]
-
-                if self._anomaly_exists(
-                    metric_category,
-                    metric_name,
-                    curr_snapshot.snapshot_time,
-                    entity_id,
-                ):
-                    continue
+        for row, check in enumerate(checks):
+            metric_category, metric_name, entity_id = check.key
+            row_mean = float(mean[row])
+            row_stddev = float(stddev[row])
 
-                # Calculate percent change
-                if prev_snapshot.value != 0:
-                    percent_change = (
-                        (curr_snapshot.value - prev_snapshot.value)
-                        / abs(prev_snapshot.value)
-                    )
-                else:
+            for col, percentile in outliers_by_row.get(row, ()):
+                metric_time = check.times[col]
+                if seen.contains(metric_category, metric_name, metric_time, entity_id):
                     continue
+                record(self._outlier_anomaly(
+                    check, col, float(z_scores[row, col]), percentile,
+                    row_mean, row_stddev, baseline_days, now,
+                ))
 
-                # Check for spike or drop
-                if abs(percent_change) >= self.SPIKE_DROP_THRESHOLD:
-                    anomaly_type = "spike" if percent_change > 0 else "drop"
-
-                    # Classify severity
-                    if abs(percent_change) >= 1.0:  # 100% change
-                        severity = "critical"
-                    elif abs(percent_change) >= 0.75:  # 75% change
-                        severity = "high"
-                    elif abs(percent_change) >= 0.6:  # 60% change
-                        severity = "medium"
-                    else:
-                        severity = "low"
-
-                    description = (
-                        f"{metric_name} {'increased' if percent_change > 0 else 'decreased'} "
-                        f"by {abs(percent_change * 100):.1f}% in one period"
-                    )
-
-                    anomaly = AnomalyRecord(
-                        metric_category=metric_category,
-                        metric_name=metric_name,
-                        detected_at=now,
-                        metric_time=curr_snapshot.snapshot_time,
-                        entity_id=entity_id,
-                        entity_type=curr_snapshot.entity_type,
-                        anomaly_type=anomaly_type,
-                        severity=severity,
-                        observed_value=curr_snapshot.value,
-                        expected_value=prev_snapshot.value,
-                        deviation=curr_snapshot.value - prev_snapshot.value,
-                        confidence=min(abs(percent_change), 1.0),
-                        baseline_window_days=baseline_days,
-                        baseline_mean=baseline_mean,
-                        baseline_stddev=baseline_stddev,
-                        description=description,
-                        extra_metadata={
-                            "percent_change": percent_change * 100,
-                            "previous_value": prev_snapshot.value,
-                        },
-                    )
-
-                    db.session.add(anomaly)
-                    anomalies.append(anomaly)
-
-        # Check for trend breaks (using existing trend records)
-        trend_anomalies = self._detect_trend_breaks(
-            metric_category,
-            metric_name,
-            entity_id,
-            baseline_mean,
-            baseline_stddev,
-            baseline_days,
-        )
-        anomalies.extend(trend_anomalies)
-
+            for col in jumps_by_row.get(row, ()):
+                if seen.contains(metric_category, metric_name, check.times[col], entity_id):
+                    continue
+                record(self._jump_anomaly(
+                    check, col, float(percent_changes[row, col - 1]),
+                    row_mean, row_stddev, baseline_days, now,
+                ))
+
+            trend_break = trend_breaks.get(row)
+            if trend_break is not None:
+                current_trend, previous_trend = trend_break
+                if not seen.contains(metric_category, metric_name, current_trend.analysis_time, entity_id):
+                    record(self._trend_break_anomaly(
+                        check.key, current_trend, previous_trend,
+                        row_mean, row_stddev, baseline_days, now,
+                    ))
+
+        db.session.add_all(anomalies)
         db.session.commit()
-
-        if anomalies:
-            self.logger.info(
-                "Detected %d anomalies for %s.%s",
-                len(anomalies),
-                metric_category,
-                metric_name,
-            )
-
         return anomalies
 
     def get_active_anomalies(
@@ -450,156 +372,258 @@ class AnomalyDetector:
         db.session.commit()
         return anomaly
 
-    def _detect_trend_breaks(
+    def _outlier_anomaly(
         self,
-        metric_category: str,
-        metric_name: str,
-        entity_id: Optional[str],
+        check: SnapshotSeries,
+        index: int,
+        z_score: float,
+        percentile: float,
         baseline_mean: float,
         baseline_stddev: float,
         baseline_days: int,
-    ) -> List[AnomalyRecord]:
-        """Detect sudden changes in trend direction or magnitude.
-
-        Args:
-            metric_category: Metric category
-            metric_name: Metric name
-            entity_id: Optional entity identifier
-            baseline_mean: Baseline mean value
-            baseline_stddev: Baseline standard deviation
-            baseline_days: Baseline window in days
-
-        Returns:
-            List of detected anomalies
-        """
-        anomalies = []
-        now = utc_now()
-
-        # Get recent trend records
-        query = TrendRecord.query.filter(
-            and_(
-                TrendRecord.metric_category == metric_category,
-                TrendRecord.metric_name == metric_name,
-                TrendRecord.analysis_time >= now - timedelta(days=7),
-            )
+        now: datetime,
+    ) -> AnomalyRecord:
+        """Build the record of a Z-score outlier at ``check.times[index]``."""
+        observed = check.values[index]
+        abs_z_score = abs(z_score)
+
+        # Classify severity based on Z-score
+        if abs_z_score >= self.Z_SCORE_THRESHOLD_CRITICAL:
+            severity = "critical"
+        elif abs_z_score >= self.Z_SCORE_THRESHOLD_HIGH:
+            severity = "high"
+        elif abs_z_score >= self.Z_SCORE_THRESHOLD_MEDIUM:
+            severity = "medium"
+        else:
+            severity = "low"
+
+        deviation = observed - baseline_mean
+        direction = "above" if z_score > 0 else "below"
+        description = (
+            f"{check.metric_name} is {abs(deviation):.2f} {direction} baseline "
+            f"(Z-score: {z_score:.2f})"
         )
 
-        if entity_id:
-            query = query.filter(TrendRecord.entity_id == entity_id)
-
-        trends = query.order_by(TrendRecord.analysis_time.desc()).limit(2).all()
-
-        if len(trends) < 2:
-            return anomalies
-
-        current_trend = trends[0]
-        previous_trend = trends[1]
+        return AnomalyRecord(
+            metric_category=check.metric_category,
+            metric_name=check.metric_name,
+            detected_at=now,
+            metric_time=check.times[index],
+            entity_id=check.entity_id,
+            entity_type=check.entity_types[index],
+            anomaly_type="outlier",
+            severity=severity,
+            observed_value=observed,
+            expected_value=baseline_mean,
+            expected_min=baseline_mean - (3 * baseline_stddev),
+            expected_max=baseline_mean + (3 * baseline_stddev),
+            deviation=deviation,
+            z_score=z_score,
+            percentile=percentile,
+            confidence=min(abs_z_score / 4.0, 1.0),  # Scale to 0-1
+            baseline_window_days=baseline_days,
+            baseline_mean=baseline_mean,
+            baseline_stddev=baseline_stddev,
+            description=description,
+        )
 
-        # Check for trend direction reversal
-        if (
-            current_trend.trend_direction != previous_trend.trend_direction
-            and current_trend.trend_direction != "stable"
-            and previous_trend.trend_direction != "stable"
-        ):
-            description = (
-                f"{metric_name} trend reversed from {previous_trend.trend_direction} "
-                f"to {current_trend.trend_direction}"
-            )
+    def _jump_anomaly(
+        self,
+        check: SnapshotSeries,
+        index: int,
+        percent_change: float,
+        baseline_mean: float,
+        baseline_stddev: float,
+        baseline_days: int,
+        now: datetime,
+    ) -> AnomalyRecord:
+        """Build the record of a spike or drop into ``check.times[index]``."""
+        observed = check.values[index]
+        previous = check.values[index - 1]
+
+        # Classify severity
+        if abs(percent_change) >= 1.0:  # 100% change
+            severity = "critical"
+        elif abs(percent_change) >= 0.75:  # 75% change
+            severity = "high"
+        elif abs(percent_change) >= 0.6:  # 60% change
+            severity = "medium"
+        else:
+            severity = "low"
+
+        description = (
+            f"{check.metric_name} {'increased' if percent_change > 0 else 'decreased'} "
+            f"by {abs(percent_change * 100):.1f}% in one period"
+        )
 
-            # Check if we already recorded this anomaly
-            if not self._anomaly_exists(
-                metric_category,
-                metric_name,
-                current_trend.analysis_time,
-                entity_id,
-            ):
-                anomaly = AnomalyRecord(
-                    metric_category=metric_category,
-                    metric_name=metric_name,
-                    detected_at=now,
-                    metric_time=current_trend.analysis_time,
-                    entity_id=entity_id,
-                    entity_type=current_trend.entity_type,
-                    anomaly_type="trend_break",
-                    severity="medium",
-                    observed_value=current_trend.mean_value,
-                    expected_value=previous_trend.mean_value,
-                    deviation=current_trend.mean_value - previous_trend.mean_value,
-                    confidence=0.7,
-                    baseline_window_days=baseline_days,
-                    baseline_mean=baseline_mean,
-                    baseline_stddev=baseline_stddev,
-                    description=description,
-                    extra_metadata={
-                        "previous_direction": previous_trend.trend_direction,
-                        "current_direction": current_trend.trend_direction,
-                    },
-                )
+        return AnomalyRecord(
+            metric_category=check.metric_category,
+            metric_name=check.metric_name,
+            detected_at=now,
+            metric_time=check.times[index],
+            entity_id=check.entity_id,
+            entity_type=check.entity_types[index],
+            anomaly_type="spike" if percent_change > 0 else "drop",
+            severity=severity,
+            observed_value=observed,
+            expected_value=previous,
+            deviation=observed - previous,
+            confidence=min(abs(percent_change), 1.0),
+            baseline_window_days=baseline_days,
+            baseline_mean=baseline_mean,
+            baseline_stddev=baseline_stddev,
+            description=description,
+            extra_metadata={
+                "percent_change": percent_change * 100,
+                "previous_value": previous,
+            },
+        )
 
-                db.session.add(anomaly)
-                anomalies.append(anomaly)
+    def _trend_break_anomaly(
+        self,
+        key: SeriesKey,
+        current_trend: TrendRecord,
+        previous_trend: TrendRecord,
+        baseline_mean: float,
+        baseline_stddev: float,
+        baseline_days: int,
+        now: datetime,
+    ) -> AnomalyRecord:
+        """Build the record of a reversal between two trend records."""
+        metric_category, metric_name, entity_id = key
+        description = (
+            f"{metric_name} trend reversed from {previous_trend.trend_direction} "
+            f"to {current_trend.trend_direction}"
+        )
 
-        return anomalies
+        return AnomalyRecord(
+            metric_category=metric_category,
+            metric_name=metric_name,
+            detected_at=now,
+            metric_time=current_trend.analysis_time,
+            entity_id=entity_id,
+            entity_type=current_trend.entity_type,
+            anomaly_type="trend_break",
+            severity="medium",
+            observed_value=current_trend.mean_value,
+            expected_value=previous_trend.mean_value,
+            deviation=current_trend.mean_value - previous_trend.mean_value,
+            confidence=0.7,
+            baseline_window_days=baseline_days,
+            baseline_mean=baseline_mean,
+            baseline_stddev=baseline_stddev,
+            description=description,
+            extra_metadata={
+                "previous_direction": previous_trend.trend_direction,
+                "current_direction": current_trend.trend_direction,
+            },
+        )
 
-    def _anomaly_exists(
+    def _find_trend_breaks(
         self,
-        metric_category: str,
-        metric_name: str,
-        metric_time: datetime,
-        entity_id: Optional[str] = None,
-    ) -> bool:
-        """Check if an anomaly record already exists for this metric/time.
+        keys: Sequence[SeriesKey],
+        now: datetime,
+    ) -> Dict[int, Tuple[TrendRecord, TrendRecord]]:
+        """Find series whose two latest trends within the last week reversed direction.
 
         Args:
-            metric_category: Metric category
-            metric_name: Metric name
-            metric_time: Metric timestamp
-            entity_id: Optional entity identifier
+            keys: (category, name, entity_id) of each series
+            now: Current time
 
         Returns:
-            True if anomaly exists
+            Mapping of index into ``keys`` to its (current, previous) trend records
         """
-        query = AnomalyRecord.query.filter(
-            and_(
-                AnomalyRecord.metric_category == metric_category,
-                AnomalyRecord.metric_name == metric_name,
-                AnomalyRecord.metric_time == metric_time,
+        pairs = sorted({(category, name) for category, name, _ in keys})
+        trends = (
+            TrendRecord.query.filter(
+                and_(
+                    tuple_(TrendRecord.metric_category, TrendRecord.metric_name).in_(pairs),
+                    TrendRecord.analysis_time >= now - timedelta(days=7),
+                )
             )
+            .order_by(TrendRecord.analysis_time.desc())
+            .all()
         )
 
-        if entity_id:
-            query = query.filter(AnomalyRecord.entity_id == entity_id)
-
-        return query.first() is not None
+        by_pair: Dict[Tuple[str, str], List[TrendRecord]] = defaultdict(list)
+        for trend in trends:
+            by_pair[(trend.metric_category, trend.metric_name)].append(trend)
+
+        latest: Dict[int, Tuple[TrendRecord, TrendRecord]] = {}
+        for index, (category, name, entity_id) in enumerate(keys):
+            candidates = [
+                trend for trend in by_pair.get((category, name), ())
+                if not entity_id or trend.entity_id == entity_id
+            ][:2]
+            if len(candidates) == 2:
+                latest[index] = (candidates[0], candidates[1])
+
+        if not latest:
+            return {}
+
+        rows = list(latest)
+        current = np.array([latest[row][0].trend_direction for row in rows], dtype=object)
+        previous = np.array([latest[row][1].trend_direction for row in rows], dtype=object)
+        reversed_ = (current != previous) & (current != "stable") & (previous != "stable")
+
+        return {row: latest[row] for row, is_break in zip(rows, reversed_.tolist()) if is_break}
+
+    def _recorded_anomalies(self, keys: Sequence[SeriesKey], since: datetime) -> "_RecordedAnomalies":
+        """Load the metric times of anomalies already recorded for ``keys`` since ``since``."""
+        pairs = sorted({(category, name) for category, name, _ in keys})
+        rows = (
+            db.session.query(
+                AnomalyRecord.metric_category,
+                AnomalyRecord.metric_name,
+                AnomalyRecord.metric_time,
+                AnomalyRecord.entity_id,
+            )
+            .filter(
+                tuple_(AnomalyRecord.metric_category, AnomalyRecord.metric_name).in_(pairs),
+                AnomalyRecord.metric_time >= since,
+            )
+            .all()
+        )
 
-    def _calculate_stddev(self, values: List[float]) -> Optional[float]:
-        """Calculate standard deviation of values.
+        recorded = _RecordedAnomalies()
+        for row in rows:
+            recorded.add(*row)
+        return recorded
 
-        Args:
-            values: List of numeric values
 
-        Returns:
-            Standard deviation or None if insufficient data
-        """
-        if len(values) < 2:
-            return None
+class _RecordedAnomalies:
+    """Which (metric, time) pairs already have an anomaly on record.
 
-        mean = sum(values) / len(values)
-        variance = sum((x - mean) ** 2 for x in values) / (len(values) - 1)
-        return variance ** 0.5
+    A lookup without an entity matches an anomaly of any entity, as the
+    per-metric existence query always did.
+    """
 
-    def _calculate_percentile(self, value: float, baseline: List[float]) -> float:
-        """Calculate percentile rank of value within baseline.
+    def __init__(self):
+        self._any_entity = set()
+        self._by_entity = set()
 
-        Args:
-            value: Value to rank
-            baseline: Baseline values
+    def add(
+        self,
+        metric_category: str,
+        metric_name: str,
+        metric_time: datetime,
+        entity_id: Optional[str],
+    ) -> None:
+        metric_time = as_utc(metric_time)
+        self._any_entity.add((metric_category, metric_name, metric_time))
+        self._by_entity.add((metric_category, metric_name, metric_time, entity_id))
 
-        Returns:
-            Percentile (0-100)
-        """
-        count_below = sum(1 for v in baseline if v < value)
-        return (count_below / len(baseline)) * 100 if baseline else 50.0
+    def contains(
+        self,
+        metric_category: str,
+        metric_name: str,
+        metric_time: datetime,
+        entity_id: Optional[str] = None,
+    ) -> bool:
+        metric_time = as_utc(metric_time)
+        if entity_id:
+            return (metric_category, metric_name, metric_time, entity_id) in self._by_entity
+        return (metric_category, metric_name, metric_time) in self._any_entity
 
 
 __all__ = ["AnomalyDetector"]
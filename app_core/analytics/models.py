@@ -92,6 +92,16 @@ class MetricSnapshot(db.Model):
             'metric_name',
             'snapshot_time',
         ),
+        # One snapshot per window: the conflict target for bulk upserts
+        db.Index(
+            'uq_metric_snapshots_window',
+            metric_category,
+            metric_name,
+            aggregation_period,
+            window_start,
+            db.func.coalesce(entity_id, ''),
+            unique=True,
+        ),
     )
 
     def to_dict(self) -> Dict[str, Any]:
@@ -0,0 +1,407 @@
+"""
+EAS Station - Emergency Alert System
+Copyright (c) 2025 Timothy Kramer (KR8MER)
+
+This file is part of EAS Station.
+
+EAS Station is dual-licensed software:
+- GNU Affero General Public License v3 (AGPL-3.0) for open-source use
+- Commercial License for proprietary use
+
+You should have received a copy of both licenses with this software.
+For more information, see LICENSE and LICENSE-COMMERCIAL files.
+
+IMPORTANT: This software cannot be rebranded or have attribution removed.
+See NOTICE file for complete terms.
+
+Repository: https://github.com/KR8MER/eas-station
+"""
+
+from __future__ import annotations
+
+"""Online anomaly detection on live audio and receiver metrics.
+
+The batch ``AnomalyDetector`` works on hourly ``MetricSnapshot`` rows, so a
+collapsed signal shows up an hour or more after the fact.  This detector
+scores every sample the audio service collects (every few seconds) as it
+arrives:
+
+- Each series keeps an exponentially weighted mean and variance (EWMA/EWMV)
+  with a time-based half-life, so irregular sampling is handled.
+- Each series also keeps a 24-bucket hour-of-day profile; once an hour has
+  enough history its profile is the baseline, so daily propagation or
+  programming patterns are not flagged.
+- A sample is an outlier when its Z-score against the baseline stays past
+  the threshold for several consecutive samples; the series must return
+  inside the normal band before it can fire again.
+- State series (source status, receiver lock) are checked for flapping via
+  an exponentially decayed transition count.
+
+All state is a fixed handful of floats per series, so memory and CPU per
+sample are constant.
+"""
+
+import logging
+import math
+from datetime import datetime, timezone
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from app_core.analytics.anomaly_detector import AnomalyDetector
+from app_core.analytics.models import AnomalyRecord
+
+logger = logging.getLogger(__name__)
+
+HOURS_PER_DAY = 24
+
+# Silent audio reports -inf dBFS; score it as this level so a collapse registers
+SILENCE_FLOOR_DB = -120.0
+
+# Source and receiver metrics published by the audio service that are watched
+_SOURCE_LEVELS = (("audio_health", "rms_level_db"),)
+_RECEIVER_LEVELS = (("receiver_status", "signal_strength"),)
+
+
+class _SeriesState:
+    """EWMA/EWMV baseline plus hour-of-day profile of one numeric series."""
+
+    __slots__ = (
+        "samples",
+        "mean",
+        "variance",
+        "last_time",
+        "hour_samples",
+        "hour_mean",
+        "hour_variance",
+        "breaching",
+        "active",
+    )
+
+    def __init__(self):
+        self.samples = 0
+        self.mean = 0.0
+        self.variance = 0.0
+        self.last_time: Optional[float] = None
+        self.hour_samples = [0] * HOURS_PER_DAY
+        self.hour_mean = [0.0] * HOURS_PER_DAY
+        self.hour_variance = [0.0] * HOURS_PER_DAY
+        self.breaching = 0
+        self.active = False
+
+
+class _StateSeries:
+    """Decayed transition count of one state series, for flap detection."""
+
+    __slots__ = ("state", "last_time", "transitions", "active")
+
+    def __init__(self, state: Any, timestamp: float):
+        self.state = state
+        self.last_time = timestamp
+        self.transitions = 0.0
+        self.active = False
+
+
+def _ew_update(mean: float, variance: float, value: float, alpha: float) -> Tuple[float, float]:
+    """One exponentially weighted update of a running mean and variance."""
+    diff = value - mean
+    increment = alpha * diff
+    return mean + increment, (1.0 - alpha) * (variance + diff * increment)
+
+
+def _decay_alpha(elapsed: float, half_life: float) -> float:
+    return 1.0 - 0.5 ** (max(elapsed, 0.0) / half_life)
+
+
+class OnlineAnomalyDetector:
+    """Scores live metric samples against per-series adaptive baselines.
+
+    Feed samples with ``observe`` / ``observe_state`` or a whole audio-service
+    metrics payload with ``observe_metrics``; each returns the unsaved
+    ``AnomalyRecord`` rows raised by that sample.
+    """
+
+    def __init__(
+        self,
+        half_life_seconds: float = 1800.0,
+        seasonal_half_life_days: float = 7.0,
+        warmup_samples: int = 60,
+        seasonal_warmup_samples: int = 360,
+        z_threshold: float = AnomalyDetector.Z_SCORE_THRESHOLD_HIGH,
+        clear_threshold: float = AnomalyDetector.Z_SCORE_THRESHOLD_LOW,
+        confirm_samples: int = 3,
+        min_stddev: float = 1e-3,
+        min_relative_stddev: float = 0.01,
+        flap_transitions: float = 4.0,
+        flap_half_life_seconds: float = 300.0,
+    ):
+        """Initialize the online detector.
+
+        Args:
+            half_life_seconds: Half-life of the short-term EWMA/EWMV baseline
+            seasonal_half_life_days: Half-life, in days of history, of each
+                hour-of-day profile bucket
+            warmup_samples: Samples a series needs before it is scored
+            seasonal_warmup_samples: Samples an hour-of-day bucket needs before
+                it replaces the short-term baseline (half an hour at 5 s sampling)
+            z_threshold: Z-score that counts as a breach
+            clear_threshold: Z-score a series must fall under to re-arm
+            confirm_samples: Consecutive breaches needed to raise an anomaly
+            min_stddev: Lower bound on the baseline standard deviation
+            min_relative_stddev: Lower bound on the baseline standard deviation
+                as a fraction of the expected value
+            flap_transitions: Decayed state-transition count that counts as flapping
+            flap_half_life_seconds: Half-life of the transition count
+        """
+        self.half_life = half_life_seconds
+        # A profile bucket only sees one hour of samples per day
+        self.seasonal_half_life = seasonal_half_life_days * 3600.0
+        self.warmup_samples = warmup_samples
+        self.seasonal_warmup_samples = seasonal_warmup_samples
+        self.z_threshold = z_threshold
+        self.clear_threshold = clear_threshold
+        self.confirm_samples = confirm_samples
+        self.min_stddev = min_stddev
+        self.min_relative_stddev = min_relative_stddev
+        self.flap_transitions = flap_transitions
+        self.flap_half_life = flap_half_life_seconds
+        self.logger = logger
+
+        self._series: Dict[Hashable, _SeriesState] = {}
+        self._states: Dict[Hashable, _StateSeries] = {}
+
+    def observe(
+        self,
+        metric_category: str,
+        metric_name: str,
+        value: float,
+        timestamp: float,
+        entity_id: Optional[str] = None,
+        entity_type: Optional[str] = None,
+    ) -> Optional[AnomalyRecord]:
+        """Score one sample of a numeric series, then fold it into the baseline.
+
+        Args:
+            metric_category: Metric category
+            metric_name: Metric name
+            value: Sample value
+            timestamp: Sample time (UNIX seconds)
+            entity_id: Optional entity identifier
+            entity_type: Optional entity type
+
+        Returns:
+            AnomalyRecord when this sample confirms a new outlier, None otherwise
+        """
+        if value is None or not math.isfinite(value):
+            return None
+
+        key = (metric_category, metric_name, entity_id)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = _SeriesState()
+
+        hour = int(timestamp // 3600) % HOURS_PER_DAY  # UTC hour of day
+        elapsed = 0.0 if series.last_time is None else timestamp - series.last_time
+        seasonal = series.hour_samples[hour] >= self.seasonal_warmup_samples
+
+        anomaly = None
+        z_score = None
+        if series.samples >= self.warmup_samples:
+            if seasonal:
+                expected = series.hour_mean[hour]
+                variance = series.hour_variance[hour]
+            else:
+                expected = series.mean
+                variance = series.variance
+            stddev = max(math.sqrt(variance), self.min_stddev, self.min_relative_stddev * abs(expected))
+            z_score = (value - expected) / stddev
+
+            if abs(z_score) >= self.z_threshold:
+                series.breaching += 1
+                if series.breaching >= self.confirm_samples and not series.active:
+                    series.active = True
+                    anomaly = self._outlier_anomaly(
+                        key, entity_type, value, timestamp, expected, stddev, z_score,
+                        "seasonal" if seasonal else "ewma",
+                    )
+            else:
+                series.breaching = 0
+                if abs(z_score) < self.clear_threshold:
+                    series.active = False
+
+        # Short-term baseline: running statistics until the half-life takes over,
+        # so the variance is not underestimated right after start-up
+        series.samples += 1
+        alpha = max(_decay_alpha(elapsed, self.half_life), 1.0 / series.samples)
+        series.mean, series.variance = _ew_update(series.mean, series.variance, value, alpha)
+
+        # Keep breaches out of the hour-of-day profile
+        if not series.breaching:
+            series.hour_samples[hour] += 1
+            alpha = max(_decay_alpha(elapsed, self.seasonal_half_life), 1.0 / series.hour_samples[hour])
+            series.hour_mean[hour], series.hour_variance[hour] = _ew_update(
+                series.hour_mean[hour], series.hour_variance[hour], value, alpha
+            )
+
+        series.last_time = timestamp
+        return anomaly
+
+    def observe_state(
+        self,
+        metric_category: str,
+        metric_name: str,
+        state: Any,
+        timestamp: float,
+        entity_id: Optional[str] = None,
+        entity_type: Optional[str] = None,
+    ) -> Optional[AnomalyRecord]:
+        """Track transitions of a state series and flag flapping.
+
+        Args:
+            metric_category: Metric category
+            metric_name: Metric name
+            state: Current state (any comparable value)
+            timestamp: Sample time (UNIX seconds)
+            entity_id: Optional entity identifier
+            entity_type: Optional entity type
+
+        Returns:
+            AnomalyRecord when the series starts flapping, None otherwise
+        """
+        key = (metric_category, metric_name, entity_id)
+        series = self._states.get(key)
+        if series is None:
+            self._states[key] = _StateSeries(state, timestamp)
+            return None
+
+        series.transitions *= 0.5 ** (max(timestamp - series.last_time, 0.0) / self.flap_half_life)
+        series.last_time = timestamp
+        if state != series.state:
+            series.transitions += 1.0
+            series.state = state
+
+        if series.transitions < self.flap_transitions / 2:
+            series.active = False
+        if series.transitions < self.flap_transitions or series.active:
+            return None
+
+        series.active = True
+        metric_category, metric_name, entity_id = key
+        return AnomalyRecord(
+            metric_category=metric_category,
+            metric_name=metric_name,
+            detected_at=datetime.now(timezone.utc),
+            metric_time=datetime.fromtimestamp(timestamp, timezone.utc),
+            entity_id=entity_id,
+            entity_type=entity_type,
+            anomaly_type="pattern_violation",
+            severity="high",
+            observed_value=series.transitions,
+            expected_value=0.0,
+            confidence=min(series.transitions / (2 * self.flap_transitions), 1.0),
+            description=(
+                f"{metric_name} of {entity_id or metric_category} is flapping "
+                f"({series.transitions:.1f} recent transitions, now {state})"
+            ),
+            extra_metadata={"detector": "online", "state": str(state)},
+        )
+
+    def observe_metrics(self, metrics: Dict[str, Any]) -> List[AnomalyRecord]:
+        """Score one audio-service metrics payload (see ``collect_metrics``).
+
+        Args:
+            metrics: Metrics dictionary with ``audio_controller`` and
+                ``radio_manager`` sections and a UNIX ``timestamp``
+
+        Returns:
+            Unsaved AnomalyRecord rows raised by this payload
+        """
+        timestamp = metrics.get("timestamp")
+        if timestamp is None:
+            return []
+
+        anomalies = []
+        sources = (metrics.get("audio_controller") or {}).get("sources") or {}
+        for name, stats in sources.items():
+            for category, metric_name in _SOURCE_LEVELS:
+                level = stats.get(metric_name)
+                if isinstance(level, (int, float)) and math.isinf(level) and level < 0:
+                    level = SILENCE_FLOOR_DB
+                anomalies.append(self.observe(
+                    category, metric_name, level, timestamp, entity_id=name, entity_type="audio_source",
+                ))
+            anomalies.append(self.observe_state(
+                "audio_health", "source_status", stats.get("status"), timestamp,
+                entity_id=name, entity_type="audio_source",
+            ))
+
+        receivers = (metrics.get("radio_manager") or {}).get("receivers") or {}
+        for identifier, stats in receivers.items():
+            for category, metric_name in _RECEIVER_LEVELS:
+                anomalies.append(self.observe(
+                    category, metric_name, stats.get(metric_name), timestamp,
+                    entity_id=identifier, entity_type="receiver",
+                ))
+            anomalies.append(self.observe_state(
+                "receiver_status", "locked", bool(stats.get("locked")), timestamp,
+                entity_id=identifier, entity_type="receiver",
+            ))
+
+        return [anomaly for anomaly in anomalies if anomaly is not None]
+
+    def _outlier_anomaly(
+        self,
+        key: Tuple[str, str, Optional[str]],
+        entity_type: Optional[str],
+        value: float,
+        timestamp: float,
+        expected: float,
+        stddev: float,
+        z_score: float,
+        baseline: str,
+    ) -> AnomalyRecord:
+        """Build the record of a confirmed outlier."""
+        metric_category, metric_name, entity_id = key
+        abs_z_score = abs(z_score)
+
+        if abs_z_score >= AnomalyDetector.Z_SCORE_THRESHOLD_CRITICAL:
+            severity = "critical"
+        elif abs_z_score >= AnomalyDetector.Z_SCORE_THRESHOLD_HIGH:
+            severity = "high"
+        elif abs_z_score >= AnomalyDetector.Z_SCORE_THRESHOLD_MEDIUM:
+            severity = "medium"
+        else:
+            severity = "low"
+
+        deviation = value - expected
+        direction = "above" if z_score > 0 else "below"
+        self.logger.info(
+            "Live anomaly: %s.%s (%s) %.2f %s baseline, Z=%.2f",
+            metric_category, metric_name, entity_id, abs(deviation), direction, z_score,
+        )
+
+        return AnomalyRecord(
+            metric_category=metric_category,
+            metric_name=metric_name,
+            detected_at=datetime.now(timezone.utc),
+            metric_time=datetime.fromtimestamp(timestamp, timezone.utc),
+            entity_id=entity_id,
+            entity_type=entity_type,
+            anomaly_type="outlier",
+            severity=severity,
+            observed_value=value,
+            expected_value=expected,
+            expected_min=expected - (3 * stddev),
+            expected_max=expected + (3 * stddev),
+            deviation=deviation,
+            z_score=z_score,
+            confidence=min(abs_z_score / 4.0, 1.0),
+            baseline_mean=expected,
+            baseline_stddev=stddev,
+            description=(
+                f"{metric_name} is {abs(deviation):.2f} {direction} its live baseline "
+                f"(Z-score: {z_score:.2f})"
+            ),
+            extra_metadata={"detector": "online", "baseline": baseline},
+        )
+
+
+__all__ = ["OnlineAnomalyDetector", "SILENCE_FLOOR_DB"]
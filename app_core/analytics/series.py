@@ -0,0 +1,284 @@
+"""
+EAS Station - Emergency Alert System
+Copyright (c) 2025 Timothy Kramer (KR8MER)
+
+This file is part of EAS Station.
+
+EAS Station is dual-licensed software:
+- GNU Affero General Public License v3 (AGPL-3.0) for open-source use
+- Commercial License for proprietary use
+
+You should have received a copy of both licenses with this software.
+For more information, see LICENSE and LICENSE-COMMERCIAL files.
+
+IMPORTANT: This software cannot be rebranded or have attribution removed.
+See NOTICE file for complete terms.
+
+Repository: https://github.com/KR8MER/eas-station
+"""
+
+from __future__ import annotations
+
+"""Batched snapshot series loading and vectorized series statistics.
+
+Trend analysis and anomaly detection look at every (category, name, entity)
+series in one pass.  ``load_snapshot_series`` fetches all of their snapshots
+with a single query, and the ``batch_*`` helpers below compute statistics for
+all series at once on NaN-padded ``(series, points)`` matrices, where row
+``i`` holds ``lengths[i]`` valid points followed by padding.
+
+As with the per-metric queries these replace, a series whose entity is
+``None`` covers every snapshot of its category and name.
+"""
+
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import tuple_
+
+from app_core.extensions import db
+from app_core.analytics.models import MetricSnapshot
+
+logger = logging.getLogger(__name__)
+
+SeriesKey = Tuple[str, str, Optional[str]]
+
+# Upper bound on baseline elements compared in one step of the percentile ranks
+_RANK_CHUNK_ELEMENTS = 4_000_000
+
+
+def as_utc(moment: datetime) -> datetime:
+    """Treat naive datetimes from the database as UTC."""
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+@dataclass
+class SnapshotSeries:
+    """Time-ordered snapshot values of one metric series."""
+
+    metric_category: str
+    metric_name: str
+    entity_id: Optional[str]
+    times: List[datetime] = field(default_factory=list)
+    values: List[float] = field(default_factory=list)
+    entity_types: List[Optional[str]] = field(default_factory=list)
+
+    @property
+    def key(self) -> SeriesKey:
+        return (self.metric_category, self.metric_name, self.entity_id)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def split(self, boundary: datetime) -> Tuple["SnapshotSeries", "SnapshotSeries"]:
+        """Split into the points before ``boundary`` and those at or after it."""
+        index = next((i for i, moment in enumerate(self.times) if moment >= boundary), len(self.times))
+        before = SnapshotSeries(*self.key, self.times[:index], self.values[:index], self.entity_types[:index])
+        after = SnapshotSeries(*self.key, self.times[index:], self.values[index:], self.entity_types[index:])
+        return before, after
+
+
+def distinct_series_keys(metric_categories: Optional[Sequence[str]] = None) -> List[SeriesKey]:
+    """Every (category, name, entity) combination with stored snapshots."""
+    query = db.session.query(
+        MetricSnapshot.metric_category,
+        MetricSnapshot.metric_name,
+        MetricSnapshot.entity_id,
+    ).distinct()
+
+    if metric_categories:
+        query = query.filter(MetricSnapshot.metric_category.in_(metric_categories))
+
+    return [tuple(row) for row in query.all()]
+
+
+def load_snapshot_series(
+    keys: Iterable[SeriesKey],
+    start: datetime,
+    end: datetime,
+) -> List[SnapshotSeries]:
+    """Load the snapshots of every series in ``keys`` between ``start`` and ``end`` (inclusive).
+
+    Returns one ``SnapshotSeries`` per key, in the order given, with one query
+    for all of them.
+    """
+    keys = list(keys)
+    if not keys:
+        return []
+
+    pairs = sorted({(category, name) for category, name, _ in keys})
+    rows = (
+        db.session.query(
+            MetricSnapshot.metric_category,
+            MetricSnapshot.metric_name,
+            MetricSnapshot.entity_id,
+            MetricSnapshot.entity_type,
+            MetricSnapshot.snapshot_time,
+            MetricSnapshot.value,
+        )
+        .filter(
+            tuple_(MetricSnapshot.metric_category, MetricSnapshot.metric_name).in_(pairs),
+            MetricSnapshot.snapshot_time >= start,
+            MetricSnapshot.snapshot_time <= end,
+        )
+        .order_by(
+            MetricSnapshot.metric_category,
+            MetricSnapshot.metric_name,
+            MetricSnapshot.snapshot_time,
+        )
+        .all()
+    )
+
+    # Rows per metric, and per metric and entity, so each key reads only its own rows
+    grouped: Dict[Tuple[str, str], list] = defaultdict(list)
+    by_entity: Dict[Tuple[str, str, Optional[str]], list] = defaultdict(list)
+    for row in rows:
+        grouped[(row[0], row[1])].append(row)
+        by_entity[(row[0], row[1], row[2])].append(row)
+
+    series = []
+    for category, name, entity_id in keys:
+        result = SnapshotSeries(category, name, entity_id)
+        matching = by_entity.get((category, name, entity_id), ()) if entity_id else grouped.get((category, name), ())
+        for _, _, _, entity_type, snapshot_time, value in matching:
+            result.times.append(as_utc(snapshot_time))
+            result.values.append(value)
+            result.entity_types.append(entity_type)
+        series.append(result)
+    return series
+
+
+def pad_series(rows: Sequence[Sequence[float]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Stack variable-length rows into a NaN-padded matrix.
+
+    Returns:
+        Tuple of (``(len(rows), longest)`` float64 matrix, row lengths)
+    """
+    lengths = np.fromiter((len(row) for row in rows), dtype=np.int64, count=len(rows))
+    width = int(lengths.max()) if len(rows) else 0
+    matrix = np.full((len(rows), width), np.nan)
+    for index, row in enumerate(rows):
+        matrix[index, :len(row)] = row
+    return matrix, lengths
+
+
+def _valid(lengths: np.ndarray, width: int) -> np.ndarray:
+    return np.arange(width)[None, :] < lengths[:, None]
+
+
+def batch_mean_stddev(values: np.ndarray, lengths: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-row mean and sample standard deviation (NaN where undefined)."""
+    valid = _valid(lengths, values.shape[1])
+    filled = np.where(valid, values, 0.0)
+    count = np.maximum(lengths, 1)
+    mean = filled.sum(axis=1) / count
+    deviations = np.where(valid, values - mean[:, None], 0.0)
+    variance = (deviations ** 2).sum(axis=1) / np.maximum(lengths - 1, 1)
+    stddev = np.where(lengths >= 2, np.sqrt(variance), np.nan)
+    return np.where(lengths >= 1, mean, np.nan), stddev
+
+
+def batch_min_max(values: np.ndarray, lengths: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-row minimum and maximum (NaN for empty rows)."""
+    valid = _valid(lengths, values.shape[1])
+    empty = lengths == 0
+    minimum = np.where(valid, values, np.inf).min(axis=1, initial=np.inf)
+    maximum = np.where(valid, values, -np.inf).max(axis=1, initial=-np.inf)
+    return np.where(empty, np.nan, minimum), np.where(empty, np.nan, maximum)
+
+
+def batch_describe(values: np.ndarray, lengths: np.ndarray) -> Dict[str, np.ndarray]:
+    """Mean, median, sample stddev, min, max, first and last value of rows with data."""
+    mean, stddev = batch_mean_stddev(values, lengths)
+    minimum, maximum = batch_min_max(values, lengths)
+    last = np.maximum(lengths - 1, 0)
+    return {
+        "mean": mean,
+        "median": np.nanmedian(values, axis=1),
+        "stddev": stddev,
+        "min": minimum,
+        "max": maximum,
+        "first": values[:, 0],
+        "last": values[np.arange(values.shape[0]), last],
+    }
+
+
+def batch_linear_regression(
+    x: np.ndarray,
+    y: np.ndarray,
+    lengths: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Least-squares line through each row's points.
+
+    Returns:
+        Tuple of (slope, intercept, r_squared) arrays; rows with fewer than two
+        points get zeros, rows with constant ``x`` get a flat line at the mean.
+    """
+    valid = _valid(lengths, x.shape[1])
+    count = np.maximum(lengths, 1)
+    x_mean = np.where(valid, x, 0.0).sum(axis=1) / count
+    y_mean = np.where(valid, y, 0.0).sum(axis=1) / count
+
+    dx = np.where(valid, x - x_mean[:, None], 0.0)
+    dy = np.where(valid, y - y_mean[:, None], 0.0)
+    numerator = (dx * dy).sum(axis=1)
+    denominator = (dx * dx).sum(axis=1)
+
+    sloped = denominator != 0
+    slope = np.divide(numerator, denominator, out=np.zeros_like(numerator), where=sloped)
+    intercept = y_mean - slope * x_mean
+
+    residuals = np.where(valid, y - (slope[:, None] * x + intercept[:, None]), 0.0)
+    ss_res = (residuals ** 2).sum(axis=1)
+    ss_tot = (dy * dy).sum(axis=1)
+    explained = np.divide(ss_res, ss_tot, out=np.ones_like(ss_res), where=ss_tot != 0)
+    r_squared = np.where(sloped & (ss_tot != 0), np.maximum(1.0 - explained, 0.0), 0.0)
+
+    short = lengths < 2
+    slope[short] = 0.0
+    intercept[short] = 0.0
+    r_squared[short] = 0.0
+    return slope, intercept, r_squared
+
+
+def batch_percentile_rank(
+    values: np.ndarray,
+    rows: np.ndarray,
+    baseline: np.ndarray,
+    baseline_lengths: np.ndarray,
+) -> np.ndarray:
+    """Percentage of baseline row ``rows[i]`` that lies strictly below ``values[i]``."""
+    ranks = np.full(values.shape, 50.0)
+    if not values.size or not baseline.size:
+        return ranks
+
+    valid = _valid(baseline_lengths, baseline.shape[1])
+    step = max(1, _RANK_CHUNK_ELEMENTS // baseline.shape[1])
+    for start in range(0, values.shape[0], step):
+        chunk = slice(start, start + step)
+        row = rows[chunk]
+        below = ((baseline[row] < values[chunk, None]) & valid[row]).sum(axis=1)
+        sizes = baseline_lengths[row]
+        ranks[chunk] = np.where(sizes > 0, below / np.maximum(sizes, 1) * 100.0, 50.0)
+    return ranks
+
+
+__all__ = [
+    "SeriesKey",
+    "SnapshotSeries",
+    "as_utc",
+    "batch_describe",
+    "batch_linear_regression",
+    "batch_mean_stddev",
+    "batch_min_max",
+    "batch_percentile_rank",
+    "distinct_series_keys",
+    "load_snapshot_series",
+    "pad_series",
+]
@@ -22,20 +22,29 @@ from __future__ import annotations
 """Trend analysis with linear regression and statistical methods.
 
 This module provides functionality to analyze trends in time-series metrics:
-- Linear regression analysis
+- Linear regression analysis, batched across all metric series
 - Trend direction and strength classification
 - Statistical significance testing
 - Forecasting future values
 """
 
 import logging
-from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple
+from datetime import timedelta
+from typing import List, Optional, Sequence, Tuple
 
+import numpy as np
 from sqlalchemy import and_, func
 
 from app_core.extensions import db
-from app_core.analytics.models import MetricSnapshot, TrendRecord
+from app_core.analytics.models import TrendRecord
+from app_core.analytics.series import (
+    SeriesKey,
+    batch_describe,
+    batch_linear_regression,
+    distinct_series_keys,
+    load_snapshot_series,
+    pad_series,
+)
 from app_utils import utc_now
 
 logger = logging.getLogger(__name__)
@@ -55,6 +64,8 @@ class TrendAnalyzer:
     ) -> int:
         """Analyze trends for all metrics or specified categories.
 
+        Every series is loaded with one query and analyzed in one batch.
+
         Args:
             window_days: Number of days to analyze
             metric_categories: Optional list of categories to analyze
@@ -62,39 +73,17 @@ class TrendAnalyzer:
         Returns:
             Number of trend records created
         """
-        # Get unique metric combinations
-        query = db.session.query(
-            MetricSnapshot.metric_category,
-            MetricSnapshot.metric_name,
-            MetricSnapshot.entity_id,
-        ).distinct()
-
-        if metric_categories:
-            query = query.filter(MetricSnapshot.metric_category.in_(metric_categories))
-
-        metrics = query.all()
-
-        trend_count = 0
-        for category, name, entity_id in metrics:
-            try:
-                trend = self.analyze_metric_trend(
-                    metric_category=category,
-                    metric_name=name,
-                    window_days=window_days,
-                    entity_id=entity_id,
-                )
-                if trend:
-                    trend_count += 1
-            except Exception as e:
-                self.logger.error(
-                    "Failed to analyze trend for %s.%s: %s",
-                    category,
-                    name,
-                    str(e),
-                )
+        keys = distinct_series_keys(metric_categories)
 
-        self.logger.info("Analyzed %d metric trends", trend_count)
-        return trend_count
+        try:
+            trends = self.analyze_series_trends(keys, window_days=window_days)
+        except Exception as e:
+            db.session.rollback()
+            self.logger.error("Failed to analyze metric trends: %s", str(e))
+            return 0
+
+        self.logger.info("Analyzed %d metric trends", len(trends))
+        return len(trends)
 
     def analyze_metric_trend(
         self,
@@ -116,117 +105,129 @@ class TrendAnalyzer:
         Returns:
             TrendRecord if analysis successful, None otherwise
         """
-        now = utc_now()
-        window_start = now - timedelta(days=window_days)
-
-        # Get metric snapshots
-        query = MetricSnapshot.query.filter(
-            and_(
-                MetricSnapshot.metric_category == metric_category,
-                MetricSnapshot.metric_name == metric_name,
-                MetricSnapshot.snapshot_time >= window_start,
-                MetricSnapshot.snapshot_time <= now,
-            )
+        trends = self.analyze_series_trends(
+            [(metric_category, metric_name, entity_id)],
+            window_days=window_days,
+            forecast_days=forecast_days,
         )
+        return trends[0] if trends else None
 
-        if entity_id:
-            query = query.filter(MetricSnapshot.entity_id == entity_id)
-
-        snapshots = query.order_by(MetricSnapshot.snapshot_time).all()
-
-        if len(snapshots) < 3:
-            self.logger.debug(
-                "Insufficient data for trend analysis: %s.%s (only %d points)",
-                metric_category,
-                metric_name,
-                len(snapshots),
-            )
-            return None
-
-        # Extract time series data
-        times = [(s.snapshot_time - window_start).total_seconds() for s in snapshots]
-        values = [s.value for s in snapshots]
-
-        # Perform linear regression
-        slope, intercept, r_squared = self._linear_regression(times, values)
+    def analyze_series_trends(
+        self,
+        keys: Sequence[SeriesKey],
+        window_days: int = 7,
+        forecast_days: int = 7,
+    ) -> List[TrendRecord]:
+        """Analyze the trends of many metric series at once.
 
-        # Calculate statistical measures
-        mean_val = sum(values) / len(values)
-        median_val = self._calculate_median(values)
-        stddev_val = self._calculate_stddev(values)
-        min_val = min(values)
-        max_val = max(values)
+        Args:
+            keys: (category, name, entity_id) of each series to analyze
+            window_days: Number of days to analyze
+            forecast_days: Number of days ahead to forecast
 
-        # Classify trend direction and strength
-        trend_direction, trend_strength = self._classify_trend(
-            slope, stddev_val, mean_val, r_squared
-        )
+        Returns:
+            TrendRecords created, in the order of ``keys``, for every series
+            with at least three data points
+        """
+        now = utc_now()
+        window_start = now - timedelta(days=window_days)
 
-        # Calculate rate of change
-        first_value = values[0]
-        last_value = values[-1]
-        absolute_change = last_value - first_value
-        percent_change = (
-            (absolute_change / first_value * 100) if first_value != 0 else 0
-        )
+        series = []
+        for snapshot_series in load_snapshot_series(keys, window_start, now):
+            if len(snapshot_series) < 3:
+                self.logger.debug(
+                    "Insufficient data for trend analysis: %s.%s (only %d points)",
+                    snapshot_series.metric_category,
+                    snapshot_series.metric_name,
+                    len(snapshot_series),
+                )
+                continue
+            series.append(snapshot_series)
+
+        if not series:
+            return []
+
+        # Seconds since the window start against metric values, one row per series
+        times, lengths = pad_series([
+            [(moment - window_start).total_seconds() for moment in s.times]
+            for s in series
+        ])
+        values, _ = pad_series([s.values for s in series])
+
+        slope, intercept, r_squared = batch_linear_regression(times, values, lengths)
+        stats = batch_describe(values, lengths)
+
+        # Rate of change between the first and last points
+        first_value = stats["first"]
+        absolute_change = stats["last"] - first_value
+        percent_change = np.divide(
+            absolute_change,
+            first_value,
+            out=np.zeros_like(absolute_change),
+            where=first_value != 0,
+        ) * 100
         rate_per_day = absolute_change / window_days
 
-        # Calculate forecast
         forecast_value = None
-        forecast_confidence = None
         if forecast_days > 0:
             forecast_seconds = (
                 (now + timedelta(days=forecast_days)) - window_start
             ).total_seconds()
-            forecast_value = slope * forecast_seconds + intercept
-            forecast_confidence = r_squared  # Use R² as confidence proxy
-
-        # Calculate p-value (simplified)
-        p_value = self._calculate_p_value(r_squared, len(values))
-
-        # Create trend record
-        trend = TrendRecord(
-            metric_category=metric_category,
-            metric_name=metric_name,
-            analysis_time=now,
-            window_start=window_start,
-            window_end=now,
-            window_days=window_days,
-            entity_id=entity_id,
-            entity_type=snapshots[0].entity_type if entity_id else None,
-            trend_direction=trend_direction,
-            trend_strength=trend_strength,
-            slope=slope,
-            intercept=intercept,
-            r_squared=r_squared,
-            p_value=p_value,
-            data_points=len(snapshots),
-            mean_value=mean_val,
-            median_value=median_val,
-            stddev_value=stddev_val,
-            min_value=min_val,
-            max_value=max_val,
-            absolute_change=absolute_change,
-            percent_change=percent_change,
-            rate_per_day=rate_per_day,
-            forecast_days_ahead=forecast_days if forecast_days > 0 else None,
-            forecast_value=forecast_value,
-            forecast_confidence=forecast_confidence,
-        )
-
-        db.session.add(trend)
-        db.session.commit()
+            forecast_value = (slope * forecast_seconds + intercept).tolist()
+
+        slope, intercept, r_squared = slope.tolist(), intercept.tolist(), r_squared.tolist()
+        mean, median, stddev = stats["mean"].tolist(), stats["median"].tolist(), stats["stddev"].tolist()
+        min_value, max_value = stats["min"].tolist(), stats["max"].tolist()
+        absolute_change, percent_change = absolute_change.tolist(), percent_change.tolist()
+        rate_per_day = rate_per_day.tolist()
+
+        trends = []
+        for index, snapshot_series in enumerate(series):
+            trend_direction, trend_strength = self._classify_trend(
+                slope[index], stddev[index], mean[index], r_squared[index]
+            )
+            trends.append(TrendRecord(
+                metric_category=snapshot_series.metric_category,
+                metric_name=snapshot_series.metric_name,
+                analysis_time=now,
+                window_start=window_start,
+                window_end=now,
+                window_days=window_days,
+                entity_id=snapshot_series.entity_id,
+                entity_type=snapshot_series.entity_types[0] if snapshot_series.entity_id else None,
+                trend_direction=trend_direction,
+                trend_strength=trend_strength,
+                slope=slope[index],
+                intercept=intercept[index],
+                r_squared=r_squared[index],
+                p_value=self._calculate_p_value(r_squared[index], len(snapshot_series)),
+                data_points=len(snapshot_series),
+                mean_value=mean[index],
+                median_value=median[index],
+                stddev_value=stddev[index],
+                min_value=min_value[index],
+                max_value=max_value[index],
+                absolute_change=absolute_change[index],
+                percent_change=percent_change[index],
+                rate_per_day=rate_per_day[index],
+                forecast_days_ahead=forecast_days if forecast_days > 0 else None,
+                forecast_value=forecast_value[index] if forecast_value else None,
+                # R² stands in for the forecast confidence
+                forecast_confidence=r_squared[index] if forecast_days > 0 else None,
+            ))
 
-        self.logger.debug(
-            "Analyzed trend for %s.%s: %s (%s) with R²=%.3f",
-            metric_category,
-            metric_name,
-            trend_direction,
-            trend_strength,
-            r_squared,
-        )
+            self.logger.debug(
+                "Analyzed trend for %s.%s: %s (%s) with R²=%.3f",
+                snapshot_series.metric_category,
+                snapshot_series.metric_name,
+                trend_direction,
+                trend_strength,
+                r_squared[index],
+            )
 
-        return trend
+        db.session.add_all(trends)
+        db.session.commit()
+        return trends
 
     def get_latest_trends(
         self,
@@ -284,44 +285,6 @@ class TrendAnalyzer:
 
         return query.order_by(TrendRecord.analysis_time.desc()).limit(limit).all()
 
-    def _linear_regression(
-        self, x: List[float], y: List[float]
-    ) -> Tuple[float, float, float]:
-        """Perform simple linear regression.
-
-        Args:
-            x: Independent variable (time)
-            y: Dependent variable (metric values)
-
-        Returns:
-            Tuple of (slope, intercept, r_squared)
-        """
-        n = len(x)
-        if n < 2:
-            return 0.0, 0.0, 0.0
-
-        # Calculate means
-        x_mean = sum(x) / n
-        y_mean = sum(y) / n
-
-        # Calculate slope and intercept
-        numerator = sum((x[i] - x_mean) * (y[i] - y_mean) for i in range(n))
-        denominator = sum((x[i] - x_mean) ** 2 for i in range(n))
-
-        if denominator == 0:
-            return 0.0, y_mean, 0.0
-
-        slope = numerator / denominator
-        intercept = y_mean - slope * x_mean
-
-        # Calculate R²
-        ss_tot = sum((y[i] - y_mean) ** 2 for i in range(n))
-        ss_res = sum((y[i] - (slope * x[i] + intercept)) ** 2 for i in range(n))
-
-        r_squared = 1 - (ss_res / ss_tot) if ss_tot != 0 else 0.0
-
-        return slope, intercept, max(0.0, r_squared)
-
     def _classify_trend(
         self,
         slope: float,
@@ -368,38 +331,6 @@ class TrendAnalyzer:
 
         return direction, strength
 
-    def _calculate_median(self, values: List[float]) -> float:
-        """Calculate median of values.
-
-        Args:
-            values: List of numeric values
-
-        Returns:
-            Median value
-        """
-        sorted_values = sorted(values)
-        n = len(sorted_values)
-        if n % 2 == 0:
-            return (sorted_values[n // 2 - 1] + sorted_values[n // 2]) / 2
-        else:
-            return sorted_values[n // 2]
-
-    def _calculate_stddev(self, values: List[float]) -> Optional[float]:
-        """Calculate standard deviation of values.
-
-        Args:
-            values: List of numeric values
-
-        Returns:
-            Standard deviation or None if insufficient data
-        """
-        if len(values) < 2:
-            return None
-
-        mean = sum(values) / len(values)
-        variance = sum((x - mean) ** 2 for x in values) / (len(values) - 1)
-        return variance ** 0.5
-
     def _calculate_p_value(self, r_squared: float, n: int) -> float:
         """Calculate approximate p-value for regression.
 
@@ -0,0 +1,326 @@
+"""
+EAS Station - Emergency Alert System
+Copyright (c) 2025 Timothy Kramer (KR8MER)
+
+This file is part of EAS Station.
+
+EAS Station is dual-licensed software:
+- GNU Affero General Public License v3 (AGPL-3.0) for open-source use
+- Commercial License for proprietary use
+
+You should have received a copy of both licenses with this software.
+For more information, see LICENSE and LICENSE-COMMERCIAL files.
+
+IMPORTANT: This software cannot be rebranded or have attribution removed.
+See NOTICE file for complete terms.
+
+Repository: https://github.com/KR8MER/eas-station
+"""
+
+from __future__ import annotations
+
+"""
+Write-behind persistence for received alerts.
+
+The decode thread must never wait on PostgreSQL.  ``submit()`` journals each
+record as one JSON file in a local spool directory (page-cache write, no DB
+I/O) and wakes a background writer.  The writer stores spool files oldest
+first and deletes each one only after the store succeeds, so records survive a
+crash or restart of the audio-service and are replayed in submission order.
+
+While the database is unavailable the writer backs off exponentially and the
+spool grows, bounded by ``max_records``; when full, new records are rejected
+(and logged) rather than exhausting disk or memory.
+
+A record the database rejects outright (constraint or data errors, such as a
+foreign key to a row that no longer exists) would fail forever and block every
+record behind it.  Such records are moved aside as ``<seq>.json.bad`` and the
+queue moves on.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy.exc import DataError, IntegrityError
+
+from .latency_metrics import STAGE_PERSIST_RECEIVED_ALERT, observe_latency
+
+logger = logging.getLogger(__name__)
+
+_SPOOL_SUFFIX = '.json'
+_BAD_SUFFIX = '.bad'
+
+# Database errors that retrying cannot fix: the record itself is rejected.
+# Anything else (including bugs in the store path) is retried with backoff so
+# a fix or redeploy can still drain the spool.
+PERMANENT_STORE_ERRORS: Tuple[type, ...] = (IntegrityError, DataError)
+
+_STORED = 'stored'
+_RETRY = 'retry'
+_REJECTED = 'rejected'
+
+
+def default_spool_dir() -> str:
+    """Spool location: ``EAS_ALERT_SPOOL_DIR``, the persistent config volume, or tmp."""
+    configured = os.getenv('EAS_ALERT_SPOOL_DIR')
+    if configured:
+        return configured
+    if os.path.isdir('/app-config'):
+        return '/app-config/alert-spool'
+    return os.path.join(tempfile.gettempdir(), 'eas-alert-spool')
+
+
+class AlertPersistenceQueue:
+    """Bounded, disk-spooled write-behind queue with in-order replay.
+
+    ``store`` receives one record dict and must raise when the record could not
+    be written (e.g. database unavailable); the record is then retried later,
+    unless the exception is one of ``permanent_errors`` (database integrity
+    and data errors by default), in which case the record is quarantined.  When ``app`` is given, each store runs inside
+    ``app.app_context()``.
+    """
+
+    def __init__(
+        self,
+        store: Callable[[Dict[str, Any]], None],
+        spool_dir: Optional[str] = None,
+        max_records: int = 10000,
+        app=None,
+        retry_initial_seconds: float = 1.0,
+        retry_max_seconds: float = 60.0,
+        permanent_errors: Tuple[type, ...] = PERMANENT_STORE_ERRORS,
+    ):
+        self._store = store
+        self._permanent_errors = permanent_errors
+        self.spool_dir = spool_dir or default_spool_dir()
+        self.max_records = max_records
+        self._app = app
+        self._retry_initial = retry_initial_seconds
+        self._retry_max = retry_max_seconds
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._idle = threading.Condition(self._lock)
+        self._thread: Optional[threading.Thread] = None
+
+        # Used only if the spool directory cannot be written
+        self._memory_backlog: Deque[Tuple[int, Dict[str, Any]]] = deque()
+
+        self._stored = 0
+        self._failures = 0
+        self._dropped = 0
+        self._rejected = 0
+        self._last_error: Optional[str] = None
+        self._retry_delay = 0.0
+
+        os.makedirs(self.spool_dir, exist_ok=True)
+        existing = self._spool_files()
+        self._pending = len(existing)
+        self._next_seq = (int(existing[-1][:-len(_SPOOL_SUFFIX)]) + 1) if existing else 1
+        if existing:
+            logger.warning("Found %d spooled received alert(s) awaiting replay in %s", len(existing), self.spool_dir)
+
+    def start(self) -> None:
+        """Start the background writer (replays any spool left by a previous run)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._writer_loop, name="alert-persistence", daemon=True)
+        self._thread.start()
+        self._wake.set()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the writer; unwritten records stay spooled for the next start."""
+        self._stop_event.set()
+        self._wake.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def submit(self, record: Dict[str, Any]) -> bool:
+        """Journal ``record`` for write-behind storage; never touches the database.
+
+        Returns False when the queue is full and the record was dropped.
+        """
+        payload = json.dumps(record, default=str)
+        with self._lock:
+            if self._pending >= self.max_records:
+                self._dropped += 1
+                logger.error(
+                    "Received-alert spool full (%d records); dropping record for %s",
+                    self.max_records,
+                    record.get('event_code') or record.get('raw_text', '')[:40],
+                )
+                return False
+            seq = self._next_seq
+            self._next_seq += 1
+            self._pending += 1
+            # Written under the lock so the writer never sees seq N+1 before N
+            try:
+                self._write_spool_file(seq, payload)
+            except OSError as exc:
+                logger.error("Failed to spool received alert to %s: %s; holding it in memory", self.spool_dir, exc)
+                self._memory_backlog.append((seq, record))
+
+        self._wake.set()
+        return True
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait until every submitted record has been stored; False on timeout."""
+        deadline = time.monotonic() + timeout
+        self._wake.set()
+        with self._idle:
+            while self._pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue health for status pages."""
+        with self._lock:
+            return {
+                'pending': self._pending,
+                'stored': self._stored,
+                'failures': self._failures,
+                'dropped': self._dropped,
+                'rejected': self._rejected,
+                'retry_delay_seconds': self._retry_delay,
+                'last_error': self._last_error,
+                'spool_dir': self.spool_dir,
+            }
+
+    def _spool_files(self) -> List[str]:
+        try:
+            names = os.listdir(self.spool_dir)
+        except FileNotFoundError:
+            return []
+        return sorted(name for name in names if name.endswith(_SPOOL_SUFFIX))
+
+    def _write_spool_file(self, seq: int, payload: str) -> None:
+        path = os.path.join(self.spool_dir, f"{seq:012d}{_SPOOL_SUFFIX}")
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as handle:
+            handle.write(payload)
+        # Atomic rename: the writer never sees a partially written record
+        os.replace(temp_path, path)
+
+    def _writer_loop(self) -> None:
+        while not self._stop_event.is_set():
+            # Clear before draining so a submit() during the drain is not missed
+            self._wake.clear()
+            if self._drain():
+                self._wake.wait(timeout=1.0)
+            else:
+                # Back off; new submissions queue up behind the failed record
+                self._stop_event.wait(self._retry_delay)
+
+    def _drain(self) -> bool:
+        """Store spooled records oldest first; False if the store failed."""
+        for name in self._spool_files():
+            if self._stop_event.is_set():
+                return True
+            path = os.path.join(self.spool_dir, name)
+            try:
+                with open(path, 'r', encoding='utf-8') as handle:
+                    record = json.load(handle)
+            except (OSError, ValueError) as exc:
+                logger.error("Unreadable received-alert spool file %s: %s; moving aside", path, exc)
+                self._quarantine(path)
+                continue
+
+            outcome = self._store_record(record)
+            if outcome == _RETRY:
+                return False
+            if outcome == _REJECTED:
+                self._quarantine(path)
+                continue
+            try:
+                os.unlink(path)
+            except OSError as exc:
+                logger.warning("Could not remove spool file %s: %s", path, exc)
+            self._record_done()
+
+        while True:
+            with self._lock:
+                if not self._memory_backlog:
+                    return True
+                _, record = self._memory_backlog[0]
+            # Rejected records have no spool file to keep; they are logged and dropped
+            if self._store_record(record) == _RETRY:
+                return False
+            with self._lock:
+                self._memory_backlog.popleft()
+            self._record_done()
+
+    def _store_record(self, record: Dict[str, Any]) -> str:
+        """Store one record: ``_STORED``, ``_RETRY`` (transient) or ``_REJECTED``."""
+        started = time.perf_counter()
+        try:
+            if self._app is not None:
+                with self._app.app_context():
+                    self._store(record)
+            else:
+                self._store(record)
+        except self._permanent_errors as exc:
+            with self._lock:
+                self._rejected += 1
+                self._last_error = str(exc)
+            logger.error(
+                "Received-alert record for %s rejected by the store (%s: %s); not retrying",
+                record.get('event_code') or str(record.get('raw_text', ''))[:40],
+                type(exc).__name__,
+                exc,
+            )
+            return _REJECTED
+        except Exception as exc:
+            with self._lock:
+                self._failures += 1
+                self._last_error = str(exc)
+                self._retry_delay = min(self._retry_max, max(self._retry_initial, self._retry_delay * 2))
+                pending = self._pending
+            logger.warning(
+                "Received-alert store failed (%s); %d record(s) spooled, retrying in %.1fs",
+                exc,
+                pending,
+                self._retry_delay,
+            )
+            return _RETRY
+
+        observe_latency(STAGE_PERSIST_RECEIVED_ALERT, time.perf_counter() - started)
+        with self._lock:
+            self._stored += 1
+            if self._retry_delay:
+                logger.info("Received-alert storage recovered; replaying spool")
+            self._retry_delay = 0.0
+            self._last_error = None
+        return _STORED
+
+    def _quarantine(self, path: str) -> None:
+        """Move a poison spool file aside so the records behind it can drain."""
+        try:
+            os.replace(path, f"{path}{_BAD_SUFFIX}")
+        except OSError as exc:
+            logger.error("Could not move spool file %s aside: %s; deleting it", path, exc)
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+        self._record_done()
+
+    def _record_done(self) -> None:
+        with self._idle:
+            self._pending -= 1
+            if not self._pending:
+                self._idle.notify_all()
+
+
+__all__ = ["AlertPersistenceQueue", "PERMANENT_STORE_ERRORS", "default_spool_dir"]
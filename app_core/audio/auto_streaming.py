@@ -65,7 +65,9 @@ class AutoStreamingService:
         default_bitrate: int = 128,
         default_format: StreamFormat = StreamFormat.MP3,
         enabled: bool = False,
-        audio_controller: Optional['AudioIngestController'] = None
+        audio_controller: Optional['AudioIngestController'] = None,
+        low_latency: bool = False,
+        max_latency_ms: float = 800.0,
     ):
         """
         Initialize auto-streaming service.
@@ -78,6 +80,8 @@ class AutoStreamingService:
             default_format: Default audio format (MP3 or OGG)
             enabled: Whether service is enabled
             audio_controller: AudioIngestController for broadcast queue access
+            low_latency: Stream through the adaptive jitter buffer (sub-second latency)
+            max_latency_ms: Upper bound for the jitter buffer target in low-latency mode
         """
         self.icecast_server = icecast_server
         self.icecast_port = icecast_port
@@ -88,6 +92,8 @@ class AutoStreamingService:
         self.default_format = default_format
         self.enabled = enabled
         self.audio_controller = audio_controller
+        self.low_latency = low_latency
+        self.max_latency_ms = max_latency_ms
 
         # Active streamers: source_name -> IcecastStreamer
         self._streamers: Dict[str, IcecastStreamer] = {}
@@ -208,6 +214,8 @@ class AutoStreamingService:
                     channels=channels,
                     admin_user=self.icecast_admin_user,
                     admin_password=self.icecast_admin_password,
+                    low_latency=self.low_latency,
+                    max_latency_ms=self.max_latency_ms,
                 )
 
                 # CRITICAL: Each Icecast stream reads DIRECTLY from its own audio source
@@ -40,8 +40,8 @@ import wave
 import math
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from collections import OrderedDict
-from typing import Optional, Callable, List
+from collections import OrderedDict, deque
+from typing import Optional, Callable, Dict, List
 
 import numpy as np
 # Note: scipy.signal.resample_poly was replaced with numpy.interp (linear interpolation)
@@ -52,10 +52,23 @@ from app_utils import utc_now
 from app_utils.eas_codes import get_event_name, get_originator_name
 from .source_manager import AudioSourceManager
 from .fips_utils import determine_fips_matches
+from .streaming_tone_detector import StreamingToneDetector, ToneEvent
+from .alert_persistence import AlertPersistenceQueue
+from .latency_metrics import (
+    STAGE_DECODE,
+    STAGE_END_TO_END,
+    STAGE_FIPS_FILTER,
+    STAGE_RESAMPLE,
+    STAGE_STORE_RECEIVED_ALERT,
+    get_latency_registry,
+    observe_latency,
+    timed,
+)
 
 logger = logging.getLogger(__name__)
 
 
+@timed(STAGE_STORE_RECEIVED_ALERT)
 def _store_received_alert(
     alert: EASAlert,
     forwarding_decision: str,
@@ -64,7 +77,11 @@ def _store_received_alert(
     generated_message_id: Optional[int] = None
 ) -> None:
     """
-    Store received EAS alert in database with forwarding decision.
+    Queue a received EAS alert and its forwarding decision for storage.
+
+    Only journals the record to the local write-behind spool; the database
+    write happens on the persistence thread (see ``_persist_received_alert``)
+    so a slow commit never stalls decoding or the next relay.
 
     Args:
         alert: The received EAS alert
@@ -74,56 +91,88 @@ def _store_received_alert(
         generated_message_id: FK to eas_messages table if forwarded
     """
     try:
-        # Import here to avoid circular dependencies
-        from app_core.models import ReceivedEASAlert
-        from app_core.extensions import db
-        from flask import current_app, has_app_context
-
-        # Skip if not in Flask app context
-        if not has_app_context():
-            logger.debug("Not in Flask app context, skipping database storage")
-            return
+        record = {
+            'received_at': alert.timestamp.isoformat() if alert.timestamp else None,
+            'source_name': alert.source_name,
+            'raw_text': alert.raw_text,
+            'headers': alert.headers,
+            'confidence': alert.confidence,
+            'duration_seconds': alert.duration_seconds,
+            'audio_file_path': alert.audio_file_path,
+            'forwarding_decision': forwarding_decision,
+            'forwarding_reason': forwarding_reason,
+            'matched_fips': list(matched_fips or []),
+            'generated_message_id': generated_message_id,
+            'forwarded_at': utc_now().isoformat() if forwarding_decision == 'forwarded' else None,
+        }
+        get_received_alert_queue().submit(record)
+    except Exception as e:
+        # Don't let persistence errors break alert processing
+        logger.error(f"Failed to queue received alert for storage: {e}", exc_info=True)
 
-        # Extract data from alert
-        event_code = "UNKNOWN"
-        event_name = None
-        originator_code = "UNKNOWN"
-        originator_name = None
-        fips_codes = []
-        issue_datetime = None
-        purge_datetime = None
-        callsign = None
-        raw_same_header = None
 
-        if alert.headers and len(alert.headers) > 0:
-            first_header = alert.headers[0]
-            raw_same_header = first_header.get('raw_text')
+def _parse_record_datetime(value):
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
 
-            if 'fields' in first_header:
-                fields = first_header['fields']
-                event_code = fields.get('event_code', 'UNKNOWN')
-                event_name = get_event_name(event_code)
-                originator_code = fields.get('originator', 'UNKNOWN')
-                originator_name = get_originator_name(originator_code)
-                callsign = fields.get('callsign')
 
-                # Extract FIPS codes
-                locations = fields.get('locations', [])
-                if isinstance(locations, list):
-                    for loc in locations:
-                        if isinstance(loc, dict):
-                            code = loc.get('code', '')
-                            if code:
-                                fips_codes.append(code)
+def _persist_received_alert(record: Dict) -> None:
+    """
+    Store one queued received-alert record in the database.
 
-                # Extract timestamps
-                issue_time = fields.get('issue_time')
-                purge_time = fields.get('purge_time')
-                if issue_time:
-                    issue_datetime = datetime.fromisoformat(issue_time) if isinstance(issue_time, str) else issue_time
-                if purge_time:
-                    purge_datetime = datetime.fromisoformat(purge_time) if isinstance(purge_time, str) else purge_time
+    Runs on the persistence thread.  Raises when the database write fails so
+    the record stays spooled and is retried in order.
+    """
+    # Import here to avoid circular dependencies
+    from app_core.models import ReceivedEASAlert
+    from app_core.extensions import db
+    from flask import has_app_context
+
+    # Without an app context the write cannot happen; raise so the record stays spooled
+    if not has_app_context():
+        raise RuntimeError("No Flask app context for received-alert storage")
+
+    # Extract data from alert
+    event_code = "UNKNOWN"
+    event_name = None
+    originator_code = "UNKNOWN"
+    originator_name = None
+    fips_codes = []
+    issue_datetime = None
+    purge_datetime = None
+    callsign = None
+    raw_same_header = None
+
+    headers = record.get('headers') or []
+    if headers:
+        first_header = headers[0]
+        raw_same_header = first_header.get('raw_text')
+
+        if 'fields' in first_header:
+            fields = first_header['fields']
+            event_code = fields.get('event_code', 'UNKNOWN')
+            event_name = get_event_name(event_code)
+            originator_code = fields.get('originator', 'UNKNOWN')
+            originator_name = get_originator_name(originator_code)
+            callsign = fields.get('callsign')
+
+            # Extract FIPS codes
+            locations = fields.get('locations', [])
+            if isinstance(locations, list):
+                for loc in locations:
+                    if isinstance(loc, dict):
+                        code = loc.get('code', '')
+                        if code:
+                            fips_codes.append(code)
+
+            # Extract timestamps
+            issue_time = fields.get('issue_time')
+            purge_time = fields.get('purge_time')
+            if issue_time:
+                issue_datetime = _parse_record_datetime(issue_time)
+            if purge_time:
+                purge_datetime = _parse_record_datetime(purge_time)
 
+    try:
         # Suppress duplicate alerts that arrive within a short window
         # Duplicates can occur when multiple receivers hear the same alert
         # or when the SAME header is decoded repeatedly from the same message.
@@ -147,8 +196,8 @@ def _store_received_alert(
 
         # Create database record
         received_alert = ReceivedEASAlert(
-            received_at=alert.timestamp,
-            source_name=alert.source_name,
+            received_at=_parse_record_datetime(record.get('received_at')),
+            source_name=record.get('source_name'),
             raw_same_header=raw_same_header,
             event_code=event_code,
             event_name=event_name,
@@ -158,32 +207,85 @@ def _store_received_alert(
             issue_datetime=issue_datetime,
             purge_datetime=purge_datetime,
             callsign=callsign,
-            forwarding_decision=forwarding_decision,
-            forwarding_reason=forwarding_reason,
-            matched_fips_codes=matched_fips,
-            generated_message_id=generated_message_id,
-            forwarded_at=utc_now() if forwarding_decision == 'forwarded' else None,
-            decode_confidence=alert.confidence,
+            forwarding_decision=record.get('forwarding_decision'),
+            forwarding_reason=record.get('forwarding_reason'),
+            matched_fips_codes=record.get('matched_fips') or [],
+            generated_message_id=record.get('generated_message_id'),
+            forwarded_at=_parse_record_datetime(record.get('forwarded_at')),
+            decode_confidence=record.get('confidence'),
             full_alert_data={
-                'raw_text': alert.raw_text,
-                'headers': alert.headers,
-                'duration_seconds': alert.duration_seconds,
-                'audio_file_path': alert.audio_file_path,
+                'raw_text': record.get('raw_text'),
+                'headers': headers,
+                'duration_seconds': record.get('duration_seconds'),
+                'audio_file_path': record.get('audio_file_path'),
             }
         )
 
         db.session.add(received_alert)
         db.session.commit()
-        logger.info(f"Stored received alert in database: {event_code} from {alert.source_name}")
+        logger.info(f"Stored received alert in database: {event_code} from {record.get('source_name')}")
 
-    except Exception as e:
-        logger.error(f"Failed to store received alert in database: {e}", exc_info=True)
-        # Don't let database errors break alert processing
+    except Exception:
         try:
-            from app_core.extensions import db
             db.session.rollback()
-        except:
+        except Exception:
             pass
+        raise
+
+
+_received_alert_queue: Optional[AlertPersistenceQueue] = None
+_received_alert_queue_lock = threading.Lock()
+
+
+def configure_received_alert_persistence(
+    app=None,
+    spool_dir: Optional[str] = None,
+    store: Optional[Callable[[Dict], None]] = None,
+) -> AlertPersistenceQueue:
+    """
+    (Re)create and start the received-alert write-behind queue.
+
+    Args:
+        app: Flask app whose context the database writes run in (required
+            with the default ``store``)
+        spool_dir: Local spool directory (default: ``default_spool_dir()``)
+        store: Record writer (default: ``_persist_received_alert``)
+
+    Returns:
+        The running AlertPersistenceQueue
+
+    Raises:
+        ValueError: If the default database store is used without an app
+    """
+    global _received_alert_queue
+    if store is None and app is None:
+        raise ValueError("Received-alert persistence needs the Flask app for database writes")
+    with _received_alert_queue_lock:
+        if _received_alert_queue is not None:
+            _received_alert_queue.stop()
+        _received_alert_queue = AlertPersistenceQueue(
+            store or _persist_received_alert,
+            spool_dir=spool_dir,
+            app=app,
+        )
+        _received_alert_queue.start()
+        return _received_alert_queue
+
+
+def get_received_alert_queue() -> AlertPersistenceQueue:
+    """
+    Return the received-alert queue set up by ``configure_received_alert_persistence``.
+
+    Raises:
+        RuntimeError: If persistence has not been configured with an app
+    """
+    with _received_alert_queue_lock:
+        if _received_alert_queue is None:
+            raise RuntimeError(
+                "Received-alert persistence is not configured; "
+                "call configure_received_alert_persistence(app=...) at startup"
+            )
+        return _received_alert_queue
 
 
 @dataclass
@@ -196,6 +298,8 @@ class EASAlert:
     duration_seconds: float
     source_name: str
     audio_file_path: Optional[str] = None
+    # time.monotonic() when the decoder saw the first header byte
+    header_started_at: Optional[float] = None
 
 
 def compute_alert_signature(alert: EASAlert) -> str:
@@ -257,6 +361,7 @@ def create_fips_filtering_callback(
     """
     log = logger_instance or logger
 
+    @timed(STAGE_FIPS_FILTER)
     def fips_filtering_callback(alert: EASAlert) -> None:
         """Callback that filters alerts by FIPS codes with logging."""
         # Extract FIPS codes from alert
@@ -364,6 +469,9 @@ def create_fips_filtering_callback(
                 matched_fips=[]
             )
 
+        if alert.header_started_at is not None:
+            observe_latency(STAGE_END_TO_END, time.monotonic() - alert.header_started_at)
+
     return fips_filtering_callback
 
 
@@ -385,7 +493,8 @@ class ContinuousEASMonitor:
         sample_rate: int = 16000,
         alert_callback: Optional[Callable[[EASAlert], None]] = None,
         save_audio_files: bool = True,
-        audio_archive_dir: str = "/tmp/eas-audio"
+        audio_archive_dir: str = "/tmp/eas-audio",
+        tone_callback: Optional[Callable[[ToneEvent], None]] = None
     ):
         """
         Initialize continuous EAS monitor with real-time streaming decoder.
@@ -396,6 +505,7 @@ class ContinuousEASMonitor:
             alert_callback: Optional callback function called when alert detected
             save_audio_files: Whether to save audio files of detected alerts
             audio_archive_dir: Directory to save alert audio files
+            tone_callback: Optional callback for attention-tone start/stop events
             
         How it works:
             Audio samples are processed immediately as they arrive using a
@@ -406,6 +516,7 @@ class ContinuousEASMonitor:
         self.sample_rate = sample_rate
         self.source_sample_rate = getattr(audio_manager, "sample_rate", sample_rate)
         self.alert_callback = alert_callback
+        self.tone_callback = tone_callback
         self.save_audio_files = save_audio_files
         self.audio_archive_dir = audio_archive_dir
 
@@ -423,6 +534,14 @@ class ContinuousEASMonitor:
             sample_rate=sample_rate,
             alert_callback=self._handle_streaming_alert
         )
+
+        # ATTENTION TONES: EBS two-tone / NWS 1050 Hz detection runs on the same
+        # chunks as the SAME decoder so tones behind a garbled header are caught.
+        # One detector per source keeps tone state from bleeding across failovers.
+        self._tone_detectors: Dict[str, StreamingToneDetector] = {}
+        self._tone_detectors_lock = threading.Lock()
+        self._tone_source: Optional[str] = None
+        self._recent_tone_events: deque = deque(maxlen=50)
         
         logger.warning(
             "⚠️ BATCH PROCESSING DISABLED - Using real-time streaming decoder. "
@@ -628,6 +747,10 @@ class ContinuousEASMonitor:
             # Alert metrics
             "alerts_detected": alerts_detected,
             "last_alert_time": last_alert_time,
+
+            # Attention tone detection (EBS two-tone / NWS 1050 Hz)
+            "tone_detectors": self.get_tone_stats(),
+            "recent_tone_events": self.get_tone_events(),
             
             # Health metrics
             "last_activity": last_activity,
@@ -635,6 +758,11 @@ class ContinuousEASMonitor:
             "restart_count": self._restart_count,
             "watchdog_timeout": self._watchdog_timeout,
 
+            # Write-behind received-alert storage (pending > 0 while the DB lags)
+            "alert_persistence": (
+                _received_alert_queue.get_stats() if _received_alert_queue is not None else None
+            ),
+
             # Audio adapter stats (broadcast subscription health)
             "audio_buffer_samples": adapter_stats.get("buffer_samples"),
             "audio_buffer_seconds": adapter_stats.get("buffer_seconds"),
@@ -722,6 +850,9 @@ class ContinuousEASMonitor:
             # CRITICAL FIX: Reset the streaming decoder to clear samples_processed counter
             # This ensures runtime metrics stay consistent after restart
             self._streaming_decoder.reset()
+            with self._tone_detectors_lock:
+                for detector in self._tone_detectors.values():
+                    detector.reset()
             
             # Start new monitoring thread
             self._monitor_thread = threading.Thread(
@@ -819,6 +950,10 @@ class ContinuousEASMonitor:
         successful_reads = 0
         failed_reads = 0
 
+        latency = get_latency_registry()
+        resample_latency = latency.histogram(STAGE_RESAMPLE)
+        decode_latency = latency.histogram(STAGE_DECODE)
+
         while not self._stop_event.is_set():
             try:
                 # Update activity heartbeat periodically
@@ -887,16 +1022,25 @@ class ContinuousEASMonitor:
                     # but the EAS decoder MUST receive 16 kHz audio for optimal SAME decoding.
                     # This resampling uses linear interpolation (numpy.interp) optimized for
                     # Raspberry Pi performance - 10-20x faster than polyphase filtering.
+                    stage_started = time.perf_counter()
                     decoded_samples = self._resample_if_needed(samples)
+                    resample_latency.observe(time.perf_counter() - stage_started)
 
                     # REAL-TIME PROCESSING: Feed samples directly to decoder
                     # ZERO buffering, ZERO batching, ZERO delays
                     # Every sample is processed immediately
+                    stage_started = time.perf_counter()
                     try:
                         self._streaming_decoder.process_samples(decoded_samples)
                         samples_processed += len(decoded_samples)
                     except Exception as decode_error:
                         logger.error(f"Error in streaming decoder: {decode_error}", exc_info=True)
+                    decode_latency.observe(time.perf_counter() - stage_started)
+
+                    try:
+                        self._get_tone_detector().process_samples(decoded_samples)
+                    except Exception as tone_error:
+                        logger.error(f"Error in streaming tone detector: {tone_error}", exc_info=True)
                 
                 # Brief sleep only if we didn't get audio samples
                 if samples is None:
@@ -909,6 +1053,53 @@ class ContinuousEASMonitor:
 
         logger.info("🔴 STREAMING EAS monitor stopped")
 
+    def _get_tone_detector(self) -> StreamingToneDetector:
+        """
+        Return the tone detector for the active source, creating it on first use.
+
+        On failover the previous source's detector is closed so a tone that was
+        on the air there gets its stop event instead of staying open forever.
+        """
+        source_name = self.audio_manager.get_active_source() or "unknown"
+        previous_source = self._tone_source
+        if previous_source != source_name:
+            self._tone_source = source_name
+            previous = self._tone_detectors.get(previous_source) if previous_source else None
+            if previous is not None:
+                previous.close()
+        detector = self._tone_detectors.get(source_name)
+        if detector is None:
+            with self._tone_detectors_lock:
+                detector = self._tone_detectors.get(source_name)
+                if detector is None:
+                    detector = StreamingToneDetector(
+                        sample_rate=self.sample_rate,
+                        source_name=source_name,
+                        event_callback=self._handle_tone_event,
+                    )
+                    self._tone_detectors[source_name] = detector
+        return detector
+
+    def _handle_tone_event(self, event: ToneEvent) -> None:
+        """Record an attention-tone event and forward it to the tone callback."""
+        self._recent_tone_events.append(event)
+        if self.tone_callback:
+            try:
+                self.tone_callback(event)
+            except Exception as e:
+                logger.error(f"Error in tone callback: {e}", exc_info=True)
+
+    def get_tone_events(self, limit: int = 20) -> List[dict]:
+        """Return the most recent attention-tone events (newest last)."""
+        events = list(self._recent_tone_events)[-limit:]
+        return [event.to_dict() for event in events]
+
+    def get_tone_stats(self) -> Dict[str, dict]:
+        """Return per-source tone detector statistics, including CPU cost."""
+        with self._tone_detectors_lock:
+            detectors = list(self._tone_detectors.items())
+        return {name: detector.get_stats() for name, detector in detectors}
+
     def _handle_streaming_alert(self, alert) -> None:
         """
         Handle alert from streaming decoder.
@@ -988,7 +1179,8 @@ class ContinuousEASMonitor:
             confidence=alert.confidence,
             duration_seconds=0.0,  # Streaming doesn't track duration
             source_name=source_name,
-            audio_file_path=audio_file_path
+            audio_file_path=audio_file_path,
+            header_started_at=getattr(alert, 'started_at', None),
         )
         
         # Check for duplicates
@@ -1345,8 +1537,17 @@ class ContinuousEASMonitor:
             'samples_processed': decoder_stats['samples_processed'],
             'alerts_detected': self._alerts_detected,
             'active_source': self.audio_manager.get_active_source(),
-            'last_alert_time': self._last_alert_time
+            'last_alert_time': self._last_alert_time,
+            'tone_detectors': self.get_tone_stats(),
+            'recent_tone_events': self.get_tone_events(),
         }
 
 
-__all__ = ['ContinuousEASMonitor', 'EASAlert', 'create_fips_filtering_callback', 'compute_alert_signature']
+__all__ = [
+    'ContinuousEASMonitor',
+    'EASAlert',
+    'compute_alert_signature',
+    'configure_received_alert_persistence',
+    'create_fips_filtering_callback',
+    'get_received_alert_queue',
+]
@@ -382,6 +382,20 @@ class FFmpegAudioSource:
         """
         return self.ring_buffer.read(num_samples, block=False)
 
+    def read_available(self, max_samples: Optional[int] = None) -> Optional[np.ndarray]:
+        """
+        Read every sample currently buffered (up to ``max_samples``) without waiting.
+
+        Returns:
+            NumPy array of samples, or None if the buffer is empty
+        """
+        available = self.ring_buffer.available_read()
+        if max_samples is not None:
+            available = min(available, max_samples)
+        if available <= 0:
+            return None
+        return self.ring_buffer.read(available, block=False)
+
     def get_metrics(self) -> SourceMetrics:
         """Get current health metrics."""
         uptime = time.time() - self._start_time if self._start_time > 0 else 0
@@ -46,6 +46,8 @@ class IcecastAutoConfig:
         self.public_hostname = None  # Public hostname/IP for browser access
         self.admin_user = None
         self.admin_password = None
+        self.low_latency = False  # Adaptive jitter buffer instead of the 7.5 s prebuffer
+        self.max_latency_ms = 800.0
 
         self._detect_config()
 
@@ -84,6 +86,10 @@ class IcecastAutoConfig:
                     "and ICECAST_ADMIN_PASSWORD are provided."
                 )
 
+            # Low-latency output (sub-second buffering; see IcecastConfig.low_latency)
+            self.low_latency = os.environ.get('ICECAST_LOW_LATENCY', 'false').lower() in ('true', '1', 'yes', 'enabled')
+            self.max_latency_ms = float(os.environ.get('ICECAST_MAX_LATENCY_MS', '800'))
+
             # For external URLs (browser access), use the external port
             external_port_str = os.environ.get('ICECAST_EXTERNAL_PORT')
             if external_port_str:
@@ -32,16 +32,20 @@ import queue
 import threading
 import time
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
 from enum import Enum
 from pathlib import Path
-from typing import Dict, List, Optional, Union
+from typing import Callable, Dict, Iterator, List, Optional, TypeVar, Union
 
 import numpy as np
 from .broadcast_queue import BroadcastQueue
+from .latency_metrics import STAGE_CAPTURE_READ, get_latency_registry
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 
 class AudioSourceType(Enum):
     """Supported audio source types."""
@@ -75,6 +79,39 @@ class AudioMetrics:
     metadata: Optional[Dict] = None  # Additional source-specific metadata (e.g., stream URL, codec, bitrate)
 
 
+class _SequenceGuard:
+    """Seqlock for state written by one thread at a time (usually the capture thread).
+
+    The writer bumps the sequence to odd before mutating and back to even
+    afterwards, so it never waits.  Readers copy the state and retry if the
+    sequence moved underneath them.
+    """
+
+    __slots__ = ("_sequence",)
+
+    MAX_READ_ATTEMPTS = 100
+
+    def __init__(self):
+        self._sequence = 0
+
+    def begin_write(self) -> None:
+        self._sequence += 1
+
+    def end_write(self) -> None:
+        self._sequence += 1
+
+    def read(self, copy: Callable[[], T]) -> T:
+        for _ in range(self.MAX_READ_ATTEMPTS):
+            start = self._sequence
+            if not start & 1:
+                value = copy()
+                if self._sequence == start:
+                    return value
+            time.sleep(0)
+        # A writer that never finishes is a bug elsewhere; hand back best effort
+        return copy()
+
+
 @dataclass
 class AudioSourceConfig:
     """Configuration for an audio source."""
@@ -131,14 +168,26 @@ class AudioSourceAdapter(ABC):
         
         self._last_metrics_update = 0.0
         self._start_time = 0.0
-        # Waveform buffer for visualization (stores last 2048 samples)
+        self._metrics_guard = _SequenceGuard()
+        # Metrics have more than one writer (capture thread, RBDS/squelch/ICY metadata)
+        self._metrics_write_lock = threading.Lock()
+        # Mono mixdown scratch for multi-channel chunks, grown on demand
+        self._mixdown_buffer = np.zeros(0, dtype=np.float32)
+        # Waveform ring for visualization (stores last 2048 samples);
+        # _waveform_pos is the next write index, i.e. the oldest sample
         self._waveform_buffer = np.zeros(2048, dtype=np.float32)
-        self._waveform_lock = threading.Lock()
-        # Spectrogram buffer for waterfall visualization (stores last 100 FFT frames)
+        self._waveform_pos = 0
+        self._waveform_guard = _SequenceGuard()
+        # Spectrogram ring for waterfall visualization (stores last 100 FFT frames);
+        # _spectrogram_row is the next row to overwrite, i.e. the oldest frame
         self._fft_size = 1024  # FFT window size
         self._spectrogram_history = 100  # Number of FFT frames to keep
         self._spectrogram_buffer = np.zeros((self._spectrogram_history, self._fft_size // 2), dtype=np.float32)
-        self._spectrogram_lock = threading.Lock()
+        self._spectrogram_row = 0
+        self._spectrogram_guard = _SequenceGuard()
+        self._fft_window = np.hamming(self._fft_size).astype(np.float32)
+        self._fft_input = np.zeros(self._fft_size, dtype=np.float32)
+        self._fft_magnitude = np.zeros(self._fft_size // 2 + 1, dtype=np.float64)
         # Reconnection support
         self._reconnect_attempts = 0
         self._max_reconnect_attempts = 5
@@ -257,11 +306,15 @@ class AudioSourceAdapter(ABC):
     def _capture_loop(self) -> None:
         """Main capture loop running in separate thread."""
         logger.debug(f"Capture loop started for {self.config.name}")
+        read_latency = get_latency_registry().histogram(STAGE_CAPTURE_READ)
 
         while not self._stop_event.is_set():
             try:
+                read_started = time.perf_counter()
                 audio_chunk = self._read_audio_chunk()
                 if audio_chunk is not None:
+                    read_latency.observe(time.perf_counter() - read_started)
+
                     # Update metrics
                     self._update_metrics(audio_chunk)
 
@@ -286,7 +339,12 @@ class AudioSourceAdapter(ABC):
         logger.debug(f"Capture loop stopped for {self.config.name}")
 
     def _update_metrics(self, audio_chunk: np.ndarray) -> None:
-        """Update real-time metrics from audio chunk."""
+        """Update real-time metrics from audio chunk.
+
+        Runs on the capture thread for every chunk, so it works in place:
+        the ``AudioMetrics`` object and its metadata dict are reused and the
+        visualization rings are written through preallocated scratch buffers.
+        """
         current_time = time.time()
 
         # Limit update frequency
@@ -295,15 +353,15 @@ class AudioSourceAdapter(ABC):
 
         # Calculate audio levels
         if len(audio_chunk) > 0:
-            samples_for_metrics = audio_chunk
-            if isinstance(audio_chunk, np.ndarray) and audio_chunk.ndim > 1:
-                samples_for_metrics = audio_chunk.mean(axis=1)
+            samples_for_metrics = np.asarray(audio_chunk)
+            if samples_for_metrics.ndim > 1:
+                samples_for_metrics = self._mixdown(samples_for_metrics)
             # Peak level in dBFS
-            peak = np.max(np.abs(samples_for_metrics))
+            peak = max(float(samples_for_metrics.max()), -float(samples_for_metrics.min()))
             peak_db = 20 * np.log10(max(peak, 1e-10))
 
             # RMS level in dBFS
-            rms = np.sqrt(np.mean(samples_for_metrics ** 2))
+            rms = np.sqrt(float(np.dot(samples_for_metrics, samples_for_metrics)) / len(samples_for_metrics))
             rms_db = 20 * np.log10(max(rms, 1e-10))
 
             # Silence detection
@@ -316,29 +374,60 @@ class AudioSourceAdapter(ABC):
             peak_db = rms_db = -np.inf
             silence_detected = True
 
-        # Preserve existing metadata (e.g., RBDS information) across metric updates
-        current_metadata = self.metrics.metadata if self.metrics else None
-        if current_metadata is None:
-            current_metadata = {}
-        current_metadata['source_restart_count'] = self._restart_count
-        current_metadata['source_last_error'] = self._last_error
-        current_metadata['source_start_time'] = self._start_time
-
-        # Update metrics
-        self.metrics = AudioMetrics(
-            timestamp=current_time,
-            peak_level_db=peak_db,
-            rms_level_db=rms_db,
-            sample_rate=self.config.sample_rate,
-            channels=self.config.channels,
-            frames_captured=self.metrics.frames_captured + len(audio_chunk),
-            silence_detected=silence_detected,
-            buffer_utilization=self._audio_queue.qsize() / self._audio_queue.maxsize,
-            metadata=current_metadata,
-        )
+        with self.metrics_write() as metrics:
+            # Preserve existing metadata (e.g., RBDS information) across metric updates
+            metadata = metrics.metadata
+            metadata['source_restart_count'] = self._restart_count
+            metadata['source_last_error'] = self._last_error
+            metadata['source_start_time'] = self._start_time
+
+            metrics.timestamp = current_time
+            metrics.peak_level_db = peak_db
+            metrics.rms_level_db = rms_db
+            metrics.sample_rate = self.config.sample_rate
+            metrics.channels = self.config.channels
+            metrics.frames_captured += len(audio_chunk)
+            metrics.silence_detected = silence_detected
+            metrics.buffer_utilization = self._audio_queue.qsize() / self._audio_queue.maxsize
 
         self._last_metrics_update = current_time
 
+    def _mixdown(self, audio_chunk: np.ndarray) -> np.ndarray:
+        """Average channels into a reused mono scratch buffer."""
+        frames = audio_chunk.shape[0]
+        if self._mixdown_buffer.shape[0] < frames:
+            self._mixdown_buffer = np.zeros(frames, dtype=np.float32)
+        mono = self._mixdown_buffer[:frames]
+        np.mean(audio_chunk, axis=1, out=mono)
+        return mono
+
+    @contextmanager
+    def metrics_write(self) -> Iterator[AudioMetrics]:
+        """Write section for ``self.metrics`` (its ``metadata`` dict is always present).
+
+        Writers serialize on a lock, since metadata is updated from threads
+        other than the capture thread; readers use ``get_metrics_snapshot()``
+        and never block.
+        """
+        with self._metrics_write_lock:
+            self._metrics_guard.begin_write()
+            try:
+                if self.metrics.metadata is None:
+                    self.metrics.metadata = {}
+                yield self.metrics
+            finally:
+                self._metrics_guard.end_write()
+
+    def get_metrics_snapshot(self) -> AudioMetrics:
+        """Return a consistent copy of the current metrics without blocking capture."""
+
+        def copy() -> AudioMetrics:
+            metrics = self.metrics
+            metadata = metrics.metadata
+            return replace(metrics, metadata=dict(metadata) if metadata is not None else None)
+
+        return self._metrics_guard.read(copy)
+
     def restart(
         self,
         reason: str,
@@ -391,60 +480,72 @@ class AudioSourceAdapter(ABC):
             return False
 
     def _update_waveform_buffer(self, audio_chunk: np.ndarray) -> None:
-        """Update the waveform buffer with new audio data."""
+        """Update the waveform ring with new audio data."""
         if len(audio_chunk) == 0:
             return
 
-        with self._waveform_lock:
-            # Downsample if needed to fit in buffer
-            buffer_size = len(self._waveform_buffer)
+        buffer = self._waveform_buffer
+        buffer_size = len(buffer)
+        self._waveform_guard.begin_write()
+        try:
             if len(audio_chunk) >= buffer_size:
                 # Take every Nth sample to fit
                 step = len(audio_chunk) // buffer_size
-                self._waveform_buffer[:] = audio_chunk[::step][:buffer_size]
+                buffer[:] = audio_chunk[::step][:buffer_size]
+                self._waveform_pos = 0
             else:
-                # Shift existing data and append new
-                shift_amount = len(audio_chunk)
-                self._waveform_buffer[:-shift_amount] = self._waveform_buffer[shift_amount:]
-                self._waveform_buffer[-shift_amount:] = audio_chunk[:shift_amount]
+                # Append at the write index, wrapping around the end
+                pos = self._waveform_pos
+                count = len(audio_chunk)
+                first = min(count, buffer_size - pos)
+                buffer[pos:pos + first] = audio_chunk[:first]
+                if first < count:
+                    buffer[:count - first] = audio_chunk[first:]
+                self._waveform_pos = (pos + count) % buffer_size
+        finally:
+            self._waveform_guard.end_write()
 
     def get_waveform_data(self) -> np.ndarray:
-        """Get a copy of the current waveform buffer for visualization."""
-        with self._waveform_lock:
-            return self._waveform_buffer.copy()
+        """Get a copy of the current waveform buffer (oldest sample first) for visualization."""
+
+        def copy() -> np.ndarray:
+            pos = self._waveform_pos
+            return np.concatenate((self._waveform_buffer[pos:], self._waveform_buffer[:pos]))
+
+        return self._waveform_guard.read(copy)
 
     def _update_spectrogram_buffer(self, audio_chunk: np.ndarray) -> None:
-        """Update the spectrogram buffer with FFT of new audio data."""
+        """Write the FFT of the newest samples into the next spectrogram row."""
         if len(audio_chunk) < self._fft_size:
             return
 
-        with self._spectrogram_lock:
-            # Take the last fft_size samples for FFT computation
-            fft_window = audio_chunk[-self._fft_size:]
-
-            # Apply Hamming window to reduce spectral leakage
-            windowed = fft_window * np.hamming(self._fft_size)
+        # Apply the cached Hamming window to the last fft_size samples
+        windowed = np.multiply(audio_chunk[-self._fft_size:], self._fft_window, out=self._fft_input)
 
-            # Compute FFT and get magnitude spectrum (only positive frequencies)
-            fft_result = np.fft.rfft(windowed)
-            magnitude = np.abs(fft_result)
+        # Magnitude spectrum (positive frequencies) in dB with a floor to avoid log(0)
+        magnitude = np.abs(np.fft.rfft(windowed), out=self._fft_magnitude)
+        np.maximum(magnitude, 1e-10, out=magnitude)
+        np.log10(magnitude, out=magnitude)
 
-            # Convert to dB scale (with floor to avoid log(0))
-            magnitude = np.maximum(magnitude, 1e-10)
-            magnitude_db = 20 * np.log10(magnitude)
+        self._spectrogram_guard.begin_write()
+        try:
+            row = self._spectrogram_buffer[self._spectrogram_row]
+            # Normalize 20*log10 dB onto 0-1 for visualization (-120 dB to 0 dB)
+            np.multiply(magnitude[:self._fft_size // 2], 20.0 / 120.0, out=row)
+            row += 1.0
+            np.clip(row, 0.0, 1.0, out=row)
+            self._spectrogram_row = (self._spectrogram_row + 1) % self._spectrogram_history
+        finally:
+            self._spectrogram_guard.end_write()
 
-            # Normalize to 0-1 range for visualization (assuming -120dB to 0dB range)
-            normalized = (magnitude_db + 120) / 120
-            normalized = np.clip(normalized, 0, 1)
+    def get_spectrogram_data(self) -> np.ndarray:
+        """Get a copy of the spectrogram (oldest frame first) for waterfall visualization."""
 
-            # Shift buffer and add new FFT frame
-            self._spectrogram_buffer[:-1] = self._spectrogram_buffer[1:]
-            self._spectrogram_buffer[-1] = normalized[:self._fft_size // 2]
+        def copy() -> np.ndarray:
+            row = self._spectrogram_row
+            return np.concatenate((self._spectrogram_buffer[row:], self._spectrogram_buffer[:row]))
 
-    def get_spectrogram_data(self) -> np.ndarray:
-        """Get a copy of the current spectrogram buffer for waterfall visualization."""
-        with self._spectrogram_lock:
-            return self._spectrogram_buffer.copy()
+        return self._spectrogram_guard.read(copy)
 
 
 class AudioIngestController:
@@ -572,8 +673,8 @@ class AudioIngestController:
         with self._lock:
             active = self._active_source
             if active and active in self._sources:
-                metrics = self._sources[active].metrics
-                if metrics and metrics.sample_rate:
+                metrics = self._sources[active].get_metrics_snapshot()
+                if metrics.sample_rate:
                     return int(metrics.sample_rate)
 
             # Fall back to the first configured source's sample rate if active is unknown
@@ -587,13 +688,13 @@ class AudioIngestController:
         """Get metrics for a specific source."""
         with self._lock:
             if name in self._sources:
-                return self._sources[name].metrics
+                return self._sources[name].get_metrics_snapshot()
             return None
 
     def get_all_metrics(self) -> Dict[str, AudioMetrics]:
         """Get metrics for all sources."""
         with self._lock:
-            return {name: source.metrics for name, source in self._sources.items()}
+            return {name: source.get_metrics_snapshot() for name, source in self._sources.items()}
 
     def get_source_status(self, name: str) -> Optional[AudioSourceStatus]:
         """Get status for a specific source."""
@@ -785,7 +886,7 @@ class AudioIngestController:
         if status == AudioSourceStatus.RUNNING:
             if adapter._start_time and now - adapter._start_time < self._monitor_grace_period:
                 return
-            last_update = adapter._last_metrics_update or (adapter.metrics.timestamp if adapter.metrics else 0.0)
+            last_update = adapter._last_metrics_update or adapter.get_metrics_snapshot().timestamp
             if last_update == 0.0 or now - last_update > self._monitor_stall_seconds:
                 adapter.restart("stalled capture (no audio samples)")
             return
@@ -0,0 +1,239 @@
+"""
+EAS Station - Emergency Alert System
+Copyright (c) 2025 Timothy Kramer (KR8MER)
+
+This file is part of EAS Station.
+
+EAS Station is dual-licensed software:
+- GNU Affero General Public License v3 (AGPL-3.0) for open-source use
+- Commercial License for proprietary use
+
+You should have received a copy of both licenses with this software.
+For more information, see LICENSE and LICENSE-COMMERCIAL files.
+
+IMPORTANT: This software cannot be rebranded or have attribution removed.
+See NOTICE file for complete terms.
+
+Repository: https://github.com/KR8MER/eas-station
+"""
+
+from __future__ import annotations
+
+"""
+Adaptive jitter buffer for low-latency PCM playout.
+
+Audio arrives from the source in irregular lumps (network reads, SDR blocks,
+scheduler hiccups) but the encoder must be fed at a steady real-time rate.
+``AdaptiveJitterBuffer`` sits between the two:
+
+* ``push()`` timestamps every chunk and measures how far its arrival strays
+  from the media clock.  The spread of that *transit time* over a sliding
+  window, plus the largest chunk seen, is exactly the depth needed to ride out
+  the observed jitter, so the target depth follows it (bounded by
+  ``min_latency_ms``/``max_latency_ms``).
+* ``pop()`` is called once per output frame on a real-time clock and always
+  returns one frame.  When the buffer runs dry it pads with silence and
+  re-primes to the target instead of stalling the encoder; when a burst leaves
+  it deeper than the target it drops the oldest audio so latency stays bounded.
+
+Every pop also measures the age of the newest sample handed to the encoder
+(arrival time minus its position in the chunk), which is the in-process part
+of glass-to-glass latency.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_BYTES_PER_SAMPLE = 2  # s16le
+_JITTER_WINDOW_SECONDS = 10.0
+# RFC 3550 interarrival jitter gain
+_JITTER_GAIN = 1.0 / 16.0
+_LATENCY_SMOOTHING = 0.05
+
+
+class AdaptiveJitterBuffer:
+    """Real-time paced s16le playout buffer sized from measured arrival jitter.
+
+    Not thread-safe for concurrent producers; ``push``/``pop`` are expected
+    from the feeder thread while ``get_stats`` may be called from anywhere.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        channels: int = 1,
+        frame_ms: float = 20.0,
+        min_latency_ms: float = 60.0,
+        max_latency_ms: float = 800.0,
+        window_seconds: float = _JITTER_WINDOW_SECONDS,
+    ):
+        self.channels = max(1, int(channels))
+        self.sample_rate = int(sample_rate)
+        self._byte_rate = float(self.sample_rate * self.channels * _BYTES_PER_SAMPLE)
+
+        frame_samples = max(1, int(round(self.sample_rate * frame_ms / 1000.0)))
+        self.frame_bytes = frame_samples * self.channels * _BYTES_PER_SAMPLE
+        self.frame_seconds = frame_samples / float(self.sample_rate)
+        self._silence = bytes(self.frame_bytes)
+
+        self.max_latency_ms = float(max_latency_ms)
+        self.min_latency_ms = min(float(min_latency_ms), self.max_latency_ms)
+        self._window_seconds = window_seconds
+
+        self._lock = threading.Lock()
+        self._buffer = bytearray()
+        self._pushed_bytes = 0  # write offset, in bytes of real audio
+        self._read_offset = 0   # bytes of real audio consumed (played or dropped)
+        # (end offset, arrival) per chunk, for sample-age measurement
+        self._arrivals: Deque[Tuple[int, float]] = deque()
+        # (arrival, transit, chunk seconds) inside the jitter window
+        self._transits: Deque[Tuple[float, float, float]] = deque()
+        self._last_transit: Optional[float] = None
+
+        self._playing = False
+        self._target_ms = self.min_latency_ms
+        self._jitter_ms = 0.0
+        self._latency_ms = 0.0
+        self._latency_peak_ms = 0.0
+
+        self._underruns = 0
+        self._silence_ms = 0.0
+        self._dropped_ms = 0.0
+        self._frames_out = 0
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+    def push(self, pcm: bytes, arrival: Optional[float] = None) -> None:
+        """Append one chunk of interleaved s16le PCM received at ``arrival``."""
+        if not pcm:
+            return
+        arrival = time.monotonic() if arrival is None else arrival
+        chunk_seconds = len(pcm) / self._byte_rate
+
+        with self._lock:
+            self._buffer += pcm
+            self._pushed_bytes += len(pcm)
+            self._arrivals.append((self._pushed_bytes, arrival))
+
+            # Transit = arrival time minus media time of the chunk's last sample;
+            # constant for a perfectly regular source, so its spread is the jitter.
+            transit = arrival - self._pushed_bytes / self._byte_rate
+            if self._last_transit is not None:
+                deviation_ms = abs(transit - self._last_transit) * 1000.0
+                self._jitter_ms += (deviation_ms - self._jitter_ms) * _JITTER_GAIN
+            self._last_transit = transit
+
+            self._transits.append((arrival, transit, chunk_seconds))
+            horizon = arrival - self._window_seconds
+            while self._transits and self._transits[0][0] < horizon:
+                self._transits.popleft()
+            self._target_ms = self._compute_target_ms()
+
+    def _compute_target_ms(self) -> float:
+        transits = [entry[1] for entry in self._transits]
+        spread_ms = (max(transits) - min(transits)) * 1000.0
+        largest_chunk_ms = max(entry[2] for entry in self._transits) * 1000.0
+        # Data arrives in lumps: the buffer dips by one chunk between arrivals,
+        # by the transit spread when a chunk is late, and by one frame per pop.
+        wanted = largest_chunk_ms + spread_ms + self.frame_seconds * 1000.0
+        return min(self.max_latency_ms, max(self.min_latency_ms, wanted))
+
+    # ------------------------------------------------------------------
+    # Consumer side
+    # ------------------------------------------------------------------
+    def pop(self, now: Optional[float] = None) -> bytes:
+        """Return exactly one output frame; silence while priming or on underrun."""
+        now = time.monotonic() if now is None else now
+        frame = self.frame_bytes
+        frame_ms = self.frame_seconds * 1000.0
+
+        with self._lock:
+            depth_ms = len(self._buffer) / self._byte_rate * 1000.0
+
+            if not self._playing:
+                if depth_ms < self._target_ms:
+                    self._silence_ms += frame_ms
+                    self._frames_out += 1
+                    return self._silence
+                self._playing = True
+
+            # Trim backlog left by a burst so latency returns to the target
+            hysteresis_ms = max(2.0 * frame_ms, 0.25 * self._target_ms)
+            if depth_ms > self._target_ms + hysteresis_ms:
+                excess = int((depth_ms - self._target_ms) / 1000.0 * self._byte_rate)
+                excess -= excess % (self.channels * _BYTES_PER_SAMPLE)
+                if excess > 0:
+                    del self._buffer[:excess]
+                    self._read_offset += excess
+                    self._dropped_ms += excess / self._byte_rate * 1000.0
+
+            available = min(frame, len(self._buffer))
+            out = bytes(self._buffer[:available])
+            del self._buffer[:available]
+            self._read_offset += available
+
+            if available < frame:
+                # Underrun: pad with silence and wait for the target depth again
+                out += self._silence[:frame - available]
+                self._underruns += 1
+                self._silence_ms += (frame - available) / self._byte_rate * 1000.0
+                self._playing = False
+
+            if available:
+                self._record_latency(now)
+            self._frames_out += 1
+            return out
+
+    def _record_latency(self, now: float) -> None:
+        # Find the chunk holding the newest sample handed out (offset - 1)
+        while self._arrivals and self._arrivals[0][0] < self._read_offset:
+            self._arrivals.popleft()
+        if not self._arrivals:
+            return
+        end_offset, arrival = self._arrivals[0]
+        captured_at = arrival - (end_offset - self._read_offset) / self._byte_rate
+        latency_ms = (now - captured_at) * 1000.0
+        if self._latency_ms == 0.0:
+            self._latency_ms = latency_ms
+        else:
+            self._latency_ms += (latency_ms - self._latency_ms) * _LATENCY_SMOOTHING
+        self._latency_peak_ms = max(self._latency_peak_ms, latency_ms)
+
+    # ------------------------------------------------------------------
+    # Introspection
+    # ------------------------------------------------------------------
+    @property
+    def target_ms(self) -> float:
+        with self._lock:
+            return self._target_ms
+
+    @property
+    def depth_ms(self) -> float:
+        with self._lock:
+            return len(self._buffer) / self._byte_rate * 1000.0
+
+    def get_stats(self) -> Dict[str, float]:
+        """Buffer and latency figures for status pages (milliseconds)."""
+        with self._lock:
+            return {
+                'target_ms': round(self._target_ms, 1),
+                'depth_ms': round(len(self._buffer) / self._byte_rate * 1000.0, 1),
+                'max_latency_ms': self.max_latency_ms,
+                'jitter_ms': round(self._jitter_ms, 2),
+                'latency_ms': round(self._latency_ms, 1),
+                'latency_peak_ms': round(self._latency_peak_ms, 1),
+                'underruns': self._underruns,
+                'silence_inserted_ms': round(self._silence_ms, 1),
+                'dropped_ms': round(self._dropped_ms, 1),
+                'frames_out': self._frames_out,
+                'playing': self._playing,
+            }
+
+
+__all__ = ["AdaptiveJitterBuffer"]
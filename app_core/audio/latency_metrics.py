@@ -0,0 +1,273 @@
+"""
+EAS Station - Emergency Alert System
+Copyright (c) 2025 Timothy Kramer (KR8MER)
+
+This file is part of EAS Station.
+
+EAS Station is dual-licensed software:
+- GNU Affero General Public License v3 (AGPL-3.0) for open-source use
+- Commercial License for proprietary use
+
+You should have received a copy of both licenses with this software.
+For more information, see LICENSE and LICENSE-COMMERCIAL files.
+
+IMPORTANT: This software cannot be rebranded or have attribution removed.
+See NOTICE file for complete terms.
+
+Repository: https://github.com/KR8MER/eas-station
+"""
+
+from __future__ import annotations
+
+"""
+Per-stage latency histograms for the audio and alert pipeline.
+
+Each pipeline stage (capture read, resample, decode, alert emission, FIPS
+filtering, database storage, playout start) records how long it took into a
+fixed-bucket histogram.  Snapshots are plain dicts so the audio service can
+ship them to the web application through the existing ``eas:metrics`` Redis
+hash, where ``/metrics`` renders them in Prometheus text format.
+
+Recording is lock-free: every thread writes to its own shard of bucket
+counters, so the audio thread never contends with the scraper or with other
+stages.  Readers sum the shards when taking a snapshot; a snapshot taken
+mid-update may be one observation behind, which is fine for monitoring.
+"""
+
+import functools
+import logging
+import math
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Sequence, TypeVar
+
+logger = logging.getLogger(__name__)
+
+# Prometheus-style upper bounds in seconds: sub-millisecond DSP work up to
+# multi-second database/relay paths.
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+STAGE_CAPTURE_READ = "capture_read"
+STAGE_RESAMPLE = "resample"
+STAGE_DECODE = "decode"
+STAGE_EMIT_ALERT = "emit_alert"
+STAGE_FIPS_FILTER = "fips_filter"
+STAGE_STORE_RECEIVED_ALERT = "store_received_alert"
+# Background database write of a received alert (off the decode path)
+STAGE_PERSIST_RECEIVED_ALERT = "persist_received_alert"
+STAGE_PLAYOUT_START = "playout_start"
+# First SAME header byte decoded -> alert forwarded/ignored and queued for storage
+STAGE_END_TO_END = "header_to_stored"
+# Control plane: app -> audio-service command queued -> reply received
+STAGE_AUDIO_COMMAND = "audio_command_round_trip"
+
+PIPELINE_STAGES = (
+    STAGE_CAPTURE_READ,
+    STAGE_RESAMPLE,
+    STAGE_DECODE,
+    STAGE_EMIT_ALERT,
+    STAGE_FIPS_FILTER,
+    STAGE_STORE_RECEIVED_ALERT,
+    STAGE_PERSIST_RECEIVED_ALERT,
+    STAGE_PLAYOUT_START,
+    STAGE_END_TO_END,
+)
+
+F = TypeVar("F", bound=Callable)
+
+METRIC_NAME = "eas_pipeline_stage_latency_seconds"
+METRIC_HELP = "Time spent in each EAS audio/alert pipeline stage."
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with one counter shard per writer thread."""
+
+    def __init__(self, name: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+        # thread ident -> [count per bucket..., +Inf count, sum of seconds]
+        self._shards: Dict[int, List[float]] = {}
+        self._shards_lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        """Record one duration. Safe to call from any thread without locking."""
+        shard = self._shards.get(threading.get_ident())
+        if shard is None:
+            shard = self._new_shard()
+        shard[bisect_left(self.buckets, seconds)] += 1
+        shard[-1] += seconds
+
+    def _new_shard(self) -> List[float]:
+        shard = [0] * (len(self.buckets) + 1) + [0.0]
+        with self._shards_lock:
+            # Thread idents can be recycled; a new thread simply continues
+            # the dead thread's shard, which still has a single writer.
+            return self._shards.setdefault(threading.get_ident(), shard)
+
+    def snapshot(self) -> dict:
+        """Return bucket counts (non-cumulative, last entry is +Inf), count and sum."""
+        with self._shards_lock:
+            shards = list(self._shards.values())
+        counts = [0] * (len(self.buckets) + 1)
+        total_sum = 0.0
+        for shard in shards:
+            values = list(shard)
+            for i in range(len(counts)):
+                counts[i] += int(values[i])
+            total_sum += values[-1]
+        return {
+            "buckets": list(self.buckets),
+            "counts": counts,
+            "count": sum(counts),
+            "sum": total_sum,
+        }
+
+    def reset(self) -> None:
+        with self._shards_lock:
+            self._shards.clear()
+
+
+class LatencyRegistry:
+    """Collection of per-stage latency histograms."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, stage: str) -> LatencyHistogram:
+        histogram = self._histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.get(stage)
+                if histogram is None:
+                    histogram = LatencyHistogram(stage, self.buckets)
+                    self._histograms[stage] = histogram
+        return histogram
+
+    def observe(self, stage: str, seconds: float) -> None:
+        self.histogram(stage).observe(seconds)
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            histograms = list(self._histograms.items())
+        return {stage: histogram.snapshot() for stage, histogram in histograms}
+
+    def reset(self) -> None:
+        """Zero every histogram; references held by hot loops stay valid."""
+        with self._lock:
+            histograms = list(self._histograms.values())
+        for histogram in histograms:
+            histogram.reset()
+
+
+_registry = LatencyRegistry()
+
+
+def get_latency_registry() -> LatencyRegistry:
+    """Return the process-wide latency registry."""
+    return _registry
+
+
+def observe_latency(stage: str, seconds: float) -> None:
+    """Record ``seconds`` against ``stage`` in the process-wide registry."""
+    _registry.observe(stage, seconds)
+
+
+def timed(stage: str) -> Callable[[F], F]:
+    """Decorator recording each call's wall time (including failures) against ``stage``."""
+
+    def decorator(func: F) -> F:
+        histogram = _registry.histogram(stage)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def merge_snapshots(snapshots: Iterable[Optional[Mapping[str, dict]]]) -> Dict[str, dict]:
+    """Sum registry snapshots from several processes into one.
+
+    Stages whose bucket layouts disagree are kept from the first snapshot that
+    reported them; the others are logged and skipped rather than mis-added.
+    """
+    merged: Dict[str, dict] = {}
+    for snapshot in snapshots:
+        for stage, data in (snapshot or {}).items():
+            existing = merged.get(stage)
+            if existing is None:
+                merged[stage] = {
+                    "buckets": list(data["buckets"]),
+                    "counts": list(data["counts"]),
+                    "count": data["count"],
+                    "sum": data["sum"],
+                }
+                continue
+            if existing["buckets"] != list(data["buckets"]):
+                logger.warning("Skipping latency snapshot for %s: bucket layout mismatch", stage)
+                continue
+            existing["counts"] = [a + b for a, b in zip(existing["counts"], data["counts"])]
+            existing["count"] += data["count"]
+            existing["sum"] += data["sum"]
+    return merged
+
+
+def _format_bound(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value))
+
+
+def render_prometheus(snapshot: Mapping[str, dict], metric_name: str = METRIC_NAME) -> str:
+    """Render a registry snapshot in the Prometheus text exposition format."""
+    lines = [
+        f"# HELP {metric_name} {METRIC_HELP}",
+        f"# TYPE {metric_name} histogram",
+    ]
+    for stage in sorted(snapshot):
+        data = snapshot[stage]
+        label = stage.replace("\\", "\\\\").replace('"', '\\"')
+        cumulative = 0
+        for bound, count in zip(list(data["buckets"]) + [math.inf], data["counts"]):
+            cumulative += count
+            lines.append(
+                f'{metric_name}_bucket{{stage="{label}",le="{_format_bound(bound)}"}} {cumulative}'
+            )
+        lines.append(f'{metric_name}_sum{{stage="{label}"}} {data["sum"]!r}')
+        lines.append(f'{metric_name}_count{{stage="{label}"}} {data["count"]}')
+    return "\n".join(lines) + "\n"
+
+
+__all__ = [
+    "DEFAULT_BUCKETS",
+    "LatencyHistogram",
+    "LatencyRegistry",
+    "PIPELINE_STAGES",
+    "STAGE_AUDIO_COMMAND",
+    "STAGE_CAPTURE_READ",
+    "STAGE_DECODE",
+    "STAGE_EMIT_ALERT",
+    "STAGE_END_TO_END",
+    "STAGE_FIPS_FILTER",
+    "STAGE_PERSIST_RECEIVED_ALERT",
+    "STAGE_PLAYOUT_START",
+    "STAGE_RESAMPLE",
+    "STAGE_STORE_RECEIVED_ALERT",
+    "get_latency_registry",
+    "merge_snapshots",
+    "observe_latency",
+    "render_prometheus",
+    "timed",
+]
@@ -58,11 +58,28 @@ class AudioAlert:
 
 
 class AudioMeter:
-    """Real-time audio level meter with peak and RMS monitoring."""
+    """Real-time audio level meter with peak, RMS, clip and ballistic monitoring.
 
-    def __init__(self, window_size: int = 1024, peak_hold_time: float = 2.0):
+    All per-chunk work is done with NumPy block operations; state (circular RMS
+    window, peak hold, clip totals and ballistic level) carries across chunks so
+    readings do not depend on how the audio was split.
+    """
+
+    def __init__(
+        self,
+        window_size: int = 1024,
+        peak_hold_time: float = 2.0,
+        sample_rate: int = 48000,
+        attack_time: float = 0.01,
+        release_time: float = 0.3,
+        clip_threshold: float = 0.99,
+    ):
         self.window_size = window_size
         self.peak_hold_time = peak_hold_time
+        self.sample_rate = sample_rate
+        self.attack_time = attack_time
+        self.release_time = release_time
+        self.clip_threshold = clip_threshold
         
         # Audio buffers
         self._buffer = np.zeros(window_size, dtype=np.float32)
@@ -75,29 +92,62 @@ class AudioMeter:
         # RMS calculation
         self._rms_sum = 0.0
         self._rms_count = 0
+
+        # Clip counting and ballistic (attack/release smoothed) RMS level
+        self._clips_total = 0
+        self._ballistic_level = 0.0
         
         self._lock = threading.Lock()
 
+    def _write_buffer(self, samples: np.ndarray) -> None:
+        """Append samples to the circular RMS window in at most two slice copies."""
+        count = len(samples)
+        if count >= self.window_size:
+            # Only the newest window_size samples survive; keep their ring positions
+            start = (self._buffer_pos + count - self.window_size) % self.window_size
+            tail = samples[-self.window_size:]
+            self._buffer[start:] = tail[:self.window_size - start]
+            self._buffer[:start] = tail[self.window_size - start:]
+        else:
+            first = min(count, self.window_size - self._buffer_pos)
+            self._buffer[self._buffer_pos:self._buffer_pos + first] = samples[:first]
+            self._buffer[:count - first] = samples[first:]
+        self._buffer_pos = (self._buffer_pos + count) % self.window_size
+
+    def _update_ballistics(self, block_rms: float, block_len: int) -> None:
+        """Move the ballistic level toward this block's RMS with attack/release time constants."""
+        time_constant = self.attack_time if block_rms > self._ballistic_level else self.release_time
+        if time_constant <= 0:
+            self._ballistic_level = block_rms
+            return
+        coeff = 1.0 - np.exp(-block_len / (time_constant * self.sample_rate))
+        self._ballistic_level += coeff * (block_rms - self._ballistic_level)
+
     def process_samples(self, samples: np.ndarray) -> Dict[str, float]:
         """Process new audio samples and return meter readings."""
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1)
         with self._lock:
             metrics = {}
-            
-            # Update buffer and calculate peak
             current_time = time.time()
-            peak_updated = False
-            
-            for sample in samples:
-                # Update circular buffer
-                self._buffer[self._buffer_pos] = sample
-                self._buffer_pos = (self._buffer_pos + 1) % self.window_size
-                
+
+            if len(samples):
+                abs_samples = np.abs(samples)
+                instant_peak = abs_samples.max()
+                clip_count = int(np.count_nonzero(abs_samples >= self.clip_threshold))
+                block_rms = float(np.sqrt(np.mean(np.square(samples, dtype=np.float64))))
+
+                self._write_buffer(samples)
+
                 # Track peak
-                abs_sample = abs(sample)
-                if abs_sample > self._current_peak:
-                    self._current_peak = abs_sample
+                if instant_peak > self._current_peak:
+                    self._current_peak = instant_peak
                     self._peak_hold_start = current_time
-                    peak_updated = True
+
+                self._clips_total += clip_count
+                self._update_ballistics(block_rms, len(samples))
+            else:
+                instant_peak = 0.0
+                clip_count = 0
             
             # Release peak hold if expired
             if current_time - self._peak_hold_start > self.peak_hold_time:
@@ -108,15 +158,15 @@ class AudioMeter:
             # Calculate RMS from buffer
             rms = np.sqrt(np.mean(self._buffer ** 2))
             
-            # Calculate current peak from latest samples
-            instant_peak = np.max(np.abs(samples))
-            
             # Convert to dBFS
             metrics['peak_dbfs'] = 20 * np.log10(max(self._current_peak, 1e-10))
             metrics['rms_dbfs'] = 20 * np.log10(max(rms, 1e-10))
             metrics['instant_peak_dbfs'] = 20 * np.log10(max(instant_peak, 1e-10))
             metrics['peak_linear'] = self._current_peak
             metrics['rms_linear'] = rms
+            metrics['ballistic_rms_dbfs'] = 20 * np.log10(max(self._ballistic_level, 1e-10))
+            metrics['clip_count'] = clip_count
+            metrics['clips_total'] = self._clips_total
             
             return metrics
 
@@ -130,7 +180,9 @@ class AudioMeter:
                 'peak_dbfs': 20 * np.log10(max(self._current_peak, 1e-10)),
                 'rms_dbfs': 20 * np.log10(max(rms, 1e-10)),
                 'peak_linear': self._current_peak,
-                'rms_linear': rms
+                'rms_linear': rms,
+                'ballistic_rms_dbfs': 20 * np.log10(max(self._ballistic_level, 1e-10)),
+                'clips_total': self._clips_total,
             }
 
     def reset(self) -> None:
@@ -142,6 +194,8 @@ class AudioMeter:
             self._peak_hold_start = 0.0
             self._rms_sum = 0.0
             self._rms_count = 0
+            self._clips_total = 0
+            self._ballistic_level = 0.0
 
 
 class SilenceDetector:
@@ -310,11 +364,16 @@ class SilenceDetector:
 class AudioHealthMonitor:
     """Comprehensive audio health monitoring with multiple detectors."""
 
-    def __init__(self, source_name: str):
+    def __init__(self, source_name: str, sample_rate: int = 48000):
+        """
+        Args:
+            source_name: Audio source being monitored
+            sample_rate: Sample rate of that source, which sets the meter ballistics
+        """
         self.source_name = source_name
         
         # Components
-        self.meter = AudioMeter()
+        self.meter = AudioMeter(sample_rate=sample_rate)
         self.silence_detector = SilenceDetector()
         
         # Clipping detection
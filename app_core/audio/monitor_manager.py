@@ -241,7 +241,10 @@ def get_combined_metrics() -> dict:
 
                         # Include VU meter metrics if available
                         if hasattr(source, 'metrics') and source.metrics:
-                            metrics_obj = source.metrics
+                            if hasattr(source, 'get_metrics_snapshot'):
+                                metrics_obj = source.get_metrics_snapshot()
+                            else:
+                                metrics_obj = source.metrics
                             source_stats.update({
                                 "peak_level_db": float(metrics_obj.peak_level_db) if metrics_obj.peak_level_db is not None else -120.0,
                                 "rms_level_db": float(metrics_obj.rms_level_db) if metrics_obj.rms_level_db is not None else -120.0,
@@ -39,6 +39,7 @@ from typing import Any, Callable, Dict, List, Optional, Sequence
 
 from app_utils.gpio import GPIOActivationType, GPIOBehaviorManager, GPIOController
 
+from .latency_metrics import STAGE_PLAYOUT_START, observe_latency
 from .playout_queue import AudioPlayoutQueue, PlayoutItem
 
 
@@ -312,6 +313,10 @@ class AudioOutputService:
                     manager_handled = False
                     gpio_activated = False
 
+            enqueued_at = item.metadata.get('enqueued_monotonic')
+            if enqueued_at is not None:
+                observe_latency(STAGE_PLAYOUT_START, time.monotonic() - enqueued_at)
+
             # Play main audio file
             if item.audio_path:
                 play_success = self._play_audio_file(item.audio_path)
@@ -38,6 +38,7 @@ Within each precedence level, alerts are prioritized by:
 import heapq
 import logging
 import threading
+import time
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from enum import IntEnum
@@ -337,6 +338,8 @@ class AudioPlayoutQueue:
             True if the item should interrupt current playback, False otherwise
         """
         with self._lock:
+            # Monotonic enqueue time for playout-start latency; kept across re-queues
+            item.metadata.setdefault('enqueued_monotonic', time.monotonic())
             heapq.heappush(self._queue, item)
 
             self.logger.info(
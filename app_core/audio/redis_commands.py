@@ -18,13 +18,26 @@ Repository: https://github.com/KR8MER/eas-station
 """
 
 """
-Redis Pub/Sub command channel for audio service communication.
+Redis Streams command channel for audio service communication.
 
-This module provides inter-container communication between the app container
-and audio-service container using Redis Pub/Sub.
+This module provides request/response communication between the app
+container and the audio-service container.
 
 Architecture:
-    app container → Redis Pub/Sub → audio-service container
+    app container → XADD eas:audio:commands:stream → audio-service (consumer group)
+    audio-service → LPUSH eas:audio:reply:<command_id> → app container (BLPOP)
+
+Commands are durable: they stay in the stream until the audio-service
+acknowledges them, so commands sent while it restarts run once it is back
+(unless older than ``COMMAND_TIMEOUT``).  Entries left pending by a consumer
+that died (e.g. a container recreated under a new hostname) are taken over
+with XAUTOCLAIM once idle for ``PENDING_CLAIM_MIN_IDLE_MS``; a consumer
+re-claims the entry it is running every ``PENDING_HEARTBEAT_INTERVAL`` so a
+slow command is never taken over and run twice.  Each command carries a
+correlation ID; the publisher blocks on that ID's reply list for at most
+``COMMAND_REPLY_TIMEOUT`` seconds (web request handlers pass the shorter
+``REQUEST_REPLY_TIMEOUT`` and poll ``get_reply()`` afterwards) and returns the
+real result from ``AudioCommandSubscriber._execute_command``.
 
 Commands:
     - source_start: Start an audio source
@@ -41,10 +54,15 @@ Commands:
 import json
 import logging
 import os
+import socket
+import threading
 import time
-from typing import Any, Callable, Dict, Optional
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import redis
+from app_core.audio.latency_metrics import STAGE_AUDIO_COMMAND, observe_latency
 from app_core.redis_client import get_redis_client, redis_operation
 
 logger = logging.getLogger(__name__)
@@ -53,25 +71,48 @@ logger = logging.getLogger(__name__)
 REDIS_HOST = os.getenv("REDIS_HOST", "redis")
 REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
 
-# Channel names
-AUDIO_COMMAND_CHANNEL = 'eas:audio:commands'
-AUDIO_RESPONSE_CHANNEL = 'eas:audio:responses'
+# Stream, consumer group and reply key names
+AUDIO_COMMAND_STREAM = 'eas:audio:commands:stream'
+AUDIO_COMMAND_GROUP = 'audio-service'
+AUDIO_REPLY_KEY_PREFIX = 'eas:audio:reply:'
+AUDIO_COMMAND_STREAM_MAXLEN = 1000
 
-# Command timeout (seconds)
+# Commands older than this are acknowledged without running (seconds)
 COMMAND_TIMEOUT = 30
+# How long a publisher waits for the audio-service reply (seconds)
+COMMAND_REPLY_TIMEOUT = 10.0
+# How long a web request waits before answering that the command is still queued (seconds)
+REQUEST_REPLY_TIMEOUT = 2.0
+# Replies nobody collected expire after this (seconds)
+REPLY_TTL_SECONDS = 60
+# Entries pending this long on another consumer are presumed abandoned (milliseconds);
+# well below COMMAND_TIMEOUT so a dead consumer's commands still run, or expire, promptly
+PENDING_CLAIM_MIN_IDLE_MS = 15000
+# A running command's entry is re-claimed this often, keeping its idle time near zero (seconds)
+PENDING_HEARTBEAT_INTERVAL = PENDING_CLAIM_MIN_IDLE_MS / 3000.0
+# How often a running subscriber sweeps the group for abandoned entries (seconds)
+PENDING_CLAIM_INTERVAL = 10.0
+
+# Blocking reads stay below the client's 5 s socket timeout
+_BLOCK_SLICE_SECONDS = 2.0
+
+
+def reply_key(command_id: str) -> str:
+    """Redis list the audio-service pushes the reply for ``command_id`` onto."""
+    return f"{AUDIO_REPLY_KEY_PREFIX}{command_id}"
 
 
 class AudioCommandPublisher:
     """
-    Publishes audio control commands to Redis for audio-service to execute.
+    Sends audio control commands to the audio-service and waits for the result.
 
     Used by app container to send commands to audio-service container.
     """
 
-    def __init__(self):
+    def __init__(self, redis_client: Optional[redis.Redis] = None):
         """Initialize Redis connection for publishing commands with retry logic."""
         try:
-            self.redis_client = get_redis_client(max_retries=5)
+            self.redis_client = redis_client or get_redis_client(max_retries=5)
             logger.info("✅ AudioCommandPublisher connected to Redis")
         except Exception as e:
             logger.error(f"❌ Failed to connect AudioCommandPublisher to Redis: {e}")
@@ -86,84 +127,133 @@ class AudioCommandPublisher:
             logger.error(f"Failed to connect to Redis: {e}")
             raise
 
-    def _publish_command(self, command: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    def _publish_command(
+        self,
+        command: str,
+        params: Dict[str, Any],
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
         """
-        Publish a command and wait for response.
+        Queue a command and wait for the audio-service reply.
 
         Args:
             command: Command name (e.g., 'source_start')
             params: Command parameters
+            timeout: Seconds to wait for the reply (default COMMAND_REPLY_TIMEOUT)
 
         Returns:
-            Response dict with 'success', 'message', and optional 'data'
+            Response dict with 'success', 'message', 'command_id' and
+            'latency_ms'; 'timed_out' is set when no reply arrived in time
+            (the command stays queued until COMMAND_TIMEOUT).
         """
-        command_id = f"{command}_{int(time.time() * 1000)}"
+        command_id = uuid.uuid4().hex
+        timeout = COMMAND_REPLY_TIMEOUT if timeout is None else timeout
+        started = time.monotonic()
+        now = time.time()
 
         message = {
             'command_id': command_id,
             'command': command,
-            'params': params,
-            'timestamp': time.time()
+            'params': json.dumps(params),
+            'reply_to': reply_key(command_id),
+            'timestamp': repr(now),
+            'expires_at': repr(now + COMMAND_TIMEOUT),
         }
 
         try:
-            # Publish command
-            self.redis_client.publish(AUDIO_COMMAND_CHANNEL, json.dumps(message))
-            logger.info(f"Published command: {command} (id: {command_id})")
-
-            # For now, return success immediately
-            # TODO: Implement response waiting mechanism if needed
+            self.redis_client.xadd(
+                AUDIO_COMMAND_STREAM,
+                message,
+                maxlen=AUDIO_COMMAND_STREAM_MAXLEN,
+                approximate=True,
+            )
+            logger.info(f"Queued command: {command} (id: {command_id})")
+            reply = self._wait_for_reply(command_id, started + timeout)
+        except Exception as e:
+            logger.error(f"Failed to send command {command}: {e}")
             return {
-                'success': True,
-                'message': f'Command {command} sent to audio-service',
-                'command_id': command_id
+                'success': False,
+                'message': f'Failed to send command: {str(e)}',
+                'command_id': command_id,
             }
 
-        except Exception as e:
-            logger.error(f"Failed to publish command {command}: {e}")
+        elapsed = time.monotonic() - started
+        if reply is None:
+            logger.warning(f"No reply to {command} (id: {command_id}) within {timeout:.1f}s")
             return {
                 'success': False,
-                'message': f'Failed to send command: {str(e)}'
+                'timed_out': True,
+                'message': f'audio-service did not reply to {command} within {timeout:.1f}s',
+                'command_id': command_id,
+                'latency_ms': round(elapsed * 1000.0, 3),
             }
 
-    def start_source(self, source_name: str) -> Dict[str, Any]:
+        observe_latency(STAGE_AUDIO_COMMAND, elapsed)
+        reply['command_id'] = command_id
+        reply['latency_ms'] = round(elapsed * 1000.0, 3)
+        return reply
+
+    def _wait_for_reply(self, command_id: str, deadline: float) -> Optional[Dict[str, Any]]:
+        """Block on the reply list until ``deadline`` (monotonic seconds)."""
+        key = reply_key(command_id)
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            # BLPOP takes whole or fractional seconds; 0 would block forever
+            popped = self.redis_client.blpop([key], timeout=max(0.01, min(remaining, _BLOCK_SLICE_SECONDS)))
+            if popped:
+                _, payload = popped
+                return json.loads(payload)
+
+    def get_reply(self, command_id: str) -> Optional[Dict[str, Any]]:
+        """Reply to a command whose wait timed out, or None while it is still queued.
+
+        The reply is left in place (until ``REPLY_TTL_SECONDS``) so it can be polled again.
+        """
+        payload = self.redis_client.lindex(reply_key(command_id), 0)
+        return json.loads(payload) if payload else None
+
+    def start_source(self, source_name: str, timeout: Optional[float] = None) -> Dict[str, Any]:
         """Start an audio source."""
-        return self._publish_command('source_start', {'source_name': source_name})
+        return self._publish_command('source_start', {'source_name': source_name}, timeout)
 
-    def stop_source(self, source_name: str) -> Dict[str, Any]:
+    def stop_source(self, source_name: str, timeout: Optional[float] = None) -> Dict[str, Any]:
         """Stop an audio source."""
-        return self._publish_command('source_stop', {'source_name': source_name})
+        return self._publish_command('source_stop', {'source_name': source_name}, timeout)
 
-    def add_source(self, source_config: Dict[str, Any]) -> Dict[str, Any]:
+    def add_source(self, source_config: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
         """Add a new audio source."""
-        return self._publish_command('source_add', {'config': source_config})
+        return self._publish_command('source_add', {'config': source_config}, timeout)
 
-    def update_source(self, source_name: str, updates: Dict[str, Any]) -> Dict[str, Any]:
+    def update_source(
+        self, source_name: str, updates: Dict[str, Any], timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
         """Update audio source configuration."""
         return self._publish_command('source_update', {
             'source_name': source_name,
             'updates': updates
-        })
+        }, timeout)
 
-    def delete_source(self, source_name: str) -> Dict[str, Any]:
+    def delete_source(self, source_name: str, timeout: Optional[float] = None) -> Dict[str, Any]:
         """Delete an audio source."""
-        return self._publish_command('source_delete', {'source_name': source_name})
+        return self._publish_command('source_delete', {'source_name': source_name}, timeout)
 
-    def start_streaming(self) -> Dict[str, Any]:
+    def start_streaming(self, timeout: Optional[float] = None) -> Dict[str, Any]:
         """Start auto-streaming service."""
-        return self._publish_command('streaming_start', {})
+        return self._publish_command('streaming_start', {}, timeout)
 
-    def stop_streaming(self) -> Dict[str, Any]:
+    def stop_streaming(self, timeout: Optional[float] = None) -> Dict[str, Any]:
         """Stop auto-streaming service."""
-        return self._publish_command('streaming_stop', {})
+        return self._publish_command('streaming_stop', {}, timeout)
 
-    def start_eas_monitor(self) -> Dict[str, Any]:
+    def start_eas_monitor(self, timeout: Optional[float] = None) -> Dict[str, Any]:
         """Start EAS monitor in audio-service."""
-        return self._publish_command('eas_monitor_start', {})
+        return self._publish_command('eas_monitor_start', {}, timeout)
 
-    def stop_eas_monitor(self) -> Dict[str, Any]:
+    def stop_eas_monitor(self, timeout: Optional[float] = None) -> Dict[str, Any]:
         """Stop EAS monitor in audio-service."""
-        return self._publish_command('eas_monitor_stop', {})
+        return self._publish_command('eas_monitor_stop', {}, timeout)
 
 
 class AudioCommandSubscriber:
@@ -173,7 +263,14 @@ class AudioCommandSubscriber:
     Used by audio-service container to receive and execute commands from app.
     """
 
-    def __init__(self, audio_controller, auto_streaming_service=None, eas_monitor=None):
+    def __init__(
+        self,
+        audio_controller,
+        auto_streaming_service=None,
+        eas_monitor=None,
+        redis_client: Optional[redis.Redis] = None,
+        consumer_name: Optional[str] = None,
+    ):
         """
         Initialize Redis subscriber with retry logic.
 
@@ -181,13 +278,17 @@ class AudioCommandSubscriber:
             audio_controller: AudioIngestController instance to execute commands on
             auto_streaming_service: Optional AutoStreamingService for Icecast streaming
             eas_monitor: Optional ContinuousEASMonitor for EAS monitoring control
+            redis_client: Optional Redis client (defaults to the shared client)
+            consumer_name: Consumer name within the group (defaults to
+                AUDIO_COMMAND_CONSUMER or the hostname); entries pending on
+                consumers that no longer run are claimed by XAUTOCLAIM
         """
         self.audio_controller = audio_controller
         self.auto_streaming_service = auto_streaming_service
         self.eas_monitor = eas_monitor
+        self.consumer_name = consumer_name or os.getenv('AUDIO_COMMAND_CONSUMER') or socket.gethostname()
         try:
-            self.redis_client = get_redis_client(max_retries=5)
-            self.pubsub = self.redis_client.pubsub()
+            self.redis_client = redis_client or get_redis_client(max_retries=5)
             self.running = False
             logger.info("✅ AudioCommandSubscriber connected to Redis")
         except Exception as e:
@@ -204,28 +305,65 @@ class AudioCommandSubscriber:
             logger.error(f"Failed to connect to Redis: {e}")
             raise
 
-    def _handle_command(self, message_data: str):
+    def _handle_command(self, entry_id: str, fields: Dict[str, str]) -> None:
         """
-        Handle incoming command message.
+        Execute one stream entry, push its reply and acknowledge it.
 
         Args:
-            message_data: JSON string with command data
+            entry_id: Stream entry ID
+            fields: Entry fields written by AudioCommandPublisher
         """
+        command = fields.get('command', '')
+        command_id = fields.get('command_id', entry_id)
         try:
-            message = json.loads(message_data)
-            command = message['command']
-            params = message['params']
-            command_id = message['command_id']
-
-            logger.info(f"Received command: {command} (id: {command_id})")
-
-            # Execute command
-            result = self._execute_command(command, params)
-
-            logger.info(f"Command {command} completed: {result}")
+            params = json.loads(fields.get('params') or '{}')
+            expires_at = float(fields.get('expires_at') or 'inf')
 
+            if time.time() > expires_at:
+                logger.warning(f"Skipping expired command: {command} (id: {command_id})")
+                result = {'success': False, 'message': f'Command {command} expired before it was run'}
+            else:
+                logger.info(f"Received command: {command} (id: {command_id})")
+                with self._keep_claimed(entry_id):
+                    result = self._execute_command(command, params)
+                logger.info(f"Command {command} completed: {result}")
         except Exception as e:
             logger.error(f"Error handling command: {e}", exc_info=True)
+            result = {'success': False, 'message': str(e)}
+
+        reply_to = fields.get('reply_to')
+        if reply_to:
+            self.redis_client.lpush(reply_to, json.dumps(result, default=str))
+            self.redis_client.expire(reply_to, REPLY_TTL_SECONDS)
+        # Acknowledge last: a crash before this point redelivers the command
+        self.redis_client.xack(AUDIO_COMMAND_STREAM, AUDIO_COMMAND_GROUP, entry_id)
+
+    @contextmanager
+    def _keep_claimed(self, entry_id: str) -> Iterator[None]:
+        """Reset ``entry_id``'s idle time while it runs so other consumers never XAUTOCLAIM it."""
+        done = threading.Event()
+
+        def heartbeat() -> None:
+            while not done.wait(PENDING_HEARTBEAT_INTERVAL):
+                try:
+                    self.redis_client.xclaim(
+                        AUDIO_COMMAND_STREAM,
+                        AUDIO_COMMAND_GROUP,
+                        self.consumer_name,
+                        0,
+                        [entry_id],
+                        justid=True,
+                    )
+                except redis.RedisError as e:
+                    logger.warning(f"Could not refresh claim on command {entry_id}: {e}")
+
+        thread = threading.Thread(target=heartbeat, name=f"audio-command-claim-{entry_id}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            done.set()
+            thread.join()
 
     def _execute_command(self, command: str, params: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -362,25 +500,118 @@ class AudioCommandSubscriber:
             logger.error(f"Error executing command {command}: {e}", exc_info=True)
             return {'success': False, 'message': str(e)}
 
-    def start(self):
-        """Start listening for commands."""
-        self.pubsub.subscribe(AUDIO_COMMAND_CHANNEL)
-        self.running = True
-
-        logger.info(f"AudioCommandSubscriber listening on channel: {AUDIO_COMMAND_CHANNEL}")
-
-        for message in self.pubsub.listen():
-            if not self.running:
+    def _ensure_group(self) -> None:
+        """Create the consumer group (and stream) if they do not exist yet."""
+        try:
+            self.redis_client.xgroup_create(AUDIO_COMMAND_STREAM, AUDIO_COMMAND_GROUP, id='0', mkstream=True)
+        except redis.ResponseError as e:
+            if 'BUSYGROUP' not in str(e):
+                raise
+
+    def _read_entries(self, stream_id: str, block_ms: Optional[int]) -> List[Tuple[str, Dict[str, str]]]:
+        """Read entries for this consumer: '0' = own pending entries, '>' = new ones."""
+        response = self.redis_client.xreadgroup(
+            AUDIO_COMMAND_GROUP,
+            self.consumer_name,
+            {AUDIO_COMMAND_STREAM: stream_id},
+            count=10,
+            block=block_ms,
+        )
+        entries: List[Tuple[str, Dict[str, str]]] = []
+        for _stream, stream_entries in response or []:
+            entries.extend(stream_entries)
+        return entries
+
+    def poll_once(self, block_ms: Optional[int] = 1000) -> int:
+        """Process commands that are ready (blocking up to ``block_ms``); return how many ran."""
+        entries = self._read_entries('>', block_ms)
+        for entry_id, fields in entries:
+            self._handle_command(entry_id, fields)
+        return len(entries)
+
+    def _run_recovered(self, entries: List[Tuple[Optional[str], Optional[Dict[str, str]]]]) -> int:
+        """Run recovered pending entries; return how many commands ran."""
+        ran = 0
+        for entry_id, fields in entries:
+            if entry_id is None:
+                continue
+            if fields:
+                self._handle_command(entry_id, fields)
+                ran += 1
+            else:
+                # Trimmed from the stream while pending; nothing left to run
+                self.redis_client.xack(AUDIO_COMMAND_STREAM, AUDIO_COMMAND_GROUP, entry_id)
+        return ran
+
+    def _claim_abandoned(self, min_idle_ms: Optional[int] = None) -> int:
+        """Take over and run entries left pending on any consumer for ``min_idle_ms``."""
+        min_idle_ms = PENDING_CLAIM_MIN_IDLE_MS if min_idle_ms is None else min_idle_ms
+        claimed = 0
+        start_id = '0-0'
+        while True:
+            response = self.redis_client.xautoclaim(
+                AUDIO_COMMAND_STREAM,
+                AUDIO_COMMAND_GROUP,
+                self.consumer_name,
+                min_idle_ms,
+                start_id=start_id,
+                count=10,
+            )
+            # [next start, claimed entries] (Redis 7 appends the IDs it dropped as deleted)
+            start_id, entries = response[0], response[1]
+            claimed += self._run_recovered(entries)
+            if start_id in ('0-0', b'0-0'):
+                return claimed
+
+    def _recover_pending(self) -> int:
+        """Run commands delivered to this consumer, or abandoned by another, but never acknowledged."""
+        recovered = 0
+        while True:
+            # History reads return each entry at most once per call; acked entries drop out
+            entries = self._read_entries('0', None)
+            if not entries:
                 break
+            recovered += self._run_recovered(entries)
+        return recovered + self._claim_abandoned()
 
-            if message['type'] == 'message':
-                self._handle_command(message['data'])
+    def start(self):
+        """Start consuming commands (blocks until stop() is called)."""
+        self.running = True
+        logger.info(
+            f"AudioCommandSubscriber consuming {AUDIO_COMMAND_STREAM} "
+            f"as {AUDIO_COMMAND_GROUP}/{self.consumer_name}"
+        )
+
+        recovered = False
+        last_claim = time.monotonic()
+        while self.running:
+            try:
+                if not recovered:
+                    self._ensure_group()
+                    count = self._recover_pending()
+                    if count:
+                        logger.info(f"Recovered {count} unacknowledged command(s)")
+                    recovered = True
+                    last_claim = time.monotonic()
+                elif time.monotonic() - last_claim >= PENDING_CLAIM_INTERVAL:
+                    count = self._claim_abandoned()
+                    if count:
+                        logger.info(f"Claimed {count} command(s) abandoned by another consumer")
+                    last_claim = time.monotonic()
+                self.poll_once()
+            except redis.ConnectionError as e:
+                # Redis restarted; the group may need recreating once it is back
+                logger.warning(f"Command stream unavailable: {e}")
+                recovered = False
+                time.sleep(1.0)
+            except redis.ResponseError as e:
+                if 'NOGROUP' not in str(e):
+                    raise
+                recovered = False
 
     def stop(self):
-        """Stop listening for commands."""
+        """Stop consuming commands; the loop exits within one block interval."""
         self.running = False
-        self.pubsub.unsubscribe(AUDIO_COMMAND_CHANNEL)
-        self.pubsub.close()
         logger.info("AudioCommandSubscriber stopped")
 
 
@@ -33,6 +33,15 @@ Key Features:
 - Health monitoring for all sources
 - Seamless audio handoff between sources
 - Integration with EAS decoder
+
+Hot standby: every enabled source keeps capturing while it is not active.
+The mixer drains all of them every 10 ms frame into per-source history
+lanes, estimates each standby's sample offset against the active source by
+cross-correlation, and fails over inside the mixer itself when the active
+source underruns (no data for ``failover_timeout_ms``) or drops to silence
+while an aligned standby is still carrying audio.  The switch continues the
+decoder's input from the standby at the exact sample where the active source
+stopped, so no audio is lost or repeated.
 """
 
 import logging
@@ -40,7 +49,7 @@ import threading
 import time
 from dataclasses import dataclass
 from enum import Enum
-from typing import Dict, List, Optional, Callable
+from typing import Dict, List, Optional, Callable, Tuple
 
 import numpy as np
 
@@ -54,6 +63,7 @@ class FailoverReason(Enum):
     """Reason for source failover."""
     SOURCE_FAILED = "source_failed"
     SILENCE_DETECTED = "silence_detected"
+    UNDERRUN = "underrun"
     MANUAL = "manual"
     PRIORITY_CHANGE = "priority_change"
 
@@ -78,6 +88,74 @@ class FailoverEvent:
     from_source: Optional[str]
     to_source: str
     description: str
+    # Hot-standby switches: time from the first missing/silent sample to the
+    # switch, and samples skipped at the splice (0 = sample-accurate, None = unaligned)
+    detection_ms: Optional[float] = None
+    gap_samples: Optional[int] = None
+
+
+class _SourceLane:
+    """Recent audio history of one source, addressed by absolute sample index."""
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, int(capacity))
+        self._buffer = np.zeros(self.capacity, dtype=np.float32)
+        self.received = 0  # absolute index of the next sample to arrive
+        self.last_arrival = 0.0  # monotonic time of the last data
+        self.fresh_since = 0.0  # start of the current run without underruns
+
+    @property
+    def oldest(self) -> int:
+        return max(0, self.received - self.capacity)
+
+    def append(self, samples: np.ndarray, now: float, gap_timeout: float) -> None:
+        samples = samples[-self.capacity:]
+        count = len(samples)
+        start = self.received % self.capacity
+        first = min(count, self.capacity - start)
+        self._buffer[start:start + first] = samples[:first]
+        self._buffer[:count - first] = samples[first:]
+        self.received += count
+        if not self.last_arrival or now - self.last_arrival > gap_timeout:
+            self.fresh_since = now
+        self.last_arrival = now
+
+    def read(self, start: int, end: int) -> np.ndarray:
+        """Copy of samples ``[start, end)``; both must lie inside the history."""
+        count = end - start
+        offset = start % self.capacity
+        first = min(count, self.capacity - offset)
+        if first == count:
+            return self._buffer[offset:offset + count].copy()
+        return np.concatenate((self._buffer[offset:], self._buffer[:count - first]))
+
+    def latest(self, count: int) -> Optional[np.ndarray]:
+        count = min(count, self.received - self.oldest)
+        if count <= 0:
+            return None
+        return self.read(self.received - count, self.received)
+
+
+# Sentinel from _dropout_standby: hold output until a trailing standby catches up
+_AWAIT_STANDBY = object()
+
+
+def _rms_db(samples: np.ndarray) -> float:
+    rms = float(np.sqrt(np.mean(np.square(samples, dtype=np.float64))))
+    return 20 * np.log10(max(rms, 1e-10))
+
+
+def _estimate_offset(template: np.ndarray, history: np.ndarray) -> Tuple[int, float]:
+    """Position of ``template`` inside ``history`` and its normalised correlation."""
+    width = len(template)
+    size = 1 << (len(history) + width - 1).bit_length()
+    spectrum = np.fft.rfft(history, size) * np.conj(np.fft.rfft(template, size))
+    correlation = np.fft.irfft(spectrum, size)[:len(history) - width + 1]
+    energy = np.concatenate(([0.0], np.cumsum(np.square(history, dtype=np.float64))))
+    window_norm = np.sqrt(np.maximum(energy[width:] - energy[:-width], 0.0))
+    score = correlation / (window_norm * np.linalg.norm(template) + 1e-12)
+    position = int(np.argmax(score))
+    return position, float(score[position])
 
 
 class AudioSourceManager:
@@ -93,7 +171,13 @@ class AudioSourceManager:
         self,
         sample_rate: int = 44100,  # Native sample rate for audio sources/streams
         master_buffer_seconds: float = 5.0,
-        failover_callback: Optional[Callable[[FailoverEvent], None]] = None
+        failover_callback: Optional[Callable[[FailoverEvent], None]] = None,
+        failover_timeout_ms: float = 80.0,
+        frame_ms: float = 10.0,
+        dropout_frames: int = 3,
+        history_seconds: float = 2.0,
+        max_alignment_seconds: float = 0.5,
+        failback_hold_seconds: float = 5.0,
     ):
         """
         Initialize source manager.
@@ -102,6 +186,14 @@ class AudioSourceManager:
             sample_rate: Global sample rate for all sources (native rate for streams)
             master_buffer_seconds: Size of master output buffer
             failover_callback: Optional callback for failover events
+            failover_timeout_ms: Active source underrun that triggers a hot-standby switch
+            frame_ms: Mixer frame; silence is judged per frame
+            dropout_frames: Consecutive silent frames (while an aligned standby has
+                audio) that trigger a switch; the mixer holds this much audio back
+            history_seconds: Per-source history kept for alignment and splicing
+            max_alignment_seconds: Largest offset between sources that is aligned
+            failback_hold_seconds: Time a higher-priority source must deliver audio
+                without underruns before the manager switches back to it
         """
         self.sample_rate = sample_rate
         self.failover_callback = failover_callback
@@ -114,11 +206,27 @@ class AudioSourceManager:
         self._sources: Dict[str, FFmpegAudioSource] = {}
         self._source_configs: Dict[str, AudioSourceConfig] = {}
         self._active_source: Optional[str] = None
+        self._lock = threading.RLock()
+
+        # Hot standby: history lanes, splice position and pairwise sample offsets
+        self._frame_seconds = frame_ms / 1000.0
+        self._frame_samples = max(1, int(sample_rate * self._frame_seconds))
+        self._failover_timeout = failover_timeout_ms / 1000.0
+        self._dropout_frames = max(1, int(dropout_frames))
+        self._history_seconds = history_seconds
+        self._max_alignment_seconds = max_alignment_seconds
+        self._failback_hold = failback_hold_seconds
+        self._lanes: Dict[str, _SourceLane] = {}
+        self._mixer_source: Optional[str] = None
+        self._out_pos = 0  # next sample of the mixer source to emit
+        self._offsets: Dict[Tuple[str, str], int] = {}  # (a, b) -> index_b - index_a
+        self._next_alignment = 0.0
 
         # Monitoring threads
         self._monitor_thread: Optional[threading.Thread] = None
         self._mixer_thread: Optional[threading.Thread] = None
         self._stop_event = threading.Event()
+        self._stop_event.set()  # Start in stopped state
 
         # Failover history
         self._failover_history: List[FailoverEvent] = []
@@ -157,6 +265,7 @@ class AudioSourceManager:
             self._sources[config.name] = source
             self._source_configs[config.name] = config
             self._silence_start_times[config.name] = None
+            self._lanes[config.name] = _SourceLane(int(config.sample_rate * self._history_seconds))
 
             logger.info(f"Added source: {config.name} (priority={config.priority})")
             return True
@@ -169,6 +278,9 @@ class AudioSourceManager:
         """
         Start the source manager and all enabled sources.
 
+        Every enabled source is started, not just the best one: the others run
+        as hot standbys so a failover never waits for a source to start.
+
         Returns:
             True if started successfully
         """
@@ -191,6 +303,7 @@ class AudioSourceManager:
 
         if started_count == 0:
             logger.error("No sources started successfully")
+            self._stop_event.set()
             return False
 
         # Select initial active source
@@ -237,26 +350,31 @@ class AudioSourceManager:
         logger.info("AudioSourceManager stopped")
 
     def _monitor_loop(self) -> None:
-        """Monitor source health and trigger failover if needed."""
+        """Monitor source health and trigger failover if needed.
+
+        Slow checks only (failed processes, long silence, failback); sub-chunk
+        underruns and dropouts are handled by the mixer.
+        """
         logger.debug("Source monitor loop started")
 
         while not self._stop_event.wait(1.0):
             try:
                 # Check if active source is still healthy
-                if self._active_source:
-                    source = self._sources[self._active_source]
+                active = self._active_source
+                if active:
+                    source = self._sources[active]
                     metrics = source.get_metrics()
 
                     # Check if source failed
                     if metrics.health == SourceHealth.FAILED:
-                        logger.warning(f"Active source {self._active_source} failed")
+                        logger.warning(f"Active source {active} failed")
                         self._select_best_source(reason=FailoverReason.SOURCE_FAILED)
                         continue
 
                     # Check for silence
-                    config = self._source_configs[self._active_source]
-                    if self._check_silence(self._active_source, config):
-                        logger.warning(f"Silence detected on {self._active_source}")
+                    config = self._source_configs[active]
+                    if self._check_silence(active, config):
+                        logger.warning(f"Silence detected on {active}")
                         self._select_best_source(reason=FailoverReason.SILENCE_DETECTED)
                         continue
 
@@ -269,35 +387,226 @@ class AudioSourceManager:
         logger.debug("Source monitor loop stopped")
 
     def _mixer_loop(self) -> None:
-        """Mix active source audio into master buffer."""
+        """Drain every source each frame and emit the active one into the master buffer."""
         logger.debug("Audio mixer loop started")
-        chunk_samples = int(self.sample_rate * 0.05)  # 50ms chunks
-
-        while not self._stop_event.is_set():
-            if not self._active_source:
-                # No active source, sleep
-                time.sleep(0.1)
-                continue
 
+        while not self._stop_event.wait(self._frame_seconds):
             try:
-                source = self._sources[self._active_source]
-                samples = source.read_samples(chunk_samples)
-
-                if samples is not None:
-                    # Write to master buffer
-                    written = self.master_buffer.write(samples, block=False)
-                    if written == 0:
-                        logger.warning("Master buffer overflow - decoder too slow!")
-                else:
-                    # No data available, yield briefly
-                    time.sleep(0.05)  # 50ms sleep to prevent CPU spinning
-
+                now = time.monotonic()
+                self._drain_sources(now)
+                if now >= self._next_alignment:
+                    self._next_alignment = now + 1.0
+                    self._update_alignment()
+                self._check_underrun(now)
+                self._emit_active()
             except Exception as e:
                 logger.error(f"Error in mixer loop: {e}")
                 time.sleep(0.1)
 
         logger.debug("Audio mixer loop stopped")
 
+    def _drain_sources(self, now: float) -> None:
+        """Move everything each running source has captured into its lane."""
+        for name, lane in self._lanes.items():
+            if not self._source_configs[name].enabled:
+                continue
+            samples = self._sources[name].read_available(lane.capacity)
+            if samples is not None and len(samples):
+                lane.append(samples, now, self._failover_timeout)
+
+    def _update_alignment(self) -> None:
+        """Measure each standby's sample offset against the mixer source."""
+        active = self._mixer_source
+        if active is None:
+            return
+        active_lane = self._lanes[active]
+        active_rate = self._source_configs[active].sample_rate
+        max_lag = int(active_rate * self._max_alignment_seconds)
+        width = max(self._frame_samples, int(active_rate * 0.25))
+
+        # Template ends max_lag back so a standby trailing by up to max_lag has it
+        end = active_lane.received - max_lag
+        start = end - width
+        if start < active_lane.oldest:
+            return
+        template = active_lane.read(start, end)
+        if _rms_db(template) < self._source_configs[active].silence_threshold_db:
+            return  # Nothing to correlate against
+
+        for name, lane in self._lanes.items():
+            if name == active or self._source_configs[name].sample_rate != active_rate:
+                continue
+            if lane.received - lane.oldest < width:
+                continue
+            history = lane.read(lane.oldest, lane.received)
+            position, score = _estimate_offset(template, history)
+            if score < 0.6:
+                # Different programme or too noisy: splice unaligned if needed
+                self._offsets.pop((active, name), None)
+                self._offsets.pop((name, active), None)
+                continue
+            offset = lane.oldest + position - start
+            self._offsets[(active, name)] = offset
+            self._offsets[(name, active)] = -offset
+
+    def _check_underrun(self, now: float) -> None:
+        """Switch to a hot standby once the active source stops delivering."""
+        active = self._mixer_source
+        if active is None:
+            return
+        lane = self._lanes[active]
+        starved = now - lane.last_arrival if lane.last_arrival else 0.0
+        if starved <= self._failover_timeout:
+            return
+        standby = self._best_standby(active, now)
+        if standby is not None:
+            logger.warning(f"Active source {active} underrun ({starved * 1000:.0f} ms without audio)")
+            self._switch_source(standby, FailoverReason.UNDERRUN, detection_ms=starved * 1000.0)
+
+    def _emit_active(self) -> None:
+        """Write the mixer source's audio to the master buffer, frame by frame."""
+        active = self._active_source
+        if active is None:
+            return
+        if active != self._mixer_source:
+            self._splice_to(active)
+
+        lane = self._lanes[active]
+        frame = self._frame_samples
+        # Hold back dropout_frames frames so a dropout is caught before it is emitted
+        end = lane.received - frame * self._dropout_frames
+        self._out_pos = max(self._out_pos, lane.oldest)
+        if end <= self._out_pos:
+            return
+
+        start = self._out_pos
+        pos = start
+        while pos + frame <= end:
+            standby = self._dropout_standby(active, pos)
+            if standby is _AWAIT_STANDBY:
+                break
+            if standby is not None:
+                self._write_master(lane.read(start, pos))
+                self._out_pos = pos
+                logger.warning(f"Dropout on active source {active}; standby {standby} still has audio")
+                self._switch_source(
+                    standby,
+                    FailoverReason.SILENCE_DETECTED,
+                    detection_ms=(time.monotonic() - lane.last_arrival) * 1000.0
+                    + (lane.received - pos) / self._source_configs[active].sample_rate * 1000.0,
+                )
+                return
+            pos += frame
+
+        self._write_master(lane.read(start, pos))
+        self._out_pos = pos
+
+    def _dropout_standby(self, active: str, pos: int) -> Optional[object]:
+        """Aligned standby with audio where the active source has dropout_frames silent frames.
+
+        Returns ``_AWAIT_STANDBY`` when the active audio is silent but a live
+        standby trailing it has not delivered the matching samples yet; output
+        pauses until it has, so a dropout is never emitted while undecided.
+        """
+        frame = self._frame_samples
+        lane = self._lanes[active]
+        threshold = self._source_configs[active].silence_threshold_db
+        span = frame * self._dropout_frames
+        if pos + span > lane.received:
+            return None
+        silent = lane.read(pos, pos + span)
+        if any(_rms_db(silent[i:i + frame]) >= threshold for i in range(0, span, frame)):
+            return None
+
+        now = time.monotonic()
+        waiting = False
+        for name in self._standby_order(active):
+            offset = self._offsets.get((active, name))
+            if offset is None:
+                continue
+            other = self._lanes[name]
+            other_start = pos + offset
+            if other_start < other.oldest:
+                continue
+            if other_start + span > other.received:
+                waiting = waiting or now - other.last_arrival <= self._failover_timeout
+                continue
+            audio = other.read(other_start, other_start + span)
+            other_threshold = self._source_configs[name].silence_threshold_db
+            if all(_rms_db(audio[i:i + frame]) >= other_threshold for i in range(0, span, frame)):
+                return name
+        return _AWAIT_STANDBY if waiting else None
+
+    def _standby_order(self, active: str) -> List[str]:
+        """Enabled sources other than ``active``, best priority first."""
+        return [
+            name for _, name in sorted(
+                (config.priority, name)
+                for name, config in self._source_configs.items()
+                if config.enabled and name != active
+            )
+        ]
+
+    def _best_standby(self, active: str, now: float) -> Optional[str]:
+        """Highest-priority standby that delivered audio within the failover timeout."""
+        for name in self._standby_order(active):
+            lane = self._lanes[name]
+            if lane.last_arrival and now - lane.last_arrival <= self._failover_timeout:
+                return name
+        return None
+
+    def _switch_source(
+        self,
+        new_source: str,
+        reason: FailoverReason,
+        detection_ms: Optional[float] = None,
+    ) -> None:
+        """Make ``new_source`` active from the mixer thread and splice immediately."""
+        with self._lock:
+            old_source = self._active_source
+            self._active_source = new_source
+        gap = self._splice_to(new_source)
+        self._record_failover(old_source, new_source, reason, detection_ms=detection_ms, gap_samples=gap)
+
+    def _splice_to(self, name: str) -> Optional[int]:
+        """Continue output from ``name`` at the sample matching the current position.
+
+        Returns the samples skipped at the splice (0 when sample-accurate) or
+        None when the sources could not be aligned.
+        """
+        old = self._mixer_source
+        lane = self._lanes[name]
+        self._mixer_source = name
+        live_edge = max(lane.oldest, lane.received - self._frame_samples * self._dropout_frames)
+
+        offset = self._offsets.get((old, name)) if old is not None else None
+        if offset is None:
+            self._out_pos = live_edge
+            gap = None
+        else:
+            target = self._out_pos + offset
+            gap = max(0, lane.oldest - target)
+            self._out_pos = max(target, lane.oldest)
+
+        if old is not None:
+            logger.info(
+                f"Spliced audio {old} -> {name} at sample {self._out_pos} "
+                f"({'unaligned' if gap is None else f'gap {gap} samples'})"
+            )
+            for event in reversed(self._failover_history):
+                if event.to_source == name:
+                    if event.gap_samples is None:
+                        event.gap_samples = gap
+                    break
+        return gap
+
+    def _write_master(self, samples: np.ndarray) -> None:
+        if len(samples) == 0:
+            return
+        written = self.master_buffer.write(samples, block=False)
+        if written == 0:
+            logger.warning("Master buffer overflow - decoder too slow!")
+
     def _select_best_source(self, reason: FailoverReason) -> None:
         """
         Select the best available source based on priority and health.
@@ -305,52 +614,71 @@ class AudioSourceManager:
         Args:
             reason: Reason for source selection
         """
-        old_source = self._active_source
+        with self._lock:
+            old_source = self._active_source
+            now = time.monotonic()
 
-        # Get all healthy sources sorted by priority
-        healthy_sources = []
-        for name, config in self._source_configs.items():
-            if not config.enabled:
-                continue
+            # Get all healthy sources sorted by priority; sources whose lane
+            # has gone quiet rank behind ones still delivering audio
+            healthy_sources = []
+            for name, config in self._source_configs.items():
+                if not config.enabled:
+                    continue
 
-            source = self._sources[name]
-            metrics = source.get_metrics()
+                source = self._sources[name]
+                metrics = source.get_metrics()
 
-            if metrics.health in [SourceHealth.HEALTHY, SourceHealth.DEGRADED]:
-                healthy_sources.append((config.priority, name))
+                if metrics.health in [SourceHealth.HEALTHY, SourceHealth.DEGRADED]:
+                    lane = self._lanes[name]
+                    stale = bool(lane.last_arrival) and now - lane.last_arrival > self._failover_timeout
+                    healthy_sources.append((stale, config.priority, name))
 
-        if not healthy_sources:
-            logger.error("No healthy sources available!")
-            self._active_source = None
-            return
+            if not healthy_sources:
+                logger.error("No healthy sources available!")
+                self._active_source = None
+                return
 
-        # Sort by priority (lower number = higher priority)
-        healthy_sources.sort()
-        new_source = healthy_sources[0][1]
+            # Sort by priority (lower number = higher priority)
+            healthy_sources.sort()
+            new_source = healthy_sources[0][2]
 
-        if new_source != old_source:
+            if new_source == old_source:
+                return
             self._active_source = new_source
 
-            # Record failover event
-            event = FailoverEvent(
-                timestamp=time.time(),
-                reason=reason,
-                from_source=old_source,
-                to_source=new_source,
-                description=f"Switched from {old_source or 'none'} to {new_source}"
-            )
-            self._failover_history.append(event)
-            if len(self._failover_history) > self._max_history:
-                self._failover_history.pop(0)
+        # The mixer splices to the new source on its next frame
+        self._record_failover(old_source, new_source, reason)
+
+    def _record_failover(
+        self,
+        old_source: Optional[str],
+        new_source: str,
+        reason: FailoverReason,
+        detection_ms: Optional[float] = None,
+        gap_samples: Optional[int] = None,
+    ) -> None:
+        """Record a failover event and notify the callback."""
+        event = FailoverEvent(
+            timestamp=time.time(),
+            reason=reason,
+            from_source=old_source,
+            to_source=new_source,
+            description=f"Switched from {old_source or 'none'} to {new_source}",
+            detection_ms=detection_ms,
+            gap_samples=gap_samples,
+        )
+        self._failover_history.append(event)
+        if len(self._failover_history) > self._max_history:
+            self._failover_history.pop(0)
 
-            logger.info(f"Failover: {old_source or 'none'} -> {new_source} ({reason.value})")
+        logger.info(f"Failover: {old_source or 'none'} -> {new_source} ({reason.value})")
 
-            # Notify callback
-            if self.failover_callback:
-                try:
-                    self.failover_callback(event)
-                except Exception as e:
-                    logger.error(f"Error in failover callback: {e}")
+        # Notify callback
+        if self.failover_callback:
+            try:
+                self.failover_callback(event)
+            except Exception as e:
+                logger.error(f"Error in failover callback: {e}")
 
     def _check_silence(self, source_name: str, config: AudioSourceConfig) -> bool:
         """
@@ -363,16 +691,12 @@ class AudioSourceManager:
         Returns:
             True if silence threshold exceeded
         """
-        source = self._sources[source_name]
-
-        # Read some samples to check level
-        test_samples = source.read_samples(int(self.sample_rate * 0.1))
+        # Inspect the lane rather than reading the source (the mixer owns reads)
+        test_samples = self._lanes[source_name].latest(int(self.sample_rate * 0.1))
         if test_samples is None:
             return False  # No data yet
 
-        # Calculate RMS level
-        rms = np.sqrt(np.mean(test_samples ** 2))
-        rms_db = 20 * np.log10(max(rms, 1e-10))
+        rms_db = _rms_db(test_samples)
 
         if rms_db < config.silence_threshold_db:
             # Silent
@@ -390,21 +714,35 @@ class AudioSourceManager:
 
     def _check_priority_failover(self) -> None:
         """Check if a higher priority source is now available."""
-        if not self._active_source:
+        active = self._active_source
+        if not active:
             return
 
-        active_config = self._source_configs[self._active_source]
+        active_config = self._source_configs[active]
+        now = time.monotonic()
 
         # Check if any higher priority source is healthy
         for name, config in self._source_configs.items():
             if config.priority < active_config.priority and config.enabled:
                 source = self._sources[name]
                 metrics = source.get_metrics()
-
-                if metrics.health == SourceHealth.HEALTHY:
-                    logger.info(f"Higher priority source {name} available")
-                    self._select_best_source(reason=FailoverReason.PRIORITY_CHANGE)
-                    return
+                if metrics.health != SourceHealth.HEALTHY:
+                    continue
+
+                # Don't fail back to a source that is underrunning or in a dropout
+                lane = self._lanes[name]
+                if lane.last_arrival and (
+                    now - lane.last_arrival > self._failover_timeout
+                    or now - lane.fresh_since < self._failback_hold
+                ):
+                    continue
+                recent = lane.latest(int(config.sample_rate * 0.1))
+                if recent is not None and _rms_db(recent) < config.silence_threshold_db:
+                    continue
+
+                logger.info(f"Higher priority source {name} available")
+                self._select_best_source(reason=FailoverReason.PRIORITY_CHANGE)
+                return
 
     def _on_source_health_change(self, source_name: str, metrics: SourceMetrics) -> None:
         """Callback when source health changes."""
@@ -440,6 +778,20 @@ class AudioSourceManager:
         """Get metrics for all sources."""
         return {name: source.get_metrics() for name, source in self._sources.items()}
 
+    def get_standby_status(self) -> Dict[str, dict]:
+        """Hot-standby state per source: data age and offset to the active source."""
+        now = time.monotonic()
+        active = self._mixer_source
+        status = {}
+        for name, lane in self._lanes.items():
+            status[name] = {
+                'active': name == active,
+                'samples_received': lane.received,
+                'last_data_age_ms': (now - lane.last_arrival) * 1000.0 if lane.last_arrival else None,
+                'offset_samples': 0 if name == active else self._offsets.get((active, name)),
+            }
+        return status
+
     def get_failover_history(self) -> List[FailoverEvent]:
         """Get recent failover events."""
         return self._failover_history.copy()
@@ -28,6 +28,7 @@ Concrete implementations of AudioSourceAdapter for different input types.
 import copy
 import logging
 import os
+import socket
 import subprocess
 import threading
 import time
@@ -167,39 +168,39 @@ class SDRSourceAdapter(AudioSourceAdapter):
             self._squelch_open_timer = None
             self._squelch_close_timer = None
 
-            metadata = self.metrics.metadata or {}
-            metadata.setdefault('receiver_identifier', receiver_id)
-            metadata.setdefault('receiver_display_name', db_receiver.display_name)
-            metadata.setdefault('receiver_driver', db_receiver.driver)
-            metadata.setdefault('source_category', 'sdr')
-            metadata.setdefault('icecast_mount', f"/{self.config.name}")
-            metadata.setdefault('receiver_audio_output', bool(db_receiver.audio_output))
-            metadata.setdefault('receiver_auto_start', bool(db_receiver.auto_start))
-            metadata.setdefault('rbds_enabled', bool(db_receiver.enable_rbds))
-
-            freq_hz = float(db_receiver.frequency_hz or 0.0)
-            if freq_hz and 'receiver_frequency_hz' not in metadata:
-                metadata['receiver_frequency_hz'] = freq_hz
-                metadata['receiver_frequency_mhz'] = round(freq_hz / 1_000_000, 6)
-                if freq_hz >= 1_000_000:
-                    metadata['receiver_frequency_display'] = f"{freq_hz / 1_000_000:.3f} MHz"
-                elif freq_hz >= 1_000:
-                    metadata['receiver_frequency_display'] = f"{freq_hz / 1_000:.0f} kHz"
-                else:
-                    metadata['receiver_frequency_display'] = f"{freq_hz:.0f} Hz"
-
-            metadata.setdefault('receiver_modulation', (self._receiver_config.modulation_type or 'IQ').upper())
-            metadata.setdefault('squelch_enabled', self._squelch_enabled)
-            metadata.setdefault('squelch_threshold_db', self._squelch_threshold_db)
-            metadata.setdefault('squelch_open_ms', self._squelch_open_ms)
-            metadata.setdefault('squelch_close_ms', self._squelch_close_ms)
-            metadata.setdefault('carrier_alarm_enabled', self._squelch_alarm_enabled)
-            metadata.setdefault('carrier_present', None if self._squelch_enabled else True)
-            metadata.setdefault('squelch_state', 'pending' if self._squelch_enabled else 'open')
-            metadata.setdefault('squelch_state_since', self._squelch_last_change)
-            metadata.setdefault('squelch_last_rms_db', None)
-            metadata.setdefault('carrier_alarm', False)
-            self.metrics.metadata = metadata
+            with self.metrics_write() as metrics:
+                metadata = metrics.metadata
+                metadata.setdefault('receiver_identifier', receiver_id)
+                metadata.setdefault('receiver_display_name', db_receiver.display_name)
+                metadata.setdefault('receiver_driver', db_receiver.driver)
+                metadata.setdefault('source_category', 'sdr')
+                metadata.setdefault('icecast_mount', f"/{self.config.name}")
+                metadata.setdefault('receiver_audio_output', bool(db_receiver.audio_output))
+                metadata.setdefault('receiver_auto_start', bool(db_receiver.auto_start))
+                metadata.setdefault('rbds_enabled', bool(db_receiver.enable_rbds))
+
+                freq_hz = float(db_receiver.frequency_hz or 0.0)
+                if freq_hz and 'receiver_frequency_hz' not in metadata:
+                    metadata['receiver_frequency_hz'] = freq_hz
+                    metadata['receiver_frequency_mhz'] = round(freq_hz / 1_000_000, 6)
+                    if freq_hz >= 1_000_000:
+                        metadata['receiver_frequency_display'] = f"{freq_hz / 1_000_000:.3f} MHz"
+                    elif freq_hz >= 1_000:
+                        metadata['receiver_frequency_display'] = f"{freq_hz / 1_000:.0f} kHz"
+                    else:
+                        metadata['receiver_frequency_display'] = f"{freq_hz:.0f} Hz"
+
+                metadata.setdefault('receiver_modulation', (self._receiver_config.modulation_type or 'IQ').upper())
+                metadata.setdefault('squelch_enabled', self._squelch_enabled)
+                metadata.setdefault('squelch_threshold_db', self._squelch_threshold_db)
+                metadata.setdefault('squelch_open_ms', self._squelch_open_ms)
+                metadata.setdefault('squelch_close_ms', self._squelch_close_ms)
+                metadata.setdefault('carrier_alarm_enabled', self._squelch_alarm_enabled)
+                metadata.setdefault('carrier_present', None if self._squelch_enabled else True)
+                metadata.setdefault('squelch_state', 'pending' if self._squelch_enabled else 'open')
+                metadata.setdefault('squelch_state_since', self._squelch_last_change)
+                metadata.setdefault('squelch_last_rms_db', None)
+                metadata.setdefault('carrier_alarm', False)
             self._update_squelch_metadata(float('-inf'))
 
             # Create demodulator if audio output is enabled and modulation is not IQ
@@ -215,7 +216,8 @@ class SDRSourceAdapter(AudioSourceAdapter):
                 self._demodulator = create_demodulator(demod_config)
                 if self._receiver_config.stereo_enabled:
                     self.config.channels = 2
-                    self.metrics.channels = 2
+                    with self.metrics_write() as metrics:
+                        metrics.channels = 2
                 logger.info(f"Created {self._receiver_config.modulation_type} demodulator for receiver: {receiver_id}")
 
         # Start IQ capture from the specified receiver
@@ -269,28 +271,27 @@ class SDRSourceAdapter(AudioSourceAdapter):
     def _update_squelch_metadata(self, rms_db: float, carrier_present: Optional[bool] = None) -> None:
         """Update metadata reflecting the latest squelch measurements."""
 
-        metadata = self.metrics.metadata or {}
-        metadata['squelch_last_rms_db'] = (
-            round(float(rms_db), 2)
-            if np.isfinite(rms_db)
-            else None
-        )
+        with self.metrics_write() as metrics:
+            metadata = metrics.metadata
+            metadata['squelch_last_rms_db'] = (
+                round(float(rms_db), 2)
+                if np.isfinite(rms_db)
+                else None
+            )
 
-        if carrier_present is None:
-            carrier_present = self._squelch_state_open if self._squelch_enabled else True
+            if carrier_present is None:
+                carrier_present = self._squelch_state_open if self._squelch_enabled else True
 
-        metadata['carrier_present'] = carrier_present
-        metadata['squelch_state'] = 'open' if carrier_present else 'muted'
-        metadata['squelch_state_since'] = self._squelch_last_change
+            metadata['carrier_present'] = carrier_present
+            metadata['squelch_state'] = 'open' if carrier_present else 'muted'
+            metadata['squelch_state_since'] = self._squelch_last_change
 
-        if carrier_present:
-            metadata['carrier_alarm'] = False
-        elif self._squelch_alarm_enabled:
-            metadata['carrier_alarm'] = True
-        else:
-            metadata.setdefault('carrier_alarm', False)
-
-        self.metrics.metadata = metadata
+            if carrier_present:
+                metadata['carrier_alarm'] = False
+            elif self._squelch_alarm_enabled:
+                metadata['carrier_alarm'] = True
+            else:
+                metadata.setdefault('carrier_alarm', False)
 
     def _emit_carrier_event(self, carrier_present: bool, rms_db: float) -> None:
         """Emit structured events when the carrier state changes."""
@@ -417,25 +418,23 @@ class SDRSourceAdapter(AudioSourceAdapter):
                     if latest_rbds:
                         if rbds_data:
                             self._rbds_data = rbds_data
-                        if self.metrics.metadata is None:
-                            self.metrics.metadata = {}
-                        metadata = self.metrics.metadata
-                        metadata['rbds_ps_name'] = latest_rbds.ps_name
-                        metadata['rbds_radio_text'] = latest_rbds.radio_text
-                        metadata['rbds_pty'] = latest_rbds.pty
-                        metadata['rbds_pi_code'] = latest_rbds.pi_code
-                        metadata['rbds_tp'] = latest_rbds.tp
-                        metadata['rbds_ta'] = latest_rbds.ta
-                        metadata['rbds_ms'] = latest_rbds.ms
-                        metadata['rbds_program_type_name'] = (
-                            RBDS_PROGRAM_TYPES.get(int(latest_rbds.pty))
-                            if latest_rbds.pty is not None
-                            else None
-                        )
-                        if rbds_data:
-                            metadata['rbds_last_updated'] = time.time()
-                        metadata.setdefault('rbds_last_updated', time.time())
-                        self.metrics.metadata = metadata
+                        with self.metrics_write() as metrics:
+                            metadata = metrics.metadata
+                            metadata['rbds_ps_name'] = latest_rbds.ps_name
+                            metadata['rbds_radio_text'] = latest_rbds.radio_text
+                            metadata['rbds_pty'] = latest_rbds.pty
+                            metadata['rbds_pi_code'] = latest_rbds.pi_code
+                            metadata['rbds_tp'] = latest_rbds.tp
+                            metadata['rbds_ta'] = latest_rbds.ta
+                            metadata['rbds_ms'] = latest_rbds.ms
+                            metadata['rbds_program_type_name'] = (
+                                RBDS_PROGRAM_TYPES.get(int(latest_rbds.pty))
+                                if latest_rbds.pty is not None
+                                else None
+                            )
+                            if rbds_data:
+                                metadata['rbds_last_updated'] = time.time()
+                            metadata.setdefault('rbds_last_updated', time.time())
 
                     return self._apply_squelch(audio_array)
 
@@ -835,26 +834,102 @@ class FileSourceAdapter(AudioSourceAdapter):
             raise RuntimeError("pydub not available for MP3 playback - install with: pip install pydub")
 
 
+class IcyStreamDemuxer:
+    """Split an ICY (Shoutcast/Icecast) byte stream into audio and metadata.
+
+    With ``icy-metaint`` set, the server inserts a metadata block after every
+    ``metaint`` audio bytes: one length byte (in units of 16 bytes) followed by
+    NUL-padded ``StreamTitle='...';`` text.  ``feed()`` accepts arbitrary chunk
+    boundaries and keeps its position between calls.
+    """
+
+    def __init__(self, metaint: int):
+        self.metaint = metaint
+        self._audio_remaining = metaint
+        self._metadata_remaining: Optional[int] = None  # None while expecting audio
+        self._metadata_buffer = bytearray()
+
+    def feed(self, data: bytes) -> Tuple[bytes, List[str]]:
+        """Return the audio bytes and any complete metadata strings in ``data``."""
+        if self.metaint <= 0:
+            return bytes(data), []
+
+        view = memoryview(data)
+        audio = bytearray()
+        metadata: List[str] = []
+        pos = 0
+        size = len(view)
+
+        while pos < size:
+            if self._metadata_remaining is None:
+                take = min(self._audio_remaining, size - pos)
+                audio += view[pos:pos + take]
+                pos += take
+                self._audio_remaining -= take
+                if self._audio_remaining == 0:
+                    self._metadata_remaining = -1  # Length byte is next
+            elif self._metadata_remaining < 0:
+                self._metadata_remaining = view[pos] * 16
+                pos += 1
+                if self._metadata_remaining == 0:
+                    self._end_metadata_block(metadata)
+            else:
+                take = min(self._metadata_remaining, size - pos)
+                self._metadata_buffer += view[pos:pos + take]
+                pos += take
+                self._metadata_remaining -= take
+                if self._metadata_remaining == 0:
+                    self._end_metadata_block(metadata)
+
+        return bytes(audio), metadata
+
+    def _end_metadata_block(self, metadata: List[str]) -> None:
+        text = self._metadata_buffer.rstrip(b'\x00').decode('utf-8', errors='replace').strip()
+        if text:
+            metadata.append(text)
+        self._metadata_buffer.clear()
+        self._metadata_remaining = None
+        self._audio_remaining = self.metaint
+
+
 class StreamSourceAdapter(AudioSourceAdapter):
-    """Audio source adapter that delegates streaming + decoding to FFmpeg."""
+    """Audio source adapter for HTTP/Icecast streams.
+
+    One HTTP connection per stream: a reader thread strips ICY metadata
+    in-process and pipes the compressed audio into FFmpeg for decoding.
+    HLS playlists are segment lists, not a byte stream, so FFmpeg opens
+    those URLs itself and follows the playlist.
+    """
 
     def __init__(self, config: AudioSourceConfig):
         super().__init__(config)
         self._stream_url = self.config.device_params.get('stream_url', '')
         self._resolved_stream_url: Optional[str] = None
+        self._is_hls = False  # FFmpeg reads the URL itself; no ICY pipe
         self._ffmpeg_process: Optional[subprocess.Popen] = None
         self._stderr_thread: Optional[threading.Thread] = None
         self._pcm_backlog = bytearray()
         self._stream_metadata: Dict[str, Any] = {}
         self._last_restart = 0.0
         self._restart_delay_seconds = 3.0
-        self._metadata_thread: Optional[threading.Thread] = None
-        self._metadata_stop_event = threading.Event()
+        # A single HTTP connection carries both audio and ICY metadata
+        self._network_thread: Optional[threading.Thread] = None
+        self._network_stop_event = threading.Event()
+        self._network_response = None
+        self._connect_retry_seconds = 5.0
+        self._reconnect_delay_seconds = 3.0
+        self._read_chunk_bytes = 4096
+        self._connection_count = 0
         self._metadata_lock = threading.Lock()
         self._last_icy_metadata: Optional[str] = None
 
     def _resolve_stream_url(self, url: str) -> str:
-        """Validate the configured URL and resolve playlists when needed."""
+        """Validate the configured URL and resolve playlists when needed.
+
+        M3U lists of Icecast/SHOUTcast URLs resolve to their first entry.  HLS
+        playlists (``#EXT-X-`` tags) are kept as-is and mark the source as HLS.
+        """
+        self._is_hls = False
         if not url:
             raise ValueError("stream_url must be configured for stream sources")
 
@@ -875,6 +950,12 @@ class StreamSourceAdapter(AudioSourceAdapter):
             except Exception as exc:
                 raise RuntimeError(f"Failed to fetch playlist {url}: {exc}") from exc
 
+            if '#EXT-X-' in response.text:
+                # Master or media HLS playlist: FFmpeg follows variants and segments
+                logger.info(f"Stream URL is an HLS playlist; FFmpeg will read it directly: {url}")
+                self._is_hls = True
+                return url
+
             for line in response.text.splitlines():
                 entry = line.strip()
                 if not entry or entry.startswith('#'):
@@ -884,27 +965,37 @@ class StreamSourceAdapter(AudioSourceAdapter):
                 candidate_parsed = urlparse(candidate)
                 if candidate_parsed.scheme in ("http", "https") and candidate_parsed.netloc:
                     logger.info(f"Resolved M3U entry to stream URL: {candidate}")
+                    self._is_hls = candidate_parsed.path.lower().endswith('.m3u8')
                     return candidate
 
             raise RuntimeError(f"Playlist {url} did not contain a playable stream URL")
 
         return url
 
-    def _build_ffmpeg_command(self, stream_url: str) -> List[str]:
-        """Construct the FFmpeg command used for streaming + decoding."""
+    def _build_ffmpeg_command(self) -> List[str]:
+        """Construct the FFmpeg decoder command.
+
+        ICY streams are fed to stdin by the network reader; HLS playlists are
+        opened by FFmpeg, which reconnects on its own after network errors.
+        """
+        if self._is_hls:
+            source = [
+                '-user_agent', 'EAS-Station/1.0',
+                '-reconnect', '1',
+                '-reconnect_streamed', '1',
+                '-reconnect_on_network_error', '1',
+                '-reconnect_delay_max', '5',
+                '-rw_timeout', '15000000',
+                '-i', self._resolved_stream_url,
+            ]
+        else:
+            source = ['-i', 'pipe:0']
         return [
             'ffmpeg',
             '-hide_banner',
             '-loglevel', 'error',
-            '-nostdin',
-            '-user_agent', 'EAS-Station/1.0',
-            '-headers', 'Icy-MetaData:1\r\n',
-            '-reconnect', '1',
-            '-reconnect_streamed', '1',
-            '-reconnect_on_network_error', '1',
-            '-reconnect_delay_max', '5',
             '-fflags', '+genpts',
-            '-i', stream_url,
+            *source,
             '-vn',
             '-acodec', 'pcm_s16le',
             '-ar', str(self.config.sample_rate),
@@ -919,7 +1010,7 @@ class StreamSourceAdapter(AudioSourceAdapter):
             raise RuntimeError("Stream URL has not been resolved yet")
 
         self._stop_ffmpeg_process()
-        command = self._build_ffmpeg_command(self._resolved_stream_url)
+        command = self._build_ffmpeg_command()
         logger.info(f"{self.config.name}: launching FFmpeg decoder")
 
         try:
@@ -927,7 +1018,7 @@ class StreamSourceAdapter(AudioSourceAdapter):
                 command,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                stdin=subprocess.DEVNULL,
+                stdin=subprocess.DEVNULL if self._is_hls else subprocess.PIPE,
                 bufsize=0,
             )
         except FileNotFoundError as exc:
@@ -974,6 +1065,11 @@ class StreamSourceAdapter(AudioSourceAdapter):
                 except subprocess.TimeoutExpired:
                     process.kill()
         finally:
+            if process.stdin is not None:
+                try:
+                    process.stdin.close()
+                except Exception:
+                    pass
             if process.stdout is not None:
                 try:
                     process.stdout.close()
@@ -1042,7 +1138,10 @@ class StreamSourceAdapter(AudioSourceAdapter):
             logger.debug(f"{self.config.name}: stderr pump stopped: {exc}")
 
     def _start_capture(self) -> None:
-        """Resolve the stream URL and start FFmpeg decoding."""
+        """Resolve the stream URL, start FFmpeg and open the stream connection."""
+        if not REQUESTS_AVAILABLE:
+            raise RuntimeError("Requests library not available for stream sources")
+
         resolved = self._resolve_stream_url(self._stream_url)
         self._resolved_stream_url = resolved
 
@@ -1051,23 +1150,34 @@ class StreamSourceAdapter(AudioSourceAdapter):
             'resolved_url': resolved,
             'connection_timestamp': time.time(),
             'decoder': 'ffmpeg',
+            'transport': 'hls' if self._is_hls else 'icy',
+            'connections': 0,
             'icy': {
                 'supported': False,
             },
         }
-        with self._metadata_lock:
-            self.metrics.metadata = copy.deepcopy(self._stream_metadata)
+        with self._metadata_lock, self.metrics_write() as metrics:
+            metrics.metadata = copy.deepcopy(self._stream_metadata)
         self._last_icy_metadata = None
+        self._connection_count = 0
 
         logger.info(f"{self.config.name}: resolved stream to {resolved}")
         self._launch_ffmpeg_process()
         self.status = AudioSourceStatus.RUNNING
-        self._start_metadata_listener()
+        if self._is_hls:
+            self._apply_metadata_update({
+                'icy': {'last_error': 'ICY metadata not available for HLS streams'},
+            })
+        else:
+            self._start_network_reader()
 
     def _stop_capture(self) -> None:
-        """Stop FFmpeg decoding for the stream source."""
-        self._stop_metadata_listener()
+        """Stop the stream connection and FFmpeg decoding."""
+        self._network_stop_event.set()
+        self._close_network_response()
+        # Killing FFmpeg also unblocks a reader stuck writing into a full stdin pipe
         self._stop_ffmpeg_process()
+        self._stop_network_reader()
         self._pcm_backlog.clear()
 
     def _read_audio_chunk(self) -> Optional[np.ndarray]:
@@ -1115,34 +1225,48 @@ class StreamSourceAdapter(AudioSourceAdapter):
         samples = np.frombuffer(raw, dtype=np.int16).astype(np.float32) / 32768.0
         return samples
 
-    def _start_metadata_listener(self) -> None:
-        """Start a background thread that harvests ICY metadata from the stream."""
-        if not REQUESTS_AVAILABLE:
+    def _start_network_reader(self) -> None:
+        """Start the thread that pulls the stream and feeds FFmpeg."""
+        if self._network_thread and self._network_thread.is_alive():
             return
 
-        if self._metadata_thread and self._metadata_thread.is_alive():
-            return
-
-        self._metadata_stop_event.clear()
-        self._metadata_thread = threading.Thread(
-            target=self._metadata_loop,
-            name=f"metadata-{self.config.name}",
+        self._network_stop_event.clear()
+        self._network_thread = threading.Thread(
+            target=self._network_loop,
+            name=f"stream-{self.config.name}",
             daemon=True,
         )
-        self._metadata_thread.start()
-
-    def _stop_metadata_listener(self) -> None:
-        """Stop the ICY metadata harvesting thread."""
-        self._metadata_stop_event.set()
-        if self._metadata_thread and self._metadata_thread.is_alive():
-            self._metadata_thread.join(timeout=2.0)
-        self._metadata_thread = None
-
-    def _metadata_loop(self) -> None:
-        """Continuously poll the stream for ICY metadata updates."""
-        if not REQUESTS_AVAILABLE:
-            return
+        self._network_thread.start()
+
+    def _stop_network_reader(self) -> None:
+        """Stop the stream reader thread."""
+        self._network_stop_event.set()
+        self._close_network_response()
+        if self._network_thread and self._network_thread.is_alive():
+            self._network_thread.join(timeout=2.0)
+        self._network_thread = None
+
+    def _close_network_response(self) -> None:
+        """Shut down the open stream socket so a pending read returns immediately.
+
+        Closing the response itself from this thread would wait on the reader's
+        buffer lock until the read timed out; the reader closes it on its way out.
+        """
+        raw = getattr(self._network_response, 'raw', None)
+        connection = getattr(raw, 'connection', None) or getattr(raw, '_connection', None)
+        sock = getattr(connection, 'sock', None)
+        if sock is None:
+            # http.client hands the socket to the response's buffered reader
+            socket_io = getattr(getattr(getattr(raw, '_fp', None), 'fp', None), 'raw', None)
+            sock = getattr(socket_io, '_sock', None)
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
 
+    def _network_loop(self) -> None:
+        """Hold one HTTP connection per stream, reconnecting with a fixed backoff."""
         session = requests.Session()
         session.headers.update({
             'User-Agent': 'EAS-Station/1.0',
@@ -1150,7 +1274,7 @@ class StreamSourceAdapter(AudioSourceAdapter):
         })
 
         try:
-            while not self._metadata_stop_event.is_set():
+            while not self._network_stop_event.is_set():
                 stream_url = self._resolved_stream_url or self._stream_url
                 if not stream_url:
                     break
@@ -1163,91 +1287,120 @@ class StreamSourceAdapter(AudioSourceAdapter):
                     )
                     response.raise_for_status()
                 except Exception as exc:
-                    logger.debug(
-                        "%s: metadata request failed: %s",
+                    logger.warning(
+                        "%s: stream connection failed: %s",
                         self.config.name,
                         exc,
                     )
-                    if self._metadata_stop_event.wait(5.0):
+                    self._apply_metadata_update({'last_error': str(exc)})
+                    if self._network_stop_event.wait(self._connect_retry_seconds):
                         break
                     continue
 
-                metaint_header = response.headers.get('icy-metaint')
+                self._network_response = response
                 try:
-                    metaint = int(metaint_header)
-                except (TypeError, ValueError):
-                    metaint = 0
-
-                if metaint <= 0:
-                    logger.debug(
-                        "%s: stream does not advertise ICY metadata (icy-metaint=%s)",
-                        self.config.name,
-                        metaint_header,
-                    )
-                    self._apply_metadata_update({
-                        'icy': {
-                            'supported': False,
-                            'last_error': 'ICY metadata not available',
-                            'last_check': time.time(),
-                        }
-                    })
+                    reason = self._pump_stream(response)
+                finally:
+                    self._network_response = None
                     response.close()
-                    if self._metadata_stop_event.wait(30.0):
-                        break
-                    continue
 
-                self._apply_metadata_update({
-                    'icy': {
-                        'supported': True,
-                        'metaint': metaint,
-                        'last_error': None,
-                        'last_check': time.time(),
-                    }
-                })
-
-                raw = response.raw
-                raw.decode_content = False
+                if self._network_stop_event.is_set():
+                    break
+                if reason == 'decoder restarted':
+                    # Give the fresh decoder the start of a stream rather than a mid-stream join
+                    continue
 
-                try:
-                    while not self._metadata_stop_event.is_set():
-                        if not raw.read(metaint):
-                            break
+                logger.info(f"{self.config.name}: stream connection closed ({reason}), reconnecting")
+                if self._network_stop_event.wait(self._reconnect_delay_seconds):
+                    break
+        finally:
+            session.close()
 
-                        length_byte = raw.read(1)
-                        if not length_byte:
-                            break
+    def _pump_stream(self, response: Any) -> str:
+        """Demultiplex one HTTP response into FFmpeg; return why it stopped."""
+        metaint_header = response.headers.get('icy-metaint')
+        try:
+            metaint = max(0, int(metaint_header))
+        except (TypeError, ValueError):
+            metaint = 0
+
+        self._connection_count += 1
+        icy_update: Dict[str, Any] = {
+            'supported': metaint > 0,
+            'metaint': metaint or None,
+            'last_error': None if metaint else 'ICY metadata not available',
+            'last_check': time.time(),
+        }
+        self._apply_metadata_update({
+            'connection_timestamp': time.time(),
+            'connections': self._connection_count,
+            'content_type': response.headers.get('Content-Type'),
+            'last_error': None,
+            'icy': icy_update,
+        })
+        if not metaint:
+            logger.debug(
+                "%s: stream does not advertise ICY metadata (icy-metaint=%s)",
+                self.config.name,
+                metaint_header,
+            )
 
-                        block_length = length_byte[0] * 16
-                        if block_length == 0:
-                            continue
+        demuxer = IcyStreamDemuxer(metaint)
+        process = self._ffmpeg_process
+        raw = response.raw
+        raw.decode_content = False
+        # read1() returns whatever has arrived instead of waiting for a full chunk
+        read = getattr(raw, 'read1', raw.read)
 
-                        metadata_block = raw.read(block_length) or b''
-                        metadata_text = metadata_block.rstrip(b'\x00').decode(
-                            'utf-8', errors='replace'
-                        ).strip()
+        try:
+            while not self._network_stop_event.is_set():
+                data = read(self._read_chunk_bytes)
+                if not data:
+                    return 'stream ended'
+
+                audio, metadata_blocks = demuxer.feed(data)
+                for metadata_text in metadata_blocks:
+                    self._handle_icy_metadata(metadata_text)
+
+                if self._ffmpeg_process is not process:
+                    return 'decoder restarted'
+                if audio and not self._feed_decoder(process, audio):
+                    return 'decoder input closed'
+        except Exception as exc:
+            if self._network_stop_event.is_set():
+                return 'stopped'
+            logger.debug(
+                "%s: error while reading stream: %s",
+                self.config.name,
+                exc,
+            )
+            self._apply_metadata_update({
+                'last_error': str(exc),
+                'icy': {
+                    'last_error': str(exc),
+                    'last_check': time.time(),
+                },
+            })
+            return 'read error'
 
-                        if metadata_text:
-                            self._handle_icy_metadata(metadata_text)
+        return 'stopped'
 
-                except Exception as exc:
-                    logger.debug(
-                        "%s: error while reading ICY metadata: %s",
-                        self.config.name,
-                        exc,
-                    )
-                    self._apply_metadata_update({
-                        'icy': {
-                            'last_error': str(exc),
-                            'last_check': time.time(),
-                        }
-                    })
-                finally:
-                    response.close()
+    def _feed_decoder(self, process: Optional[subprocess.Popen], audio: bytes) -> bool:
+        """Write compressed audio into FFmpeg stdin; False when the decoder is gone."""
+        stdin = process.stdin if process is not None else None
+        if stdin is None:
+            return False
 
-                if self._metadata_stop_event.wait(3.0):
-                    break
-        finally:
-            session.close()
+        view = memoryview(audio)
+        try:
+            while view:
+                written = stdin.write(view)
+                if not written:
+                    return False
+                view = view[written:]
+        except (BrokenPipeError, OSError, ValueError):
+            return False
+        return True
 
     def _handle_icy_metadata(self, metadata_text: str) -> None:
         """Parse raw ICY metadata and update the source metadata cache."""
@@ -1422,7 +1575,8 @@ class StreamSourceAdapter(AudioSourceAdapter):
 
         with self._metadata_lock:
             if _merge_dict(self._stream_metadata, updates):
-                self.metrics.metadata = copy.deepcopy(self._stream_metadata)
+                with self.metrics_write() as metrics:
+                    metrics.metadata = copy.deepcopy(self._stream_metadata)
 
 # Factory function for creating sources
 def create_audio_source(config: AudioSourceConfig) -> AudioSourceAdapter:
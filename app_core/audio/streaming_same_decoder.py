@@ -10,10 +10,16 @@ EAS decoders like DASDEC and multimon-ng operate.
 
 CRITICAL: This is a life-safety system. The decoder MUST process every audio sample
 with zero dropouts or gaps. Commercial EAS decoders operate this way.
+
+ENERGY GATE: During dead air or programming the per-sample correlator is kept
+asleep behind a cheap block-level mark/space energy gate. Every sample still
+lands in a look-back history, and on wake-up that history is replayed through
+the correlator first, so the leading preamble bytes are never skipped.
 """
 
 import logging
 import math
+import time
 from dataclasses import dataclass
 from datetime import datetime
 from typing import List, Optional, Callable, Tuple
@@ -23,6 +29,8 @@ import numpy as np
 from app_utils.eas_fsk import SAME_BAUD, SAME_MARK_FREQ, SAME_SPACE_FREQ
 from app_utils import utc_now
 
+from .latency_metrics import STAGE_EMIT_ALERT, observe_latency
+
 logger = logging.getLogger(__name__)
 
 
@@ -33,6 +41,8 @@ class StreamingSAMEAlert:
     confidence: float
     timestamp: datetime
     raw_bits: List[int]
+    # time.monotonic() when the first header byte ('Z') was decoded
+    started_at: Optional[float] = None
 
 
 class StreamingSAMEDecoder:
@@ -55,10 +65,20 @@ class StreamingSAMEDecoder:
         # Callback is invoked when alert is detected
     """
     
+    # Energy gate tuning. A 32 ms block gives ~30 Hz resolution at the mark and
+    # space frequencies; clean FSK scores ~0.5 and white noise ~0.008 on the
+    # normalized band-energy ratio, so 0.04 wakes well below decodable SNR.
+    GATE_BLOCK_SECONDS = 0.032
+    GATE_THRESHOLD = 0.04
+    GATE_MIN_POWER = 1e-8  # Mean-square level treated as digital silence
+    GATE_LOOKBACK_SECONDS = 0.25  # History replayed on wake (> one preamble byte block)
+    GATE_HANGOVER_SECONDS = 1.0  # Stay awake this long after FSK energy disappears
+
     def __init__(
         self,
         sample_rate: int = 16000,
-        alert_callback: Optional[Callable[[StreamingSAMEAlert], None]] = None
+        alert_callback: Optional[Callable[[StreamingSAMEAlert], None]] = None,
+        energy_gate: bool = True
     ):
         """
         Initialize streaming SAME decoder.
@@ -66,9 +86,11 @@ class StreamingSAMEDecoder:
         Args:
             sample_rate: Audio sample rate in Hz
             alert_callback: Function called when alert detected
+            energy_gate: Keep the correlator asleep until mark/space energy appears
         """
         self.sample_rate = sample_rate
         self.alert_callback = alert_callback
+        self.energy_gate = energy_gate
         
         # SAME FSK parameters
         self.baud_rate = float(SAME_BAUD)  # 520.83 baud
@@ -76,17 +98,36 @@ class StreamingSAMEDecoder:
         self.space_freq = SAME_SPACE_FREQ   # 1562.5 Hz (logic 0)
         
         # Correlation parameters
-        self.SUBSAMP = 2  # Downsampling factor
         self.corr_len = int(sample_rate / self.baud_rate)  # Samples per bit
         
         # Generate correlation tables (precomputed for efficiency)
         self.mark_i, self.mark_q, self.space_i, self.space_q = self._generate_correlation_tables()
+        self._mark_i_arr = np.asarray(self.mark_i, dtype=np.float32)
+        self._mark_q_arr = np.asarray(self.mark_q, dtype=np.float32)
+        self._space_i_arr = np.asarray(self.space_i, dtype=np.float32)
+        self._space_q_arr = np.asarray(self.space_q, dtype=np.float32)
+        
+        # Energy gate: block-level mark/space DFT basis and look-back history size
+        self.gate_block_len = max(self.corr_len, int(sample_rate * self.GATE_BLOCK_SECONDS))
+        gate_t = np.arange(self.gate_block_len, dtype=np.float64) / sample_rate
+        self._gate_basis = np.exp(
+            -2j * np.pi * np.outer(gate_t, [self.mark_freq, self.space_freq])
+        ).astype(np.complex64)
+        self.gate_lookback_len = max(
+            int(sample_rate * self.GATE_LOOKBACK_SECONDS),
+            2 * self.gate_block_len + self.corr_len,
+        )
+        self._gate_hangover_blocks = max(
+            1, int(math.ceil(self.GATE_HANGOVER_SECONDS / self.GATE_BLOCK_SECONDS))
+        )
         
         # Decoder state variables (persistent across process_samples calls)
         self._reset_decoder_state()
         
         # Statistics
         self.samples_processed = 0
+        self.samples_correlated = 0
+        self.gate_wakeups = 0
         self.alerts_detected = 0
         self.bytes_decoded = 0
         
@@ -97,34 +138,50 @@ class StreamingSAMEDecoder:
     
     def _reset_decoder_state(self) -> None:
         """Reset decoder state variables."""
-        # DLL (Delay-Locked Loop) state
-        self.dcd_shreg = 0  # Shift register for bit history
-        self.dcd_integrator = 0  # Integrator for noise immunity
-        self.sphase = 1  # Sampling phase (16-bit fixed point)
-        self.lasts = 0  # Last 8 bits received
-        self.byte_counter = 0  # Bits received in current byte
+        self._reset_correlator_state()
         self.synced = False  # Whether we've found preamble
         
         # Message assembly state
         self.current_msg = []
         self.in_message = False
+        self._message_started_at: Optional[float] = None
         
         # Confidence tracking
         self.bit_confidences = []
         
-        # Sample buffer (holds corr_len samples for correlation)
-        self.sample_buffer = np.zeros(self.corr_len, dtype=np.float32)
-        self.buffer_pos = 0
-        
-        # Pre-allocated correlation window to avoid repeated allocation
-        self._correlation_window = np.zeros(self.corr_len, dtype=np.float32)
+        # Energy gate state
+        self.gate_awake = not self.energy_gate
+        self._gate_block = np.zeros(self.gate_block_len, dtype=np.float32)
+        self._gate_block_fill = 0
+        self._gate_idle_blocks = 0
+        self._gate_history = np.zeros(self.gate_lookback_len, dtype=np.float32)
+        self._gate_history_pos = 0
+        self._gate_history_fill = 0
         
         # Constants
         self.PREAMBLE_BYTE = 0xAB
         self.DLL_GAIN = 0.4
-        self.INTEGRATOR_MAX = 12
+        self.INTEGRATOR_MAX = max(2, self.corr_len // 4)
         self.MAX_MSG_LEN = 268
-        self.sphaseinc = int(0x10000 * self.baud_rate * self.SUBSAMP / self.sample_rate)
+        # Every sample is processed (no subsampling), so the phase advances
+        # by one bit period per samples_per_bit samples
+        self.sphaseinc = int(0x10000 * self.baud_rate / self.sample_rate)
+    
+    def _reset_correlator_state(self) -> None:
+        """Reset correlator history and DLL bit state (also done when the gate sleeps)."""
+        # DLL (Delay-Locked Loop) state
+        self.dcd_shreg = 0  # Shift register for bit history
+        self.dcd_integrator = 0  # Integrator for noise immunity
+        self.sphase = 1  # Sampling phase (16-bit fixed point)
+        self.lasts = 0  # Last 8 bits received
+        self.byte_counter = 0  # Bits received in current byte
+        
+        # Most recent corr_len samples (oldest first), carried between batches
+        # so correlation windows span chunk boundaries
+        self._correlation_window = np.zeros(self.corr_len, dtype=np.float32)
+        
+        # Correlator fill tracking (the correlator may sleep behind the gate)
+        self._correlator_fill = 0
     
     def reset(self) -> None:
         """
@@ -135,6 +192,8 @@ class StreamingSAMEDecoder:
         """
         self._reset_decoder_state()
         self.samples_processed = 0
+        self.samples_correlated = 0
+        self.gate_wakeups = 0
         self.alerts_detected = 0
         self.bytes_decoded = 0
         logger.debug("StreamingSAMEDecoder reset to initial state")
@@ -170,78 +229,146 @@ class StreamingSAMEDecoder:
         
         self.samples_processed += len(samples)
         
-        # OPTIMIZATION: Process samples in batches using vectorized operations
-        # instead of iterating one sample at a time in Python.
-        # This significantly reduces CPU overhead on Raspberry Pi.
+        if not self.energy_gate:
+            self._run_correlator(samples)
+            return
         
+        # Walk the chunk in gate-block segments. While awake, samples go straight
+        # to the correlator; while asleep they only land in the look-back history.
         num_samples = len(samples)
         sample_idx = 0
-        
         while sample_idx < num_samples:
-            # Calculate how many samples we can add to the buffer in one go.
-            # This handles the circular buffer by only copying up to the end,
-            # then wrapping on the next iteration if needed.
-            space_in_buffer = self.corr_len - self.buffer_pos
-            samples_to_add = min(space_in_buffer, num_samples - sample_idx)
+            take = min(self.gate_block_len - self._gate_block_fill, num_samples - sample_idx)
+            segment = samples[sample_idx:sample_idx + take]
+            self._gate_block[self._gate_block_fill:self._gate_block_fill + take] = segment
+            self._gate_block_fill += take
+            sample_idx += take
             
-            # Batch copy samples into the circular buffer.
-            # Since we limited samples_to_add to space_in_buffer, this slice
-            # is guaranteed to fit within bounds [buffer_pos, corr_len).
-            self.sample_buffer[self.buffer_pos:self.buffer_pos + samples_to_add] = \
-                samples[sample_idx:sample_idx + samples_to_add]
-            
-            # Process each sample position (still need to track state per sample)
-            old_buffer_pos = self.buffer_pos
-            self.buffer_pos = (self.buffer_pos + samples_to_add) % self.corr_len
-            
-            # Only start processing once buffer is initially filled
-            if self.samples_processed >= self.corr_len:
-                # Process each sample in this batch
-                for i in range(samples_to_add):
-                    # logical_pos represents where the correlation window ENDS in the buffer.
-                    # We add +1 because after writing sample i, the next valid window ends
-                    # at position (old_buffer_pos + i + 1). The correlation window spans
-                    # [logical_pos - corr_len + 1, logical_pos] in the circular buffer.
-                    logical_pos = (old_buffer_pos + i + 1) % self.corr_len
-                    self._process_one_sample_at(logical_pos)
+            if self.gate_awake:
+                self._run_correlator(segment)
+            else:
+                self._append_gate_history(segment)
             
-            sample_idx += samples_to_add
+            if self._gate_block_fill == self.gate_block_len:
+                self._gate_block_fill = 0
+                self._evaluate_gate_block()
+    
+    def _block_has_fsk_energy(self, block: np.ndarray) -> bool:
+        """Return True when a gate block carries significant mark/space energy."""
+        energy = float(np.dot(block, block))
+        if energy < self.GATE_MIN_POWER * len(block):
+            return False
+        spectrum = block @ self._gate_basis
+        band_power = float(np.sum(spectrum.real ** 2 + spectrum.imag ** 2))
+        # Normalized so a pure in-band tone scores 1.0 regardless of level
+        ratio = band_power / (energy * len(block) / 2.0)
+        return ratio >= self.GATE_THRESHOLD
     
-    def _process_one_sample_at(self, logical_buffer_pos: int) -> None:
+    def _evaluate_gate_block(self) -> None:
+        """Update the gate after a complete block has been collected."""
+        if self._block_has_fsk_energy(self._gate_block):
+            self._gate_idle_blocks = 0
+            if not self.gate_awake:
+                self._wake_correlator()
+            return
+        
+        if not self.gate_awake:
+            return
+        
+        # Never sleep in the middle of a message or while locked to a preamble
+        if self.synced or self.in_message:
+            self._gate_idle_blocks = 0
+            return
+        
+        self._gate_idle_blocks += 1
+        if self._gate_idle_blocks >= self._gate_hangover_blocks:
+            self.gate_awake = False
+            self._gate_idle_blocks = 0
+            self._gate_history_pos = 0
+            self._gate_history_fill = 0
+            # The next wake replays look-back history that is not contiguous
+            # with what the correlator last saw; never stitch the two together
+            self._reset_correlator_state()
+    
+    def _append_gate_history(self, segment: np.ndarray) -> None:
+        """Store samples in the look-back ring while the correlator sleeps."""
+        n = len(segment)
+        if n >= self.gate_lookback_len:
+            self._gate_history[:] = segment[-self.gate_lookback_len:]
+            self._gate_history_pos = 0
+            self._gate_history_fill = self.gate_lookback_len
+            return
+        end = self._gate_history_pos + n
+        if end <= self.gate_lookback_len:
+            self._gate_history[self._gate_history_pos:end] = segment
+        else:
+            first = self.gate_lookback_len - self._gate_history_pos
+            self._gate_history[self._gate_history_pos:] = segment[:first]
+            self._gate_history[:n - first] = segment[first:]
+        self._gate_history_pos = end % self.gate_lookback_len
+        self._gate_history_fill = min(self._gate_history_fill + n, self.gate_lookback_len)
+    
+    def _wake_correlator(self) -> None:
+        """Wake the correlator and replay the look-back history through it."""
+        self.gate_awake = True
+        self.gate_wakeups += 1
+        fill = self._gate_history_fill
+        if fill:
+            start = (self._gate_history_pos - fill) % self.gate_lookback_len
+            if start + fill <= self.gate_lookback_len:
+                history = self._gate_history[start:start + fill]
+            else:
+                history = np.concatenate((
+                    self._gate_history[start:],
+                    self._gate_history[:(start + fill) - self.gate_lookback_len],
+                ))
+            self._run_correlator(history)
+        self._gate_history_pos = 0
+        self._gate_history_fill = 0
+    
+    def _run_correlator(self, samples: np.ndarray) -> None:
         """
-        Process one correlation window ending at the specified buffer position.
+        Feed samples through the full correlator and DLL.
         
-        Args:
-            logical_buffer_pos: The position in the circular buffer where the
-                              correlation window ends (0 to corr_len-1).
+        Correlations for every window ending in this batch are computed at once
+        with np.correlate over [last corr_len-1 samples | new samples], so each
+        window holds exactly the corr_len most recent samples in time order.
+        Only the DLL / bit-slicer state machine runs per sample in Python.
+        """
+        num_samples = len(samples)
+        self.samples_correlated += num_samples
+        
+        history_len = self.corr_len - 1
+        x = np.empty(history_len + num_samples, dtype=np.float32)
+        x[:history_len] = self._correlation_window[1:]
+        x[history_len:] = samples
+        
+        mark_i_corr = np.correlate(x, self._mark_i_arr, mode='valid')
+        mark_q_corr = np.correlate(x, self._mark_q_arr, mode='valid')
+        space_i_corr = np.correlate(x, self._space_i_arr, mode='valid')
+        space_q_corr = np.correlate(x, self._space_q_arr, mode='valid')
+        mark_power = mark_i_corr * mark_i_corr + mark_q_corr * mark_q_corr
+        space_power = space_i_corr * space_i_corr + space_q_corr * space_q_corr
+        correlations = (mark_power - space_power).tolist()
+        total_powers = (mark_power + space_power).tolist()
+        
+        # Keep the most recent corr_len samples for the next batch
+        self._correlation_window[:] = x[-self.corr_len:]
+        
+        # Only start processing once the window has been filled once
+        first = max(0, self.corr_len - self._correlator_fill - 1)
+        self._correlator_fill = min(self._correlator_fill + num_samples, self.corr_len)
+        for i in range(first, num_samples):
+            self._process_correlation(correlations[i], total_powers[i])
+    
+    def _process_correlation(self, correlation: float, total_power: float) -> None:
+        """
+        Advance the DLL and bit slicer by one sample.
         
-        The correlation window contains the most recent corr_len samples,
-        starting from logical_buffer_pos and wrapping around if needed.
+        Args:
+            correlation: Mark power minus space power for the current window
+            total_power: Mark power plus space power for the current window
         """
-        # Get samples in correct order (accounting for circular buffer)
-        # OPTIMIZATION: Use pre-allocated array and np.roll-style indexing
-        if logical_buffer_pos == 0:
-            # Special case: window aligns with buffer start, no reordering needed
-            correlation_window = self.sample_buffer
-        else:
-            # Reorder samples to get contiguous window:
-            # [logical_buffer_pos:] contains older samples (start of window)
-            # [:logical_buffer_pos] contains newer samples (end of window)
-            tail_len = self.corr_len - logical_buffer_pos
-            self._correlation_window[:tail_len] = self.sample_buffer[logical_buffer_pos:]
-            self._correlation_window[tail_len:] = self.sample_buffer[:logical_buffer_pos]
-            correlation_window = self._correlation_window
-        
-        # Compute correlation (mark - space)
-        mark_i_corr = np.dot(correlation_window, self.mark_i)
-        mark_q_corr = np.dot(correlation_window, self.mark_q)
-        space_i_corr = np.dot(correlation_window, self.space_i)
-        space_q_corr = np.dot(correlation_window, self.space_q)
-        
-        mark_power = mark_i_corr**2 + mark_q_corr**2
-        space_power = space_i_corr**2 + space_q_corr**2
-        correlation = mark_power - space_power
-        total_power = mark_power + space_power
         
         # Update DCD shift register
         self.dcd_shreg = (self.dcd_shreg << 1) & 0xFFFFFFFF
@@ -254,16 +381,16 @@ class StreamingSAMEDecoder:
         elif correlation < 0 and self.dcd_integrator > -self.INTEGRATOR_MAX:
             self.dcd_integrator -= 1
         
-        # DLL: Check for bit transitions and adjust timing
+        # DLL: Check for bit transitions and adjust timing. Transitions are
+        # steered toward mid-phase (0x8000) so bits are sliced half a bit after
+        # the correlator flips, where the window lines up with a whole bit.
         if (self.dcd_shreg ^ (self.dcd_shreg >> 1)) & 1:
-            if self.sphase < 0x8000:
-                if self.sphase > self.sphaseinc // 2:
-                    adjustment = min(int(self.sphase * self.DLL_GAIN), 8192)
-                    self.sphase -= adjustment
-            else:
-                if self.sphase < 0x10000 - self.sphaseinc // 2:
-                    adjustment = min(int((0x10000 - self.sphase) * self.DLL_GAIN), 8192)
-                    self.sphase += adjustment
+            if self.sphase < 0x8000 - self.sphaseinc // 2:
+                adjustment = min(int((0x8000 - self.sphase) * self.DLL_GAIN), 8192)
+                self.sphase += adjustment
+            elif self.sphase > 0x8000 + self.sphaseinc // 2:
+                adjustment = min(int((self.sphase - 0x8000) * self.DLL_GAIN), 8192)
+                self.sphase -= adjustment
         
         # Advance sampling phase
         self.sphase += self.sphaseinc
@@ -306,6 +433,7 @@ class StreamingSAMEDecoder:
                             # Possible start of ZCZC
                             self.in_message = True
                             self.current_msg = [char]
+                            self._message_started_at = time.monotonic()
                         elif self.in_message:
                             self.current_msg.append(char)
                             
@@ -367,9 +495,11 @@ class StreamingSAMEDecoder:
         self.in_message = False
         self.synced = False
         self.bit_confidences = []
+        self._message_started_at = None
     
     def _emit_alert(self, msg_text: str) -> None:
         """Emit decoded alert via callback."""
+        emit_started = time.perf_counter()
         msg_text = msg_text.strip()
         
         # Calculate average confidence
@@ -383,7 +513,8 @@ class StreamingSAMEDecoder:
             message=msg_text,
             confidence=confidence,
             timestamp=utc_now(),
-            raw_bits=list(self.bit_confidences)
+            raw_bits=list(self.bit_confidences),
+            started_at=self._message_started_at,
         )
         
         self.alerts_detected += 1
@@ -399,6 +530,8 @@ class StreamingSAMEDecoder:
                 self.alert_callback(alert)
             except Exception as e:
                 logger.error(f"Error in alert callback: {e}", exc_info=True)
+
+        observe_latency(STAGE_EMIT_ALERT, time.perf_counter() - emit_started)
     
     def get_stats(self) -> dict:
         """Get decoder statistics."""
@@ -408,7 +541,11 @@ class StreamingSAMEDecoder:
             'bytes_decoded': self.bytes_decoded,
             'synced': self.synced,
             'in_message': self.in_message,
-            'current_message_length': len(self.current_msg)
+            'current_message_length': len(self.current_msg),
+            'energy_gate_enabled': self.energy_gate,
+            'gate_awake': self.gate_awake,
+            'gate_wakeups': self.gate_wakeups,
+            'samples_correlated': self.samples_correlated,
         }
 
 
@@ -0,0 +1,355 @@
+"""
+EAS Station - Emergency Alert System
+Copyright (c) 2025 Timothy Kramer (KR8MER)
+
+Streaming Attention-Tone Detector
+
+Real-time companion to StreamingSAMEDecoder that watches the same audio chunks
+for the EBS two-tone attention signal (853 Hz + 960 Hz) and the NWS 1050 Hz
+tone. The offline detectors in app_utils.eas_tone_detection only run on saved
+recordings; this detector keeps per-source state between calls so a tone that
+follows a garbled SAME header is still reported while it is on the air.
+
+PERFORMANCE: Each analysis window is reduced to a handful of DFT bins with a
+single matrix-vector product against a precomputed (Hann-windowed) basis. The
+cost is fixed per window regardless of chunk size or tone activity, which keeps
+it well under the streaming decoder's budget on a Raspberry Pi 4.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from app_utils import utc_now
+from app_utils.eas_tone_detection import EBS_TONE_FREQ_1, EBS_TONE_FREQ_2, NWS_TONE_FREQ
+
+logger = logging.getLogger(__name__)
+
+# Reference bins used to estimate the local noise floor (same ±150 Hz offsets
+# as the offline detector in app_utils.eas_tone_detection).
+_EBS_NOISE_FREQS = (
+    EBS_TONE_FREQ_1 - 150.0,
+    EBS_TONE_FREQ_1 + 150.0,
+    EBS_TONE_FREQ_2 - 150.0,
+    EBS_TONE_FREQ_2 + 150.0,
+)
+_NWS_NOISE_FREQS = (NWS_TONE_FREQ - 150.0, NWS_TONE_FREQ + 150.0)
+_NWS_HARMONIC_FREQS = (NWS_TONE_FREQ * 2, NWS_TONE_FREQ * 3)
+
+
+@dataclass
+class ToneEvent:
+    """Start or stop of an attention tone on a monitored source."""
+    tone_type: str  # 'ebs' or 'nws'
+    event: str  # 'start' or 'stop'
+    source_name: str
+    timestamp: datetime  # Wall-clock time the tone started/stopped on air
+    sample_offset: int  # Position in the source's sample stream
+    duration_seconds: float  # Tone duration so far (start) or total (stop)
+    snr_db: float
+
+    def to_dict(self) -> dict:
+        return {
+            'tone_type': self.tone_type,
+            'event': self.event,
+            'source_name': self.source_name,
+            'timestamp': self.timestamp.isoformat(),
+            'sample_offset': self.sample_offset,
+            'duration_seconds': self.duration_seconds,
+            'snr_db': self.snr_db,
+        }
+
+
+class _ToneTracker:
+    """Hysteresis state machine for one tone type."""
+
+    def __init__(self, tone_type: str, min_windows: int, release_windows: int):
+        self.tone_type = tone_type
+        self.min_windows = max(1, min_windows)
+        self.release_windows = max(1, release_windows)
+        self.reset()
+
+    def reset(self) -> None:
+        self.active_windows = 0
+        self.inactive_windows = 0
+        self.start_sample: Optional[int] = None
+        self.last_active_end: Optional[int] = None
+        self.reported = False
+        self.snr_sum = 0.0
+
+
+class StreamingToneDetector:
+    """
+    Real-time EBS two-tone and NWS 1050 Hz detector for one audio source.
+
+    Audio is accumulated into fixed analysis windows (100 ms by default), so
+    results do not depend on how callers chunk the stream. A tone is reported
+    once it has been present for its minimum duration (matching the offline
+    detector defaults) and is closed after a short release period of absence.
+
+    Usage:
+        detector = StreamingToneDetector(sample_rate=16000, source_name="wxr",
+                                         event_callback=handle_tone)
+        detector.process_samples(chunk)  # In the same loop as the SAME decoder
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        source_name: str = "unknown",
+        event_callback: Optional[Callable[[ToneEvent], None]] = None,
+        window_seconds: float = 0.1,
+        ebs_threshold_db: float = 10.0,
+        nws_threshold_db: float = 18.0,
+        ebs_min_duration: float = 0.5,
+        nws_min_duration: float = 2.0,
+        release_seconds: float = 0.3,
+    ):
+        """
+        Initialize streaming tone detector.
+
+        Args:
+            sample_rate: Audio sample rate in Hz
+            source_name: Name of the monitored source (reported in events)
+            event_callback: Function called with each ToneEvent
+            window_seconds: Analysis window length in seconds
+            ebs_threshold_db: Per-tone SNR required for the EBS two-tone
+            nws_threshold_db: SNR required for the NWS 1050 Hz tone
+            ebs_min_duration: Seconds of two-tone before a start event
+            nws_min_duration: Seconds of 1050 Hz before a start event
+            release_seconds: Seconds of absence before a stop event
+        """
+        self.sample_rate = sample_rate
+        self.source_name = source_name
+        self.event_callback = event_callback
+        self.ebs_threshold_db = ebs_threshold_db
+        self.nws_threshold_db = nws_threshold_db
+
+        self.window_len = max(16, int(round(window_seconds * sample_rate)))
+        self.window_seconds = self.window_len / float(sample_rate)
+
+        # Precompute Hann-windowed DFT basis for every bin we need. One matrix
+        # product per window replaces ~10 separate Goertzel passes.
+        freqs = [EBS_TONE_FREQ_1, EBS_TONE_FREQ_2, NWS_TONE_FREQ]
+        freqs.extend(_EBS_NOISE_FREQS)
+        freqs.extend(_NWS_NOISE_FREQS)
+        freqs.extend(_NWS_HARMONIC_FREQS)
+        nyquist = sample_rate / 2.0
+        self._freqs = np.array(freqs, dtype=np.float64)
+        self._valid_bins = self._freqs < nyquist
+        t = np.arange(self.window_len, dtype=np.float64) / sample_rate
+        hann = np.hanning(self.window_len)
+        phase = -2.0 * np.pi * np.outer(t, self._freqs)
+        self._basis = (hann[:, None] * np.exp(1j * phase)).astype(np.complex64)
+
+        self._idx_ebs1 = 0
+        self._idx_ebs2 = 1
+        self._idx_nws = 2
+        self._idx_ebs_noise = slice(3, 3 + len(_EBS_NOISE_FREQS))
+        nws_noise_start = 3 + len(_EBS_NOISE_FREQS)
+        self._idx_nws_noise = slice(nws_noise_start, nws_noise_start + len(_NWS_NOISE_FREQS))
+        harmonic_start = nws_noise_start + len(_NWS_NOISE_FREQS)
+        self._idx_harmonics = slice(harmonic_start, harmonic_start + len(_NWS_HARMONIC_FREQS))
+
+        release_windows = int(np.ceil(release_seconds / self.window_seconds))
+        self._trackers: Dict[str, _ToneTracker] = {
+            'ebs': _ToneTracker('ebs', int(np.ceil(ebs_min_duration / self.window_seconds)), release_windows),
+            'nws': _ToneTracker('nws', int(np.ceil(nws_min_duration / self.window_seconds)), release_windows),
+        }
+
+        self._reset_state()
+
+    def _reset_state(self) -> None:
+        """Reset windowing state, trackers and counters."""
+        self._window = np.zeros(self.window_len, dtype=np.float32)
+        self._window_fill = 0
+        for tracker in self._trackers.values():
+            tracker.reset()
+        self.samples_processed = 0
+        self.windows_analyzed = 0
+        self.events_emitted = 0
+        self.processing_seconds = 0.0
+
+    def reset(self) -> None:
+        """Reset detector to initial state (e.g. after a monitor restart)."""
+        self._reset_state()
+
+    def process_samples(self, samples: np.ndarray) -> List[ToneEvent]:
+        """
+        Process a chunk of audio samples.
+
+        Args:
+            samples: Audio samples as numpy array (float32, normalized to [-1.0, 1.0])
+
+        Returns:
+            List of ToneEvents emitted while processing this chunk
+        """
+        if samples is None or len(samples) == 0:
+            return []
+
+        started = time.perf_counter()
+        events: List[ToneEvent] = []
+        num_samples = len(samples)
+        idx = 0
+
+        while idx < num_samples:
+            take = min(self.window_len - self._window_fill, num_samples - idx)
+            self._window[self._window_fill:self._window_fill + take] = samples[idx:idx + take]
+            self._window_fill += take
+            idx += take
+            self.samples_processed += take
+
+            if self._window_fill == self.window_len:
+                self._window_fill = 0
+                self._analyze_window(events)
+
+        self.processing_seconds += time.perf_counter() - started
+        self._dispatch(events)
+        return events
+
+    def close(self) -> List[ToneEvent]:
+        """
+        End the current stream segment (e.g. the source lost a failover).
+
+        Tones still reported on the air get their stop event, and tracker and
+        partial-window state are dropped so audio fed later (after a failback)
+        is never stitched onto the old segment. Counters are kept.
+
+        Returns:
+            List of stop ToneEvents emitted
+        """
+        events: List[ToneEvent] = []
+        for tracker in self._trackers.values():
+            if tracker.reported:
+                events.append(self._make_event(tracker, 'stop', tracker.last_active_end))
+            tracker.reset()
+        self._window_fill = 0
+        self._dispatch(events)
+        return events
+
+    def _dispatch(self, events: List[ToneEvent]) -> None:
+        """Count events and hand them to the event callback."""
+        for event in events:
+            self.events_emitted += 1
+            if self.event_callback:
+                try:
+                    self.event_callback(event)
+                except Exception as e:
+                    logger.error(f"Error in tone event callback: {e}", exc_info=True)
+
+    def _analyze_window(self, events: List[ToneEvent]) -> None:
+        """Measure tone and reference bins for the current window and update trackers."""
+        self.windows_analyzed += 1
+        spectrum = self._window @ self._basis
+        powers = (spectrum.real * spectrum.real + spectrum.imag * spectrum.imag).astype(np.float64)
+        powers[~self._valid_bins] = 0.0
+
+        # EBS two-tone: both tones above the local noise floor at once
+        ebs_noise = max(float(np.median(powers[self._idx_ebs_noise])), 1e-10)
+        snr_853 = 10.0 * np.log10(max(powers[self._idx_ebs1], 1e-10) / ebs_noise)
+        snr_960 = 10.0 * np.log10(max(powers[self._idx_ebs2], 1e-10) / ebs_noise)
+        ebs_present = snr_853 > self.ebs_threshold_db and snr_960 > self.ebs_threshold_db
+
+        # NWS 1050 Hz: above the noise floor and harmonically pure
+        power_1050 = powers[self._idx_nws]
+        nws_noise = max(float(np.median(powers[self._idx_nws_noise])), 1e-10)
+        snr_1050 = 10.0 * np.log10(max(power_1050, 1e-10) / nws_noise)
+        fundamental_ratio = power_1050 / (power_1050 + float(np.sum(powers[self._idx_harmonics])) + 1e-10)
+        nws_present = (
+            snr_1050 > self.nws_threshold_db
+            and fundamental_ratio > 0.7
+            and min(fundamental_ratio * (snr_1050 / 20.0), 1.0) > 0.5
+            and not ebs_present
+        )
+
+        window_end = self.samples_processed
+        self._update_tracker(self._trackers['ebs'], ebs_present, (snr_853 + snr_960) / 2.0, window_end, events)
+        self._update_tracker(self._trackers['nws'], nws_present, snr_1050, window_end, events)
+
+    def _update_tracker(
+        self,
+        tracker: _ToneTracker,
+        present: bool,
+        snr_db: float,
+        window_end: int,
+        events: List[ToneEvent],
+    ) -> None:
+        """Advance one tone's start/stop state machine by one window."""
+        if present:
+            if tracker.start_sample is None:
+                tracker.start_sample = window_end - self.window_len
+                tracker.snr_sum = 0.0
+                tracker.active_windows = 0
+            tracker.active_windows += 1
+            tracker.inactive_windows = 0
+            tracker.last_active_end = window_end
+            tracker.snr_sum += float(snr_db)
+
+            if not tracker.reported and tracker.active_windows >= tracker.min_windows:
+                tracker.reported = True
+                events.append(self._make_event(tracker, 'start', tracker.start_sample))
+            return
+
+        if tracker.start_sample is None:
+            return
+
+        tracker.inactive_windows += 1
+        if tracker.inactive_windows < tracker.release_windows:
+            return
+
+        if tracker.reported:
+            events.append(self._make_event(tracker, 'stop', tracker.last_active_end))
+        tracker.reset()
+
+    def _make_event(self, tracker: _ToneTracker, kind: str, sample_offset: int) -> ToneEvent:
+        """Build a ToneEvent with a wall-clock timestamp for the given stream position."""
+        lag_seconds = (self.samples_processed - sample_offset) / float(self.sample_rate)
+        start = sample_offset if tracker.start_sample is None else tracker.start_sample
+        end = sample_offset if tracker.last_active_end is None else tracker.last_active_end
+        duration_samples = end - start
+        event = ToneEvent(
+            tone_type=tracker.tone_type,
+            event=kind,
+            source_name=self.source_name,
+            timestamp=utc_now() - timedelta(seconds=lag_seconds),
+            sample_offset=int(sample_offset),
+            duration_seconds=duration_samples / float(self.sample_rate),
+            snr_db=tracker.snr_sum / max(tracker.active_windows, 1),
+        )
+
+        log = logger.warning if kind == 'start' else logger.info
+        log(
+            f"📯 Attention tone {kind.upper()}: type={tracker.tone_type.upper()} "
+            f"source={self.source_name} duration={event.duration_seconds:.1f}s "
+            f"snr={event.snr_db:.1f}dB"
+        )
+        return event
+
+    def get_active_tones(self) -> List[str]:
+        """Return the tone types currently reported as on the air."""
+        return [name for name, tracker in self._trackers.items() if tracker.reported]
+
+    def get_stats(self) -> dict:
+        """Get detector statistics including per-source CPU cost."""
+        audio_seconds = self.samples_processed / float(self.sample_rate)
+        cpu_ratio = self.processing_seconds / audio_seconds if audio_seconds > 0 else 0.0
+        per_window_us = (
+            self.processing_seconds / self.windows_analyzed * 1e6 if self.windows_analyzed else 0.0
+        )
+        return {
+            'source_name': self.source_name,
+            'samples_processed': self.samples_processed,
+            'windows_analyzed': self.windows_analyzed,
+            'events_emitted': self.events_emitted,
+            'active_tones': self.get_active_tones(),
+            'processing_seconds': self.processing_seconds,
+            'cpu_percent_of_realtime': cpu_ratio * 100.0,
+            'microseconds_per_window': per_window_us,
+        }
+
+
+__all__ = ['StreamingToneDetector', 'ToneEvent']
@@ -148,7 +148,9 @@ def release_master_lock():
 
 
 def is_master_worker() -> bool:
-    """Check if this worker is the master."""
+    """Check if this worker is the master (and its Redis lease has not lapsed)."""
+    if _USE_REDIS and _redis_coordinator:
+        return _is_master_worker and _redis_coordinator.is_master_worker()
     return _is_master_worker
 
 
@@ -26,7 +26,7 @@ Architecture:
     Master Worker: Runs audio controller, broadcast pump, EAS monitor
     Slave Workers: Serve UI requests by reading shared metrics from Redis
 
-Coordination: Redis distributed locks (SETNX) with TTL
+Coordination: Fenced Redis lease (atomic Lua compare-and-set) with TTL
 Shared State: Redis hashes with automatic expiration
 Real-time Updates: Redis Pub/Sub for push-based UI updates
 
@@ -41,6 +41,8 @@ Benefits over file-based approach:
 import os
 import json
 import time
+import uuid
+import socket
 import logging
 import threading
 from typing import Optional, Dict, Any
@@ -58,6 +60,8 @@ REDIS_PASSWORD = os.getenv("REDIS_PASSWORD", None)
 
 # Redis keys
 MASTER_LOCK_KEY = "eas:master:lock"
+MASTER_TOKEN_KEY = "eas:master:token"  # Fencing token counter (never expires)
+MASTER_HANDOFF_KEY = "eas:master:handoff"  # Wakes standbys on a clean release
 METRICS_KEY = "eas:metrics"
 HEARTBEAT_CHANNEL = "eas:heartbeat"
 METRICS_UPDATE_CHANNEL = "eas:metrics:update"
@@ -66,10 +70,11 @@ METRICS_UPDATE_CHANNEL = "eas:metrics:update"
 MASTER_LOCK_TTL = 30  # Master lock expires after 30 seconds (auto-failover)
 HEARTBEAT_INTERVAL = 5.0  # Master updates heartbeat every 5 seconds
 METRICS_TTL = 60  # Metrics expire after 60 seconds if master dies
+HANDOFF_POLL_INTERVAL = 1.0  # Standby re-checks the lease at least this often
 
 # Global state
 _redis_client: Optional[redis.Redis] = None
-_is_master_worker: bool = False
+_lease: Optional["MasterLease"] = None
 _heartbeat_thread: Optional[threading.Thread] = None
 _heartbeat_stop_flag: threading.Event = threading.Event()
 
@@ -117,50 +122,306 @@ def get_redis_client() -> redis.Redis:
     return _redis_client
 
 
-def try_acquire_master_lock() -> bool:
+# Lease scripts.  Each runs atomically inside Redis, so checking the holder and
+# acting on it can never interleave with another worker's acquire/refresh.
+# The lease value is "<fencing token>:<owner id>"; the token comes from INCR on
+# MASTER_TOKEN_KEY and therefore grows with every new lease.
+ACQUIRE_SCRIPT = """
+local holder = redis.call('GET', KEYS[1])
+if holder then
+    return {0, redis.call('PTTL', KEYS[1])}
+end
+local token = redis.call('INCR', KEYS[2])
+redis.call('SET', KEYS[1], token .. ':' .. ARGV[1], 'PX', ARGV[2])
+return {token, tonumber(ARGV[2])}
+"""
+
+REFRESH_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    redis.call('DEL', KEYS[1])
+    redis.call('LPUSH', KEYS[2], ARGV[1])
+    redis.call('PEXPIRE', KEYS[2], ARGV[2])
+    return 1
+end
+return 0
+"""
+
+# Fenced metrics write: only the holder of the current lease (token included)
+# may replace the shared metrics, so a master that stalled past its lease
+# cannot overwrite its successor's state when it wakes up.
+WRITE_METRICS_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+redis.call('DEL', KEYS[2])
+redis.call('HSET', KEYS[2], unpack(ARGV, 4))
+redis.call('EXPIRE', KEYS[2], ARGV[2])
+redis.call('PUBLISH', ARGV[3], '1')
+return 1
+"""
+
+
+def _flatten_metrics(metrics: Dict[str, Any]) -> Dict[str, str]:
+    """Serialize nested dicts/lists to JSON (Redis hashes only hold flat strings)."""
+    flat_metrics = {}
+    for key, value in metrics.items():
+        if isinstance(value, (dict, list)):
+            flat_metrics[key] = json.dumps(value)
+        else:
+            flat_metrics[key] = str(value)
+    return flat_metrics
+
+
+class MasterLease:
     """
-    Try to acquire the master worker lock using Redis SETNX.
+    Fenced, time-bounded master lease on ``MASTER_LOCK_KEY``.
 
-    Uses Redis distributed locking with automatic expiration (TTL).
-    If master worker dies, lock expires and another worker can take over.
+    Acquire, refresh and release are single Lua scripts, so there is no window
+    between reading the holder and changing the key.  Each acquisition gets a
+    fencing token that is checked by every shared-state write.
 
-    Returns:
-        True if this worker acquired master lock, False otherwise
+    A worker only believes it is master until ``ttl_seconds`` (less a clock
+    drift allowance) after it *sent* its last successful acquire/refresh.  Redis
+    started the key's TTL later than that, so the worker stops acting as master
+    before any other worker can acquire the lease, even if its heartbeat thread
+    stalls for longer than the TTL.
     """
-    global _is_master_worker
 
-    try:
-        r = get_redis_client()
-        pid = os.getpid()
-
-        # Try to acquire lock with SETNX (SET if Not eXists)
-        # NX = only set if key doesn't exist
-        # EX = set expiration time in seconds
-        acquired = r.set(
-            MASTER_LOCK_KEY,
-            pid,
-            nx=True,  # Only set if doesn't exist
-            ex=MASTER_LOCK_TTL  # Expires after 30 seconds
+    def __init__(
+        self,
+        client: Optional[redis.Redis] = None,
+        owner_id: Optional[str] = None,
+        ttl_seconds: float = MASTER_LOCK_TTL,
+    ):
+        self._client = client
+        self.owner_id = owner_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.ttl_seconds = float(ttl_seconds)
+        self._ttl_ms = max(1, int(self.ttl_seconds * 1000))
+        # Redlock-style allowance for clock drift between this process and Redis
+        self._validity_seconds = self.ttl_seconds - (self.ttl_seconds * 0.01 + 0.002)
+
+        self._lock = threading.Lock()
+        self._scripts: Optional[Dict[str, Any]] = None
+        self._scripts_client: Optional[redis.Redis] = None
+        self._token: Optional[int] = None
+        self._acquired_at = 0.0
+        self._valid_until = 0.0
+        self._holder_ttl_ms = 0
+
+    def _redis(self) -> redis.Redis:
+        return self._client if self._client is not None else get_redis_client()
+
+    def _script(self, name: str):
+        r = self._redis()
+        if self._scripts is None or self._scripts_client is not r:
+            self._scripts = {
+                "acquire": r.register_script(ACQUIRE_SCRIPT),
+                "refresh": r.register_script(REFRESH_SCRIPT),
+                "release": r.register_script(RELEASE_SCRIPT),
+                "write_metrics": r.register_script(WRITE_METRICS_SCRIPT),
+            }
+            self._scripts_client = r
+        return self._scripts[name]
+
+    @property
+    def token(self) -> Optional[int]:
+        """Fencing token of the lease currently held, or None."""
+        with self._lock:
+            return self._token
+
+    @property
+    def value(self) -> Optional[str]:
+        """Lease value stored under ``MASTER_LOCK_KEY`` while held."""
+        with self._lock:
+            return None if self._token is None else f"{self._token}:{self.owner_id}"
+
+    def held(self, now: Optional[float] = None) -> bool:
+        """True while the lease is held and not past its local deadline."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            return self._token is not None and self._acquired_at <= now < self._valid_until
+
+    def acquire(self) -> bool:
+        """Take the lease if nobody holds it. Returns True on success."""
+        started = time.monotonic()
+        token, remaining_ms = self._script("acquire")(
+            keys=[MASTER_LOCK_KEY, MASTER_TOKEN_KEY],
+            args=[self.owner_id, self._ttl_ms],
         )
+        token = int(token)
+        with self._lock:
+            if not token:
+                self._holder_ttl_ms = int(remaining_ms)
+                return False
+            self._token = token
+            self._acquired_at = time.monotonic()
+            self._valid_until = started + self._validity_seconds
+            self._holder_ttl_ms = 0
+        return True
 
-        if acquired:
-            _is_master_worker = True
-            logger.info(f"✅ Worker PID {pid} acquired MASTER lock (TTL={MASTER_LOCK_TTL}s)")
+    def refresh(self) -> bool:
+        """Extend the lease; False (and demoted) if it is no longer ours."""
+        value = self.value
+        if value is None:
+            return False
+        started = time.monotonic()
+        if self._script("refresh")(keys=[MASTER_LOCK_KEY], args=[value, self._ttl_ms]):
+            with self._lock:
+                if self._token is not None:
+                    self._valid_until = started + self._validity_seconds
             return True
-        else:
-            # Lock held by another worker
-            current_master = r.get(MASTER_LOCK_KEY)
+        self._demote(value, "lease expired or taken over")
+        return False
+
+    def release(self) -> bool:
+        """Give the lease up and wake a standby waiting in ``wait()``."""
+        value = self.value
+        if value is None:
+            return False
+        # Stop acting as master before the key disappears
+        with self._lock:
+            self._token = None
+            self._valid_until = 0.0
+        return bool(self._script("release")(
+            keys=[MASTER_LOCK_KEY, MASTER_HANDOFF_KEY],
+            args=[value, self._ttl_ms],
+        ))
+
+    def write_metrics(self, metrics: Dict[str, Any]) -> bool:
+        """Replace the shared metrics if, and only if, our lease is current."""
+        value = self.value
+        if value is None:
+            return False
+        metrics["_heartbeat"] = time.time()
+        metrics["_master_pid"] = os.getpid()
+        metrics["_fencing_token"] = value.split(":", 1)[0]
+
+        fields = []
+        for key, field_value in _flatten_metrics(metrics).items():
+            fields.extend((key, field_value))
+        accepted = self._script("write_metrics")(
+            keys=[MASTER_LOCK_KEY, METRICS_KEY],
+            args=[value, METRICS_TTL, METRICS_UPDATE_CHANNEL, *fields],
+        )
+        if not accepted:
+            self._demote(value, "metrics write fenced off")
+            return False
+        return True
+
+    def wait(self, timeout: Optional[float] = None, stop_event: Optional[threading.Event] = None) -> bool:
+        """
+        Block until this worker holds the lease (standby mode).
+
+        Wakes as soon as the master releases the lease on a clean exit, or when
+        a dead master's lease expires.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if self.acquire():
+                return True
+            if stop_event is not None and stop_event.is_set():
+                return False
+            pause = HANDOFF_POLL_INTERVAL
+            if self._holder_ttl_ms >= 0:
+                # Wake when the holder's lease runs out (PTTL is -1 without expiry)
+                pause = min(pause, self._holder_ttl_ms / 1000.0)
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                pause = min(pause, remaining)
+            self._redis().blpop([MASTER_HANDOFF_KEY], timeout=max(pause, 0.01))
+
+    def run_heartbeat(self, metrics_getter_fn, stop_event: threading.Event,
+                      interval: Optional[float] = None) -> None:
+        """Refresh the lease and publish metrics until stopped or the lease is lost."""
+        if interval is None:
+            interval = min(HEARTBEAT_INTERVAL, self.ttl_seconds / 3.0)
+        while not stop_event.wait(timeout=interval):
+            try:
+                if not self.refresh():
+                    logger.error("❌ Lost master lock, stopping heartbeat")
+                    break
+
+                metrics = metrics_getter_fn()
+                if metrics and not self.write_metrics(metrics):
+                    logger.error("❌ Metrics write rejected by fencing token, stopping heartbeat")
+                    break
+
+            except Exception as e:
+                logger.error(f"Error in heartbeat loop: {e}")
+
+    def _demote(self, value: str, reason: str) -> None:
+        with self._lock:
+            if self._token is not None and f"{self._token}:{self.owner_id}" == value:
+                self._token = None
+                self._valid_until = 0.0
+                logger.error(f"❌ Lost master lease {value}: {reason}")
+
+
+def _get_lease() -> MasterLease:
+    global _lease
+    if _lease is None:
+        _lease = MasterLease()
+    return _lease
+
+
+def try_acquire_master_lock() -> bool:
+    """
+    Try to acquire the fenced master lease.
+
+    If the master worker dies, its lease expires and another worker can take
+    over; a clean exit hands the lease over immediately (see ``release_master_lock``).
+
+    Returns:
+        True if this worker acquired master lock, False otherwise
+    """
+    try:
+        lease = _get_lease()
+        if lease.acquire():
             logger.info(
-                f"Worker PID {pid} running as SLAVE "
-                f"(master lock held by PID {current_master})"
+                f"✅ Worker PID {os.getpid()} acquired MASTER lock "
+                f"(token={lease.token}, TTL={MASTER_LOCK_TTL}s)"
             )
-            return False
+            return True
+
+        current_master = lease._redis().get(MASTER_LOCK_KEY)
+        logger.info(
+            f"Worker PID {os.getpid()} running as SLAVE "
+            f"(master lock held by {current_master})"
+        )
+        return False
 
     except RedisError as e:
         logger.error(f"Redis error during master lock acquisition: {e}")
         return False
 
 
+def wait_for_master_lock(timeout: Optional[float] = None,
+                         stop_event: Optional[threading.Event] = None) -> bool:
+    """
+    Wait as a hot standby until this worker becomes master.
+
+    Returns:
+        True once the lease is held, False on timeout or when ``stop_event`` is set
+    """
+    try:
+        acquired = _get_lease().wait(timeout=timeout, stop_event=stop_event)
+    except RedisError as e:
+        logger.error(f"Redis error while waiting for master lock: {e}")
+        return False
+    if acquired:
+        logger.info(f"✅ Worker PID {os.getpid()} took over MASTER lock (token={_get_lease().token})")
+    return acquired
+
+
 def refresh_master_lock() -> bool:
     """
     Refresh the master lock TTL (called periodically by heartbeat).
@@ -168,110 +429,63 @@ def refresh_master_lock() -> bool:
     Returns:
         True if lock was refreshed, False if lock lost
     """
-    global _is_master_worker
-
-    if not _is_master_worker:
+    if _lease is None:
         return False
 
     try:
-        r = get_redis_client()
-        pid = os.getpid()
-
-        # Check if we still own the lock
-        current_master = r.get(MASTER_LOCK_KEY)
-
-        if current_master != str(pid):
-            logger.error(
-                f"❌ Lost master lock! Current master: {current_master}, our PID: {pid}"
-            )
-            _is_master_worker = False
-            return False
-
-        # Refresh TTL
-        r.expire(MASTER_LOCK_KEY, MASTER_LOCK_TTL)
-        return True
-
+        return _lease.refresh()
     except RedisError as e:
         logger.error(f"Redis error during lock refresh: {e}")
         return False
 
 
 def release_master_lock():
-    """Release the master worker lock."""
-    global _is_master_worker
-
-    if not _is_master_worker:
+    """Release the master worker lock, handing it straight to a waiting standby."""
+    if _lease is None:
         return
 
     try:
-        r = get_redis_client()
-        pid = os.getpid()
-
-        # Only delete if we own the lock (atomic check-and-delete)
-        current_master = r.get(MASTER_LOCK_KEY)
-        if current_master == str(pid):
-            r.delete(MASTER_LOCK_KEY)
-            logger.info(f"Worker PID {pid} released master lock")
-        else:
-            logger.warning(
-                f"Cannot release master lock - owned by PID {current_master}, not {pid}"
-            )
-
+        if _lease.release():
+            logger.info(f"Worker PID {os.getpid()} released master lock")
     except RedisError as e:
         logger.error(f"Redis error during lock release: {e}")
-    finally:
-        _is_master_worker = False
 
 
 def is_master_worker() -> bool:
-    """Check if this worker is the master."""
-    return _is_master_worker
+    """Check if this worker is the master (holds an unexpired lease)."""
+    return _lease is not None and _lease.held()
 
 
-def write_shared_metrics(metrics: Dict[str, Any]):
+def get_fencing_token() -> Optional[int]:
+    """Fencing token of this worker's lease, or None when not master."""
+    return _lease.token if _lease is not None and _lease.held() else None
+
+
+def write_shared_metrics(metrics: Dict[str, Any]) -> bool:
     """
     Write metrics to Redis for all workers to read.
 
     Should only be called by master worker.
 
-    Uses Redis hash with automatic expiration. Much faster and more
-    reliable than file-based approach.
+    The write is a single script that first checks this worker's lease and
+    fencing token, so a stale master's write is rejected rather than
+    clobbering the current master's metrics.
 
     Args:
         metrics: Dictionary of metrics to write
+
+    Returns:
+        True if the metrics were written
     """
-    if not _is_master_worker:
+    if not is_master_worker():
         logger.warning("write_shared_metrics() called by non-master worker, ignoring")
-        return
+        return False
 
     try:
-        r = get_redis_client()
-
-        # Add metadata
-        metrics["_heartbeat"] = time.time()
-        metrics["_master_pid"] = os.getpid()
-
-        # Serialize nested dicts to JSON strings
-        # Redis hashes only support flat key-value pairs
-        flat_metrics = {}
-        for key, value in metrics.items():
-            if isinstance(value, (dict, list)):
-                flat_metrics[key] = json.dumps(value)
-            else:
-                flat_metrics[key] = value
-
-        # Store in Redis hash with pipeline for atomicity
-        pipe = r.pipeline()
-        pipe.delete(METRICS_KEY)  # Clear old metrics
-        pipe.hset(METRICS_KEY, mapping=flat_metrics)  # Set new metrics
-        pipe.expire(METRICS_KEY, METRICS_TTL)  # Auto-expire if master dies
-        pipe.execute()
-
-        # Publish notification to subscribers (for real-time UI updates)
-        r.publish(METRICS_UPDATE_CHANNEL, "1")
-
+        return _lease.write_metrics(metrics)
     except RedisError as e:
         logger.error(f"Failed to write shared metrics to Redis: {e}")
+        return False
 
 
 def read_shared_metrics() -> Optional[Dict[str, Any]]:
@@ -332,29 +546,14 @@ def start_heartbeat_writer(metrics_getter_fn):
     """
     global _heartbeat_thread
 
-    if not _is_master_worker:
+    if not is_master_worker():
         logger.warning("start_heartbeat_writer() called by non-master worker, ignoring")
         return
 
     def heartbeat_loop():
         """Background thread that writes metrics and refreshes lock."""
         logger.info("Master worker heartbeat thread started (Redis-based)")
-
-        while not _heartbeat_stop_flag.wait(timeout=HEARTBEAT_INTERVAL):
-            try:
-                # Refresh master lock TTL
-                if not refresh_master_lock():
-                    logger.error("❌ Lost master lock, stopping heartbeat")
-                    break
-
-                # Write metrics to Redis
-                metrics = metrics_getter_fn()
-                if metrics:
-                    write_shared_metrics(metrics)
-
-            except Exception as e:
-                logger.error(f"Error in heartbeat loop: {e}")
-
+        _lease.run_heartbeat(metrics_getter_fn, _heartbeat_stop_flag)
         logger.info("Master worker heartbeat thread stopped")
 
     _heartbeat_stop_flag.clear()
@@ -384,7 +583,8 @@ def cleanup_coordinator():
     release_master_lock()
 
     # Close Redis connection
-    global _redis_client
+    global _redis_client, _lease
+    _lease = None
     if _redis_client is not None:
         try:
             _redis_client.close()
@@ -0,0 +1,460 @@
+"""
+EAS Station - Emergency Alert System
+Copyright (c) 2025 Timothy Kramer (KR8MER)
+
+This file is part of EAS Station.
+
+EAS Station is dual-licensed software:
+- GNU Affero General Public License v3 (AGPL-3.0) for open-source use
+- Commercial License for proprietary use
+
+You should have received a copy of both licenses with this software.
+For more information, see LICENSE and LICENSE-COMMERCIAL files.
+
+IMPORTANT: This software cannot be rebranded or have attribution removed.
+See NOTICE file for complete terms.
+
+Repository: https://github.com/KR8MER/eas-station
+"""
+
+from __future__ import annotations
+
+"""Streaming bulk import of GeoJSON boundary files.
+
+Before this module, an upload was decoded in one piece, and each feature cost
+one ``SELECT ST_GeomFromGeoJSON(...)`` round trip before being added to the
+session.  The importer here works differently:
+
+* ``iter_json_array_items`` reads features one at a time from the uploaded
+  file on disk.
+* Geometry structure is checked in Python.
+* Rows are written in batches of ``BATCH_SIZE`` with one multi-row ``INSERT``
+  each.  PostGIS builds the geometry inside that statement.
+
+A batch the database rejects is retried row by row, each row in its own
+savepoint, so one bad polygon costs only itself.  The whole file is
+committed as one transaction.
+
+``start_boundary_import`` runs an import on a background thread.  It returns
+a ``BoundaryImportJob`` at once, and the job's progress is persisted as JSON
+so any worker process can report it.
+"""
+
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import bindparam, func
+from sqlalchemy.exc import SQLAlchemyError
+
+from app_utils import utc_now
+from app_utils.optimized_parsing import JSONDecodeError, iter_json_array_items, json_dumps, json_loads
+
+from .boundaries import extract_name_and_description
+from .extensions import db
+from .models import Boundary
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 10
+PROGRESS_INTERVAL_SECONDS = 0.5
+JOB_MAX_AGE_SECONDS = 24 * 3600
+
+# Shared by all workers, like the alert verification progress store
+JOB_DIR = os.path.join(tempfile.gettempdir(), "boundary_imports")
+
+# Nesting depth of ``coordinates`` for each GeoJSON geometry type
+_COORDINATE_DEPTHS = {
+    "Point": 0,
+    "MultiPoint": 1,
+    "LineString": 1,
+    "MultiLineString": 2,
+    "Polygon": 2,
+    "MultiPolygon": 3,
+}
+
+
+def validate_geometry(geometry: Any) -> Optional[str]:
+    """Describe what is structurally wrong with a GeoJSON geometry, or None if it is usable."""
+    if not geometry:
+        return "No geometry"
+    if not isinstance(geometry, dict):
+        return "Geometry is not an object"
+
+    geometry_type = geometry.get("type")
+    if geometry_type == "GeometryCollection":
+        members = geometry.get("geometries")
+        if not isinstance(members, list) or not members:
+            return "GeometryCollection has no geometries"
+        for member in members:
+            problem = validate_geometry(member)
+            if problem:
+                return problem
+        return None
+
+    depth = _COORDINATE_DEPTHS.get(geometry_type)
+    if depth is None:
+        return f"Unsupported geometry type {geometry_type!r}"
+    return _check_coordinates(geometry.get("coordinates"), depth, geometry_type)
+
+
+def _check_coordinates(coordinates: Any, depth: int, geometry_type: str) -> Optional[str]:
+    if depth == 0:
+        if (
+            not isinstance(coordinates, list)
+            or len(coordinates) < 2
+            or not all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in coordinates)
+        ):
+            return f"Invalid {geometry_type} position"
+        return None
+
+    if not isinstance(coordinates, list) or not coordinates:
+        return f"Empty {geometry_type} coordinates"
+    for part in coordinates:
+        problem = _check_coordinates(part, depth - 1, geometry_type)
+        if problem:
+            return problem
+
+    if depth == 1 and geometry_type in ("LineString", "MultiLineString") and len(coordinates) < 2:
+        return f"{geometry_type} needs at least two positions"
+    if depth == 1 and geometry_type in ("Polygon", "MultiPolygon"):
+        if len(coordinates) < 4:
+            return f"{geometry_type} ring needs at least four positions"
+        if coordinates[0] != coordinates[-1]:
+            return f"{geometry_type} ring is not closed"
+    return None
+
+
+@dataclass
+class ImportStats:
+    """Running totals of one import."""
+
+    features_read: int = 0
+    boundaries_added: int = 0
+    error_count: int = 0
+    errors: List[str] = field(default_factory=list)
+
+    def add_error(self, message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(message)
+
+
+def _insert_statement():
+    return Boundary.__table__.insert().values(
+        name=bindparam("name"),
+        type=bindparam("type"),
+        description=bindparam("description"),
+        geom=func.ST_SetSRID(func.ST_GeomFromGeoJSON(bindparam("geometry")), 4326),
+        created_at=bindparam("created_at"),
+        updated_at=bindparam("updated_at"),
+    )
+
+
+def _feature_row(feature: Any, boundary_type: str, now) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    if not isinstance(feature, dict):
+        return None, "Not a GeoJSON feature"
+    geometry = feature.get("geometry")
+    problem = validate_geometry(geometry)
+    if problem:
+        return None, problem
+
+    properties = feature.get("properties", {}) or {}
+    name, description = extract_name_and_description(properties, boundary_type)
+    return {
+        "name": name,
+        "type": boundary_type,
+        "description": description,
+        "geometry": json_dumps(geometry),
+        "created_at": now,
+        "updated_at": now,
+    }, None
+
+
+def _database_error(exc: SQLAlchemyError) -> str:
+    message = str(getattr(exc, "orig", None) or exc).strip()
+    return message.splitlines()[0] if message else exc.__class__.__name__
+
+
+def _insert_batch(statement, batch: List[Tuple[int, Dict[str, Any]]], stats: ImportStats) -> None:
+    try:
+        with db.session.begin_nested():
+            db.session.execute(statement, [row for _, row in batch])
+        stats.boundaries_added += len(batch)
+        return
+    except SQLAlchemyError as exc:
+        logger.debug("Boundary batch rejected (%s); inserting its features one at a time", _database_error(exc))
+
+    for index, row in batch:
+        try:
+            with db.session.begin_nested():
+                db.session.execute(statement, row)
+            stats.boundaries_added += 1
+        except SQLAlchemyError as exc:
+            stats.add_error(f"Feature {index}: {_database_error(exc)}")
+
+
+def insert_boundary_features(
+    features: Iterable[Any],
+    boundary_type: str,
+    *,
+    batch_size: int = BATCH_SIZE,
+    on_batch: Optional[Callable[[ImportStats], None]] = None,
+) -> ImportStats:
+    """Validate and insert GeoJSON features as boundaries of ``boundary_type``.
+
+    Rows are written in the current transaction; the caller commits or rolls
+    back.  ``on_batch`` is called with the running totals after each batch.
+    """
+    statement = _insert_statement()
+    stats = ImportStats()
+    now = utc_now()
+    batch: List[Tuple[int, Dict[str, Any]]] = []
+
+    for index, feature in enumerate(features, start=1):
+        stats.features_read = index
+        row, problem = _feature_row(feature, boundary_type, now)
+        if problem:
+            stats.add_error(f"Feature {index}: {problem}")
+            continue
+        batch.append((index, row))
+        if len(batch) >= batch_size:
+            _insert_batch(statement, batch, stats)
+            batch = []
+            if on_batch:
+                on_batch(stats)
+
+    if batch:
+        _insert_batch(statement, batch, stats)
+    if on_batch:
+        on_batch(stats)
+    return stats
+
+
+def _job_path(job_id: str) -> str:
+    safe_id = "".join(ch for ch in job_id if ch.isalnum() or ch in {"-", "_"})
+    return os.path.join(JOB_DIR, f"{safe_id}.json")
+
+
+@dataclass
+class BoundaryImportJob:
+    """Status of one background import, persisted so any worker can report it."""
+
+    job_id: str
+    boundary_type: str
+    display_label: str
+    filename: str
+    status: str = "queued"
+    message: str = "Waiting to start"
+    bytes_total: int = 0
+    bytes_read: int = 0
+    features_read: int = 0
+    boundaries_added: int = 0
+    error_count: int = 0
+    errors: List[str] = field(default_factory=list)
+    created_at: Optional[str] = None
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    elapsed_seconds: float = 0.0
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    @property
+    def percent(self) -> int:
+        if self.status == "completed":
+            return 100
+        if not self.bytes_total:
+            return 0
+        return min(99, int(self.bytes_read * 100 / self.bytes_total))
+
+    def record(self, stats: ImportStats) -> None:
+        self.features_read = stats.features_read
+        self.boundaries_added = stats.boundaries_added
+        self.error_count = stats.error_count
+        self.errors = list(stats.errors)
+
+    def save(self) -> None:
+        """Write the job status atomically."""
+        os.makedirs(JOB_DIR, exist_ok=True)
+        target = _job_path(self.job_id)
+        temp_path = f"{target}.{uuid.uuid4().hex}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as handle:
+            handle.write(json_dumps(asdict(self)))
+        os.replace(temp_path, target)
+
+    @classmethod
+    def load(cls, job_id: str) -> Optional["BoundaryImportJob"]:
+        try:
+            with open(_job_path(job_id), "r", encoding="utf-8") as handle:
+                return cls(**json_loads(handle.read()))
+        except FileNotFoundError:
+            return None
+        except (OSError, TypeError, ValueError):  # pragma: no cover - defensive
+            return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Status payload; finished imports also carry the former upload response keys."""
+        payload = asdict(self)
+        payload["percent"] = self.percent
+        payload["finished"] = self.finished
+        if self.status == "completed":
+            payload["success"] = self.message
+            payload["total_features"] = self.features_read
+            if self.error_count:
+                payload["warning"] = f"{self.error_count} features had errors"
+        elif self.status == "failed":
+            payload["error"] = self.message
+        return payload
+
+
+def cleanup_old_jobs(max_age_seconds: int = JOB_MAX_AGE_SECONDS) -> None:
+    """Remove status files of imports older than ``max_age_seconds``."""
+    cutoff = time.time() - max_age_seconds
+    try:
+        names = os.listdir(JOB_DIR)
+    except OSError:
+        return
+    for name in names:
+        path = os.path.join(JOB_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            continue
+
+
+def run_boundary_import(job: BoundaryImportJob, path: str, *, batch_size: int = BATCH_SIZE) -> BoundaryImportJob:
+    """Import the GeoJSON file at ``path`` in one transaction, recording progress on ``job``.
+
+    Must run inside an application context.
+    """
+    started = time.monotonic()
+    job.status = "running"
+    job.message = "Importing features"
+    job.started_at = utc_now().isoformat()
+    job.bytes_total = os.path.getsize(path)
+    job.save()
+
+    try:
+        with open(path, "rb") as handle:
+            last_saved = time.monotonic()
+
+            def _progress(stats: ImportStats) -> None:
+                nonlocal last_saved
+                job.record(stats)
+                job.bytes_read = handle.tell()
+                if time.monotonic() - last_saved >= PROGRESS_INTERVAL_SECONDS:
+                    job.elapsed_seconds = round(time.monotonic() - started, 3)
+                    job.save()
+                    last_saved = time.monotonic()
+
+            stats = insert_boundary_features(
+                iter_json_array_items(handle, "features"),
+                job.boundary_type,
+                batch_size=batch_size,
+                on_batch=_progress,
+            )
+        db.session.commit()
+    except (JSONDecodeError, UnicodeDecodeError) as exc:
+        db.session.rollback()
+        job.status = "failed"
+        if isinstance(exc, UnicodeDecodeError):
+            job.message = "Unable to decode file. Please ensure it is UTF-8 encoded."
+        else:
+            job.message = f"Invalid GeoJSON format: {exc}"
+    except Exception as exc:
+        db.session.rollback()
+        logger.error("Boundary import %s failed: %s", job.job_id, exc, exc_info=True)
+        job.status = "failed"
+        job.message = f"Database error: {exc}"
+    else:
+        job.record(stats)
+        job.status = "completed"
+        job.message = f"Successfully uploaded {stats.boundaries_added} {job.display_label} boundaries"
+        logger.info(
+            "Imported %s %s boundaries from %s (%s features, %s errors) in %.1fs",
+            stats.boundaries_added,
+            job.display_label,
+            job.filename,
+            stats.features_read,
+            stats.error_count,
+            time.monotonic() - started,
+        )
+
+    if job.status == "failed":
+        # Nothing from a failed import was committed
+        job.boundaries_added = 0
+    job.finished_at = utc_now().isoformat()
+    job.elapsed_seconds = round(time.monotonic() - started, 3)
+    job.save()
+    return job
+
+
+def _import_worker(app, job: BoundaryImportJob, path: str) -> None:
+    try:
+        with app.app_context():
+            try:
+                run_boundary_import(job, path)
+            finally:
+                db.session.remove()
+    finally:
+        try:
+            os.unlink(path)
+        except OSError as exc:
+            logger.debug("Failed to remove boundary upload %s: %s", path, exc)
+
+
+def start_boundary_import(app, path: str, boundary_type: str, display_label: str, filename: str) -> BoundaryImportJob:
+    """Import ``path`` on a background thread, which deletes the file when done.
+
+    Raises:
+        RuntimeError: If the thread cannot be started (the job is marked failed)
+    """
+    cleanup_old_jobs()
+    job = BoundaryImportJob(
+        job_id=uuid.uuid4().hex,
+        boundary_type=boundary_type,
+        display_label=display_label,
+        filename=filename,
+        created_at=utc_now().isoformat(),
+    )
+    job.save()
+
+    thread = threading.Thread(
+        target=_import_worker,
+        args=(app, job, path),
+        name=f"boundary-import-{job.job_id[:8]}",
+        daemon=True,
+    )
+    try:
+        thread.start()
+    except RuntimeError:
+        job.status = "failed"
+        job.message = "Unable to start the import"
+        job.save()
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+        raise
+    return job
+
+
+__all__ = [
+    "BATCH_SIZE",
+    "BoundaryImportJob",
+    "ImportStats",
+    "cleanup_old_jobs",
+    "insert_boundary_features",
+    "run_boundary_import",
+    "start_boundary_import",
+    "validate_geometry",
+]
@@ -0,0 +1,597 @@
+"""
+EAS Station - Emergency Alert System
+Copyright (c) 2025 Timothy Kramer (KR8MER)
+
+This file is part of EAS Station.
+
+EAS Station is dual-licensed software:
+- GNU Affero General Public License v3 (AGPL-3.0) for open-source use
+- Commercial License for proprietary use
+
+You should have received a copy of both licenses with this software.
+For more information, see LICENSE and LICENSE-COMMERCIAL files.
+
+IMPORTANT: This software cannot be rebranded or have attribution removed.
+See NOTICE file for complete terms.
+
+Repository: https://github.com/KR8MER/eas-station
+"""
+
+from __future__ import annotations
+
+"""Materialized statistics for the ``/stats`` dashboard.
+
+The dashboard used to run about fifteen aggregate queries on every view.
+``DashboardStatsSnapshot`` keeps those aggregates in memory and serves them
+from there.  To find out whether anything changed it runs one stamp query of
+index-backed high-water marks (alert id and ``updated_at``, boundaries,
+intersection and poll history ids), at most every ``refresh_interval``
+seconds.  Row counts, which need a table scan, are compared only every
+``count_check_interval`` seconds to notice deletions made by other processes;
+writers in this process call ``invalidate_dashboard_stats()`` instead.
+
+When the alert marks move, the alert aggregates are recomputed in the
+database with a few grouped queries; no alert rows are streamed into Python
+beyond the newest ``recent_limit`` and the alerts that have not expired yet.
+The poller touches ``updated_at`` of every alert still in its feed, so this
+happens about once per poll, not once per view.  New intersections are folded
+in incrementally, and changed boundaries and new poll runs re-read only
+their own section.  Active and expired counts depend on the time of the
+request, so they are derived per view from the expiry times still in the
+future at the last refresh.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import case, func, select
+
+from app_core.extensions import db
+from app_core.models import Boundary, CAPAlert, Intersection, PollHistory
+from app_utils import utc_now
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REFRESH_INTERVAL = 5.0
+COUNT_CHECK_INTERVAL = 300.0
+RECENT_ALERT_LIMIT = 2500
+POLL_HISTORY_LIMIT = 200
+
+_POLL_SUCCESS_VALUES = {"success", "ok", "completed"}
+
+_RECENT_COLUMNS = (
+    CAPAlert.id,
+    CAPAlert.identifier,
+    CAPAlert.sent,
+    CAPAlert.expires,
+    CAPAlert.severity,
+    CAPAlert.status,
+    CAPAlert.event,
+    CAPAlert.source,
+)
+
+# (id, identifier, sent, expires, severity, status, event, source)
+_RecentAlert = Tuple[int, str, Optional[datetime], Optional[datetime], Optional[str], str, str, Optional[str]]
+
+_MIN_TIME = datetime.min.replace(tzinfo=timezone.utc)
+
+
+def _as_utc(moment: datetime) -> datetime:
+    """Comparable instant; naive database values are UTC."""
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+def empty_dashboard_stats() -> Dict[str, Any]:
+    """Template context for a dashboard without data."""
+    return {
+        "total_boundaries": 0,
+        "total_alerts": 0,
+        "active_alerts": 0,
+        "expired_alerts": 0,
+        "boundary_stats": [],
+        "alert_by_status": [],
+        "alert_by_severity": [],
+        "alert_by_event": [],
+        "alert_by_hour": [0] * 24,
+        "alert_by_dow": [0] * 7,
+        "alert_by_month": [0] * 12,
+        "alert_by_year": [],
+        "most_affected_boundaries": [],
+        "duration_stats": [],
+        "avg_durations": [],
+        "recent_by_day": [],
+        "alert_events": [],
+        "daily_alerts": [],
+        "dow_hour_matrix": [[0] * 24 for _ in range(7)],
+        "lifecycle_timeline": [],
+        "filter_options": {"severities": [], "statuses": [], "events": []},
+        "polling": {"success_rate": 0, "total_runs": 0, "failed_runs": 0, "recent_runs": []},
+    }
+
+
+class DashboardStatsSnapshot:
+    """In-memory dashboard aggregates, refreshed from database high-water marks."""
+
+    def __init__(
+        self,
+        *,
+        refresh_interval: float = DEFAULT_REFRESH_INTERVAL,
+        count_check_interval: float = COUNT_CHECK_INTERVAL,
+        recent_limit: int = RECENT_ALERT_LIMIT,
+        poll_limit: int = POLL_HISTORY_LIMIT,
+    ):
+        """Initialize an empty snapshot; the first ``get()`` builds it.
+
+        Args:
+            refresh_interval: Seconds between stamp queries; 0 checks on every view
+            count_check_interval: Seconds between row-count checks for deletions
+            recent_limit: Newest alerts listed in the event explorer
+            poll_limit: Poll runs summarized in the polling section
+        """
+        self.refresh_interval = refresh_interval
+        self.count_check_interval = count_check_interval
+        self.recent_limit = recent_limit
+        self.poll_limit = poll_limit
+
+        self._lock = threading.RLock()
+        self._stamp: Optional[Tuple[Any, ...]] = None
+        self._checked_at: Optional[float] = None
+        self._counts_checked_at: Optional[float] = None
+        self._payload: Optional[Dict[str, Any]] = None
+        self.version = 0
+
+        self.full_builds = 0
+        self.incremental_refreshes = 0
+        self.alert_recomputes = 0
+        self.stamp_checks = 0
+
+        self._reset_alerts()
+        self._boundaries: Dict[int, Tuple[str, str]] = {}
+        self._intersections: Counter = Counter()
+        self._intersection_count = 0
+        self._intersection_high_water: Optional[int] = None
+        self._polling: Dict[str, Any] = empty_dashboard_stats()["polling"]
+
+    # ------------------------------------------------------------------ public
+
+    def get(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Template context for ``stats.html``, refreshed if the database changed."""
+        with self._lock:
+            if self._needs_check():
+                self.refresh()
+            stats = dict(self._payload or empty_dashboard_stats())
+            stats.update(self._live_counts(_as_utc(now or utc_now())))
+            return stats
+
+    def etag(self, now: Optional[datetime] = None) -> str:
+        """Validator for the current snapshot, including the time-dependent counts."""
+        with self._lock:
+            if self._needs_check():
+                self.refresh()
+            counts = self._live_counts(_as_utc(now or utc_now()))
+            return f"stats-{self.version}-{counts['active_alerts']}-{counts['expired_alerts']}"
+
+    def invalidate(self) -> None:
+        """Check the database, row counts included, on the next view."""
+        with self._lock:
+            self._checked_at = None
+            self._counts_checked_at = None
+
+    def refresh(self) -> bool:
+        """Bring the snapshot up to date with the database.
+
+        Returns:
+            True if anything changed
+        """
+        with self._lock:
+            self.stamp_checks += 1
+            self._checked_at = time.monotonic()
+            try:
+                return self._refresh()
+            except Exception as exc:
+                db.session.rollback()
+                # Sections may be half-updated; rebuild everything on the next check
+                self._stamp = None
+                self._counts_checked_at = None
+                self._intersection_high_water = None
+                if self._payload is None:
+                    raise
+                logger.error("Failed to refresh dashboard statistics; serving the previous snapshot: %s", exc)
+                return False
+
+    def _refresh(self) -> bool:
+        stamp = tuple(db.session.execute(_stamp_query()).one())
+        counts: Optional[Tuple[int, int]] = None
+        if (
+            self._counts_checked_at is None
+            or time.monotonic() - self._counts_checked_at >= self.count_check_interval
+        ):
+            counts = tuple(db.session.execute(_count_query()).one())
+            self._counts_checked_at = time.monotonic()
+
+        first_build = self._payload is None
+        previous = self._stamp or (None,) * len(stamp)
+        (alert_max_id, alert_updated,
+         boundary_count, boundary_max_id, boundary_updated,
+         intersection_max_id, poll_max_id) = stamp
+
+        alerts_changed = first_build or previous[0:2] != (alert_max_id, alert_updated)
+        intersections_changed = first_build or previous[5] != intersection_max_id
+        if counts is not None:
+            alerts_changed = alerts_changed or counts[0] != self._alert_count
+            intersections_changed = intersections_changed or counts[1] != self._intersection_count
+        boundaries_changed = first_build or previous[2:5] != (boundary_count, boundary_max_id, boundary_updated)
+        polling_changed = first_build or previous[6] != poll_max_id
+
+        self._stamp = stamp
+        if not (alerts_changed or intersections_changed or boundaries_changed or polling_changed):
+            return False
+
+        if alerts_changed:
+            self._load_alerts()
+        if boundaries_changed:
+            self._load_boundaries()
+        if intersections_changed:
+            self._refresh_intersections(counts[1] if counts is not None else None)
+        if polling_changed:
+            self._load_polling()
+
+        if first_build:
+            self.full_builds += 1
+        else:
+            self.incremental_refreshes += 1
+        self._payload = self._build_payload()
+        self.version += 1
+        return True
+
+    # ------------------------------------------------------------------ alerts
+
+    def _needs_check(self) -> bool:
+        return (
+            self._payload is None
+            or self._checked_at is None
+            or time.monotonic() - self._checked_at >= self.refresh_interval
+        )
+
+    def _reset_alerts(self) -> None:
+        self._alert_count = 0
+        self._by_status: Counter = Counter()
+        self._by_severity: Counter = Counter()
+        self._by_event: Counter = Counter()
+        self._by_hour = [0] * 24
+        self._by_dow = [0] * 7
+        self._by_month = [0] * 12
+        self._by_year: Counter = Counter()
+        # event -> [count, total, minimum, maximum] of durations in hours
+        self._durations: Dict[str, List[float]] = {}
+        # Alerts already expired at the last refresh; expiries after it, sorted
+        self._expired_before = 0
+        self._future_expiries: List[datetime] = []
+        self._future_active_expiries: List[datetime] = []
+        self._active_without_expiry = 0
+        self._recent: List[_RecentAlert] = []
+
+    def _load_alerts(self) -> None:
+        """Recompute the alert aggregates with grouped queries."""
+        self._reset_alerts()
+        self.alert_recomputes += 1
+        reference = _as_utc(utc_now())
+
+        hours = case(
+            (
+                CAPAlert.expires > CAPAlert.sent,
+                (func.extract("epoch", CAPAlert.expires) - func.extract("epoch", CAPAlert.sent)) / 3600.0,
+            ),
+        )
+        for status, severity, event, count, timed, total, minimum, maximum in db.session.execute(
+            select(
+                CAPAlert.status,
+                CAPAlert.severity,
+                CAPAlert.event,
+                func.count(CAPAlert.id),
+                func.count(hours),
+                func.sum(hours),
+                func.min(hours),
+                func.max(hours),
+            ).group_by(CAPAlert.status, CAPAlert.severity, CAPAlert.event)
+        ):
+            self._alert_count += count
+            self._by_status[status] += count
+            if severity is not None:
+                self._by_severity[severity] += count
+            self._by_event[event] += count
+            if timed:
+                self._add_durations(event, int(timed), float(total), float(minimum), float(maximum))
+
+        hour, dow, month, year = (
+            func.extract(field, CAPAlert.sent) for field in ("hour", "dow", "month", "year")
+        )
+        for hour_value, dow_value, month_value, year_value, count in db.session.execute(
+            select(hour, dow, month, year, func.count(CAPAlert.id)).group_by(hour, dow, month, year)
+        ):
+            if hour_value is None:
+                continue
+            self._by_hour[int(hour_value)] += count
+            self._by_dow[int(dow_value)] += count
+            self._by_month[int(month_value) - 1] += count
+            self._by_year[int(year_value)] += count
+
+        self._expired_before, self._active_without_expiry = db.session.execute(select(
+            select(func.count(CAPAlert.id)).where(CAPAlert.expires < reference).scalar_subquery(),
+            select(func.count(CAPAlert.id))
+            .where(CAPAlert.expires.is_(None), CAPAlert.status != "Expired")
+            .scalar_subquery(),
+        )).one()
+        for expires, status in db.session.execute(
+            select(CAPAlert.expires, CAPAlert.status).where(CAPAlert.expires >= reference)
+        ):
+            self._future_expiries.append(_as_utc(expires))
+            if status != "Expired":
+                self._future_active_expiries.append(_as_utc(expires))
+        self._future_expiries.sort()
+        self._future_active_expiries.sort()
+
+        self._recent = [
+            tuple(row) for row in db.session.execute(
+                select(*_RECENT_COLUMNS)
+                .order_by(CAPAlert.sent.desc(), CAPAlert.id.desc())
+                .limit(self.recent_limit)
+            )
+        ]
+
+    def _add_durations(self, event: str, count: int, total: float, minimum: float, maximum: float) -> None:
+        aggregate = self._durations.get(event)
+        if aggregate is None:
+            self._durations[event] = [count, total, minimum, maximum]
+            return
+        aggregate[0] += count
+        aggregate[1] += total
+        aggregate[2] = min(aggregate[2], minimum)
+        aggregate[3] = max(aggregate[3], maximum)
+
+    def _live_counts(self, now: datetime) -> Dict[str, int]:
+        return {
+            "active_alerts": self._active_without_expiry
+            + len(self._future_active_expiries) - bisect_right(self._future_active_expiries, now),
+            "expired_alerts": self._expired_before + bisect_left(self._future_expiries, now),
+        }
+
+    # ------------------------------------------------------------------ other sections
+
+    def _load_boundaries(self) -> None:
+        rows = db.session.execute(select(Boundary.id, Boundary.name, Boundary.type)).all()
+        self._boundaries = {boundary_id: (name, b_type) for boundary_id, name, b_type in rows}
+
+    def _refresh_intersections(self, intersection_count: Optional[int]) -> None:
+        if self._intersection_high_water is not None:
+            if intersection_count is None:
+                intersection_count = db.session.execute(select(func.count(Intersection.id))).scalar()
+            rows = db.session.execute(
+                select(Intersection.id, Intersection.boundary_id)
+                .where(Intersection.id > self._intersection_high_water)
+            ).all()
+            if self._intersection_count + len(rows) == intersection_count:
+                for intersection_id, boundary_id in rows:
+                    self._intersections[boundary_id] += 1
+                    self._intersection_high_water = max(self._intersection_high_water, intersection_id)
+                self._intersection_count = intersection_count
+                return
+
+        # First build, or intersections were deleted (e.g. recalculated)
+        rows = db.session.execute(
+            select(Intersection.boundary_id, func.count(Intersection.id), func.max(Intersection.id))
+            .group_by(Intersection.boundary_id)
+        ).all()
+        self._intersections = Counter({boundary_id: count for boundary_id, count, _ in rows})
+        self._intersection_count = sum(count for _, count, _ in rows)
+        self._intersection_high_water = max((max_id for _, _, max_id in rows), default=0)
+
+    def _load_polling(self) -> None:
+        records = (
+            PollHistory.query.order_by(PollHistory.timestamp.desc())
+            .limit(self.poll_limit)
+            .all()
+        )
+        if not records:
+            self._polling = empty_dashboard_stats()["polling"]
+            return
+
+        total_runs = len(records)
+        successes = sum(
+            1 for record in records
+            if (record.status or "").lower() in _POLL_SUCCESS_VALUES and not record.error_message
+        )
+        failures = sum(
+            1 for record in records
+            if (record.status or "").lower() not in _POLL_SUCCESS_VALUES or bool(record.error_message)
+        )
+        last_run = records[0]
+        last_error = next((record for record in records if record.error_message), None)
+
+        self._polling = {
+            "success_rate": successes / total_runs,
+            "total_runs": total_runs,
+            "failed_runs": failures,
+            "average_execution_ms": sum(record.execution_time_ms or 0 for record in records) / total_runs,
+            "last_run_status": last_run.status,
+            "last_run_timestamp": last_run.timestamp.isoformat() if last_run.timestamp else None,
+            "last_error": last_error.error_message if last_error else None,
+            "last_error_timestamp": last_error.timestamp.isoformat()
+            if last_error and last_error.timestamp
+            else None,
+            "recent_runs": [
+                {
+                    "timestamp": record.timestamp.isoformat() if record.timestamp else None,
+                    "status": record.status,
+                    "alerts_fetched": record.alerts_fetched,
+                    "alerts_new": record.alerts_new,
+                    "alerts_updated": record.alerts_updated,
+                    "error": record.error_message,
+                    "execution_time_ms": record.execution_time_ms,
+                    "data_source": record.data_source,
+                }
+                for record in records[:10]
+            ],
+        }
+
+    # ------------------------------------------------------------------ payload
+
+    def _build_payload(self) -> Dict[str, Any]:
+        stats = empty_dashboard_stats()
+
+        boundary_types = Counter(b_type for _, b_type in self._boundaries.values())
+        most_affected = [
+            (boundary_id, count)
+            for boundary_id, count in self._intersections.most_common()
+            if boundary_id in self._boundaries
+        ][:10]
+        duration_stats = [
+            {
+                "event": event,
+                "count": int(count),
+                "average": round(total / count, 2),
+                "minimum": round(minimum, 2),
+                "maximum": round(maximum, 2),
+            }
+            for event, (count, total, minimum, maximum) in sorted(
+                self._durations.items(), key=lambda item: item[1][1], reverse=True
+            )
+        ]
+
+        stats.update({
+            "total_boundaries": len(self._boundaries),
+            "total_alerts": self._alert_count,
+            "boundary_stats": [
+                {"type": b_type, "count": count} for b_type, count in boundary_types.items()
+            ],
+            "alert_by_status": [
+                {"status": status, "count": count} for status, count in self._by_status.items()
+            ],
+            "alert_by_severity": [
+                {"severity": severity, "count": count} for severity, count in self._by_severity.items()
+            ],
+            "alert_by_event": [
+                {"event": event, "count": count} for event, count in self._by_event.most_common(10)
+            ],
+            "alert_by_hour": list(self._by_hour),
+            "alert_by_dow": list(self._by_dow),
+            "alert_by_month": list(self._by_month),
+            "alert_by_year": [
+                {"year": year, "count": self._by_year[year]} for year in sorted(self._by_year) if year
+            ],
+            "most_affected_boundaries": [
+                {"name": self._boundaries[boundary_id][0], "type": self._boundaries[boundary_id][1], "count": count}
+                for boundary_id, count in most_affected
+            ],
+            "duration_stats": duration_stats,
+            "avg_durations": duration_stats,
+            "polling": self._polling,
+        })
+        stats.update(self._recent_sections())
+        return stats
+
+    def _recent_sections(self) -> Dict[str, Any]:
+        severities: set[str] = set()
+        statuses: set[str] = set()
+        events: set[str] = set()
+        daily_totals: Dict[str, int] = defaultdict(int)
+        hourly_matrix = [[0 for _ in range(24)] for _ in range(7)]
+        alert_events: List[Dict[str, Any]] = []
+
+        for alert_id, identifier, sent, expires, severity, status, event, source in self._recent:
+            if severity:
+                severities.add(severity)
+            if status:
+                statuses.add(status)
+            if event:
+                events.add(event)
+            if sent:
+                daily_totals[sent.date().isoformat()] += 1
+                hourly_matrix[(sent.weekday() + 1) % 7][sent.hour] += 1
+
+            alert_events.append({
+                "id": alert_id,
+                "identifier": identifier,
+                "sent": sent.isoformat() if sent else None,
+                "expires": expires.isoformat() if expires else None,
+                "severity": severity or "Unknown",
+                "status": status or "Unknown",
+                "event": event or "Unknown",
+                "source": source or "Unknown",
+            })
+
+        daily_alerts = [{"date": day, "count": count} for day, count in sorted(daily_totals.items())]
+        return {
+            "alert_events": alert_events,
+            "filter_options": {
+                "severities": sorted(severities),
+                "statuses": sorted(statuses),
+                "events": sorted(events),
+            },
+            "daily_alerts": daily_alerts,
+            "recent_by_day": daily_alerts[-30:],
+            "dow_hour_matrix": hourly_matrix,
+        }
+
+
+def _stamp_query():
+    """One round trip of index-backed high-water marks that tells whether a section changed."""
+    return select(
+        select(func.max(CAPAlert.id)).scalar_subquery(),
+        select(func.max(CAPAlert.updated_at)).scalar_subquery(),
+        select(func.count(Boundary.id)).scalar_subquery(),
+        select(func.max(Boundary.id)).scalar_subquery(),
+        select(func.max(Boundary.updated_at)).scalar_subquery(),
+        select(func.max(Intersection.id)).scalar_subquery(),
+        select(func.max(PollHistory.id)).scalar_subquery(),
+    )
+
+
+def _count_query():
+    """Row counts of the large tables, which reveal deletions the high-water marks miss."""
+    return select(
+        select(func.count(CAPAlert.id)).scalar_subquery(),
+        select(func.count(Intersection.id)).scalar_subquery(),
+    )
+
+
+def dashboard_etag(snapshot_etag: str, *parts: Any) -> str:
+    """Combine the snapshot validator with per-viewer parts of the page."""
+    digest = hashlib.sha1("|".join([snapshot_etag, *map(str, parts)]).encode("utf-8"))
+    return digest.hexdigest()
+
+
+_snapshot: Optional[DashboardStatsSnapshot] = None
+_snapshot_lock = threading.Lock()
+
+
+def get_dashboard_stats_snapshot() -> DashboardStatsSnapshot:
+    """Return the process-wide snapshot, creating it on first use."""
+    global _snapshot
+    with _snapshot_lock:
+        if _snapshot is None:
+            _snapshot = DashboardStatsSnapshot()
+        return _snapshot
+
+
+def invalidate_dashboard_stats() -> None:
+    """Make the next dashboard view check the database for changes."""
+    if _snapshot is not None:
+        _snapshot.invalidate()
+
+
+__all__ = [
+    "DashboardStatsSnapshot",
+    "dashboard_etag",
+    "empty_dashboard_stats",
+    "get_dashboard_stats_snapshot",
+    "invalidate_dashboard_stats",
+]
@@ -0,0 +1,80 @@
+"""Add a unique window key to metric snapshots for bulk upserts.
+
+Create Date: 2025-12-02
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = "20251202_metric_snapshot_window_key"
+down_revision = "20251201_add_snow_emergency_opt_out"
+branch_labels = None
+depends_on = None
+
+
+TABLE_NAME = "metric_snapshots"
+INDEX_NAME = "uq_metric_snapshots_window"
+
+
+def _table_exists() -> bool:
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    try:
+        return TABLE_NAME in inspector.get_table_names()
+    except Exception:
+        return False
+
+
+def _index_exists() -> bool:
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    try:
+        return any(index["name"] == INDEX_NAME for index in inspector.get_indexes(TABLE_NAME))
+    except Exception:
+        return False
+
+
+def upgrade() -> None:
+    if not _table_exists() or _index_exists():
+        return
+
+    # Keep the newest snapshot of any window that was aggregated more than once
+    conn = op.get_bind()
+    conn.execute(
+        sa.text(
+            f"""
+            DELETE FROM {TABLE_NAME} older
+            USING {TABLE_NAME} newer
+            WHERE older.metric_category = newer.metric_category
+              AND older.metric_name = newer.metric_name
+              AND older.aggregation_period = newer.aggregation_period
+              AND older.window_start = newer.window_start
+              AND COALESCE(older.entity_id, '') = COALESCE(newer.entity_id, '')
+              AND older.id < newer.id
+            """
+        )
+    )
+
+    op.create_index(
+        INDEX_NAME,
+        TABLE_NAME,
+        [
+            "metric_category",
+            "metric_name",
+            "aggregation_period",
+            "window_start",
+            sa.text("COALESCE(entity_id, '')"),
+        ],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    if not _table_exists() or not _index_exists():
+        return
+
+    op.drop_index(INDEX_NAME, table_name=TABLE_NAME)
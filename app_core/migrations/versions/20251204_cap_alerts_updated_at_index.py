@@ -0,0 +1,51 @@
+"""Index cap_alerts on updated_at for the /stats snapshot change check.
+
+Create Date: 2025-12-04
+"""
+
+from __future__ import annotations
+
+from alembic import op
+from sqlalchemy import inspect
+
+
+revision = "20251204_cap_alerts_updated_at_index"
+down_revision = "20251203_cap_alerts_sent_id_index"
+branch_labels = None
+depends_on = None
+
+
+TABLE_NAME = "cap_alerts"
+INDEX_NAME = "idx_cap_alerts_updated_at"
+
+
+def _table_exists() -> bool:
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    try:
+        return TABLE_NAME in inspector.get_table_names()
+    except Exception:
+        return False
+
+
+def _index_exists() -> bool:
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    try:
+        return any(index["name"] == INDEX_NAME for index in inspector.get_indexes(TABLE_NAME))
+    except Exception:
+        return False
+
+
+def upgrade() -> None:
+    if not _table_exists() or _index_exists():
+        return
+
+    op.create_index(INDEX_NAME, TABLE_NAME, ["updated_at"])
+
+
+def downgrade() -> None:
+    if not _table_exists() or not _index_exists():
+        return
+
+    op.drop_index(INDEX_NAME, table_name=TABLE_NAME)
@@ -159,6 +159,13 @@ class CAPAlert(db.Model):
         onupdate=utc_now,
     )
 
+    __table_args__ = (
+        # Keyset pagination of the alert list walks (sent, id) newest first
+        db.Index("idx_cap_alerts_sent_id", sent.desc(), id.desc()),
+        # The /stats snapshot polls max(updated_at) to notice touched alerts
+        db.Index("idx_cap_alerts_updated_at", updated_at),
+    )
+
     def __setattr__(self, name, value):  # pragma: no cover - passthrough
         if name == "source":
             value = normalize_alert_source(value) if value else ALERT_SOURCE_UNKNOWN
@@ -33,6 +33,26 @@ import numpy as np
 
 logger = logging.getLogger(__name__)
 
+_RBDS_POLYNOMIAL = 0b11101101001
+_RBDS_BLOCK_MASK = (1 << 26) - 1
+
+
+def _rbds_crc(value: int) -> int:
+    for bit in range(value.bit_length() - 1, 9, -1):
+        if value & (1 << bit):
+            value ^= _RBDS_POLYNOMIAL << (bit - 10)
+    return value & 0x3FF
+
+
+# The check word is linear in the data bits, so the syndrome of a 26-bit block
+# is table[high data byte] ^ table[low data byte] ^ received check word.
+_RBDS_SYNDROME_HIGH = tuple(_rbds_crc(byte << 18) for byte in range(256))
+_RBDS_SYNDROME_LOW = tuple(_rbds_crc(byte << 10) for byte in range(256))
+
+# Syndrome -> block position in the group (A=0, B=1, C/C'=2, D=3), -1 if invalid
+_RBDS_OFFSET_WORDS = {0x0FC: 0, 0x198: 1, 0x168: 2, 0x350: 2, 0x1B4: 3}
+_RBDS_BLOCK_FOR_SYNDROME = tuple(_RBDS_OFFSET_WORDS.get(syndrome, -1) for syndrome in range(1024))
+
 
 @dataclass
 class DemodulatorConfig:
@@ -93,7 +113,9 @@ class FMDemodulator:
         self._rbds_target_rate = self._rbds_symbol_rate * 4.0
         self._rbds_symbol_phase = 0.0
         self._rbds_loop_gain = 0.02
-        self._rbds_bit_buffer: List[int] = []
+        # Rolling 26-bit block register and how many bits of it are filled
+        self._rbds_register = 0
+        self._rbds_register_bits = 0
         self._rbds_expected_block: Optional[int] = None
         self._rbds_partial_group: List[int] = []
         # RBDS uses differential BPSK, so we must keep the previous symbol polarity
@@ -249,116 +271,102 @@ class FMDemodulator:
             return None
 
         samples_per_symbol = max(self._rbds_target_rate / self._rbds_symbol_rate, 1.0)
+        quarter_symbol = samples_per_symbol / 4.0
+        last_index = len(resampled) - 1
+        loop_gain = self._rbds_loop_gain
+        values = resampled.tolist()
         phase = self._rbds_symbol_phase
-        bits: List[int] = []
+        symbols: List[float] = []
 
-        while phase + samples_per_symbol < len(resampled):
+        # Symbol timing is a feedback loop and stays scalar; everything after
+        # it works on whole arrays.
+        while phase + samples_per_symbol < len(values):
             center = phase + samples_per_symbol / 2.0
-            idx = int(min(max(int(center), 0), len(resampled) - 1))
-            sample = resampled[idx]
-            bits.append(self._rbds_symbol_to_bit(float(sample)))
-
-            early_idx = int(min(max(int(center - samples_per_symbol / 4.0), 0), len(resampled) - 1))
-            late_idx = int(min(max(int(center + samples_per_symbol / 4.0), 0), len(resampled) - 1))
-            early = resampled[early_idx]
-            late = resampled[late_idx]
+            sample = values[min(max(int(center), 0), last_index)]
+            symbols.append(sample)
+
+            early = values[min(max(int(center - quarter_symbol), 0), last_index)]
+            late = values[min(max(int(center + quarter_symbol), 0), last_index)]
             error = (late - early) * sample
-            phase += samples_per_symbol - (self._rbds_loop_gain * error)
+            phase += samples_per_symbol - (loop_gain * error)
 
         self._rbds_symbol_phase = phase - len(resampled)
 
-        if bits:
-            self._rbds_bit_buffer.extend(bits)
+        if not symbols:
+            return None
+        return self._decode_rbds_groups(self._rbds_symbols_to_bits(np.asarray(symbols)))
 
-        return self._decode_rbds_groups()
+    def _decode_rbds_groups(self, bits: np.ndarray) -> Optional[RBDSData]:
+        """Feed data bits through the block synchronizer and group assembler.
 
-    def _decode_rbds_groups(self) -> Optional[RBDSData]:
+        Each bit is shifted into a 26-bit register; once it is full the
+        register's syndrome is looked up to identify the block offset.  Out of
+        sync the window slides one bit, in sync it advances a whole block.
+        """
+        register = self._rbds_register
+        filled = self._rbds_register_bits
+        expected = self._rbds_expected_block
+        group = self._rbds_partial_group
         changed = False
-        while len(self._rbds_bit_buffer) >= 26:
-            block_bits = self._rbds_bit_buffer[:26]
-            block_type, data_word = self._decode_rbds_block(block_bits)
-
-            if block_type is None:
-                del self._rbds_bit_buffer[0]
-                self._rbds_expected_block = None
-                self._rbds_partial_group.clear()
+
+        for bit in bits.tolist():
+            register = ((register << 1) | bit) & _RBDS_BLOCK_MASK
+            filled += 1
+            if filled < 26:
                 continue
 
-            if self._rbds_expected_block is None:
-                if block_type != "A":
-                    del self._rbds_bit_buffer[0]
-                    continue
-                self._rbds_partial_group = [data_word]
-                self._rbds_expected_block = 1
-                del self._rbds_bit_buffer[:26]
+            block = _RBDS_BLOCK_FOR_SYNDROME[
+                _RBDS_SYNDROME_HIGH[register >> 18]
+                ^ _RBDS_SYNDROME_LOW[(register >> 10) & 0xFF]
+                ^ (register & 0x3FF)
+            ]
+
+            if expected is None:
+                filled = 25
+                if block == 0:
+                    group = [register >> 10]
+                    expected = 1
+                    filled = 0
                 continue
 
-            sequence = ["A", "B", "C", "D"]
-            expected = sequence[self._rbds_expected_block]
-            if expected == "C" and block_type == "C":
-                pass
-            elif expected != block_type:
-                self._rbds_expected_block = None
-                self._rbds_partial_group.clear()
-                del self._rbds_bit_buffer[0]
+            if block != expected:
+                expected = None
+                group = []
+                filled = 25
                 continue
 
-            self._rbds_partial_group.append(data_word)
-            self._rbds_expected_block += 1
-            del self._rbds_bit_buffer[:26]
+            group.append(register >> 10)
+            expected += 1
+            filled = 0
 
-            if self._rbds_expected_block >= 4:
-                group_changed = self._rbds_decoder.process_group(tuple(self._rbds_partial_group))
+            if expected >= 4:
+                group_changed = self._rbds_decoder.process_group(tuple(group))
                 changed = group_changed or changed
-                self._rbds_partial_group = []
-                self._rbds_expected_block = None
+                group = []
+                expected = None
+
+        self._rbds_register = register
+        self._rbds_register_bits = filled
+        self._rbds_expected_block = expected
+        self._rbds_partial_group = group
 
         if changed:
             return self._rbds_decoder.get_current_data()
         return None
 
-    def _rbds_symbol_to_bit(self, sample: float) -> int:
-        """Decode a differentially-encoded RBDS symbol into a data bit."""
-
-        symbol = 1.0 if sample >= 0 else -1.0
-        previous = self._rbds_prev_symbol
-        self._rbds_prev_symbol = symbol
-
-        if previous is None:
-            return 0
-
-        # Differential BPSK: bit=0 when polarity stays the same, 1 when it flips
-        return 0 if symbol == previous else 1
-
-    def _decode_rbds_block(self, bits: List[int]) -> Tuple[Optional[str], Optional[int]]:
-        value = 0
-        for bit in bits:
-            value = (value << 1) | int(bit)
-
-        data_word = value >> 10
-        check_word = value & 0x3FF
-
-        remainder = self._rbds_crc(data_word << 10)
-        syndrome = remainder ^ check_word
-
-        offset_map = {
-            0x0FC: "A",
-            0x198: "B",
-            0x168: "C",
-            0x350: "C",
-            0x1B4: "D",
-        }
-        block_type = offset_map.get(syndrome)
-        if block_type is None:
-            return None, None
-        return block_type, data_word
-
-    def _rbds_crc(self, value: int) -> int:
-        polynomial = 0b11101101001
-        for bit in range(value.bit_length() - 1, 9, -1):
-            if value & (1 << bit):
-                value ^= polynomial << (bit - 10)
-        return value & 0x3FF
+    def _rbds_symbols_to_bits(self, samples: np.ndarray) -> np.ndarray:
+        """Differentially decode a run of RBDS symbol samples into data bits.
+
+        Differential BPSK: bit=0 when polarity stays the same, 1 when it
+        flips.  The last symbol is carried over so runs may be split anywhere.
+        """
+
+        symbols = np.where(samples >= 0, 1.0, -1.0)
+        previous = np.empty_like(symbols)
+        previous[0] = self._rbds_prev_symbol
+        previous[1:] = symbols[:-1]
+        self._rbds_prev_symbol = float(symbols[-1])
+        return (symbols != previous).astype(np.int64)
 
 
 class AMDemodulator:
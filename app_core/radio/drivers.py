@@ -85,10 +85,14 @@ class _CaptureTicket:
         chunk = samples[:to_take]
         try:
             if self.mode == "pcm":
-                interleaved = self.numpy.empty((to_take * 2,), dtype=self.numpy.float32)
-                interleaved[0::2] = chunk.real.astype(self.numpy.float32, copy=False)
-                interleaved[1::2] = chunk.imag.astype(self.numpy.float32, copy=False)
-                interleaved.tofile(self._file)
+                if chunk.dtype == self.numpy.complex64 and chunk.flags.c_contiguous:
+                    # complex64 memory already is interleaved float32 I/Q
+                    chunk.view(self.numpy.float32).tofile(self._file)
+                else:
+                    interleaved = self.numpy.empty((to_take * 2,), dtype=self.numpy.float32)
+                    interleaved[0::2] = chunk.real.astype(self.numpy.float32, copy=False)
+                    interleaved[1::2] = chunk.imag.astype(self.numpy.float32, copy=False)
+                    interleaved.tofile(self._file)
             else:
                 chunk.astype(self.numpy.complex64, copy=False).tofile(self._file)
         except Exception as exc:
@@ -139,24 +143,26 @@ class _SoapySDRReceiver(ReceiverInterface):
         self._status_lock = threading.Lock()
         self._capture_requests: List[_CaptureTicket] = []
         self._capture_lock = threading.Lock()
-        # Real-time sample buffer for audio streaming
+        # IQ sample ring: readStream writes straight into its slots and
+        # consumers get read-only views of it (see get_samples)
         self._sample_buffer = None  # Will be a numpy array ring buffer
-        self._sample_buffer_size = 32768  # Store ~0.67 seconds at 48kHz
+        self._read_chunk_size = 16384  # Samples per readStream call
+        self._sample_buffer_min_size = 65536
+        self._sample_buffer_seconds = 0.5  # Absorbs USB jitter and slow consumers
+        self._sample_buffer_size = self._sample_buffer_min_size
         self._sample_buffer_pos = 0
         self._sample_buffer_lock = threading.Lock()
+        self._samples_received = 0
+        self._samples_copied = 0  # Samples copied out for wrapped get_samples() requests
+        self._sample_views_served = 0
         
-        # Spectrum/Waterfall support
+        # Spectrum/Waterfall support (Welch PSD engine, created with the first samples)
         self._spectrum_buffer = None
-        self._spectrum_update_interval = 0.1  # 100ms
+        self._spectrum_config = None  # Optional SpectrumConfig override
+        self._spectrum_engine = None
         self._last_spectrum_update = 0.0
         self._fft_size = 2048
-        self._window = None
         
-        # Ring buffer for robust SDR reading (USB jitter absorption)
-        self._ring_buffer = None
-        self._ring_write_pos = 0
-        self._ring_read_pos = 0
-        self._ring_buffer_size = 0  # Will be set based on sample rate
         self._consecutive_timeouts = 0
         self._max_consecutive_timeouts = 10
         self._timeout_backoff = 0.01
@@ -286,6 +292,14 @@ class _SoapySDRReceiver(ReceiverInterface):
         else:
             health["connection_success_rate"] = 0.0
 
+        health["spectrum"] = self.get_spectrum_stats()
+        health["sample_ring"] = {
+            "size": self._sample_buffer_size,
+            "samples_received": self._samples_received,
+            "samples_copied": self._samples_copied,
+            "views_served": self._sample_views_served,
+        }
+
         return health
 
     def is_running(self) -> bool:  # noqa: D401 - documented in base class
@@ -457,9 +471,18 @@ class _SoapySDRReceiver(ReceiverInterface):
     # Internal helpers
     # ------------------------------------------------------------------
     def _initialize_sample_buffer(self, numpy_module) -> None:
-        """Reset the rolling IQ sample buffer using the provided numpy module."""
+        """Reset the rolling IQ sample ring using the provided numpy module.
+
+        The ring holds about ``_sample_buffer_seconds`` of IQ and is a whole
+        number of read chunks, so every readStream slot is contiguous.
+        """
+        chunk = self._read_chunk_size
+        wanted = max(self._sample_buffer_min_size, int(self.config.sample_rate * self._sample_buffer_seconds))
+        size = -(-wanted // chunk) * chunk
         with self._sample_buffer_lock:
-            self._sample_buffer = numpy_module.zeros(self._sample_buffer_size, dtype=numpy_module.complex64)
+            # Views handed out earlier keep the previous array alive
+            self._sample_buffer = numpy_module.zeros(size, dtype=numpy_module.complex64)
+            self._sample_buffer_size = size
             self._sample_buffer_pos = 0
 
     def _open_handle(self) -> _SoapySDRHandle:
@@ -713,65 +736,48 @@ class _SoapySDRReceiver(ReceiverInterface):
             self._handle = None
 
     def _compute_spectrum(self, samples, numpy_module) -> None:
-        """Compute power spectral density using Welch method."""
-        if len(samples) < self._fft_size:
-            return
+        """Feed IQ samples to the averaged PSD engine, refreshing the display spectrum per frame."""
+        engine = self._spectrum_engine
+        if engine is None:
+            from .spectrum import SpectrumConfig, WelchSpectrumEngine
 
-        # Initialize window if needed
-        if self._window is None:
-            self._window = numpy_module.hanning(self._fft_size)
+            engine = WelchSpectrumEngine(self._spectrum_config or SpectrumConfig(fft_size=self._fft_size))
+            self._spectrum_engine = engine
 
-        # Apply Hann window for spectral leakage reduction
-        # Take the center samples if we have more than needed
-        start_idx = (len(samples) - self._fft_size) // 2
-        windowed = samples[start_idx:start_idx + self._fft_size] * self._window
-
-        # FFT with zero-padding for better resolution (implicit in numpy if n > len)
-        # Use fftshift to center DC at 0
-        spectrum = numpy_module.abs(numpy_module.fft.fftshift(numpy_module.fft.fft(windowed, n=self._fft_size)))
-
-        # Convert to dB (10*log10 for power)
-        # Avoid log(0) by clamping to small value
-        power_db = 20 * numpy_module.log10(numpy_module.maximum(spectrum, 1e-10))
-
-        # Normalize to 0-100 scale for visualization (approximate -100dBm to 0dBm range)
-        # This is somewhat arbitrary but works for visualization
-        normalized = numpy_module.clip((power_db + 100) / 100 * 100, 0, 100)
+        if not engine.process(samples):
+            return
 
+        # Map -100..0 dBFS onto the 0-100 display scale
+        average_db = engine.get_average_db()
+        normalized = numpy_module.clip(average_db + 100.0, 0.0, 100.0)
         self._spectrum_buffer = normalized.astype(numpy_module.float32)
         self._last_spectrum_update = time.time()
 
     def get_spectrum(self) -> Optional[List[float]]:
-        """Get the latest computed spectrum data."""
+        """Get the latest averaged spectrum (0-100 scale, DC centred)."""
         if self._spectrum_buffer is None:
             return None
         # Return as list for JSON serialization
         return self._spectrum_buffer.tolist()
 
+    def get_spectrum_engine(self):
+        """Return the receiver's PSD/waterfall engine, or None before the first samples."""
+        return self._spectrum_engine
+
+    def get_spectrum_stats(self) -> Optional[Dict[str, float]]:
+        """Frame count, FFT budget use and CPU load of the spectrum engine."""
+        if self._spectrum_engine is None:
+            return None
+        return self._spectrum_engine.get_stats()
+
     def _capture_loop(self) -> None:
         handle = self._handle
-        buffer = None
-        if handle is not None:
-            # Use larger buffer to reduce USB transfer overhead and prevent SOAPY_SDR_OVERFLOW (-4)
-            # High-speed SDRs like AirSpy generate data faster than smaller buffers can handle
-            buffer = handle.numpy.zeros(16384, dtype=handle.numpy.complex64)
+        # Large reads reduce USB transfer overhead and prevent SOAPY_SDR_OVERFLOW (-4);
+        # high-speed SDRs like AirSpy generate data faster than small reads can handle
+        read_size = self._read_chunk_size
 
         retry_delay = self._retry_backoff
         consecutive_failures = 0
-        
-        # Initialize ring buffer for jitter absorption
-        # 0.5 seconds of buffer is usually enough to absorb USB jitter
-        ring_buffer_size = int(self.config.sample_rate * 0.5)
-        # Ensure buffer is at least 4x the read chunk size
-        ring_buffer_size = max(ring_buffer_size, 65536)
-        
-        ring_buffer = None
-        ring_write_pos = 0
-        
-        if handle:
-             ring_buffer = handle.numpy.zeros(ring_buffer_size, dtype=handle.numpy.complex64)
-        
-        last_spectrum_time = 0
 
         while self._running.is_set():
             if handle is None:
@@ -808,21 +814,16 @@ class _SoapySDRReceiver(ReceiverInterface):
                 )
                 handle = self._handle = new_handle
                 self._initialize_sample_buffer(new_handle.numpy)
-                # Use larger buffer to reduce USB transfer overhead and prevent SOAPY_SDR_OVERFLOW (-4)
-                buffer = new_handle.numpy.zeros(16384, dtype=new_handle.numpy.complex64)
-                
-                # Re-initialize ring buffer on new connection
-                ring_buffer_size = int(self.config.sample_rate * 0.5)
-                ring_buffer_size = max(ring_buffer_size, 65536)
-                ring_buffer = new_handle.numpy.zeros(ring_buffer_size, dtype=new_handle.numpy.complex64)
-                ring_write_pos = 0
-                
+
                 retry_delay = self._retry_backoff
                 continue
 
             try:
-                # Read with backpressure handling
-                result = handle.device.readStream(handle.stream, [buffer], len(buffer))
+                # Read straight into the next ring slot (never wraps mid-read)
+                ring = self._sample_buffer
+                pos = self._sample_buffer_pos
+                slot = ring[pos:pos + min(read_size, len(ring) - pos)]
+                result = handle.device.readStream(handle.stream, [slot], len(slot))
                 
                 if result.ret < 0:
                     # Handle different error types differently
@@ -873,24 +874,22 @@ class _SoapySDRReceiver(ReceiverInterface):
                 self._timeout_backoff = 0.01
 
                 if result.ret > 0:
-                    samples = buffer[: result.ret]
-                    
-                    # 1. Compute Spectrum (if interval elapsed)
-                    now = time.time()
-                    if now - last_spectrum_time > self._spectrum_update_interval:
-                        self._compute_spectrum(samples, handle.numpy)
-                        last_spectrum_time = now
-                    
-                    # 2. Update Signal Strength
+                    samples = slot[: result.ret]
+                    samples.flags.writeable = False
+
+                    # 1. Publish the slot to get_samples() readers
+                    self._commit_samples(result.ret)
+
+                    # 2. Feed the PSD engine (it paces itself to the display rate)
+                    self._compute_spectrum(samples, handle.numpy)
+
+                    # 3. Update Signal Strength
                     magnitude = float(handle.numpy.mean(handle.numpy.abs(samples)))
                     self._update_status(locked=True, signal_strength=magnitude)
-                    
-                    # 3. Update Audio Sample Buffer (existing logic)
-                    self._update_sample_buffer(samples)
-                    
-                    # 4. Process Capture (existing logic)
+
+                    # 4. Stream to file captures straight from the ring view
                     self._process_capture(samples)
-                    
+
                 else:
                     self._update_status(locked=True, signal_strength=0.0)
 
@@ -911,8 +910,6 @@ class _SoapySDRReceiver(ReceiverInterface):
                 )
                 self._teardown_handle(handle)
                 handle = None
-                buffer = None
-                ring_buffer = None
                 self._cancel_capture_requests(RuntimeError(f"Capture error: {exc}"), teardown=False)
                 if not self._running.is_set():
                     break
@@ -1004,78 +1001,54 @@ class _SoapySDRReceiver(ReceiverInterface):
             self._teardown_handle()
         self._update_status(locked=False)
 
-    def _update_sample_buffer(self, samples) -> None:
-        """Update the real-time sample ring buffer with new samples."""
-        if self._sample_buffer is None:
-            return
-
+    def _commit_samples(self, count: int) -> None:
+        """Advance the ring write position past ``count`` samples just read into it."""
         with self._sample_buffer_lock:
-            num_samples = len(samples)
-            if num_samples >= self._sample_buffer_size:
-                # If we got more samples than buffer size, just take the latest
-                self._sample_buffer[:] = samples[-self._sample_buffer_size:]
-                self._sample_buffer_pos = 0
-            else:
-                # Write samples to ring buffer
-                end_pos = self._sample_buffer_pos + num_samples
-                if end_pos <= self._sample_buffer_size:
-                    # Samples fit without wrapping
-                    self._sample_buffer[self._sample_buffer_pos:end_pos] = samples
-                else:
-                    # Samples wrap around
-                    first_chunk = self._sample_buffer_size - self._sample_buffer_pos
-                    self._sample_buffer[self._sample_buffer_pos:] = samples[:first_chunk]
-                    self._sample_buffer[:num_samples - first_chunk] = samples[first_chunk:]
-
-                self._sample_buffer_pos = end_pos % self._sample_buffer_size
+            self._sample_buffer_pos = (self._sample_buffer_pos + count) % self._sample_buffer_size
+            self._samples_received += count
 
     def get_samples(self, num_samples: Optional[int] = None):
         """Get recent IQ samples from the receiver for real-time processing.
 
+        The most recent samples are returned as a read-only view into the
+        receiver's ring whenever they are contiguous and leave room for the
+        read in flight, which is the common case.  A view of ``count``
+        samples stays valid until the capture thread has written another
+        ``size - count`` samples (``size`` being the ring length), so callers
+        that keep samples longer must copy them.  A request spanning the wrap
+        point, or longer than ``size - _read_chunk_size`` (whose oldest
+        samples the next read overwrites), is copied.
+
         Args:
             num_samples: Number of samples to retrieve. If None, returns all available samples.
 
         Returns:
-            numpy array of complex64 samples, or None if receiver is not running
+            numpy array of complex64 samples (oldest first), or None if receiver is not running
         """
         if not self._running.is_set() or self._sample_buffer is None:
             return None
 
         with self._sample_buffer_lock:
-            if num_samples is None or num_samples >= self._sample_buffer_size:
-                # Return entire buffer in correct order
-                if self._sample_buffer_pos == 0:
-                    return self._sample_buffer.copy()
-                else:
-                    # Reorder ring buffer to put oldest samples first
-                    handle = self._handle
-                    if not handle:
-                        return None
-                    result = handle.numpy.concatenate([
-                        self._sample_buffer[self._sample_buffer_pos:],
-                        self._sample_buffer[:self._sample_buffer_pos]
-                    ])
-                    return result
-            else:
-                # Return most recent num_samples
-                if num_samples > self._sample_buffer_size:
-                    num_samples = self._sample_buffer_size
-
-                handle = self._handle
-                if not handle:
-                    return None
-
-                # Calculate start position for most recent samples
-                start_pos = (self._sample_buffer_pos - num_samples) % self._sample_buffer_size
-                if start_pos < self._sample_buffer_pos:
-                    # No wrap
-                    return self._sample_buffer[start_pos:self._sample_buffer_pos].copy()
-                else:
-                    # Wrapped
-                    return handle.numpy.concatenate([
-                        self._sample_buffer[start_pos:],
-                        self._sample_buffer[:self._sample_buffer_pos]
-                    ])
+            ring = self._sample_buffer
+            size = self._sample_buffer_size
+            end = self._sample_buffer_pos or size
+            count = size if num_samples is None else max(0, min(int(num_samples), size))
+
+            start = end - count
+            # readStream fills the chunk after ``end`` before committing it
+            if start >= 0 and count <= size - self._read_chunk_size:
+                view = ring[start:end]
+                view.flags.writeable = False
+                self._sample_views_served += 1
+                return view
+
+            handle = self._handle
+            if not handle:
+                return None
+            self._samples_copied += count
+            if start >= 0:
+                return ring[start:end].copy()
+            return handle.numpy.concatenate((ring[start:], ring[:end]))
 
 
 class RTLSDRReceiver(_SoapySDRReceiver):
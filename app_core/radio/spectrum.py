@@ -0,0 +1,277 @@
+"""
+EAS Station - Emergency Alert System
+Copyright (c) 2025 Timothy Kramer (KR8MER)
+
+This file is part of EAS Station.
+
+EAS Station is dual-licensed software:
+- GNU Affero General Public License v3 (AGPL-3.0) for open-source use
+- Commercial License for proprietary use
+
+You should have received a copy of both licenses with this software.
+For more information, see LICENSE and LICENSE-COMMERCIAL files.
+
+IMPORTANT: This software cannot be rebranded or have attribution removed.
+See NOTICE file for complete terms.
+
+Repository: https://github.com/KR8MER/eas-station
+"""
+
+from __future__ import annotations
+
+"""
+Averaged power spectral density and waterfall engine for SDR receivers.
+
+IQ buffers from ``readStream`` are cut into overlapping Hann-windowed
+segments (Welch's method) whose power spectra are summed until the next
+display frame is due.  Each frame is folded into an exponential average,
+a decaying peak-hold trace and a bin-decimated waterfall ring.
+
+Work is bounded by the display rate, not the capture rate: at most
+``max_segments_per_frame`` FFTs run per frame and any further samples are
+skipped until the frame is emitted.  Levels are in dBFS for complex input,
+so a full-scale complex exponential reads 0 dB in its bin.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_POWER_FLOOR = 1e-20  # -200 dBFS, keeps log10 finite on empty bins
+
+
+@dataclass
+class SpectrumConfig:
+    """Tuning for :class:`WelchSpectrumEngine`."""
+    fft_size: int = 2048
+    overlap: float = 0.5  # Fraction of each segment shared with the next
+    averaging: float = 0.3  # EMA weight of the newest frame (1.0 = no averaging)
+    display_rate_hz: float = 10.0  # Frames emitted per second, independent of capture rate
+    max_segments_per_frame: int = 8  # FFT budget per frame
+    peak_decay_db_per_s: float = 10.0  # Peak-hold fall rate (0 = hold forever)
+    waterfall_bins: int = 512  # Columns per waterfall row after decimation
+    waterfall_history: int = 128  # Rows kept in the waterfall ring
+
+
+@dataclass(frozen=True)
+class SpectrumSnapshot:
+    """Average, peak-hold and waterfall taken from the same display frame."""
+    average_db: np.ndarray
+    peak_db: np.ndarray
+    waterfall_db: np.ndarray  # Oldest row first
+    frames: int
+
+
+class WelchSpectrumEngine:
+    """Welch PSD with exponential averaging, peak-hold and a waterfall ring.
+
+    ``process()`` is called from the receiver's capture thread with every IQ
+    buffer.  Readers (the status publisher, web routes) call the getters from
+    other threads; published arrays are replaced wholesale under a lock, never
+    mutated in place.
+    """
+
+    def __init__(self, config: Optional[SpectrumConfig] = None):
+        self.config = config or SpectrumConfig()
+        fft_size = int(self.config.fft_size)
+        if fft_size < 16:
+            raise ValueError("fft_size must be at least 16")
+        if fft_size % self.config.waterfall_bins:
+            raise ValueError("fft_size must be a multiple of waterfall_bins")
+
+        self._fft_size = fft_size
+        self._hop = max(1, int(round(fft_size * (1.0 - self.config.overlap))))
+        self._window = np.hanning(fft_size).astype(np.float32)
+        # Scale |X|^2 so a full-scale complex tone reads 0 dBFS in its bin
+        self._power_scale = 1.0 / float(np.sum(self._window)) ** 2
+        self._frame_interval = 1.0 / float(self.config.display_rate_hz)
+
+        # Accumulated segment power for the frame being built
+        self._power_sum = np.zeros(fft_size, dtype=np.float64)
+        self._segments = 0
+        # Carries samples across buffers shorter than one segment
+        self._carry = np.zeros(fft_size, dtype=np.complex64)
+        self._carry_len = 0
+        self._frame_started: Optional[float] = None
+
+        self._average: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+        self._average_db: Optional[np.ndarray] = None
+        self._peak_db: Optional[np.ndarray] = None
+        self._last_frame_time = 0.0
+        self._waterfall = np.full(
+            (self.config.waterfall_history, self.config.waterfall_bins), -200.0, dtype=np.float32
+        )
+        self._waterfall_row = 0
+        self._waterfall_rows = 0
+
+        # CPU accounting
+        self._busy_seconds = 0.0
+        self._busy_window_seconds = 0.0
+        self._window_started = 0.0
+        self._cpu_load = 0.0
+        self._frames = 0
+        self._segments_total = 0
+        self._samples_skipped = 0
+
+    @property
+    def fft_size(self) -> int:
+        return self._fft_size
+
+    def process(self, samples, now: Optional[float] = None) -> bool:
+        """Feed one IQ buffer; return True when a new display frame was produced."""
+        started = time.perf_counter()
+        if now is None:
+            now = time.monotonic()
+        if self._frame_started is None:
+            self._frame_started = now
+            self._window_started = now
+
+        samples = np.asarray(samples)
+        budget = self.config.max_segments_per_frame - self._segments
+        if budget > 0 and len(samples):
+            self._accumulate(samples, budget)
+        else:
+            self._samples_skipped += len(samples)
+
+        produced = False
+        if self._segments and now - self._frame_started >= self._frame_interval:
+            self._emit_frame(now)
+            # Keep a fixed cadence; after a stall, restart it rather than bursting
+            self._frame_started += self._frame_interval
+            if now - self._frame_started >= self._frame_interval:
+                self._frame_started = now
+            produced = True
+
+        self._account(time.perf_counter() - started, now)
+        return produced
+
+    def _accumulate(self, samples: np.ndarray, budget: int) -> None:
+        fft_size = self._fft_size
+        if self._carry_len or len(samples) < fft_size:
+            take = min(fft_size - self._carry_len, len(samples))
+            self._carry[self._carry_len:self._carry_len + take] = samples[:take]
+            self._carry_len += take
+            if self._carry_len < fft_size:
+                return
+            self._add_segments(self._carry[np.newaxis, :])
+            self._carry_len = 0
+            samples = samples[take:]
+            budget -= 1
+            if budget <= 0 or len(samples) < fft_size:
+                self._samples_skipped += len(samples)
+                return
+
+        count = min(budget, 1 + (len(samples) - fft_size) // self._hop)
+        segments = np.lib.stride_tricks.sliding_window_view(samples, fft_size)[::self._hop][:count]
+        self._add_segments(segments)
+        self._samples_skipped += max(0, len(samples) - ((count - 1) * self._hop + fft_size))
+
+    def _add_segments(self, segments: np.ndarray) -> None:
+        spectra = np.fft.fft(segments * self._window, axis=1)
+        power = spectra.real * spectra.real + spectra.imag * spectra.imag
+        self._power_sum += power.sum(axis=0)
+        self._segments += segments.shape[0]
+        self._segments_total += segments.shape[0]
+
+    def _emit_frame(self, now: float) -> None:
+        frame = np.fft.fftshift(self._power_sum * (self._power_scale / self._segments))
+        self._power_sum[:] = 0.0
+        self._segments = 0
+
+        alpha = self.config.averaging
+        if self._average is None:
+            self._average = frame
+        else:
+            self._average = alpha * frame + (1.0 - alpha) * self._average
+
+        average_db = (10.0 * np.log10(np.maximum(self._average, _POWER_FLOOR))).astype(np.float32)
+        frame_db = 10.0 * np.log10(np.maximum(frame, _POWER_FLOOR))
+        decimated = frame.reshape(self.config.waterfall_bins, -1).mean(axis=1)
+        waterfall_row = 10.0 * np.log10(np.maximum(decimated, _POWER_FLOOR))
+
+        with self._lock:
+            if self._peak_db is None:
+                peak_db = frame_db
+            else:
+                decay = self.config.peak_decay_db_per_s * (now - self._last_frame_time)
+                peak_db = np.maximum(self._peak_db - decay, frame_db)
+            self._peak_db = peak_db.astype(np.float32)
+            self._average_db = average_db
+            self._waterfall[self._waterfall_row] = waterfall_row
+            self._waterfall_row = (self._waterfall_row + 1) % self.config.waterfall_history
+            self._waterfall_rows = min(self._waterfall_rows + 1, self.config.waterfall_history)
+            self._last_frame_time = now
+            self._frames += 1
+
+    def _account(self, busy: float, now: float) -> None:
+        self._busy_seconds += busy
+        self._busy_window_seconds += busy
+        elapsed = now - self._window_started
+        if elapsed >= 1.0:
+            self._cpu_load = self._busy_window_seconds / elapsed
+            self._busy_window_seconds = 0.0
+            self._window_started = now
+
+    def get_average_db(self) -> Optional[np.ndarray]:
+        """Exponentially averaged PSD in dBFS, DC centred (fftshift order)."""
+        with self._lock:
+            return self._average_db
+
+    def get_peak_hold_db(self) -> Optional[np.ndarray]:
+        """Decaying peak-hold trace in dBFS, DC centred."""
+        with self._lock:
+            return self._peak_db
+
+    def get_waterfall(self) -> np.ndarray:
+        """Decimated waterfall rows in dBFS, oldest first."""
+        with self._lock:
+            return self._ordered_waterfall()
+
+    def get_snapshot(self) -> Optional[SpectrumSnapshot]:
+        """Average, peak-hold and waterfall under one lock, or None before the first frame.
+
+        Use this when the traces are combined (e.g. scaled to a common range):
+        separate getters may straddle a frame and mix two of them.
+        """
+        with self._lock:
+            if self._average_db is None:
+                return None
+            return SpectrumSnapshot(
+                average_db=self._average_db,
+                peak_db=self._peak_db,
+                waterfall_db=self._ordered_waterfall(),
+                frames=self._frames,
+            )
+
+    def _ordered_waterfall(self) -> np.ndarray:
+        """Waterfall ring unrolled oldest first; the caller holds ``_lock``."""
+        rows = self._waterfall_rows
+        end = self._waterfall_row
+        ordered = np.concatenate((self._waterfall[end:], self._waterfall[:end]))
+        return ordered[len(ordered) - rows:]
+
+    def frequency_offsets(self, sample_rate: float) -> np.ndarray:
+        """Bin centre frequencies relative to the tuned frequency, in Hz."""
+        return np.fft.fftshift(np.fft.fftfreq(self._fft_size, d=1.0 / float(sample_rate)))
+
+    def get_stats(self) -> Dict[str, float]:
+        """Engine health: frames, FFT segments, skipped samples and CPU load."""
+        return {
+            'fft_size': self._fft_size,
+            'display_rate_hz': self.config.display_rate_hz,
+            'frames': self._frames,
+            'segments': self._segments_total,
+            'samples_skipped': self._samples_skipped,
+            'cpu_seconds': round(self._busy_seconds, 6),
+            'cpu_percent': round(self._cpu_load * 100.0, 3),
+        }
+
+
+__all__ = ["SpectrumConfig", "SpectrumSnapshot", "WelchSpectrumEngine"]
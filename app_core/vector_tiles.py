@@ -0,0 +1,300 @@
+"""
+EAS Station - Emergency Alert System
+Copyright (c) 2025 Timothy Kramer (KR8MER)
+
+This file is part of EAS Station.
+
+EAS Station is dual-licensed software:
+- GNU Affero General Public License v3 (AGPL-3.0) for open-source use
+- Commercial License for proprietary use
+
+You should have received a copy of both licenses with this software.
+For more information, see LICENSE and LICENSE-COMMERCIAL files.
+
+IMPORTANT: This software cannot be rebranded or have attribution removed.
+See NOTICE file for complete terms.
+
+Repository: https://github.com/KR8MER/eas-station
+"""
+
+from __future__ import annotations
+
+"""Mapbox Vector Tiles of alert and boundary geometry, rendered by PostGIS.
+
+The GeoJSON map APIs send every vertex of every polygon in one response.
+A vector tile holds only the geometry inside one ``z/x/y`` web-mercator
+tile.  Before ``ST_AsMVT`` encodes it, each geometry is:
+
+* clipped to the tile plus its buffer, and
+* simplified to about one tile pixel at that zoom (``simplify_tolerance``).
+
+So a zoomed-out tile of detailed county or utility polygons stays small,
+and zooming in brings the detail back.
+
+Tiles are cached in the Flask-Caching store under a key that includes the
+data version (row counts and high-water marks of ``boundaries`` and
+``cap_alerts``).  Any edit to either table therefore moves to fresh keys
+instead of needing explicit invalidation.  Alert tiles filtered by status
+also include the current minute, because alerts expire without their row
+changing.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from sqlalchemy import bindparam, func, select, text
+
+from app_utils import utc_now
+
+from .boundaries import normalize_boundary_type
+from .cache import cache
+from .extensions import db
+from .models import Boundary, CAPAlert
+
+logger = logging.getLogger(__name__)
+
+TILE_EXTENT = 4096
+TILE_BUFFER = 64
+MAX_ZOOM = 22
+# Width of the web-mercator world in metres
+WORLD_WIDTH_METERS = 40075016.685578488
+# Simplify to this many tile pixels; ST_AsMVTGeom snaps to the pixel grid anyway
+SIMPLIFY_PIXELS = 1.0
+
+LAYERS = ("boundaries", "alerts")
+ALERT_STATUSES = ("active", "expired", "all")
+
+TILE_CACHE_SECONDS = 3600
+VERSION_CHECK_SECONDS = 5.0
+
+
+def pixel_size(zoom: int) -> float:
+    """Width of one tile pixel (of ``TILE_EXTENT``) in web-mercator metres at ``zoom``."""
+    return WORLD_WIDTH_METERS / (2 ** zoom) / TILE_EXTENT
+
+
+def simplify_tolerance(zoom: int) -> float:
+    """Simplification tolerance in web-mercator metres for tiles at ``zoom``."""
+    return pixel_size(zoom) * SIMPLIFY_PIXELS
+
+
+@dataclass(frozen=True)
+class TileRequest:
+    """One tile and the layers and filters it is rendered with."""
+
+    z: int
+    x: int
+    y: int
+    layers: Tuple[str, ...] = LAYERS
+    boundary_types: Tuple[str, ...] = ()
+    alert_status: str = "active"
+
+    def __post_init__(self) -> None:
+        if not 0 <= self.z <= MAX_ZOOM:
+            raise ValueError(f"zoom must be between 0 and {MAX_ZOOM}")
+        limit = 2 ** self.z
+        if not (0 <= self.x < limit and 0 <= self.y < limit):
+            raise ValueError(f"tile {self.z}/{self.x}/{self.y} is outside the tile grid")
+        if not self.layers or any(layer not in LAYERS for layer in self.layers):
+            raise ValueError(f"layers must be a comma-separated subset of {', '.join(LAYERS)}")
+        if self.alert_status not in ALERT_STATUSES:
+            raise ValueError(f"alert_status must be one of {', '.join(ALERT_STATUSES)}")
+
+    @classmethod
+    def from_args(cls, z: int, x: int, y: int, args: Mapping[str, Any]) -> "TileRequest":
+        """Build a request from query parameters ``layers``, ``boundary_type`` and ``alert_status``.
+
+        ``boundary_type`` may be repeated or comma separated.
+        """
+        layers = _split(args.get("layers")) or list(LAYERS)
+        if set(layers) <= set(LAYERS):
+            layers = [layer for layer in LAYERS if layer in layers]
+        getlist = getattr(args, "getlist", None)
+        raw_types = getlist("boundary_type") if getlist else [args.get("boundary_type")]
+        boundary_types = sorted({
+            normalize_boundary_type(value) for raw in raw_types for value in _split(raw)
+        })
+        return cls(
+            z=z,
+            x=x,
+            y=y,
+            layers=tuple(layers),
+            boundary_types=tuple(boundary_types),
+            alert_status=(args.get("alert_status") or "active").strip().lower(),
+        )
+
+    def cache_key(self, data_version: str, now: Optional[datetime] = None) -> str:
+        parts = [
+            "mvt",
+            data_version,
+            f"{self.z}/{self.x}/{self.y}",
+            ",".join(self.layers),
+            ",".join(self.boundary_types) or "*",
+            self.alert_status,
+        ]
+        if "alerts" in self.layers and self.alert_status != "all":
+            # Alerts expire as time passes, without any row changing
+            parts.append(str(int((now or utc_now()).timestamp() // 60)))
+        return "_".join(parts)
+
+
+def _split(value: Optional[str]) -> list:
+    return [part.strip().lower() for part in (value or "").split(",") if part.strip()]
+
+
+def build_tile_query(tile: TileRequest, now: Optional[datetime] = None):
+    """SQL returning the encoded tile as a single ``bytea`` value."""
+    params: Dict[str, Any] = {
+        "z": tile.z,
+        "x": tile.x,
+        "y": tile.y,
+        "extent": TILE_EXTENT,
+        "buffer": TILE_BUFFER,
+        "buffer_m": pixel_size(tile.z) * TILE_BUFFER,
+        "tolerance": simplify_tolerance(tile.z),
+    }
+    # Clip before simplifying, so high zooms do not simplify whole counties
+    mvt_geom = (
+        "ST_AsMVTGeom("
+        "ST_SimplifyPreserveTopology("
+        "ST_ClipByBox2D(ST_Transform({column}, 3857), ST_Expand(bounds.geom3857, :buffer_m)), :tolerance), "
+        "bounds.geom3857, :extent, :buffer, true)"
+    )
+
+    ctes = [
+        # Rows are selected by the buffered envelope, so features just outside
+        # the tile still draw into its buffer and no seam shows at tile edges
+        "bounds AS (SELECT ST_TileEnvelope(:z, :x, :y) AS geom3857, "
+        "ST_Transform(ST_Expand(ST_TileEnvelope(:z, :x, :y), :buffer_m), 4326) AS geom4326)"
+    ]
+    layers = []
+    expanding = []
+
+    if "boundaries" in tile.layers:
+        type_clause = ""
+        if tile.boundary_types:
+            type_clause = "AND lower(b.type) IN :boundary_types"
+            params["boundary_types"] = list(tile.boundary_types)
+            expanding.append("boundary_types")
+        ctes.append(
+            "boundary_rows AS ("
+            "SELECT b.id, b.name, b.type, "
+            f"{mvt_geom.format(column='b.geom')} AS geom "
+            "FROM boundaries b, bounds "
+            f"WHERE b.geom IS NOT NULL AND b.geom && bounds.geom4326 {type_clause})"
+        )
+        layers.append(
+            "(SELECT COALESCE(ST_AsMVT(boundary_rows, 'boundaries', :extent, 'geom'), ''::bytea) "
+            "FROM boundary_rows WHERE geom IS NOT NULL)"
+        )
+
+    if "alerts" in tile.layers:
+        status_clause = ""
+        if tile.alert_status == "active":
+            status_clause = "AND (a.expires IS NULL OR a.expires > :now) AND a.status != 'Expired'"
+        elif tile.alert_status == "expired":
+            status_clause = "AND a.expires < :now"
+        params["now"] = now or utc_now()
+        ctes.append(
+            "alert_rows AS ("
+            "SELECT a.id, a.identifier, a.event, a.severity, a.status, a.source, "
+            "to_char(a.expires AT TIME ZONE 'UTC', 'YYYY-MM-DD\"T\"HH24:MI:SS\"Z\"') AS expires, "
+            "(a.expires IS NOT NULL AND a.expires < :now) AS is_expired, "
+            f"{mvt_geom.format(column='a.geom')} AS geom "
+            "FROM cap_alerts a, bounds "
+            f"WHERE a.geom IS NOT NULL AND a.geom && bounds.geom4326 {status_clause})"
+        )
+        layers.append(
+            "(SELECT COALESCE(ST_AsMVT(alert_rows, 'alerts', :extent, 'geom'), ''::bytea) "
+            "FROM alert_rows WHERE geom IS NOT NULL)"
+        )
+
+    statement = text(f"WITH {', '.join(ctes)} SELECT {' || '.join(layers)} AS tile")
+    if expanding:
+        statement = statement.bindparams(*(bindparam(name, expanding=True) for name in expanding))
+    return statement, params
+
+
+def render_tile(tile: TileRequest, now: Optional[datetime] = None) -> bytes:
+    """Encode one tile straight from the database (no caching)."""
+    statement, params = build_tile_query(tile, now)
+    data = db.session.execute(statement, params).scalar()
+    return bytes(data or b"")
+
+
+_version_lock = threading.Lock()
+_version: Optional[str] = None
+_version_checked_at = 0.0
+
+
+def tile_data_version(max_age: float = VERSION_CHECK_SECONDS) -> str:
+    """Short hash of the boundary and alert high-water marks, re-read every ``max_age`` seconds."""
+    global _version, _version_checked_at
+    with _version_lock:
+        if _version is not None and time.monotonic() - _version_checked_at < max_age:
+            return _version
+
+    stamp = db.session.execute(select(
+        select(func.count(Boundary.id)).scalar_subquery(),
+        select(func.max(Boundary.id)).scalar_subquery(),
+        select(func.max(Boundary.updated_at)).scalar_subquery(),
+        select(func.count(CAPAlert.id)).scalar_subquery(),
+        select(func.max(CAPAlert.id)).scalar_subquery(),
+        select(func.max(CAPAlert.updated_at)).scalar_subquery(),
+    )).one()
+    version = hashlib.sha1(repr(tuple(stamp)).encode("utf-8")).hexdigest()[:16]
+
+    with _version_lock:
+        _version, _version_checked_at = version, time.monotonic()
+    return version
+
+
+def invalidate_tile_version() -> None:
+    """Re-read the data version on the next tile request."""
+    global _version
+    with _version_lock:
+        _version = None
+
+
+def get_vector_tile(tile: TileRequest, now: Optional[datetime] = None) -> Tuple[bytes, str]:
+    """Encoded tile and its ETag, from the tile cache when the data has not changed."""
+    now = now or utc_now()
+    key = tile.cache_key(tile_data_version(), now)
+    etag = hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+    try:
+        cached = cache.get(key)
+    except Exception:  # cache not initialised (CLI tools, tests)
+        cached = None
+    if cached is not None:
+        return cached, etag
+
+    started = time.perf_counter()
+    data = render_tile(tile, now)
+    logger.debug("Rendered tile %s/%s/%s (%d bytes) in %.1f ms",
+                 tile.z, tile.x, tile.y, len(data), (time.perf_counter() - started) * 1000)
+    try:
+        cache.set(key, data, timeout=TILE_CACHE_SECONDS)
+    except Exception:
+        pass
+    return data, etag
+
+
+__all__ = [
+    "ALERT_STATUSES",
+    "LAYERS",
+    "TILE_EXTENT",
+    "TileRequest",
+    "build_tile_query",
+    "get_vector_tile",
+    "invalidate_tile_version",
+    "pixel_size",
+    "render_tile",
+    "simplify_tolerance",
+    "tile_data_version",
+]
@@ -150,19 +150,20 @@ def _push_worker(app: 'Flask', socketio: 'SocketIO') -> None:
 
                     for source_name, adapter in controller._sources.items():
                         if adapter.metrics:
+                            metrics = adapter.get_metrics_snapshot()
                             source_metrics.append({
                                 'source_id': source_name,
                                 'source_name': adapter.config.name,
                                 'source_type': adapter.config.source_type.value,
                                 'source_status': adapter.status.value,
-                                'timestamp': adapter.metrics.timestamp,
-                                'peak_level_db': float(adapter.metrics.peak_level_db) if adapter.metrics.peak_level_db is not None else -120.0,
-                                'rms_level_db': float(adapter.metrics.rms_level_db) if adapter.metrics.rms_level_db is not None else -120.0,
-                                'sample_rate': adapter.metrics.sample_rate,
-                                'channels': adapter.metrics.channels,
-                                'frames_captured': adapter.metrics.frames_captured,
-                                'silence_detected': bool(adapter.metrics.silence_detected),
-                                'buffer_utilization': float(adapter.metrics.buffer_utilization) if adapter.metrics.buffer_utilization is not None else 0.0,
+                                'timestamp': metrics.timestamp,
+                                'peak_level_db': float(metrics.peak_level_db) if metrics.peak_level_db is not None else -120.0,
+                                'rms_level_db': float(metrics.rms_level_db) if metrics.rms_level_db is not None else -120.0,
+                                'sample_rate': metrics.sample_rate,
+                                'channels': metrics.channels,
+                                'frames_captured': metrics.frames_captured,
+                                'silence_detected': bool(metrics.silence_detected),
+                                'buffer_utilization': float(metrics.buffer_utilization) if metrics.buffer_utilization is not None else 0.0,
                             })
 
                     broadcast_stats = controller.get_broadcast_queue().get_stats()
@@ -0,0 +1,309 @@
+"""
+EAS Station - Emergency Alert System
+Copyright (c) 2025 Timothy Kramer (KR8MER)
+
+This file is part of EAS Station.
+
+EAS Station is dual-licensed software:
+- GNU Affero General Public License v3 (AGPL-3.0) for open-source use
+- Commercial License for proprietary use
+
+You should have received a copy of both licenses with this software.
+For more information, see LICENSE and LICENSE-COMMERCIAL files.
+
+IMPORTANT: This software cannot be rebranded or have attribution removed.
+See NOTICE file for complete terms.
+
+Repository: https://github.com/KR8MER/eas-station
+"""
+
+from __future__ import annotations
+
+"""Write-behind batching for high-volume audit and log tables.
+
+System log entries, poll history, poll debug records and GPIO activation
+logs used to be written with one session add and commit per event, so a
+busy poll paid a commit (and a WAL fsync) for every row.  Producers now hand
+rows to a shared ``WriteBehindSink`` instead: a background thread collects
+them for up to ``flush_interval`` seconds (or ``batch_size`` rows) and writes
+each batch as multi-row ``INSERT ... VALUES`` statements in one transaction.
+
+The queue is bounded; when it is full new rows are dropped and counted
+rather than blocking the producer.  ``stats()`` reports submitted, written,
+dropped, failed and delayed rows.  Sinks flush on ``close()`` and at
+interpreter exit.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from sqlalchemy import Table, insert
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_QUEUE = 10_000
+DEFAULT_FLUSH_INTERVAL = 0.5
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_DELAY_WARNING_SECONDS = 5.0
+
+# (table, row, enqueued-at monotonic time)
+_Item = Tuple[Table, Dict[str, Any], float]
+
+
+def _table_of(target: Any) -> Table:
+    """Accept a Table or a declarative model class."""
+    return target if isinstance(target, Table) else target.__table__
+
+
+class WriteBehindSink:
+    """Batches row inserts and writes them from a background thread."""
+
+    def __init__(
+        self,
+        bind: Engine,
+        *,
+        name: str = "write-behind",
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        delay_warning_seconds: float = DEFAULT_DELAY_WARNING_SECONDS,
+    ):
+        """Initialize the sink.
+
+        Args:
+            bind: Engine the rows are written through
+            name: Name used for the worker thread and log messages
+            max_queue: Rows that may wait before new ones are dropped
+            flush_interval: Longest a row waits for its batch to fill (seconds)
+            batch_size: Most rows written per transaction
+            delay_warning_seconds: Rows written later than this count as delayed
+        """
+        self.bind = bind
+        self.name = name
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.delay_warning_seconds = delay_warning_seconds
+
+        self._queue: "queue.Queue[_Item]" = queue.Queue(maxsize=max_queue)
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._progress = threading.Condition()
+
+        self._submitted = 0
+        self._written = 0
+        self._dropped = 0
+        self._failed = 0
+        self._delayed = 0
+        self._flushes = 0
+        self._max_delay = 0.0
+        self._last_error: Optional[str] = None
+
+    # ------------------------------------------------------------------ producers
+
+    def submit(self, target: Any, row: Mapping[str, Any]) -> bool:
+        """Queue one row for insertion into ``target`` (a Table or model class).
+
+        Returns:
+            False if the queue was full or the sink is closed and the row was dropped
+        """
+        if self._stopping.is_set():
+            return self._drop("sink is closed")
+
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((_table_of(target), dict(row), time.monotonic()))
+        except queue.Full:
+            return self._drop("queue is full")
+
+        with self._progress:
+            self._submitted += 1
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Write every row submitted so far before returning.
+
+        Returns:
+            True if all of them were written (or failed) within ``timeout``
+        """
+        with self._progress:
+            target = self._submitted
+        self._drain()
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._progress:
+            while self._written + self._failed < target:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._progress.wait(remaining if remaining is not None else 0.1)
+        return True
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Stop accepting rows, write what is queued and stop the worker."""
+        if self._stopping.is_set():
+            return
+        self._stopping.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        self._drain()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for monitoring dropped, failed and delayed rows."""
+        with self._progress:
+            return {
+                "name": self.name,
+                "queue_depth": self._queue.qsize(),
+                "queue_capacity": self._queue.maxsize,
+                "submitted": self._submitted,
+                "written": self._written,
+                "dropped": self._dropped,
+                "failed": self._failed,
+                "delayed": self._delayed,
+                "flushes": self._flushes,
+                "max_delay_seconds": round(self._max_delay, 3),
+                "last_error": self._last_error,
+            }
+
+    # ------------------------------------------------------------------ worker
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name=f"{self.name}-writer", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            # Let the batch fill for up to flush_interval after its first row
+            batch = [first]
+            deadline = first[2] + self.flush_interval
+            while len(batch) < self.batch_size and not self._stopping.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._write(batch)
+
+        self._drain()
+
+    def _drain(self) -> None:
+        """Write everything currently queued, in ``batch_size`` transactions."""
+        while True:
+            batch: List[_Item] = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return
+            self._write(batch)
+
+    def _write(self, batch: List[_Item]) -> None:
+        """Insert one batch in a single transaction; isolate failures per table."""
+        groups: "OrderedDict[Tuple[Table, Tuple[str, ...]], List[Dict[str, Any]]]" = OrderedDict()
+        oldest = min(enqueued for _, _, enqueued in batch)
+        for table, row, _ in batch:
+            groups.setdefault((table, tuple(sorted(row))), []).append(row)
+
+        written = failed = 0
+        try:
+            with self.bind.begin() as conn:
+                for (table, _), rows in groups.items():
+                    conn.execute(insert(table).values(rows))
+            written = len(batch)
+        except Exception as exc:
+            # Retry table by table so one broken table does not lose the others' rows
+            logger.warning("%s: batched insert of %d rows failed, retrying per table: %s",
+                           self.name, len(batch), exc)
+            for (table, _), rows in groups.items():
+                try:
+                    with self.bind.begin() as conn:
+                        conn.execute(insert(table).values(rows))
+                    written += len(rows)
+                except Exception as table_exc:
+                    failed += len(rows)
+                    self._last_error = f"{table.name}: {table_exc}"
+                    logger.error("%s: dropping %d %s rows: %s", self.name, len(rows), table.name, table_exc)
+
+        delay = time.monotonic() - oldest
+        delayed = len(batch) if delay > self.delay_warning_seconds else 0
+        if delayed:
+            logger.warning("%s: wrote rows %.1fs after they were queued", self.name, delay)
+
+        with self._progress:
+            self._written += written
+            self._failed += failed
+            self._delayed += delayed
+            self._flushes += 1
+            self._max_delay = max(self._max_delay, delay)
+            self._progress.notify_all()
+
+    def _drop(self, reason: str) -> bool:
+        with self._progress:
+            self._dropped += 1
+            dropped = self._dropped
+        # Log the first drop and then every thousandth, not every row
+        if dropped == 1 or dropped % 1000 == 0:
+            logger.warning("%s: dropped row (%s); %d dropped so far", self.name, reason, dropped)
+        return False
+
+
+_sinks: Dict[int, WriteBehindSink] = {}
+_sinks_lock = threading.Lock()
+
+
+def get_write_behind_sink(bind: Engine, **kwargs: Any) -> WriteBehindSink:
+    """Return the shared sink for ``bind``, creating it on first use.
+
+    Keyword arguments configure the sink when it is created and are ignored
+    afterwards.
+    """
+    with _sinks_lock:
+        sink = _sinks.get(id(bind))
+        if sink is None or sink.bind is not bind or sink._stopping.is_set():
+            sink = WriteBehindSink(bind, name=kwargs.pop("name", f"write-behind-{bind.url.database}"), **kwargs)
+            _sinks[id(bind)] = sink
+        return sink
+
+
+def close_write_behind_sinks(timeout: float = 5.0) -> None:
+    """Flush and stop every shared sink."""
+    with _sinks_lock:
+        sinks = list(_sinks.values())
+        _sinks.clear()
+    for sink in sinks:
+        try:
+            sink.close(timeout)
+        except Exception as exc:
+            logger.error("Failed to close %s: %s", sink.name, exc)
+
+
+atexit.register(close_write_behind_sinks)
+
+
+__all__ = [
+    "WriteBehindSink",
+    "close_write_behind_sinks",
+    "get_write_behind_sink",
+]
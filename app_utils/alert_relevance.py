@@ -0,0 +1,187 @@
+"""
+EAS Station - Emergency Alert System
+Copyright (c) 2025 Timothy Kramer (KR8MER)
+
+This file is part of EAS Station.
+
+EAS Station is dual-licensed software:
+- GNU Affero General Public License v3 (AGPL-3.0) for open-source use
+- Commercial License for proprietary use
+
+You should have received a copy of both licenses with this software.
+For more information, see LICENSE and LICENSE-COMMERCIAL files.
+
+IMPORTANT: This software cannot be rebranded or have attribution removed.
+See NOTICE file for complete terms.
+
+Repository: https://github.com/KR8MER/eas-station
+"""
+
+from __future__ import annotations
+
+"""Compiled SAME/UGC relevance matching for one or many station profiles.
+
+A ``RelevanceProfile`` holds the SAME, zone and storage-zone codes of one
+station.  ``CompiledRelevanceMatcher`` indexes any number of profiles by
+code once, so matching an alert costs one dictionary lookup per alert code
+no matter how many profiles are configured, and one fetched feed can be
+matched against every station in a single pass.
+
+Per profile the rules are those the CAP poller has always applied, in order:
+
+1. The first SAME code that is one of the profile's codes, or a statewide
+   code (``0SS000``) for a state the profile has codes in.  Storage and
+   broadcast.
+2. Otherwise the first UGC code in the profile's zones.  Storage only if the
+   zone is also one of its storage zones.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from app_utils.location_settings import normalise_upper, sanitize_fips_codes
+
+SAME_MATCH = "SAME_MATCH"
+UGC_MATCH = "UGC_MATCH"
+NO_MATCH = "NO_MATCH"
+
+_UGC_PATTERN = re.compile(r"^[A-Z]{2}[CZ]\d{3}$")
+
+
+def is_valid_ugc_code(ugc: Any) -> bool:
+    r"""Validate UGC code format: [A-Z]{2}[CZ]\d{3} (e.g., OHZ016, OHC137)."""
+    if not ugc or not isinstance(ugc, str):
+        return False
+    return bool(_UGC_PATTERN.match(ugc.strip().upper()))
+
+
+def normalize_same_code(value: Any) -> Optional[str]:
+    """Zero-padded six digit SAME code, or None when ``value`` has no digits."""
+    digits = "".join(ch for ch in str(value) if ch.isdigit())
+    if not digits:
+        return None
+    return digits.zfill(6)[:6]
+
+
+def normalize_alert_codes(geocode: Optional[Mapping[str, Any]]) -> Tuple[List[str], List[str], List[Any]]:
+    """Normalize an alert's ``geocode`` mapping.
+
+    Returns:
+        Tuple of (valid upper-case UGC codes, SAME codes, malformed UGC values),
+        each in the order the alert lists them
+    """
+    geocode = geocode or {}
+    ugc_codes: List[str] = []
+    malformed: List[Any] = []
+    for ugc in geocode.get("UGC", []) or []:
+        if not ugc:
+            continue
+        ugc_str = str(ugc).strip().upper()
+        if _UGC_PATTERN.match(ugc_str):
+            ugc_codes.append(ugc_str)
+        else:
+            malformed.append(ugc)
+
+    same_codes = [code for code in map(normalize_same_code, geocode.get("SAME", []) or []) if code]
+    return ugc_codes, same_codes, malformed
+
+
+@dataclass(frozen=True)
+class RelevanceProfile:
+    """The codes one station accepts alerts for."""
+
+    name: str
+    same_codes: FrozenSet[str] = frozenset()
+    zone_codes: FrozenSet[str] = frozenset()
+    storage_zone_codes: FrozenSet[str] = frozenset()
+
+    @classmethod
+    def from_location_settings(cls, name: str, settings: Mapping[str, Any]) -> "RelevanceProfile":
+        """Build a profile from a location settings mapping (as stored or exported)."""
+        fips_codes, _ = sanitize_fips_codes(settings.get("fips_codes"))
+        return cls(
+            name=name,
+            same_codes=frozenset(code for code in fips_codes if code),
+            zone_codes=frozenset(normalise_upper(settings.get("zone_codes") or [])),
+            storage_zone_codes=frozenset(normalise_upper(settings.get("storage_zone_codes") or [])),
+        )
+
+
+@dataclass(frozen=True)
+class RelevanceMatch:
+    """Why an alert is relevant to one profile."""
+
+    profile: str
+    reason: str
+    code: str
+    is_storage_relevant: bool
+    statewide: bool = False
+
+
+@dataclass
+class CompiledRelevanceMatcher:
+    """Code indexes over a fixed set of profiles; rebuild when configuration changes."""
+
+    profiles: Sequence[RelevanceProfile]
+    _same_index: Dict[str, Tuple[int, ...]] = field(init=False, repr=False)
+    _state_index: Dict[str, Tuple[int, ...]] = field(init=False, repr=False)
+    _ugc_index: Dict[str, Tuple[Tuple[int, bool], ...]] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.profiles = tuple(self.profiles)
+        same: Dict[str, List[int]] = {}
+        state: Dict[str, List[int]] = {}
+        ugc: Dict[str, List[Tuple[int, bool]]] = {}
+
+        for index, profile in enumerate(self.profiles):
+            for code in profile.same_codes:
+                same.setdefault(code, []).append(index)
+            # A statewide code 0SS000 matches profiles with any code starting 0SS
+            for prefix in {code[:3] for code in profile.same_codes if code[:3]}:
+                state.setdefault(prefix, []).append(index)
+            for zone in profile.zone_codes:
+                ugc.setdefault(zone, []).append((index, zone in profile.storage_zone_codes))
+
+        self._same_index = {code: tuple(indexes) for code, indexes in same.items()}
+        self._state_index = {prefix: tuple(indexes) for prefix, indexes in state.items()}
+        self._ugc_index = {zone: tuple(entries) for zone, entries in ugc.items()}
+
+    def match_codes(self, same_codes: Iterable[str], ugc_codes: Iterable[str]) -> Dict[int, RelevanceMatch]:
+        """Match normalized alert codes against every profile.
+
+        Returns:
+            Mapping of profile index to its match; profiles without a match are absent
+        """
+        matches: Dict[int, RelevanceMatch] = {}
+        remaining = len(self.profiles)
+
+        for same in same_codes:
+            for index in self._same_index.get(same, ()):
+                if index not in matches:
+                    matches[index] = RelevanceMatch(self.profiles[index].name, SAME_MATCH, same, True)
+            if same.endswith("000"):
+                for index in self._state_index.get(same[:3], ()):
+                    if index not in matches:
+                        matches[index] = RelevanceMatch(self.profiles[index].name, SAME_MATCH, same, True, True)
+            if len(matches) == remaining:
+                return matches
+
+        for ugc in ugc_codes:
+            for index, is_storage in self._ugc_index.get(ugc, ()):
+                if index not in matches:
+                    matches[index] = RelevanceMatch(self.profiles[index].name, UGC_MATCH, ugc, is_storage)
+            if len(matches) == remaining:
+                break
+
+        return matches
+
+    def match_alert(self, alert_data: Mapping[str, Any]) -> Dict[str, RelevanceMatch]:
+        """Per-profile relevance of one GeoJSON-style alert, keyed by profile name."""
+        properties = alert_data.get("properties", {}) or {}
+        ugc_codes, same_codes, _ = normalize_alert_codes(properties.get("geocode"))
+        return {match.profile: match for match in self.match_codes(same_codes, ugc_codes).values()}
+
+    def match_alerts(self, alerts: Iterable[Mapping[str, Any]]) -> List[Dict[str, RelevanceMatch]]:
+        """Per-profile relevance of every alert of one fetch, in order."""
+        return [self.match_alert(alert) for alert in alerts]
@@ -549,6 +549,7 @@ class GPIOController:
         """
         self.db_session = db_session
         self.logger = logger
+        self._log_sink = None
         self._pins: Dict[int, GPIOPinConfig] = {}
         self._states: Dict[int, GPIOState] = {}
         self._activation_times: Dict[int, float] = {}
@@ -1108,8 +1109,14 @@ class GPIOController:
 
         try:
             from app_core.models import GPIOActivationLog
+            from app_core.write_behind import get_write_behind_sink
 
-            log_entry = GPIOActivationLog(
+            # Audit rows are batched by the shared write-behind sink so that
+            # bursts of activations do not each pay for a commit
+            if self._log_sink is None:
+                self._log_sink = get_write_behind_sink(self.db_session.get_bind())
+
+            self._log_sink.submit(GPIOActivationLog, dict(
                 pin=event.pin,
                 activation_type=event.activation_type.value,
                 activated_at=event.activated_at,
@@ -1120,19 +1127,14 @@ class GPIOController:
                 reason=event.reason,
                 success=event.success,
                 error_message=event.error_message,
-            )
-
-            self.db_session.add(log_entry)
-            self.db_session.commit()
+            ))
 
             if self.logger:
-                self.logger.debug(f"Saved GPIO activation log for pin {event.pin}")
+                self.logger.debug(f"Queued GPIO activation log for pin {event.pin}")
 
         except Exception as exc:
             if self.logger:
                 self.logger.error(f"Failed to save GPIO activation log: {exc}")
-            if self.db_session:
-                self.db_session.rollback()
 
     def cleanup(self) -> None:
         """Cleanup all GPIO pins and stop watchdogs."""
@@ -1152,6 +1154,9 @@ class GPIOController:
                 finally:
                     self._devices.pop(pin, None)
 
+            if self._log_sink is not None:
+                self._log_sink.flush(timeout=5.0)
+
             if self._initialized and self.logger:
                 self.logger.info("GPIO cleanup complete")
 
@@ -29,7 +29,9 @@ Performance improvements:
 - Datetime: More robust parsing with python-dateutil
 """
 
-from typing import Any, Dict, Optional, Union
+from typing import IO, Any, Dict, Iterator, Optional, Union
+import codecs
+import io
 import logging
 
 logger = logging.getLogger(__name__)
@@ -163,6 +165,117 @@ def json_dump(obj: Any, fp, indent: Optional[int] = None, ensure_ascii: bool = T
     fp.write(json_str)
 
 
+_JSON_WHITESPACE = ' \t\n\r'
+
+
+class _JSONStreamReader:
+    """Buffered cursor over a text or UTF-8 byte stream for ``iter_json_array_items``."""
+
+    def __init__(self, stream: IO, chunk_size: int):
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._decoder = _stdlib_json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def error(self, message: str) -> JSONDecodeError:
+        return JSONDecodeError(message, self._buffer, self._pos)
+
+    def _fill(self) -> bool:
+        """Append at least as much as is still pending, so retries stay linear."""
+        if self._eof:
+            return False
+        chunk = self._stream.read(max(self._chunk_size, len(self._buffer) - self._pos))
+        if isinstance(chunk, bytes):
+            text = self._text_decoder.decode(chunk, final=not chunk)
+        else:
+            text = chunk
+        if not chunk:
+            self._eof = True
+        self._buffer = self._buffer[self._pos:] + text
+        self._pos = 0
+        return bool(chunk)
+
+    def peek(self) -> str:
+        """Next non-whitespace character, without consuming it."""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _JSON_WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                raise self.error('Unexpected end of JSON data')
+
+    def take(self, expected: str) -> str:
+        char = self.peek()
+        if char not in expected:
+            raise self.error('Expecting ' + ' or '.join(repr(char) for char in expected))
+        self._pos += 1
+        return char
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self._buffer) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+
+def iter_json_array_items(stream: IO, key: str, chunk_size: int = 64 * 1024) -> Iterator[Any]:
+    """
+    Incrementally parse a JSON object, yielding each item of its ``key`` array.
+
+    Only the current item is held in memory, so a GeoJSON FeatureCollection
+    of any size can be read one feature at a time with ``key="features"``.
+    Other top-level members are skipped; parsing stops at the end of the
+    array.
+
+    Args:
+        stream: Binary (UTF-8, optionally with BOM) or text file object
+        key: Name of the top-level array member
+        chunk_size: Characters or bytes read at a time
+
+    Yields:
+        Decoded items of the array, in document order (none if ``key`` is absent)
+
+    Raises:
+        JSONDecodeError: If the JSON is malformed (after the items before the error)
+    """
+    reader = _JSONStreamReader(stream, chunk_size)
+    reader.take('{')
+    if reader.peek() == '}':
+        return
+
+    while True:
+        if reader.peek() != '"':
+            raise reader.error('Expecting property name enclosed in double quotes')
+        name = reader.value()
+        reader.take(':')
+        if name != key:
+            reader.value()
+        else:
+            reader.take('[')
+            if reader.peek() == ']':
+                return
+            while True:
+                yield reader.value()
+                if reader.take(',]') == ']':
+                    return
+        if reader.take(',}') == '}':
+            return
+
+
 # =============================================================================
 # XML Parsing - Fast XML with fallback
 # =============================================================================
@@ -227,6 +340,54 @@ def parse_xml_file(filename: str):
         return tree.getroot()
 
 
+def iter_xml_elements(xml_string: Union[str, bytes], tag: str) -> Iterator[Any]:
+    """
+    Incrementally parse XML, yielding each completed ``tag`` element.
+
+    Unlike ``parse_xml_string`` the whole document is never built as a tree:
+    once the caller moves on to the next element, the previous one is cleared
+    and detached from its parent, so memory stays proportional to a single
+    element rather than the whole document.  Yielded elements must not be
+    used after the generator has advanced.
+
+    Args:
+        xml_string: XML string or bytes to parse
+        tag: Fully qualified tag to yield, e.g. ``{urn:oasis:names:tc:emergency:cap:1.2}alert``
+
+    Yields:
+        Complete elements with the requested tag, in document order
+
+    Raises:
+        ParseError: If the XML is malformed (after the elements before the error)
+    """
+    if isinstance(xml_string, str):
+        xml_string = xml_string.encode('utf-8')
+    source = io.BytesIO(xml_string)
+
+    if _HAS_LXML:
+        for _, elem in _lxml_etree.iterparse(source, events=('end',), tag=tag):
+            yield elem
+            parent = elem.getparent()
+            elem.clear()
+            if parent is not None:
+                parent.remove(elem)
+        return
+
+    # ElementTree has no getparent(); track the open elements instead
+    open_elements = []
+    for event, elem in _stdlib_ET.iterparse(source, events=('start', 'end')):
+        if event == 'start':
+            open_elements.append(elem)
+            continue
+        open_elements.pop()
+        if elem.tag != tag:
+            continue
+        yield elem
+        elem.clear()
+        if open_elements:
+            open_elements[-1].remove(elem)
+
+
 def get_element_tree_module():
     """
     Get the ElementTree module being used (for compatibility).
@@ -42,6 +42,7 @@ import sys
 import time
 import signal
 import logging
+import threading
 import redis
 import json
 from typing import Optional, Any, Dict
@@ -76,11 +77,14 @@ else:
 
 # Global state
 _running = True
+_stop_event = threading.Event()  # Set with _running = False; wakes lease waits
 _redis_client: Optional[redis.Redis] = None
+_master_lease = None  # MasterLease held while this service drives the audio hardware
 _audio_controller = None
 _eas_monitor = None
 _auto_streaming_service = None
 _radio_manager = None  # Reference to RadioManager for metrics collection
+_online_detector = None  # Live anomaly detection on collected metrics
 
 
 def signal_handler(signum, frame):
@@ -88,6 +92,7 @@ def signal_handler(signum, frame):
     global _running
     logger.info(f"Received signal {signum}, initiating graceful shutdown...")
     _running = False
+    _stop_event.set()
 
 
 def get_redis_client() -> redis.Redis:
@@ -314,6 +319,8 @@ def initialize_auto_streaming(app, audio_controller):
                 icecast_admin_user=auto_config.admin_user,
                 icecast_admin_password=auto_config.admin_password,
                 default_bitrate=128,
+                low_latency=auto_config.low_latency,
+                max_latency_ms=auto_config.max_latency_ms,
                 enabled=True,
                 audio_controller=audio_controller
             )
@@ -336,7 +343,11 @@ def initialize_eas_monitor(app, audio_controller):
     global _eas_monitor
 
     with app.app_context():
-        from app_core.audio.eas_monitor import ContinuousEASMonitor, create_fips_filtering_callback
+        from app_core.audio.eas_monitor import (
+            ContinuousEASMonitor,
+            configure_received_alert_persistence,
+            create_fips_filtering_callback,
+        )
         from app_core.audio.broadcast_adapter import BroadcastAudioAdapter
         from app_core.audio.startup_integration import load_fips_codes_from_config
 
@@ -357,6 +368,10 @@ def initialize_eas_monitor(app, audio_controller):
         configured_fips = load_fips_codes_from_config()
         logger.info(f"Loaded {len(configured_fips)} FIPS codes for alert filtering")
 
+        # Received-alert DB writes run on a write-behind thread in this app's context
+        persistence = configure_received_alert_persistence(app=app)
+        logger.info(f"Received-alert persistence spooling to {persistence.spool_dir}")
+
         # Create alert callback with filtering
         def forward_alert_handler(alert):
             """Forward matched alerts."""
@@ -524,6 +539,7 @@ def collect_metrics():
         "eas_monitor": None,
         "broadcast_queue": None,
         "radio_manager": None,  # Add radio manager metrics for app container
+        "latency_histograms": None,  # Per-stage pipeline latency, rendered by /metrics
         "timestamp": time.time()
     }
 
@@ -659,35 +675,61 @@ def collect_metrics():
             except Exception as e:
                 logger.error(f"Error getting EAS monitor stats: {e}")
 
+        try:
+            from app_core.audio.latency_metrics import get_latency_registry
+            metrics["latency_histograms"] = get_latency_registry().snapshot()
+        except Exception as e:
+            logger.error(f"Error getting latency histograms: {e}")
+
     except Exception as e:
         logger.error(f"Error collecting metrics: {e}")
 
     return metrics
 
 
-def publish_metrics_to_redis(metrics):
-    """Publish metrics to Redis for web application."""
+def record_live_anomalies(app, metrics):
+    """Score collected metrics with the online detector and store any anomalies."""
+    global _online_detector
+
     try:
-        r = get_redis_client()
+        if _online_detector is None:
+            from app_core.analytics.online_detector import OnlineAnomalyDetector
+            _online_detector = OnlineAnomalyDetector()
 
-        # Add heartbeat timestamp and process ID (required by app container)
-        metrics["_heartbeat"] = time.time()
-        metrics["_master_pid"] = os.getpid()
+        anomalies = _online_detector.observe_metrics(metrics)
+        if not anomalies:
+            return
 
-        # Flatten nested dicts to strings for Redis hash
-        flat_metrics = {}
-        for key, value in metrics.items():
-            if isinstance(value, (dict, list)):
-                flat_metrics[key] = json.dumps(value)
-            else:
-                flat_metrics[key] = str(value)
+        from app_core.extensions import db
+        with app.app_context():
+            try:
+                db.session.add_all(anomalies)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+        logger.warning(f"Recorded {len(anomalies)} live anomal{'y' if len(anomalies) == 1 else 'ies'}")
+    except Exception as e:
+        logger.error(f"Error recording live anomalies: {e}")
+
+
+def publish_metrics_to_redis(metrics):
+    """Publish metrics to Redis for web application.
+
+    ``eas:metrics`` is replaced by the lease's fenced script, so a service that
+    lost its master lease (e.g. after a long stall) cannot overwrite the
+    metrics of the service that took over.
+    """
+    if _master_lease is None or not _master_lease.held():
+        logger.warning("Not holding the audio master lease, skipping metrics publish")
+        return
+
+    try:
+        r = get_redis_client()
 
-        # Store in Redis with pipeline for atomicity
+        # Visualization data goes in one pipeline; the main metrics hash is written last
         pipe = r.pipeline()
-        pipe.delete("eas:metrics")  # Use same key as worker coordinator
-        pipe.hset("eas:metrics", mapping=flat_metrics)
-        pipe.expire("eas:metrics", 60)  # Expire if service dies
-        
+
         # Publish waveform and spectrogram data for each source separately (to keep main metrics lightweight)
         if _audio_controller:
             for name, source in _audio_controller._sources.items():
@@ -779,6 +821,54 @@ def publish_metrics_to_redis(metrics):
                                 )
                                 continue
 
+                            # Prefer the receiver's averaged Welch PSD when it has produced a frame
+                            engine = (
+                                receiver_instance.get_spectrum_engine()
+                                if hasattr(receiver_instance, 'get_spectrum_engine')
+                                else None
+                            )
+                            # One snapshot so all three traces come from the same frame
+                            snapshot = engine.get_snapshot() if engine is not None else None
+                            if snapshot is not None:
+                                average_db = snapshot.average_db
+                                peak_db = snapshot.peak_db
+                                waterfall_db = snapshot.waterfall_db
+                                config = receiver_instance.config
+                                frequency_hz = config.frequency_hz
+                                sample_rate = config.sample_rate
+
+                                # Normalize to 0-1 range for display
+                                min_db = float(average_db.min())
+                                max_db = float(max(average_db.max(), peak_db.max()))
+                                span = max_db - min_db if max_db > min_db else 1.0
+                                spectrum_payload = {
+                                    'identifier': identifier,
+                                    'spectrum': _sanitize_value(((average_db - min_db) / span).tolist()),
+                                    'peak_hold': _sanitize_value(np.clip((peak_db - min_db) / span, 0.0, 1.0).tolist()),
+                                    # Decimated history on the same scale, oldest row first
+                                    'waterfall': _sanitize_value(
+                                        np.round(np.clip((waterfall_db - min_db) / span, 0.0, 1.0), 3).tolist()
+                                    ),
+                                    'waterfall_rows': int(waterfall_db.shape[0]),
+                                    'waterfall_bins': int(waterfall_db.shape[1]),
+                                    'level_min_dbfs': min_db,
+                                    'level_max_dbfs': max_db,
+                                    'fft_size': engine.fft_size,
+                                    'sample_rate': sample_rate,
+                                    'center_frequency': frequency_hz,
+                                    'freq_min': frequency_hz - (sample_rate / 2) if sample_rate else 0,
+                                    'freq_max': frequency_hz + (sample_rate / 2) if sample_rate else 0,
+                                    'engine': engine.get_stats(),
+                                    'timestamp': time.time(),
+                                    'status': 'available'
+                                }
+                                pipe.setex(
+                                    f"eas:spectrum:{identifier}",
+                                    5,
+                                    json.dumps(spectrum_payload)
+                                )
+                                continue
+
                             # Get IQ samples for spectrum
                             if hasattr(receiver_instance, 'get_samples'):
                                 iq_samples = receiver_instance.get_samples(num_samples=2048)
@@ -867,8 +957,10 @@ def publish_metrics_to_redis(metrics):
         
         pipe.execute()
 
-        # Publish notification for real-time updates
-        r.publish("eas:metrics:update", "1")
+        # Replace the metrics hash (heartbeat, PID and fencing token included)
+        # and notify subscribers, only while our lease is current
+        if not _master_lease.write_metrics(metrics):
+            logger.error("Metrics write rejected by fencing token; another audio service holds the lease")
 
     except Exception as e:
         logger.error(f"Error publishing metrics to Redis: {e}")
@@ -876,7 +968,7 @@ def publish_metrics_to_redis(metrics):
 
 def main():
     """Main service loop."""
-    global _running, _audio_controller
+    global _running, _audio_controller, _master_lease
 
     logger.info("=" * 80)
     logger.info("EAS Station - Standalone Audio Processing Service")
@@ -891,6 +983,24 @@ def main():
         logger.info("Connecting to Redis...")
         r = get_redis_client()
 
+        # Only one audio service may own the hardware and publish metrics; a
+        # second instance waits here as a hot standby until the lease is free
+        from app_core.audio.worker_coordinator_redis import MasterLease
+
+        _master_lease = MasterLease(client=r)
+        logger.info(f"Waiting for the audio master lease as {_master_lease.owner_id}...")
+        if not _master_lease.wait(stop_event=_stop_event):
+            logger.info("Shutdown requested before the master lease was acquired")
+            return 0
+        logger.info(f"✅ Acquired audio master lease (token={_master_lease.token})")
+        lease_thread = threading.Thread(
+            target=_master_lease.run_heartbeat,
+            args=(lambda: None, _stop_event),  # Renew only; metrics are written by the main loop
+            daemon=True,
+            name="MasterLeaseRenewal",
+        )
+        lease_thread.start()
+
         # Initialize database
         logger.info("Initializing database connection...")
         app = initialize_database()
@@ -958,13 +1068,12 @@ def main():
             logger.error("Failed to initialize EAS monitor")
             return 1
 
-        # Initialize Redis Pub/Sub command subscriber
+        # Initialize Redis Streams command subscriber
         logger.info("Starting Redis command subscriber...")
         command_subscriber = None
         subscriber_thread = None
         try:
             from app_core.audio.redis_commands import AudioCommandSubscriber
-            import threading
 
             command_subscriber = AudioCommandSubscriber(
                 audio_controller,
@@ -991,7 +1100,6 @@ def main():
         streaming_port = 5002  # Default port, will be overwritten if server starts
         try:
             from flask import Flask, Response, stream_with_context, jsonify
-            import threading
             from werkzeug.serving import make_server
             
             # Create Flask app for streaming endpoints
@@ -1187,9 +1295,16 @@ def main():
         # Main loop: publish metrics every 5 seconds
         last_metrics_time = 0
         metrics_interval = 5.0
+        lease_lost = False
 
         while _running:
             try:
+                if not _master_lease.held():
+                    # A standby may already own the hardware; stop instead of competing
+                    logger.error("❌ Lost the audio master lease, shutting down")
+                    lease_lost = True
+                    break
+
                 current_time = time.time()
 
                 # Process pending commands from webapp (non-blocking)
@@ -1199,6 +1314,7 @@ def main():
                 if current_time - last_metrics_time >= metrics_interval:
                     metrics = collect_metrics()
                     publish_metrics_to_redis(metrics)
+                    record_live_anomalies(app, metrics)
                     last_metrics_time = current_time
 
                     # Log health status
@@ -1218,6 +1334,8 @@ def main():
                 time.sleep(5)
 
         logger.info("Shutting down audio service...")
+        _stop_event.set()
+        lease_thread.join(timeout=5)
 
         # Stop command subscriber
         if command_subscriber:
@@ -1237,11 +1355,20 @@ def main():
             logger.info("Stopping audio controller...")
             # Audio controller doesn't have explicit stop, sources will be cleaned up
 
+        # Hand the lease straight to a waiting standby
+        try:
+            if _master_lease.release():
+                logger.info("Released audio master lease")
+        except redis.RedisError as e:
+            logger.warning(f"Error releasing master lease: {e}")
+
         # Close Redis connection
         if _redis_client:
             logger.info("Closing Redis connection...")
             _redis_client.close()
 
+        if lease_lost:
+            return 1
         logger.info("✅ Audio service shut down gracefully")
         return 0
 
@@ -62,7 +62,7 @@ import math
 print("[CAP_POLLER_INIT] requests, logging, hashlib, math imported", flush=True)
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
 import argparse
 print("[CAP_POLLER_INIT] datetime, pathlib, typing, argparse imported", flush=True)
 
@@ -156,6 +156,12 @@ from app_utils import (
     utc_now as util_utc_now,
 )
 print(f"[CAP_POLLER] Importing app_utils.alert_sources...")
+from app_utils.alert_relevance import (
+    SAME_MATCH,
+    CompiledRelevanceMatcher,
+    RelevanceProfile,
+    normalize_alert_codes,
+)
 from app_utils.alert_sources import (
     ALERT_SOURCE_IPAWS,
     ALERT_SOURCE_NOAA,
@@ -174,8 +180,9 @@ print(f"[CAP_POLLER] Importing app_utils.eas...")
 from app_utils.eas import EASBroadcaster, load_eas_config
 print(f"[CAP_POLLER] Importing app_core.radio...")
 from app_core.radio import RadioManager, ensure_radio_tables
+from app_core.write_behind import close_write_behind_sinks, get_write_behind_sink
 print(f"[CAP_POLLER] Importing app_utils.optimized_parsing...")
-from app_utils.optimized_parsing import json_loads, json_dumps, parse_xml_string, get_element_tree_module
+from app_utils.optimized_parsing import json_loads, json_dumps, iter_xml_elements, get_element_tree_module
 print(f"[CAP_POLLER] All app module imports complete!")
 
 # Use optimized XML parser (lxml if available, else xml.etree.ElementTree)
@@ -499,10 +506,17 @@ class CAPPoller:
         self.engine = self._make_engine_with_retry(self.database_url)
         Session = sessionmaker(bind=self.engine)
         self.db_session = Session()
+        # Log, poll history and debug rows are batched off the poll path
+        self._log_sink = get_write_behind_sink(self.engine)
+        self._log_tables_present: Set[str] = set()
 
         self.last_poll_sources: List[str] = []
         self.last_duplicates_filtered: int = 0
         self.last_fetch_errors: List[str] = []  # Track errors during fetch for frontend logging
+        # (identifier, sent) of IPAWS messages already processed, and those seen this fetch
+        self._known_ipaws_alerts: Set[Tuple[str, str]] = set()
+        self._ipaws_alerts_seen: Set[Tuple[str, str]] = set()
+        self.last_unchanged_skipped: int = 0
 
         # Verify tables exist (don’t crash if missing)
         try:
@@ -730,6 +744,7 @@ class CAPPoller:
         self.same_codes = {code for code in fips_codes if code}
         # Storage zone codes: UGC/zone codes that should trigger storage (in addition to SAME codes)
         self.storage_zone_codes = set(self.location_settings.get('storage_zone_codes', []))
+        self._compile_relevance_matcher()
 
         # Log configuration for troubleshooting alert matching issues
         self.logger.info(f"📍 Location: {self.location_name} ({self.county_upper})")
@@ -1115,7 +1130,7 @@ class CAPPoller:
         try:
             data = response.json()
         except ValueError:
-            alerts = self._parse_ipaws_xml_feed(response.text)
+            alerts = self._parse_ipaws_xml_feed(response.content)
             if alerts:
                 self.logger.debug("Parsed %d CAP alerts from XML feed", len(alerts))
             return alerts
@@ -1127,15 +1142,17 @@ class CAPPoller:
         self.logger.warning("CAP feed JSON response missing 'features' array")
         return []
 
-    def _parse_ipaws_xml_feed(self, xml_text: str) -> List[Dict]:
-        alerts: List[Dict] = []
-        if not xml_text:
-            return alerts
+    def _parse_ipaws_xml_feed(self, xml_payload: Union[str, bytes]) -> List[Dict]:
+        """Convert the alerts of an IPAWS feed one at a time as they are parsed.
 
-        try:
-            root = parse_xml_string(xml_text)
-        except Exception as exc:
-            self.logger.error(f"XML parse error in CAP feed: {exc}")
+        Each ``<alert>`` is released as soon as it has been converted, so a
+        multi-megabyte national feed never exists as a full element tree.
+        Messages already handled by an earlier poll (same identifier and
+        ``sent`` time, see ``_remember_ipaws_alert``) are skipped before their
+        areas and geometry are parsed.
+        """
+        alerts: List[Dict] = []
+        if not xml_payload:
             return alerts
 
         ns = {
@@ -1143,13 +1160,35 @@ class CAPPoller:
             'cap': 'urn:oasis:names:tc:emergency:cap:1.2',
         }
 
-        for alert_elem in root.findall('.//cap:alert', ns):
-            feature = self._convert_cap_alert(alert_elem, ns)
-            if feature:
-                alerts.append(feature)
+        try:
+            for alert_elem in iter_xml_elements(xml_payload, f"{{{ns['cap']}}}alert"):
+                key = (
+                    (alert_elem.findtext('cap:identifier', default='', namespaces=ns) or '').strip(),
+                    (alert_elem.findtext('cap:sent', default='', namespaces=ns) or '').strip(),
+                )
+                self._ipaws_alerts_seen.add(key)
+                if key in self._known_ipaws_alerts:
+                    self.last_unchanged_skipped += 1
+                    continue
+
+                feature = self._convert_cap_alert(alert_elem, ns)
+                if feature:
+                    alerts.append(feature)
+        except ET.ParseError as exc:
+            self.logger.error(f"XML parse error in CAP feed: {exc}")
 
         return alerts
 
+    def _remember_ipaws_alert(self, alert_data: Dict) -> None:
+        """Let later polls skip this IPAWS message without converting it again."""
+        if alert_data.get('raw_xml') is None:
+            return
+        props = alert_data.get('properties', {})
+        identifier = props.get('identifier')
+        sent = props.get('sent')
+        if identifier and sent:
+            self._known_ipaws_alerts.add((identifier, sent))
+
     def _convert_cap_alert(self, alert_elem: ET.Element, ns: Dict[str, str]) -> Optional[Dict]:
         def get_text(element: Optional[ET.Element], path: str, default: str = '') -> str:
             if element is None:
@@ -1404,14 +1443,13 @@ class CAPPoller:
         radius_ratio = radius_km / 6371.0  # Earth radius in km
         center_lat = math.radians(lat)
         center_lon = math.radians(lon)
+        sin_lat = math.sin(center_lat)
+        cos_lat = math.cos(center_lat)
+        sin_radius = math.sin(radius_ratio)
+        cos_radius = math.cos(radius_ratio)
 
         for step in range(points):
             bearing = 2 * math.pi * (step / points)
-            sin_lat = math.sin(center_lat)
-            cos_lat = math.cos(center_lat)
-            sin_radius = math.sin(radius_ratio)
-            cos_radius = math.cos(radius_ratio)
-
             lat_rad = math.asin(
                 sin_lat * cos_radius + cos_lat * sin_radius * math.cos(bearing)
             )
@@ -1499,6 +1537,8 @@ class CAPPoller:
 
         # Reset error tracking for this fetch cycle
         self.last_fetch_errors = []
+        self._ipaws_alerts_seen = set()
+        self.last_unchanged_skipped = 0
 
         for endpoint in self.cap_endpoints:
             try:
@@ -1614,6 +1654,13 @@ class CAPPoller:
         unique_alerts.extend(alerts_by_identifier.values())
         unique_alerts.extend(alerts_without_identifier)
 
+        # Forget messages that have left the feed so the known set stays bounded
+        self._known_ipaws_alerts &= self._ipaws_alerts_seen
+        if self.last_unchanged_skipped:
+            self.logger.info(
+                "Skipped %d IPAWS alerts already processed by an earlier poll", self.last_unchanged_skipped
+            )
+
         self.last_poll_sources = sorted(sources_seen)
         self.last_duplicates_filtered = duplicates_filtered
 
@@ -1668,21 +1715,16 @@ class CAPPoller:
         return geom_type, polygon_count, preview
 
     # ---------- Relevance ----------
-    def _validate_ugc_code(self, ugc: str) -> bool:
-        r"""Validate UGC code format: [A-Z]{2}[CZ]\d{3} (e.g., OHZ016, OHC137)."""
-        if not ugc or not isinstance(ugc, str):
-            return False
-        ugc = ugc.strip().upper()
-        # Valid UGC format: 2 letters, C or Z, 3 digits
-        return bool(re.match(r'^[A-Z]{2}[CZ]\d{3}$', ugc))
-
-    @staticmethod
-    def _normalize_same_code(value: Any) -> Optional[str]:
-        digits = ''.join(ch for ch in str(value) if ch.isdigit())
-        if not digits:
-            return None
-        normalized = digits.zfill(6)[:6]
-        return normalized if normalized.strip('0') else normalized
+    def _compile_relevance_matcher(self) -> CompiledRelevanceMatcher:
+        """Index the configured codes once; call again whenever they change."""
+        profile = RelevanceProfile(
+            name='local',
+            same_codes=frozenset(self.same_codes),
+            zone_codes=frozenset(self.zone_codes),
+            storage_zone_codes=frozenset(getattr(self, 'storage_zone_codes', ()) or ()),
+        )
+        self._relevance_matcher = CompiledRelevanceMatcher([profile])
+        return self._relevance_matcher
 
     def get_alert_relevance_details(self, alert_data: Dict) -> Dict[str, Any]:
         result: Dict[str, Any] = {
@@ -1701,30 +1743,12 @@ class CAPPoller:
         try:
             properties = alert_data.get('properties', {})
             event = properties.get('event', 'Unknown')
-            geocode = properties.get('geocode', {}) or {}
-            ugc_codes = geocode.get('UGC', []) or []
-            same_codes_raw = geocode.get('SAME', []) or []
-
-            # Validate and normalize UGC codes
-            normalized_ugc = []
-            for ugc in ugc_codes:
-                if not ugc:
-                    continue
-                ugc_str = str(ugc).strip().upper()
-                if self._validate_ugc_code(ugc_str):
-                    normalized_ugc.append(ugc_str)
-                else:
-                    self.logger.warning(
-                        f"Skipping malformed UGC code '{ugc}' in alert {properties.get('identifier', 'Unknown')}"
-                    )
-
+            normalized_ugc, normalized_same, malformed_ugc = normalize_alert_codes(properties.get('geocode'))
+            for ugc in malformed_ugc:
+                self.logger.warning(
+                    f"Skipping malformed UGC code '{ugc}' in alert {properties.get('identifier', 'Unknown')}"
+                )
             result['ugc_codes'] = normalized_ugc
-
-            normalized_same = []
-            for same in same_codes_raw:
-                normalized = self._normalize_same_code(same)
-                if normalized:
-                    normalized_same.append(normalized)
             result['same_codes'] = normalized_same
 
             area_desc_raw = properties.get('areaDesc') or ''
@@ -1733,61 +1757,33 @@ class CAPPoller:
             area_desc_upper = area_desc_raw.upper()
             result['area_desc'] = area_desc_raw
 
-            for same in normalized_same:
-                if same in self.same_codes:
-                    message = f"✓ Alert ACCEPTED by SAME: {event} ({same}) [STORAGE+BROADCAST]"
-                    result.update(
-                        {
-                            'is_relevant': True,
-                            'is_storage_relevant': True,  # SAME match = store + calculate boundaries
-                            'reason': 'SAME_MATCH',
-                            'matched_ugc': same,
-                            'relevance_matches': [same],
-                            'log': {'level': 'info', 'message': message},
-                        }
-                    )
-                    return result
-
-                if same.endswith('000'):
-                    prefix = same[:3]
-                    if prefix and any(code.startswith(prefix) for code in self.same_codes):
-                        message = f"✓ Alert ACCEPTED by statewide SAME: {event} ({same}) [STORAGE+BROADCAST]"
-                        result.update(
-                            {
-                                'is_relevant': True,
-                                'is_storage_relevant': True,  # Statewide SAME match = store + calculate boundaries
-                                'reason': 'SAME_MATCH',
-                                'matched_ugc': same,
-                                'relevance_matches': [same],
-                                'log': {'level': 'info', 'message': message},
-                            }
-                        )
-                        return result
-
-            for ugc in normalized_ugc:
-                if ugc in self.zone_codes:
-                    # Check if this UGC code is in storage_zone_codes (local county)
-                    is_storage_ugc = ugc in self.storage_zone_codes
-                    if is_storage_ugc:
-                        message = f"✓ Alert ACCEPTED by UGC: {event} ({ugc}) [STORAGE+BROADCAST]"
-                    else:
-                        message = f"✓ Alert ACCEPTED by UGC: {event} ({ugc}) [BROADCAST ONLY - no storage/boundaries]"
-                    result.update(
-                        {
-                            'is_relevant': True,
-                            'is_storage_relevant': is_storage_ugc,
-                            'reason': 'UGC_MATCH',
-                            'matched_ugc': ugc,
-                            'relevance_matches': [ugc],
-                            'log': {'level': 'info', 'message': message},
-                        }
-                    )
-                    return result
-
-            message = (
-                f"✗ REJECT (not specific enough for {self.county_upper}): {event} - {area_desc_upper}"
+            matcher = getattr(self, '_relevance_matcher', None) or self._compile_relevance_matcher()
+            match = matcher.match_codes(normalized_same, normalized_ugc).get(0)
+            if match is None:
+                message = (
+                    f"✗ REJECT (not specific enough for {self.county_upper}): {event} - {area_desc_upper}"
+                )
+                result['log'] = {'level': 'info', 'message': message}
+                return result
+
+            # SAME matches store and calculate boundaries; UGC matches only for storage zones
+            if match.reason == SAME_MATCH:
+                scope = 'statewide SAME' if match.statewide else 'SAME'
+                message = f"✓ Alert ACCEPTED by {scope}: {event} ({match.code}) [STORAGE+BROADCAST]"
+            elif match.is_storage_relevant:
+                message = f"✓ Alert ACCEPTED by UGC: {event} ({match.code}) [STORAGE+BROADCAST]"
+            else:
+                message = f"✓ Alert ACCEPTED by UGC: {event} ({match.code}) [BROADCAST ONLY - no storage/boundaries]"
+            result.update(
+                {
+                    'is_relevant': True,
+                    'is_storage_relevant': match.is_storage_relevant,
+                    'reason': match.reason,
+                    'matched_ugc': match.code,
+                    'relevance_matches': [match.code],
+                    'log': {'level': 'info', 'message': message},
+                }
             )
-            result['log'] = {'level': 'info', 'message': message}
             return result
         except Exception as exc:
             result['log'] = {'level': 'error', 'message': f"Error checking relevance: {exc}"}
@@ -2333,7 +2329,7 @@ class CAPPoller:
         try:
             data_source = summarise_sources(stats.get('sources', []))
             for entry in debug_records:
-                record = PollDebugRecord(
+                self._log_sink.submit(PollDebugRecord, dict(
                     poll_run_id=poll_run_id,
                     poll_started_at=poll_started_at,
                     poll_status=stats.get('status', 'UNKNOWN'),
@@ -2359,15 +2355,9 @@ class CAPPoller:
                     raw_properties=self._safe_json_copy(entry.get('raw_properties')),
                     raw_xml_present=entry.get('raw_xml_present', False),
                     notes="\n".join(filter(None, entry.get('notes', []))) or None,
-                )
-                self.db_session.add(record)
-            self.db_session.commit()
+                ))
         except Exception as exc:
             self.logger.error(f"Failed to persist poll debug records: {exc}")
-            try:
-                self.db_session.rollback()
-            except Exception:
-                pass
 
     def cleanup_old_poll_history(self):
         """Clean old poll history records. Only runs periodically to avoid CPU overhead."""
@@ -2457,14 +2447,25 @@ class CAPPoller:
             except Exception:
                 pass
 
+    def _log_table_present(self, table_name: str) -> bool:
+        """Check once that a log table exists; missing tables are re-checked next time."""
+        if table_name in self._log_tables_present:
+            return True
+        try:
+            self.db_session.execute(text(f"SELECT 1 FROM {table_name} LIMIT 1"))
+        except Exception:
+            self.logger.debug("%s missing; file-only log", table_name)
+            try: self.db_session.rollback()
+            except Exception: pass
+            return False
+        self._log_tables_present.add(table_name)
+        return True
+
     def log_poll_history(self, stats):
         try:
-            try:
-                self.db_session.execute(text("SELECT 1 FROM poll_history LIMIT 1"))
-            except Exception:
-                self.logger.debug("poll_history missing; file-only log")
+            if not self._log_table_present('poll_history'):
                 return
-            rec = PollHistory(
+            self._log_sink.submit(PollHistory, dict(
                 timestamp=utc_now(),
                 alerts_fetched=stats.get('alerts_fetched', 0),
                 alerts_new=stats.get('alerts_new', 0),
@@ -2473,35 +2474,25 @@ class CAPPoller:
                 status=stats.get('status', 'UNKNOWN'),
                 error_message=stats.get('error_message'),
                 data_source=summarise_sources(stats.get('sources', [])),
-            )
-            self.db_session.add(rec)
-            self.db_session.commit()
+            ))
         except Exception as e:
             self.logger.error(f"log_poll_history error: {e}")
-            try: self.db_session.rollback()
-            except Exception: pass
 
     def log_system_event(self, level: str, message: str, details: Dict = None):
         try:
-            try:
-                self.db_session.execute(text("SELECT 1 FROM system_log LIMIT 1"))
-            except Exception:
-                self.logger.debug("system_log missing; file-only log")
+            if not self._log_table_present('system_log'):
                 return
             details = details or {}
             details.update({
                 'logged_at_utc': utc_now().isoformat(),
                 'logged_at_local': local_now().isoformat(),
-                'timezone': self.location_settings['timezone']
+                'timezone': self.location_settings['timezone'],
+                'log_sink': self._log_sink.stats(),
             })
-            entry = SystemLog(level=level, message=message, module='cap_poller',
-                              details=details, timestamp=utc_now())
-            self.db_session.add(entry)
-            self.db_session.commit()
+            self._log_sink.submit(SystemLog, dict(level=level, message=message, module='cap_poller',
+                                                  details=details, timestamp=utc_now()))
         except Exception as e:
             self.logger.error(f"log_system_event error: {e}")
-            try: self.db_session.rollback()
-            except Exception: pass
 
     # ---------- Main poll ----------
     def poll_and_process(self) -> Dict:
@@ -2518,7 +2509,7 @@ class CAPPoller:
             'poll_time_utc': poll_start_utc.isoformat(),
             'poll_time_local': poll_start_local.isoformat(),
             'timezone': self.location_settings['timezone'], 'led_updated': False,
-            'sources': [], 'duplicates_filtered': 0,
+            'sources': [], 'duplicates_filtered': 0, 'alerts_unchanged': 0,
             'poll_run_id': poll_run_id,
             'radio_captures': 0,
         }
@@ -2554,6 +2545,7 @@ class CAPPoller:
             stats['alerts_fetched'] = len(alerts_data)
             stats['sources'] = list(self.last_poll_sources)
             stats['duplicates_filtered'] = self.last_duplicates_filtered
+            stats['alerts_unchanged'] = self.last_unchanged_skipped
 
             # Check for fetch errors and log them to the database
             if self.last_fetch_errors:
@@ -2592,6 +2584,7 @@ class CAPPoller:
                     stats['alerts_filtered'] += 1
                     if self._debug_records_enabled and 'debug_entry' in locals():
                         debug_entry.setdefault('notes', []).append('Filtered out by strict location rules')
+                    self._remember_ipaws_alert(alert_data)
                     continue
 
                 stats['alerts_accepted'] += 1
@@ -2645,6 +2638,9 @@ class CAPPoller:
                         capture_metadata.setdefault('timestamp', utc_now())
                         stats['radio_captures'] += len(capture_metadata.get('captures', []))
                         capture_events.append(capture_metadata)
+
+                    if alert:
+                        self._remember_ipaws_alert(alert_data)
                 else:
                     # UGC/Zone match only: Broadcast but don't store or calculate boundaries
                     self.logger.info(
@@ -2656,7 +2652,9 @@ class CAPPoller:
                         debug_entry['was_new'] = False
 
                     # Trigger EAS broadcast without saving to database
-                    if self.eas_broadcaster:
+                    if not self.eas_broadcaster:
+                        self._remember_ipaws_alert(alert_data)
+                    else:
                         try:
                             # Create a temporary alert object for broadcasting without persisting
                             from app_core.models import CAPAlert
@@ -2670,6 +2668,7 @@ class CAPPoller:
                             capture_metadata = {"broadcast": broadcast_result, "broadcast_only": True}
                             capture_metadata.setdefault('timestamp', utc_now())
                             capture_events.append(capture_metadata)
+                            self._remember_ipaws_alert(alert_data)
                         except Exception as exc:
                             self.logger.error(f"EAS broadcast failed for {event}: {exc}")
                             if self._debug_records_enabled:
@@ -2715,6 +2714,10 @@ class CAPPoller:
 
     def close(self):
         try:
+            if hasattr(self, '_log_sink'):
+                # The sink is shared per engine (e.g. with GPIO logging); write our
+                # rows but leave it running. close_write_behind_sinks() stops it.
+                self._log_sink.flush(timeout=5.0)
             if hasattr(self, 'db_session'):
                 self.db_session.close()
         finally:
@@ -2886,6 +2889,7 @@ def main():
             print(json_dumps(stats, indent=2))
     finally:
         poller.close()
+        close_write_behind_sinks()
 
 if __name__ == '__main__':
     main()
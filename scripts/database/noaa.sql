@@ -48,7 +48,9 @@ SELECT AddGeometryColumn('cap_alerts', 'geom', 4326, 'POLYGON', 2);
 CREATE INDEX idx_cap_alerts_geom ON cap_alerts USING GIST(geom);
 CREATE INDEX idx_cap_alerts_identifier ON cap_alerts(identifier);
 CREATE INDEX idx_cap_alerts_sent ON cap_alerts(sent);
+CREATE INDEX idx_cap_alerts_sent_id ON cap_alerts(sent DESC, id DESC);
 CREATE INDEX idx_cap_alerts_expires ON cap_alerts(expires);
+CREATE INDEX idx_cap_alerts_updated_at ON cap_alerts(updated_at);
 CREATE INDEX idx_cap_alerts_status ON cap_alerts(status);
 CREATE INDEX idx_cap_alerts_event ON cap_alerts(event);
 
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+EAS Station - Emergency Alert System
+Copyright (c) 2025 Timothy Kramer (KR8MER)
+
+This file is part of EAS Station.
+
+EAS Station is dual-licensed software:
+- GNU Affero General Public License v3 (AGPL-3.0) for open-source use
+- Commercial License for proprietary use
+
+You should have received a copy of both licenses with this software.
+For more information, see LICENSE and LICENSE-COMMERCIAL files.
+
+IMPORTANT: This software cannot be rebranded or have attribution removed.
+See NOTICE file for complete terms.
+
+Repository: https://github.com/KR8MER/eas-station
+"""
+
+from __future__ import annotations
+
+"""Capture query plans and timings of the alert list on a large cap_alerts table.
+
+Seeds a scratch database with synthetic alerts and compares, page by page,
+the former OFFSET pagination (whole rows, ``COUNT(*)`` per request) with the
+keyset pagination and cached or estimated counts of ``/alerts``::
+
+    # 1M alerts in a temporary SQLite file
+    python scripts/profile_alert_pagination.py --rows 1000000
+
+    # Against a scratch PostgreSQL database (tables are created; rows appended)
+    python scripts/profile_alert_pagination.py --database-url postgresql://... --rows 1000000
+
+Never point ``--database-url`` at a production database.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from flask import Flask  # noqa: E402
+from sqlalchemy import MetaData, Text, func, text, tuple_  # noqa: E402
+from sqlalchemy.orm import defer, load_only  # noqa: E402
+
+from app_core.alert_pagination import (  # noqa: E402
+    LIST_COLUMNS,
+    count_alerts,
+    encode_cursor,
+    paginate_keyset,
+)
+from app_core.extensions import db  # noqa: E402
+from app_core.models import CAPAlert  # noqa: E402
+
+EVENTS = ["Flood Warning", "Tornado Warning", "Severe Thunderstorm Warning", "Winter Storm Watch",
+          "Required Weekly Test", "Special Weather Statement", "Wind Advisory", "Heat Advisory"]
+PAGE_DEPTHS = (1, 10, 100, 1000, 10000)
+PER_PAGE = 25
+
+
+def _create_app(database_url: str) -> Flask:
+    app = Flask("profile-alert-pagination")
+    app.config.update(SQLALCHEMY_DATABASE_URI=database_url, SQLALCHEMY_TRACK_MODIFICATIONS=False)
+    db.init_app(app)
+    return app
+
+
+def _create_table() -> None:
+    if db.engine.dialect.name == "sqlite":
+        from sqlalchemy.dialects.postgresql import JSONB
+        from sqlalchemy.ext.compiler import compiles
+
+        @compiles(JSONB, "sqlite")
+        def _jsonb_on_sqlite(type_, compiler, **kw):
+            return "JSON"
+
+        # No spatial extension; the list never reads geometry
+        metadata = MetaData()
+        table = CAPAlert.__table__.to_metadata(metadata)
+        for column in table.columns:
+            if column.name == "geom":
+                column.type = Text()
+        metadata.create_all(bind=db.engine)
+    else:
+        CAPAlert.__table__.create(bind=db.engine, checkfirst=True)
+
+
+def _seed(rows: int, payload_bytes: int, batch: int = 20_000) -> None:
+    existing = db.session.query(func.count(CAPAlert.id)).scalar() or 0
+    if existing >= rows:
+        print(f"cap_alerts already holds {existing:,} rows")
+        return
+
+    rng = random.Random(1)
+    start = datetime(2019, 1, 1, tzinfo=timezone.utc)
+    span_minutes = 7 * 365 * 24 * 60
+    description = "Synthetic alert description. " * (payload_bytes // 29 + 1)
+    print(f"Seeding {rows - existing:,} alerts ...", flush=True)
+    started = time.perf_counter()
+    for first in range(existing + 1, rows + 1, batch):
+        values = []
+        for index in range(first, min(first + batch, rows + 1)):
+            sent = start + timedelta(minutes=rng.randrange(span_minutes))
+            event = rng.choice(EVENTS)
+            values.append({
+                "identifier": f"urn:oid:synthetic.{index}",
+                "sent": sent,
+                "expires": sent + timedelta(hours=rng.choice([1, 3, 6, 12, 48])),
+                "status": "Actual",
+                "message_type": "Alert",
+                "scope": "Public",
+                "event": event,
+                "severity": rng.choice(["Extreme", "Severe", "Moderate", "Minor"]),
+                "source": rng.choice(["noaa", "ipaws"]),
+                "headline": f"{event} issued {sent:%B %d at %I:%M%p}",
+                "area_desc": "Putnam; Allen; Hancock",
+                "description": description[:payload_bytes],
+                "raw_json": {"properties": {"index": index, "text": description[: payload_bytes // 2]}},
+            })
+        db.session.execute(CAPAlert.__table__.insert(), values)
+        db.session.commit()
+    if db.engine.dialect.name == "postgresql":
+        db.session.execute(text("ANALYZE cap_alerts"))
+    else:
+        db.session.execute(text("ANALYZE"))
+    db.session.commit()
+    print(f"Seeded in {time.perf_counter() - started:.1f}s", flush=True)
+
+
+def _timed(function: Callable[[], Any], repeat: int = 3) -> float:
+    """Fastest of ``repeat`` runs, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        db.session.expunge_all()
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def _plan(query) -> List[str]:
+    compiled = query.statement.compile(dialect=db.engine.dialect, compile_kwargs={"literal_binds": True})
+    if db.engine.dialect.name == "postgresql":
+        rows = db.session.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {compiled}")).all()
+        return [row[0] for row in rows]
+    rows = db.session.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).all()
+    return [str(row[-1]) for row in rows]
+
+
+def profile(rows: int, payload_bytes: int) -> Dict[str, Any]:
+    _create_table()
+    _seed(rows, payload_bytes)
+
+    base = CAPAlert.query
+    # The former list loaded whole rows; SQLite without SpatiaLite cannot read geometry
+    full_rows = base.options(defer(CAPAlert.geom)) if db.engine.dialect.name == "sqlite" else base
+    report: Dict[str, Any] = {"dialect": db.engine.dialect.name, "rows": rows, "pages": []}
+
+    report["count_ms"] = _timed(lambda: base.order_by(None).count())
+    report["count_alerts_first_ms"] = _timed(lambda: count_alerts(base, ["profile"]), repeat=1)
+    report["count_alerts_result"] = count_alerts(base, ["profile"])
+
+    for depth in PAGE_DEPTHS:
+        offset = (depth - 1) * PER_PAGE
+        offset_query = full_rows.order_by(CAPAlert.sent.desc()).offset(offset).limit(PER_PAGE)
+
+        # The cursor a reader following Next links would hold on this page
+        anchor = None
+        if offset:
+            anchor = (
+                db.session.query(CAPAlert.sent, CAPAlert.id)
+                .order_by(CAPAlert.sent.desc(), CAPAlert.id.desc())
+                .offset(offset - 1)
+                .first()
+            )
+        cursor = encode_cursor(anchor) if anchor is not None else None
+        keyset_query = (
+            base.filter(tuple_(CAPAlert.sent, CAPAlert.id) < tuple(anchor))
+            if anchor is not None
+            else base
+        ).options(load_only(*LIST_COLUMNS)).order_by(CAPAlert.sent.desc(), CAPAlert.id.desc()).limit(PER_PAGE + 1)
+
+        entry = {
+            "page": depth,
+            "offset_ms": _timed(lambda: offset_query.all()),
+            "offset_with_count_ms": _timed(lambda: (offset_query.all(), base.order_by(None).count())),
+            "keyset_ms": _timed(lambda: paginate_keyset(base, per_page=PER_PAGE, after=cursor, page=depth)),
+            "offset_plan": _plan(offset_query),
+            "keyset_plan": _plan(keyset_query),
+        }
+        report["pages"].append(entry)
+        print(
+            f"page {depth:>6}: offset {entry['offset_ms']:9.2f} ms "
+            f"(+count {entry['offset_with_count_ms']:9.2f} ms)  keyset {entry['keyset_ms']:7.2f} ms",
+            flush=True,
+        )
+
+    return report
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Scratch database (default: temporary SQLite file)")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Alerts to seed (default: 1,000,000)")
+    parser.add_argument("--payload-bytes", type=int, default=512,
+                        help="Size of each synthetic description (default: 512)")
+    parser.add_argument("--json", type=Path, help="Write the report, including plans, to this file")
+    args = parser.parse_args(argv)
+
+    scratch_dir = None
+    database_url = args.database_url
+    if not database_url:
+        scratch_dir = tempfile.mkdtemp(prefix="alert-pagination-")
+        database_url = f"sqlite:///{os.path.join(scratch_dir, 'alerts.db')}"
+
+    app = _create_app(database_url)
+    with app.app_context():
+        report = profile(args.rows, args.payload_bytes)
+
+    print(f"\nCOUNT(*): {report['count_ms']:.2f} ms; "
+          f"list count: {report['count_alerts_result']} in {report['count_alerts_first_ms']:.2f} ms (then cached)")
+    for entry in report["pages"]:
+        print(f"\nPage {entry['page']} OFFSET plan:\n  " + "\n  ".join(entry["offset_plan"]))
+        print(f"Page {entry['page']} keyset plan:\n  " + "\n  ".join(entry["keyset_plan"]))
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2, default=str), encoding="utf-8")
+    if scratch_dir:
+        print(f"\nScratch database left at {database_url} (delete when done)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
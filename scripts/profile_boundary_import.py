@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+EAS Station - Emergency Alert System
+Copyright (c) 2025 Timothy Kramer (KR8MER)
+
+This file is part of EAS Station.
+
+EAS Station is dual-licensed software:
+- GNU Affero General Public License v3 (AGPL-3.0) for open-source use
+- Commercial License for proprietary use
+
+You should have received a copy of both licenses with this software.
+For more information, see LICENSE and LICENSE-COMMERCIAL files.
+
+IMPORTANT: This software cannot be rebranded or have attribution removed.
+See NOTICE file for complete terms.
+
+Repository: https://github.com/KR8MER/eas-station
+"""
+
+from __future__ import annotations
+
+"""Measure boundary import throughput on a synthetic 50k-feature GeoJSON file.
+
+Writes a FeatureCollection of detailed polygons, then reports:
+
+* parse and validation throughput and peak Python memory, for the former
+  whole-file ``json_loads`` against the streaming reader (no database)
+* with ``--database-url``, end-to-end import throughput of
+  ``run_boundary_import`` against a scratch PostGIS database, and of the
+  former per-feature ``SELECT ST_GeomFromGeoJSON`` loop on a sample
+
+::
+
+    python scripts/profile_boundary_import.py --features 50000
+    python scripts/profile_boundary_import.py --features 50000 --database-url postgresql://...
+
+Never point ``--database-url`` at a production database: the boundaries are
+committed under the type ``profile_import`` and deleted afterwards.
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from flask import Flask  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+
+from app_core.boundary_import import BoundaryImportJob, run_boundary_import, validate_geometry  # noqa: E402
+from app_core.extensions import db  # noqa: E402
+from app_core.models import Boundary  # noqa: E402
+from app_utils.optimized_parsing import iter_json_array_items, json_dumps, json_loads  # noqa: E402
+
+BOUNDARY_TYPE = "profile_import"
+LEGACY_SAMPLE = 2000
+
+
+def write_synthetic_file(path: str, features: int, vertices: int) -> int:
+    """Write a FeatureCollection one feature at a time; returns its size in bytes."""
+    rng = random.Random(5)
+    with open(path, "w", encoding="utf-8") as handle:
+        handle.write('{"type": "FeatureCollection", "name": "synthetic", "features": [\n')
+        for index in range(features):
+            lon, lat = rng.uniform(-85.0, -80.5), rng.uniform(38.5, 42.0)
+            radius = rng.uniform(0.005, 0.05)
+            ring = [
+                [round(lon + radius * math.cos(2 * math.pi * step / vertices), 6),
+                 round(lat + radius * math.sin(2 * math.pi * step / vertices), 6)]
+                for step in range(vertices)
+            ]
+            ring.append(ring[0])
+            feature = {
+                "type": "Feature",
+                "properties": {"NAME": f"Synthetic {index}", "GEOID": f"39{index:07d}", "MTFCC": "G4040"},
+                "geometry": {"type": "Polygon", "coordinates": [ring]},
+            }
+            handle.write(("," if index else "") + json.dumps(feature) + "\n")
+        handle.write("]}\n")
+    return os.path.getsize(path)
+
+
+def _measure(function: Callable[[], int]) -> Tuple[float, int, float]:
+    """Seconds, result and peak traced memory (MiB) of ``function``.
+
+    Timing and memory come from separate runs; tracing slows parsing severalfold.
+    """
+    started = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, result, peak / (1024 * 1024)
+
+
+def profile_parsing(path: str) -> Dict[str, Any]:
+    def whole_file() -> int:
+        with open(path, "rb") as handle:
+            features = json_loads(handle.read()).get("features", [])
+        return sum(1 for feature in features if validate_geometry(feature.get("geometry")) is None)
+
+    def streaming() -> int:
+        with open(path, "rb") as handle:
+            return sum(
+                1 for feature in iter_json_array_items(handle, "features")
+                if validate_geometry(feature.get("geometry")) is None
+            )
+
+    report = {}
+    for name, function in (("whole_file", whole_file), ("streaming", streaming)):
+        elapsed, count, peak_mib = _measure(function)
+        report[name] = {"seconds": elapsed, "features": count, "features_per_second": count / elapsed,
+                        "peak_mib": peak_mib}
+        print(f"{name:>10}: {count:,} features in {elapsed:6.2f}s "
+              f"({count / elapsed:8,.0f}/s), peak {peak_mib:7.1f} MiB", flush=True)
+    return report
+
+
+def _legacy_insert(path: str, sample: int) -> Tuple[float, int]:
+    """The former upload loop: one geometry SELECT per feature, ORM adds, one commit."""
+    with open(path, "rb") as handle:
+        features = json_loads(handle.read()).get("features", [])[:sample]
+    started = time.perf_counter()
+    for feature in features:
+        boundary = Boundary(name=feature["properties"]["NAME"], type=BOUNDARY_TYPE)
+        boundary.geom = db.session.execute(
+            text("SELECT ST_SetSRID(ST_GeomFromGeoJSON(:geom), 4326)"),
+            {"geom": json_dumps(feature["geometry"])},
+        ).scalar()
+        db.session.add(boundary)
+    db.session.commit()
+    return time.perf_counter() - started, len(features)
+
+
+def _clear() -> None:
+    Boundary.query.filter(Boundary.type == BOUNDARY_TYPE).delete(synchronize_session=False)
+    db.session.commit()
+
+
+def profile_database(database_url: str, path: str) -> Dict[str, Any]:
+    app = Flask("profile-boundary-import")
+    app.config.update(SQLALCHEMY_DATABASE_URI=database_url, SQLALCHEMY_TRACK_MODIFICATIONS=False)
+    db.init_app(app)
+
+    with app.app_context():
+        if db.engine.dialect.name != "postgresql":
+            raise SystemExit("--database-url must be a PostGIS database")
+        db.session.execute(text("CREATE EXTENSION IF NOT EXISTS postgis"))
+        Boundary.__table__.create(bind=db.engine, checkfirst=True)
+        db.session.commit()
+        _clear()
+
+        job = BoundaryImportJob(job_id="profile", boundary_type=BOUNDARY_TYPE,
+                                display_label="Profile", filename=os.path.basename(path))
+        started = time.perf_counter()
+        run_boundary_import(job, path)
+        elapsed = time.perf_counter() - started
+        print(f"  streaming import: {job.boundaries_added:,} rows in {elapsed:6.2f}s "
+              f"({job.boundaries_added / elapsed:8,.0f}/s), {job.error_count} errors", flush=True)
+        _clear()
+
+        legacy_seconds, legacy_rows = _legacy_insert(path, LEGACY_SAMPLE)
+        print(f"  former loop:      {legacy_rows:,} rows in {legacy_seconds:6.2f}s "
+              f"({legacy_rows / legacy_seconds:8,.0f}/s)", flush=True)
+        _clear()
+
+    return {
+        "import_seconds": elapsed,
+        "import_rows": job.boundaries_added,
+        "import_rows_per_second": job.boundaries_added / elapsed,
+        "legacy_sample_rows": legacy_rows,
+        "legacy_rows_per_second": legacy_rows / legacy_seconds,
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--features", type=int, default=50_000, help="Features to generate (default: 50,000)")
+    parser.add_argument("--vertices", type=int, default=64, help="Vertices per polygon (default: 64)")
+    parser.add_argument("--database-url", help="Scratch PostGIS database for the end-to-end import")
+    parser.add_argument("--json", type=Path, help="Write the report to this file")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="boundary-import-") as scratch:
+        path = os.path.join(scratch, "synthetic.geojson")
+        size = write_synthetic_file(path, args.features, args.vertices)
+        print(f"Synthetic file: {args.features:,} features, {size / (1024 * 1024):.1f} MiB", flush=True)
+
+        report: Dict[str, Any] = {"features": args.features, "file_bytes": size, "parsing": profile_parsing(path)}
+        if args.database_url:
+            report["database"] = profile_database(args.database_url, path)
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
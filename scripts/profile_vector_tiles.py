@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+EAS Station - Emergency Alert System
+Copyright (c) 2025 Timothy Kramer (KR8MER)
+
+This file is part of EAS Station.
+
+EAS Station is dual-licensed software:
+- GNU Affero General Public License v3 (AGPL-3.0) for open-source use
+- Commercial License for proprietary use
+
+You should have received a copy of both licenses with this software.
+For more information, see LICENSE and LICENSE-COMMERCIAL files.
+
+IMPORTANT: This software cannot be rebranded or have attribution removed.
+See NOTICE file for complete terms.
+
+Repository: https://github.com/KR8MER/eas-station
+"""
+
+from __future__ import annotations
+
+"""Benchmark vector tiles against the GeoJSON boundary API on a seeded boundary set.
+
+Seeds a scratch PostGIS database with detailed synthetic boundary polygons
+(and alerts over them), then reports, per zoom level:
+
+* time and size of the ``/api/boundaries`` GeoJSON payload for the same area
+* time and size of every ``/api/tiles`` tile covering that area, uncached
+
+::
+
+    python scripts/profile_vector_tiles.py --database-url postgresql://... --boundaries 400
+
+Requires PostGIS 3.0 or newer (``ST_TileEnvelope``).  Never point
+``--database-url`` at a production database: boundaries and alerts are
+appended to its tables.
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from flask import Flask  # noqa: E402
+from sqlalchemy import func, text  # noqa: E402
+
+from app_core.extensions import db  # noqa: E402
+from app_core.models import Boundary, CAPAlert  # noqa: E402
+from app_core.vector_tiles import TileRequest, render_tile  # noqa: E402
+from app_utils import utc_now  # noqa: E402
+
+# Northwest Ohio, where the default configuration is centred
+CENTER = (-84.0, 41.0)
+SPAN_DEGREES = 2.0
+BOUNDARY_TYPES = ("county", "township", "electric", "fire", "school")
+ZOOMS = (6, 8, 10, 12, 14)
+
+
+def _create_app(database_url: str) -> Flask:
+    app = Flask("profile-vector-tiles")
+    app.config.update(SQLALCHEMY_DATABASE_URI=database_url, SQLALCHEMY_TRACK_MODIFICATIONS=False)
+    db.init_app(app)
+    return app
+
+
+def _polygon_wkt(rng: random.Random, lon: float, lat: float, radius: float, vertices: int) -> str:
+    """A ragged closed ring, like a surveyed county or service-territory line."""
+    points = []
+    for index in range(vertices):
+        angle = 2 * math.pi * index / vertices
+        wobble = radius * (0.85 + 0.15 * math.sin(angle * 37) + rng.uniform(-0.03, 0.03))
+        points.append(f"{lon + wobble * math.cos(angle):.6f} {lat + wobble * math.sin(angle):.6f}")
+    points.append(points[0])
+    return f"MULTIPOLYGON((({', '.join(points)})))"
+
+
+def _seed(boundaries: int, vertices: int, alerts: int) -> None:
+    db.session.execute(text("CREATE EXTENSION IF NOT EXISTS postgis"))
+    Boundary.__table__.create(bind=db.engine, checkfirst=True)
+    CAPAlert.__table__.create(bind=db.engine, checkfirst=True)
+
+    rng = random.Random(7)
+    print(f"Seeding {boundaries} boundaries x {vertices} vertices and {alerts} alerts ...", flush=True)
+    started = time.perf_counter()
+    rows = []
+    for index in range(boundaries):
+        lon = CENTER[0] + rng.uniform(-SPAN_DEGREES / 2, SPAN_DEGREES / 2)
+        lat = CENTER[1] + rng.uniform(-SPAN_DEGREES / 2, SPAN_DEGREES / 2)
+        rows.append({
+            "name": f"Synthetic boundary {index}",
+            "type": BOUNDARY_TYPES[index % len(BOUNDARY_TYPES)],
+            "geom": func.ST_GeomFromText(_polygon_wkt(rng, lon, lat, rng.uniform(0.05, 0.3), vertices), 4326),
+        })
+    for row in rows:
+        db.session.execute(Boundary.__table__.insert().values(**row))
+
+    now = utc_now()
+    for index in range(alerts):
+        lon = CENTER[0] + rng.uniform(-SPAN_DEGREES / 2, SPAN_DEGREES / 2)
+        lat = CENTER[1] + rng.uniform(-SPAN_DEGREES / 2, SPAN_DEGREES / 2)
+        db.session.execute(CAPAlert.__table__.insert().values(
+            identifier=f"urn:oid:synthetic-tile.{index}.{now.timestamp()}",
+            sent=now,
+            expires=now + timedelta(hours=rng.choice([-2, 1, 6])),
+            status="Actual",
+            message_type="Alert",
+            scope="Public",
+            event="Severe Thunderstorm Warning",
+            source="noaa",
+            geom=func.ST_GeomFromText(_polygon_wkt(rng, lon, lat, rng.uniform(0.1, 0.4), vertices // 4), 4326),
+        ))
+    db.session.commit()
+    db.session.execute(text("ANALYZE boundaries"))
+    db.session.execute(text("ANALYZE cap_alerts"))
+    db.session.commit()
+    print(f"Seeded in {time.perf_counter() - started:.1f}s", flush=True)
+
+
+def _tile_range(zoom: int) -> Iterator[Tuple[int, int]]:
+    """Tiles covering the seeded area at ``zoom``."""
+    def tile_of(lon: float, lat: float) -> Tuple[int, int]:
+        n = 2 ** zoom
+        x = int((lon + 180.0) / 360.0 * n)
+        y = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+        return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+    half = SPAN_DEGREES / 2 + 0.4
+    x0, y0 = tile_of(CENTER[0] - half, CENTER[1] + half)
+    x1, y1 = tile_of(CENTER[0] + half, CENTER[1] - half)
+    for x in range(x0, x1 + 1):
+        for y in range(y0, y1 + 1):
+            yield x, y
+
+
+def _geojson_payload() -> Tuple[float, int]:
+    """Time and size of the boundary GeoJSON the map loads today."""
+    started = time.perf_counter()
+    rows = db.session.query(
+        Boundary.id, Boundary.name, Boundary.type, func.ST_AsGeoJSON(Boundary.geom).label("geometry")
+    ).all()
+    payload = json.dumps({
+        "type": "FeatureCollection",
+        "features": [
+            {"type": "Feature", "properties": {"id": row.id, "name": row.name, "type": row.type},
+             "geometry": json.loads(row.geometry)}
+            for row in rows if row.geometry
+        ],
+    })
+    return (time.perf_counter() - started) * 1000, len(payload.encode("utf-8"))
+
+
+def profile(max_tiles: int) -> Dict[str, Any]:
+    geojson_ms, geojson_bytes = _geojson_payload()
+    report: Dict[str, Any] = {"geojson_ms": geojson_ms, "geojson_bytes": geojson_bytes, "zooms": []}
+    print(f"GeoJSON boundaries: {geojson_bytes / 1024:,.0f} KiB in {geojson_ms:.0f} ms", flush=True)
+
+    for zoom in ZOOMS:
+        timings: List[float] = []
+        sizes: List[int] = []
+        for x, y in list(_tile_range(zoom))[:max_tiles]:
+            started = time.perf_counter()
+            data = render_tile(TileRequest(zoom, x, y, alert_status="all"))
+            timings.append((time.perf_counter() - started) * 1000)
+            sizes.append(len(data))
+        timings.sort()
+        entry = {
+            "zoom": zoom,
+            "tiles": len(timings),
+            "median_ms": timings[len(timings) // 2],
+            "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+            "max_bytes": max(sizes),
+            "total_bytes": sum(sizes),
+        }
+        report["zooms"].append(entry)
+        print(
+            f"z{zoom:<2} {entry['tiles']:>4} tiles: median {entry['median_ms']:7.1f} ms, "
+            f"p95 {entry['p95_ms']:7.1f} ms, largest {entry['max_bytes'] / 1024:7.1f} KiB, "
+            f"all {entry['total_bytes'] / 1024:9.1f} KiB",
+            flush=True,
+        )
+    return report
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True, help="Scratch PostGIS database")
+    parser.add_argument("--boundaries", type=int, default=400, help="Boundaries to seed (default: 400)")
+    parser.add_argument("--vertices", type=int, default=2000, help="Vertices per boundary (default: 2000)")
+    parser.add_argument("--alerts", type=int, default=50, help="Alerts to seed (default: 50)")
+    parser.add_argument("--max-tiles", type=int, default=64, help="Tiles rendered per zoom (default: 64)")
+    parser.add_argument("--skip-seed", action="store_true", help="Profile the rows already present")
+    parser.add_argument("--json", type=Path, help="Write the report to this file")
+    args = parser.parse_args(argv)
+
+    app = _create_app(args.database_url)
+    with app.app_context():
+        if db.engine.dialect.name != "postgresql":
+            parser.error("vector tiles need PostgreSQL with PostGIS")
+        if not args.skip_seed:
+            _seed(args.boundaries, args.vertices, args.alerts)
+        report = profile(args.max_tiles)
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+EAS Station - Emergency Alert System
+Copyright (c) 2025 Timothy Kramer (KR8MER)
+
+This file is part of EAS Station.
+
+EAS Station is dual-licensed software:
+- GNU Affero General Public License v3 (AGPL-3.0) for open-source use
+- Commercial License for proprietary use
+
+You should have received a copy of both licenses with this software.
+For more information, see LICENSE and LICENSE-COMMERCIAL files.
+
+IMPORTANT: This software cannot be rebranded or have attribution removed.
+See NOTICE file for complete terms.
+
+Repository: https://github.com/KR8MER/eas-station
+"""
+
+from __future__ import annotations
+
+"""Run the hot-path micro-benchmarks and compare them against a JSON baseline.
+
+Usage::
+
+    # Run the suite and fail if any benchmark is >25% slower than the baseline
+    # (compares the fastest round by default; use --stat median to change)
+    python scripts/run_benchmarks.py run --compare
+
+    # Re-record the baseline on this machine (commit the result)
+    python scripts/run_benchmarks.py run --update-baseline
+
+    # Compare two previously saved result files
+    python scripts/run_benchmarks.py compare old.json new.json --threshold 0.10
+
+Baselines are trimmed summaries (min/median/mean/stddev per benchmark) of the
+``--benchmark-json`` output from pytest-benchmark, so they diff cleanly in
+review.  Timings are only comparable on the same class of hardware; re-record
+the baseline when moving the comparison to a different host.
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+REPO_ROOT = SCRIPT_DIR.parent
+
+BENCHMARK_TESTS = REPO_ROOT / "tests" / "test_performance_benchmarks.py"
+DEFAULT_BASELINE = REPO_ROOT / "tests" / "test_data" / "benchmarks" / "baseline.json"
+DEFAULT_THRESHOLD = 0.25
+# The fastest round is the least sensitive to scheduler noise on shared hosts.
+DEFAULT_STAT = "min"
+STATS = ("min", "median", "mean")
+
+
+def summarize(raw: Dict) -> Dict:
+    """Reduce a pytest-benchmark JSON report to the fields a baseline needs.
+
+    Already-summarized files are returned unchanged so either format can be
+    passed to :func:`compare`.
+    """
+    if "benchmarks" in raw and isinstance(raw["benchmarks"], dict):
+        return raw
+
+    machine = raw.get("machine_info", {})
+    benchmarks = {}
+    for entry in raw.get("benchmarks", []):
+        stats = entry.get("stats", {})
+        benchmarks[entry["name"]] = {
+            "min": stats.get("min"),
+            "median": stats.get("median"),
+            "mean": stats.get("mean"),
+            "stddev": stats.get("stddev"),
+            "rounds": stats.get("rounds"),
+        }
+
+    return {
+        "recorded_at": raw.get("datetime") or datetime.now(timezone.utc).isoformat(),
+        "machine": {
+            "processor": machine.get("processor") or platform.processor() or platform.machine(),
+            "python": machine.get("python_version", platform.python_version()),
+            "cpu": (machine.get("cpu") or {}).get("brand_raw"),
+        },
+        "benchmarks": dict(sorted(benchmarks.items())),
+    }
+
+
+def compare(
+    baseline: Dict,
+    current: Dict,
+    threshold: float = DEFAULT_THRESHOLD,
+    stat: str = DEFAULT_STAT,
+) -> Tuple[List[str], List[str]]:
+    """Compare one timing statistic of ``current`` against ``baseline``.
+
+    Returns:
+        Tuple of (report lines, names of benchmarks slower than the threshold)
+    """
+    baseline = summarize(baseline)
+    current = summarize(current)
+    lines: List[str] = []
+    regressions: List[str] = []
+
+    for name, base_stats in baseline["benchmarks"].items():
+        current_stats = current["benchmarks"].get(name)
+        if current_stats is None:
+            lines.append(f"  MISSING   {name}")
+            continue
+
+        base_value = base_stats[stat]
+        current_value = current_stats[stat]
+        change = (current_value - base_value) / base_value if base_value else 0.0
+        status = "OK"
+        if change > threshold:
+            status = "REGRESSED"
+            regressions.append(name)
+        elif change < -threshold:
+            status = "IMPROVED"
+        lines.append(
+            f"  {status:<9} {name}: {base_value * 1000:.3f} ms -> "
+            f"{current_value * 1000:.3f} ms ({change:+.1%})"
+        )
+
+    for name in sorted(set(current["benchmarks"]) - set(baseline["benchmarks"])):
+        lines.append(f"  NEW       {name}: {current['benchmarks'][name][stat] * 1000:.3f} ms")
+
+    return lines, regressions
+
+
+def _load(path: Path) -> Dict:
+    with open(path, "r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def _write(path: Path, data: Dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(data, handle, indent=2)
+        handle.write("\n")
+
+
+def _run_suite(extra_args: List[str]) -> Dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        report = Path(tmp) / "benchmark.json"
+        command = [
+            sys.executable,
+            "-m",
+            "pytest",
+            str(BENCHMARK_TESTS),
+            "-q",
+            "-p",
+            "no:cacheprovider",
+            "--benchmark-only",
+            f"--benchmark-json={report}",
+            *extra_args,
+        ]
+        result = subprocess.run(command, cwd=REPO_ROOT)
+        if result.returncode != 0:
+            raise SystemExit(result.returncode)
+        return summarize(_load(report))
+
+
+def _report(baseline: Dict, current: Dict, threshold: float, stat: str) -> int:
+    lines, regressions = compare(baseline, current, threshold, stat)
+    print(f"Benchmark comparison (threshold {threshold:.0%} on {stat}):")
+    print("\n".join(lines))
+    if regressions:
+        print(f"\n❌ {len(regressions)} benchmark(s) regressed: {', '.join(regressions)}")
+        return 1
+    print("\n✅ No regressions")
+    return 0
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run and compare hot-path micro-benchmarks.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run the benchmark suite")
+    run_parser.add_argument("--output", type=Path, help="Write the summarized results to this file")
+    run_parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    run_parser.add_argument("--compare", action="store_true", help="Fail if slower than the baseline")
+    run_parser.add_argument("--update-baseline", action="store_true", help="Overwrite the baseline file")
+    run_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    run_parser.add_argument("--stat", choices=STATS, default=DEFAULT_STAT)
+    run_parser.add_argument("pytest_args", nargs="*", help="Extra arguments passed to pytest")
+
+    compare_parser = subparsers.add_parser("compare", help="Compare two saved result files")
+    compare_parser.add_argument("baseline", type=Path)
+    compare_parser.add_argument("current", type=Path)
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    compare_parser.add_argument("--stat", choices=STATS, default=DEFAULT_STAT)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        return _report(_load(args.baseline), _load(args.current), args.threshold, args.stat)
+
+    current = _run_suite(args.pytest_args)
+    if args.output:
+        _write(args.output, current)
+        print(f"Results written to {args.output}")
+    if args.update_baseline:
+        _write(args.baseline, current)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+    if args.compare:
+        if not args.baseline.exists():
+            print(f"No baseline at {args.baseline}; record one with --update-baseline")
+            return 1
+        return _report(_load(args.baseline), current, args.threshold, args.stat)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
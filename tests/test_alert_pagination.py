@@ -0,0 +1,184 @@
+"""
+EAS Station - Emergency Alert System
+Copyright (c) 2025 Timothy Kramer (KR8MER)
+
+This file is part of EAS Station.
+
+EAS Station is dual-licensed software:
+- GNU Affero General Public License v3 (AGPL-3.0) for open-source use
+- Commercial License for proprietary use
+
+You should have received a copy of both licenses with this software.
+For more information, see LICENSE and LICENSE-COMMERCIAL files.
+
+IMPORTANT: This software cannot be rebranded or have attribution removed.
+See NOTICE file for complete terms.
+
+Repository: https://github.com/KR8MER/eas-station
+"""
+
+"""Tests for keyset pagination and cached counts of the alert list."""
+
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from flask import Flask
+from sqlalchemy import MetaData, Text, event
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+
+from app_core.alert_pagination import count_alerts, decode_cursor, encode_cursor, paginate_keyset
+from app_core.cache import cache
+from app_core.extensions import db
+from app_core.models import CAPAlert, EASMessage, ManualEASActivation
+from webapp import routes_public
+
+NOW = datetime(2025, 3, 10, 12, 0, tzinfo=timezone.utc)
+
+
+@compiles(JSONB, "sqlite")
+def _jsonb_on_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask("alert-pagination-test")
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'alerts.db'}",
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+    )
+    db.init_app(app)
+    cache.init_app(app, config={"CACHE_TYPE": "SimpleCache"})
+
+    with app.app_context():
+        # SQLite has no spatial types here; the list never reads geometry
+        metadata = MetaData()
+        for model in (CAPAlert, EASMessage, ManualEASActivation):
+            table = model.__table__.to_metadata(metadata)
+            for column in table.columns:
+                if column.name == "geom":
+                    column.type = Text()
+        metadata.create_all(bind=db.engine)
+
+        # Groups of three alerts share a sent time, so ties must break on id
+        db.session.execute(CAPAlert.__table__.insert(), [
+            {
+                "id": index,
+                "identifier": f"alert-{index}",
+                "sent": NOW - timedelta(minutes=index // 3),
+                "status": "Actual",
+                "message_type": "Alert",
+                "scope": "Public",
+                "event": "Flood Warning" if index % 4 else "Tornado Warning",
+                "source": "noaa",
+                "description": "x" * 2000,
+                "raw_json": {"properties": {"index": index}},
+            }
+            for index in range(1, 238)
+        ])
+        db.session.commit()
+        yield app
+        db.session.remove()
+
+
+def _expected_order():
+    return [alert_id for _, alert_id in sorted(
+        ((NOW - timedelta(minutes=index // 3), index) for index in range(1, 238)), reverse=True
+    )]
+
+
+def _statements():
+    statements = []
+
+    @event.listens_for(db.engine, "before_cursor_execute")
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    return statements
+
+
+def test_cursors_walk_every_alert_once_in_both_directions(app):
+    pages = []
+    cursor = None
+    while True:
+        page = paginate_keyset(CAPAlert.query, per_page=25, after=cursor, page=len(pages) + 1)
+        pages.append(page)
+        if not page.has_next:
+            break
+        cursor = page.next_cursor
+
+    assert [alert.id for page in pages for alert in page.items] == _expected_order()
+    assert len(pages) == 10 and not pages[0].has_prev and pages[-1].has_prev
+
+    # Walking back from the last page returns the same pages
+    back = pages[-1]
+    for expected in reversed(pages[:-1]):
+        back = paginate_keyset(CAPAlert.query, per_page=25, before=back.prev_cursor, page=back.prev_num)
+        assert [alert.id for alert in back.items] == [alert.id for alert in expected.items]
+        assert back.page == expected.page
+    assert not back.has_prev
+
+
+def test_list_query_skips_large_columns_and_offset(app):
+    first = paginate_keyset(CAPAlert.query, per_page=25)
+    statements = _statements()
+
+    second = paginate_keyset(
+        CAPAlert.query.filter(CAPAlert.event == "Flood Warning"), per_page=25, after=first.next_cursor
+    )
+
+    select, parameters = statements[0]
+    # SQLite always renders OFFSET; the keyset query passes 0
+    assert "(cap_alerts.sent, cap_alerts.id) < (?, ?)" in select
+    assert parameters[-1] == 0
+    assert "raw_json" not in select and "description" not in select
+    assert "cap_alerts.headline" in select
+    assert all(alert.event == "Flood Warning" for alert in second.items)
+
+    # Links from before cursors existed still reach the same page
+    legacy = paginate_keyset(CAPAlert.query, per_page=25, page=2)
+    assert [alert.id for alert in legacy.items] == _expected_order()[25:50]
+    assert legacy.has_prev and legacy.has_next
+
+
+def test_malformed_cursor_starts_from_the_first_page(app):
+    assert decode_cursor("not a cursor") is None
+    assert decode_cursor(None) is None
+    alert = paginate_keyset(CAPAlert.query, per_page=1).items[0]
+    assert decode_cursor(encode_cursor(alert)) == (alert.sent, alert.id)
+
+    page = paginate_keyset(CAPAlert.query, per_page=10, after="%%%")
+    assert [alert.id for alert in page.items] == _expected_order()[:10]
+
+
+def test_counts_are_cached_per_filter(app):
+    statements = _statements()
+    query = CAPAlert.query.filter(CAPAlert.event == "Tornado Warning")
+
+    assert count_alerts(query, ["tornado"]) == (59, False)
+    assert count_alerts(query, ["tornado"]) == (59, False)
+    assert sum("count(" in statement.lower() for statement, _ in statements) == 1
+
+    assert count_alerts(CAPAlert.query, ["all"]) == (237, False)
+
+
+def test_alerts_route_pages_by_cursor(app, monkeypatch):
+    monkeypatch.setattr(
+        routes_public, "render_template",
+        lambda name, **context: json.dumps({
+            "ids": [alert.id for alert in context["alerts"]],
+            "total": context["pagination"].total,
+            "next": context["pagination"].next_cursor,
+        }),
+    )
+    routes_public.register(app, logging.getLogger("alert-pagination-test"))
+    client = app.test_client()
+
+    first = json.loads(client.get("/alerts?show_expired=1&per_page=50").data)
+    second = json.loads(client.get(f"/alerts?show_expired=1&per_page=50&cursor={first['next']}&page=2").data)
+
+    assert first["total"] == 237
+    assert first["ids"] + second["ids"] == _expected_order()[:100]
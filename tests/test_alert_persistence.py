@@ -0,0 +1,224 @@
+"""
+EAS Station - Emergency Alert System
+Copyright (c) 2025 Timothy Kramer (KR8MER)
+
+This file is part of EAS Station.
+
+EAS Station is dual-licensed software:
+- GNU Affero General Public License v3 (AGPL-3.0) for open-source use
+- Commercial License for proprietary use
+
+You should have received a copy of both licenses with this software.
+For more information, see LICENSE and LICENSE-COMMERCIAL files.
+
+IMPORTANT: This software cannot be rebranded or have attribution removed.
+See NOTICE file for complete terms.
+
+Repository: https://github.com/KR8MER/eas-station
+"""
+
+"""Tests for write-behind received-alert persistence."""
+
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from app_core.audio import eas_monitor
+from app_core.audio.alert_persistence import AlertPersistenceQueue
+from app_core.audio.eas_monitor import ContinuousEASMonitor, create_fips_filtering_callback
+from app_utils.eas_fsk import SAME_BAUD, SAME_MARK_FREQ, SAME_SPACE_FREQ, generate_fsk_samples
+
+HEADER = "ZCZC-WXR-TOR-039137+0030-1231200-KR8MER  -"
+
+
+def _same_audio() -> np.ndarray:
+    bits = []
+    for byte in [0xAB] * 16 + [ord(c) for c in HEADER]:
+        bits.extend((byte >> i) & 1 for i in range(8))
+    audio = np.asarray(
+        generate_fsk_samples(bits, 16000, SAME_BAUD, SAME_MARK_FREQ, SAME_SPACE_FREQ, 16000),
+        dtype=np.float32,
+    ) / 32768.0
+    return np.concatenate([audio, np.zeros(1600, dtype=np.float32)])
+
+
+class RecordingStore:
+    """Database stand-in: optional latency, optional outage, records call order."""
+
+    def __init__(self, latency=0.0, fail_times=0):
+        self.latency = latency
+        self.fail_times = fail_times
+        self.records = []
+        self.lock = threading.Lock()
+
+    def __call__(self, record):
+        time.sleep(self.latency)
+        with self.lock:
+            if self.fail_times:
+                self.fail_times -= 1
+                raise ConnectionError("database unavailable")
+            self.records.append(record)
+
+
+@pytest.fixture
+def install_queue(monkeypatch, tmp_path):
+    queues = []
+
+    def install(store, **kwargs):
+        queue = AlertPersistenceQueue(store, spool_dir=str(tmp_path), **kwargs)
+        queue.start()
+        queues.append(queue)
+        monkeypatch.setattr(eas_monitor, "_received_alert_queue", queue)
+        return queue
+
+    yield install
+    for queue in queues:
+        queue.stop()
+
+
+class _AudioManager:
+    sample_rate = 16000
+
+    def get_active_source(self):
+        return "wx-test"
+
+
+def _decode_and_time(decoder_audio, forwarded):
+    """Run the monitor's own decoder -> _handle_streaming_alert -> FIPS callback path."""
+    callback = create_fips_filtering_callback(["039137"], forwarded.append, logging.getLogger("test"))
+    monitor = ContinuousEASMonitor(_AudioManager(), alert_callback=callback, save_audio_files=False)
+    started = time.perf_counter()
+    monitor._streaming_decoder.process_samples(decoder_audio)
+    return time.perf_counter() - started
+
+
+def test_decode_timing_is_unaffected_by_database_latency(install_queue):
+    audio = _same_audio()
+
+    fast_queue = install_queue(RecordingStore())
+    baseline_forwarded = []
+    baseline = _decode_and_time(audio, baseline_forwarded)
+    assert fast_queue.flush(timeout=5.0)
+    fast_queue.stop()
+
+    slow_store = RecordingStore(latency=2.0)
+    queue = install_queue(slow_store)
+    forwarded = []
+    elapsed = _decode_and_time(audio, forwarded)
+
+    # The forwarding decision ran and decoding finished long before the 2 s commit
+    assert len(forwarded) == 1 and len(baseline_forwarded) == 1
+    assert elapsed < baseline + 0.25
+    assert slow_store.records == []
+
+    assert queue.flush(timeout=5.0)
+    assert len(slow_store.records) == 1
+    assert slow_store.records[0]["forwarding_decision"] == "forwarded"
+    assert slow_store.records[0]["headers"][0]["raw_text"].startswith("ZCZC-WXR-TOR-039137")
+
+
+def test_outage_spools_to_disk_and_replays_in_order(install_queue, tmp_path):
+    store = RecordingStore(fail_times=3)
+    queue = install_queue(store, retry_initial_seconds=0.05, retry_max_seconds=0.1)
+
+    for index in range(5):
+        assert queue.submit({"event_code": f"E{index}"})
+
+    assert queue.flush(timeout=5.0)
+    assert [record["event_code"] for record in store.records] == [f"E{index}" for index in range(5)]
+    assert queue.get_stats()["failures"] == 3
+    assert os.listdir(tmp_path) == []
+
+
+def test_spool_survives_restart_and_keeps_order(tmp_path):
+    crashed = AlertPersistenceQueue(RecordingStore(), spool_dir=str(tmp_path))
+    for index in range(3):
+        crashed.submit({"event_code": f"old{index}"})
+    # Never started: the process "died" with everything still spooled
+
+    store = RecordingStore()
+    restarted = AlertPersistenceQueue(store, spool_dir=str(tmp_path))
+    assert restarted.get_stats()["pending"] == 3
+    restarted.submit({"event_code": "new"})
+    restarted.start()
+    try:
+        assert restarted.flush(timeout=5.0)
+    finally:
+        restarted.stop()
+
+    assert [record["event_code"] for record in store.records] == ["old0", "old1", "old2", "new"]
+
+
+def test_queue_is_bounded(tmp_path):
+    queue = AlertPersistenceQueue(RecordingStore(), spool_dir=str(tmp_path), max_records=2)
+
+    assert queue.submit({"event_code": "A"})
+    assert queue.submit({"event_code": "B"})
+    assert not queue.submit({"event_code": "C"})
+    assert queue.get_stats()["dropped"] == 1
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_rejected_record_is_moved_aside_and_the_rest_drain(install_queue, tmp_path):
+    from sqlalchemy.exc import IntegrityError
+
+    stored = []
+
+    def store(record):
+        if record["event_code"] == "STALE":
+            raise IntegrityError("INSERT INTO received_eas_alerts", {}, Exception("foreign key violation"))
+        stored.append(record["event_code"])
+
+    queue = install_queue(store)
+    for code in ("A", "STALE", "B"):
+        assert queue.submit({"event_code": code})
+
+    assert queue.flush(timeout=5.0)
+    assert stored == ["A", "B"]
+    stats = queue.get_stats()
+    assert (stats["rejected"], stats["failures"], stats["retry_delay_seconds"]) == (1, 0, 0.0)
+    assert os.listdir(tmp_path) == ["000000000002.json.bad"]
+
+
+def test_non_database_error_is_retried_not_quarantined(install_queue, tmp_path):
+    stored = []
+    calls = {"count": 0}
+
+    def store(record):
+        calls["count"] += 1
+        if calls["count"] <= 2:
+            raise KeyError("alert_id")
+        stored.append(record["event_code"])
+
+    queue = install_queue(store, retry_initial_seconds=0.05)
+    assert queue.submit({"event_code": "TOR"})
+
+    assert queue.flush(timeout=5.0)
+    assert stored == ["TOR"]
+    stats = queue.get_stats()
+    assert (stats["rejected"], stats["failures"]) == (0, 2)
+    assert os.listdir(tmp_path) == []
+
+
+def test_unconfigured_persistence_keeps_records_spooled(monkeypatch, tmp_path):
+    monkeypatch.setattr(eas_monitor, "_received_alert_queue", None)
+    with pytest.raises(RuntimeError):
+        eas_monitor.get_received_alert_queue()
+    with pytest.raises(ValueError):
+        eas_monitor.configure_received_alert_persistence(spool_dir=str(tmp_path))
+
+    # A queue without an app cannot store; the record must stay in the spool
+    queue = AlertPersistenceQueue(eas_monitor._persist_received_alert, spool_dir=str(tmp_path),
+                                  retry_initial_seconds=0.05)
+    queue.submit({"event_code": "TOR"})
+    queue.start()
+    try:
+        assert not queue.flush(timeout=0.3)
+    finally:
+        queue.stop()
+    assert os.listdir(tmp_path) == ["000000000001.json"]
+    assert queue.get_stats()["failures"] >= 1
@@ -0,0 +1,117 @@
+"""
+EAS Station - Emergency Alert System
+Copyright (c) 2025 Timothy Kramer (KR8MER)
+
+This file is part of EAS Station.
+
+EAS Station is dual-licensed software:
+- GNU Affero General Public License v3 (AGPL-3.0) for open-source use
+- Commercial License for proprietary use
+
+You should have received a copy of both licenses with this software.
+For more information, see LICENSE and LICENSE-COMMERCIAL files.
+
+IMPORTANT: This software cannot be rebranded or have attribution removed.
+See NOTICE file for complete terms.
+
+Repository: https://github.com/KR8MER/eas-station
+"""
+
+"""Tests for the compiled multi-profile relevance matcher."""
+
+import random
+
+from app_utils.alert_relevance import (
+    NO_MATCH,
+    SAME_MATCH,
+    UGC_MATCH,
+    CompiledRelevanceMatcher,
+    RelevanceProfile,
+    normalize_alert_codes,
+)
+
+
+def _reference(profile, same_codes, ugc_codes):
+    """The CAP poller's former per-station checks, one profile at a time."""
+    for same in same_codes:
+        if same in profile.same_codes:
+            return SAME_MATCH, same, True
+        if same.endswith("000") and any(code.startswith(same[:3]) for code in profile.same_codes):
+            return SAME_MATCH, same, True
+    for ugc in ugc_codes:
+        if ugc in profile.zone_codes:
+            return UGC_MATCH, ugc, ugc in profile.storage_zone_codes
+    return NO_MATCH, None, False
+
+
+def _random_profiles(rng, count):
+    states = ["39", "18", "26", "42"]
+    profiles = []
+    for index in range(count):
+        state = rng.choice(states)
+        counties = rng.sample(range(1, 40, 2), 3)
+        zones = {f"OHZ{rng.randrange(1, 60):03d}" for _ in range(4)} | {f"OHC{c:03d}" for c in counties[:1]}
+        profiles.append(RelevanceProfile(
+            name=f"station-{index}",
+            same_codes=frozenset(f"0{state}{c:03d}" for c in counties),
+            zone_codes=frozenset(zones),
+            storage_zone_codes=frozenset(list(zones)[:2]),
+        ))
+    return profiles
+
+
+def _random_alert(rng):
+    same = [f"0{rng.choice(['39', '18', '26', '42', '55'])}{rng.choice([0] + list(range(1, 40))):03d}"
+            for _ in range(rng.randrange(0, 4))]
+    ugc = [f"OH{rng.choice('CZ')}{rng.randrange(1, 60):03d}" for _ in range(rng.randrange(0, 5))]
+    return {"properties": {"geocode": {"SAME": same, "UGC": ugc}}}
+
+
+def test_multi_profile_matches_agree_with_per_station_checks():
+    rng = random.Random(7)
+    profiles = _random_profiles(rng, 25)
+    matcher = CompiledRelevanceMatcher(profiles)
+
+    alerts = [_random_alert(rng) for _ in range(2000)]
+    results = matcher.match_alerts(alerts)
+
+    matched = 0
+    for alert, by_profile in zip(alerts, results):
+        ugc_codes, same_codes, _ = normalize_alert_codes(alert["properties"]["geocode"])
+        for profile in profiles:
+            reason, code, storage = _reference(profile, same_codes, ugc_codes)
+            match = by_profile.get(profile.name)
+            if reason == NO_MATCH:
+                assert match is None
+                continue
+            matched += 1
+            assert (match.reason, match.code, match.is_storage_relevant) == (reason, code, storage)
+    assert matched > 1000
+
+
+def test_statewide_and_storage_flags():
+    matcher = CompiledRelevanceMatcher([
+        RelevanceProfile("putnam", frozenset({"039137"}), frozenset({"OHZ016", "OHC137"}), frozenset({"OHC137"})),
+        RelevanceProfile("allen-in", frozenset({"018003"}), frozenset({"INZ033"})),
+    ])
+
+    statewide = matcher.match_alert({"properties": {"geocode": {"SAME": ["39000"], "UGC": ["INZ033"]}}})
+    assert statewide["putnam"].statewide and statewide["putnam"].code == "039000"
+    assert statewide["allen-in"].reason == UGC_MATCH and not statewide["allen-in"].is_storage_relevant
+
+    zone = matcher.match_alert({"properties": {"geocode": {"UGC": ["ohz016", "OHC137", "bad"]}}})
+    assert list(zone) == ["putnam"]
+    assert (zone["putnam"].code, zone["putnam"].is_storage_relevant) == ("OHZ016", False)
+
+    assert matcher.match_alert({"properties": {}}) == {}
+
+
+def test_profile_from_location_settings_normalizes_codes():
+    profile = RelevanceProfile.from_location_settings("home", {
+        "fips_codes": ["39137", "not-a-code"],
+        "zone_codes": "ohz016,ohc137",
+        "storage_zone_codes": ["ohc137"],
+    })
+    assert profile.same_codes == {"039137"}
+    assert profile.zone_codes == {"OHZ016", "OHC137"}
+    assert profile.storage_zone_codes == {"OHC137"}
@@ -0,0 +1,298 @@
+"""
+EAS Station - Emergency Alert System
+Copyright (c) 2025 Timothy Kramer (KR8MER)
+
+This file is part of EAS Station.
+
+EAS Station is dual-licensed software:
+- GNU Affero General Public License v3 (AGPL-3.0) for open-source use
+- Commercial License for proprietary use
+
+You should have received a copy of both licenses with this software.
+For more information, see LICENSE and LICENSE-COMMERCIAL files.
+
+IMPORTANT: This software cannot be rebranded or have attribution removed.
+See NOTICE file for complete terms.
+
+Repository: https://github.com/KR8MER/eas-station
+"""
+
+"""Tests for SQL-side, incremental metric snapshot aggregation."""
+
+import random
+import statistics
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from flask import Flask
+from sqlalchemy import event
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+
+from app_core.analytics import aggregator as aggregator_module
+from app_core.analytics.aggregator import MetricsAggregator
+from app_core.analytics.models import MetricSnapshot
+from app_core.extensions import db
+from app_core.models import (
+    AlertDeliveryReport,
+    AudioHealthStatus,
+    AudioSourceMetrics,
+    GPIOActivationLog,
+    RadioReceiverStatus,
+)
+
+NOW = datetime(2025, 3, 10, 12, 20, tzinfo=timezone.utc)
+TABLES = [
+    MetricSnapshot,
+    AlertDeliveryReport,
+    AudioHealthStatus,
+    AudioSourceMetrics,
+    GPIOActivationLog,
+    RadioReceiverStatus,
+]
+
+
+@compiles(JSONB, "sqlite")
+def _jsonb_on_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+
+class _StddevSamp:
+    def __init__(self):
+        self.values = []
+
+    def step(self, value):
+        if value is not None:
+            self.values.append(value)
+
+    def finalize(self):
+        return statistics.stdev(self.values) if len(self.values) > 1 else None
+
+
+def _date_trunc(unit, value):
+    moment = datetime.fromisoformat(value).replace(minute=0, second=0, microsecond=0)
+    if unit in ("day", "week"):
+        moment = moment.replace(hour=0)
+    if unit == "week":
+        moment -= timedelta(days=moment.weekday())
+    return moment.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+@pytest.fixture
+def app_context(tmp_path, monkeypatch):
+    app = Flask("analytics-test")
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'analytics.db'}",
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+    )
+    db.init_app(app)
+    clock = {"now": NOW}
+    monkeypatch.setattr(aggregator_module, "utc_now", lambda: clock["now"])
+    with app.app_context():
+        engine = db.engine
+
+        @event.listens_for(engine, "connect")
+        def _postgres_functions(dbapi_connection, _record):
+            # PostgreSQL's date_trunc/timezone/stddev_samp for the SQLite test database
+            dbapi_connection.create_function("date_trunc", 2, _date_trunc)
+            dbapi_connection.create_function("timezone", 2, lambda _zone, value: value)
+            dbapi_connection.create_aggregate("stddev_samp", 1, _StddevSamp)
+
+        engine.dispose()
+        for model in TABLES:
+            model.__table__.create(bind=engine)
+        yield clock
+        db.session.remove()
+        for model in reversed(TABLES):
+            model.__table__.drop(bind=engine)
+
+
+def _seed(start, hours, rng):
+    rows = []
+    for index in range(hours * 12):
+        moment = start + timedelta(minutes=5 * index, seconds=rng.randint(0, 240))
+        rows.append(AudioHealthStatus(
+            source_name="wx", health_score=rng.uniform(40, 100),
+            silence_detected=rng.random() < 0.2, timestamp=moment,
+        ))
+        rows.append(AudioSourceMetrics(
+            source_name="wx", source_type="stream", peak_level_db=-3.0,
+            rms_level_db=rng.uniform(-40, -10), peak_level_linear=0.7, rms_level_linear=0.1,
+            sample_rate=16000, channels=1, frames_captured=1000, timestamp=moment,
+        ))
+        rows.append(RadioReceiverStatus(receiver_id=1, locked=rng.random() < 0.9, reported_at=moment))
+        if index % 3 == 0:
+            total = rng.randint(0, 6)
+            rows.append(AlertDeliveryReport(
+                generated_at=moment, window_start=moment, window_end=moment, scope="summary",
+                total_alerts=total, delivered_alerts=rng.randint(0, total),
+                average_latency_seconds=rng.choice([None, rng.randint(1, 30)]),
+            ))
+        if index % 4 == 0:
+            rows.append(GPIOActivationLog(
+                pin=17, activation_type="automatic", activated_at=moment,
+                duration_seconds=rng.choice([None, rng.uniform(5, 120)]),
+            ))
+    db.session.add_all(rows)
+    db.session.commit()
+    return rows
+
+
+def _python_reference(rows, window_start, now):
+    """Per-window results of the former row-by-row Python aggregation."""
+    expected = {}
+    start = window_start
+    while start < now:
+        end = min(start + timedelta(hours=1), now)
+
+        def inside(moment):
+            return start <= moment.replace(tzinfo=timezone.utc) < end
+
+        health = [r for r in rows if isinstance(r, AudioHealthStatus) and inside(r.timestamp)]
+        if health:
+            scores = [r.health_score for r in health]
+            mean = sum(scores) / len(scores)
+            expected[("audio_health", "avg_health_score", start)] = (
+                mean, min(scores), max(scores), mean, statistics.stdev(scores), len(health))
+            silence = sum(1 for r in health if r.silence_detected) / len(health) * 100
+            expected[("audio_health", "silence_detection_rate", start)] = (
+                silence, None, None, None, None, len(health))
+            levels = [r.rms_level_db for r in rows if isinstance(r, AudioSourceMetrics) and inside(r.timestamp)]
+            if levels:
+                mean = sum(levels) / len(levels)
+                expected[("audio_health", "avg_signal_level_db", start)] = (
+                    mean, min(levels), max(levels), mean, statistics.stdev(levels), len(levels))
+
+        reports = [r for r in rows if isinstance(r, AlertDeliveryReport) and inside(r.generated_at)]
+        if reports:
+            total = sum(r.total_alerts for r in reports)
+            rate = sum(r.delivered_alerts for r in reports) / total * 100 if total > 0 else 0
+            rates = [r.delivered_alerts / r.total_alerts * 100 if r.total_alerts > 0 else 0 for r in reports]
+            expected[("alert_delivery", "delivery_success_rate", start)] = (
+                rate, min(rates), max(rates), rate, None, len(reports))
+            latencies = [r.average_latency_seconds * 1000 for r in reports if r.average_latency_seconds is not None]
+            if latencies:
+                mean = sum(latencies) / len(latencies)
+                expected[("alert_delivery", "avg_delivery_latency_ms", start)] = (
+                    mean, min(latencies), max(latencies), mean, None, len(latencies))
+            expected[("alert_delivery", "alert_volume", start)] = (
+                float(total), None, None, None, None, len(reports))
+
+        statuses = [r for r in rows if isinstance(r, RadioReceiverStatus) and inside(r.reported_at)]
+        if statuses:
+            expected[("receiver_status", "availability_rate", start)] = (
+                sum(1 for r in statuses if r.locked) / len(statuses) * 100, None, None, None, None, len(statuses))
+
+        activations = [r for r in rows if isinstance(r, GPIOActivationLog) and inside(r.activated_at)]
+        if activations:
+            expected[("gpio_activity", "activation_count", start)] = (
+                float(len(activations)), None, None, None, None, len(activations))
+            durations = [r.duration_seconds for r in activations if r.duration_seconds is not None]
+            if durations:
+                mean = sum(durations) / len(durations)
+                expected[("gpio_activity", "avg_activation_duration", start)] = (
+                    mean, min(durations), max(durations), mean, None, len(durations))
+        start = end
+    return expected
+
+
+def _aggregate(aggregator):
+    return sum((
+        aggregator.aggregate_alert_delivery_metrics(),
+        aggregator.aggregate_audio_health_metrics(),
+        aggregator.aggregate_receiver_status_metrics(),
+        aggregator.aggregate_gpio_metrics(),
+    ))
+
+
+def _stored():
+    return {
+        (s.metric_category, s.metric_name, s.window_start.replace(tzinfo=timezone.utc)): s
+        for s in MetricSnapshot.query.all()
+    }
+
+
+def _assert_matches(stored, expected):
+    assert set(stored) == set(expected)
+    for key, (value, min_value, max_value, avg_value, stddev_value, sample_count) in expected.items():
+        snapshot = stored[key]
+        assert snapshot.value == pytest.approx(value), key
+        assert snapshot.min_value == pytest.approx(min_value), key
+        assert snapshot.max_value == pytest.approx(max_value), key
+        assert snapshot.avg_value == pytest.approx(avg_value), key
+        assert snapshot.stddev_value == pytest.approx(stddev_value), key
+        assert snapshot.sample_count == sample_count, key
+
+
+def test_sql_aggregation_matches_python_path(app_context):
+    rows = _seed(NOW - timedelta(hours=30), 30, random.Random(7))
+    # 24 h lookback from the top of the hour, including the current partial hour
+    expected = _python_reference(rows, datetime(2025, 3, 9, 12, tzinfo=timezone.utc), NOW)
+    statements = []
+    event.listen(db.engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+
+    written = _aggregate(MetricsAggregator())
+
+    stored = _stored()
+    assert written == len(expected) == MetricSnapshot.query.count()
+    _assert_matches(stored, expected)
+    assert stored[("audio_health", "avg_health_score", datetime(2025, 3, 10, 12, tzinfo=timezone.utc))].window_end.replace(tzinfo=timezone.utc) == NOW
+
+    # One grouped statement per source table, however many windows there are
+    source_reads = [s for s in statements if "FROM metric_snapshots" not in s and s.startswith("SELECT")]
+    assert len(source_reads) == 5
+    assert all("GROUP BY" in s for s in source_reads)
+
+
+def test_high_water_mark_limits_work_to_new_windows(app_context):
+    rng = random.Random(11)
+    rows = _seed(NOW - timedelta(hours=6), 6, rng)
+    aggregator = MetricsAggregator()
+    _aggregate(aggregator)
+    before = {key: (s.value, s.sample_count) for key, s in _stored().items()}
+
+    # A late row lands in an hour that is already closed, and time moves on two hours
+    old_hour = datetime(2025, 3, 10, 8, tzinfo=timezone.utc)
+    db.session.add(AudioHealthStatus(source_name="wx", health_score=0.0, timestamp=old_hour + timedelta(minutes=30)))
+    db.session.commit()
+    later = NOW + timedelta(hours=2)
+    rows += _seed(NOW, 2, rng)
+    app_context["now"] = later
+    _aggregate(aggregator)
+
+    stored = _stored()
+    # Closed windows below the high-water mark are not recomputed
+    assert (stored[("audio_health", "avg_health_score", old_hour)].value,
+            stored[("audio_health", "avg_health_score", old_hour)].sample_count) == \
+        before[("audio_health", "avg_health_score", old_hour)]
+    # The previously partial hour was recomputed in place and new hours were added
+    expected = _python_reference(rows, datetime(2025, 3, 10, 12, tzinfo=timezone.utc), later)
+    _assert_matches({key: snapshot for key, snapshot in stored.items() if key in expected}, expected)
+    assert MetricSnapshot.query.count() == len(stored)
+
+
+def test_high_water_mark_is_floored_to_the_window(app_context):
+    # A snapshot from before windows were aligned starts mid-hour
+    legacy = datetime(2025, 3, 10, 9, 37, 12, tzinfo=timezone.utc)
+    db.session.add(MetricSnapshot(
+        metric_category="audio_health", metric_name="avg_health_score", snapshot_time=legacy,
+        window_start=legacy, window_end=legacy + timedelta(hours=1), aggregation_period="hourly", value=80.0,
+    ))
+    db.session.commit()
+
+    start = MetricsAggregator()._aggregation_start("audio_health", "hourly", 24, NOW)
+    assert start == datetime(2025, 3, 10, 9, tzinfo=timezone.utc)
+
+
+def test_rerun_upserts_without_duplicates(app_context):
+    _seed(NOW - timedelta(hours=3), 3, random.Random(3))
+    aggregator = MetricsAggregator()
+    first = _aggregate(aggregator)
+    count = MetricSnapshot.query.count()
+
+    second = _aggregate(aggregator)
+
+    # Only the newest window of each category is recomputed, in place
+    assert 0 < second < first
+    assert MetricSnapshot.query.count() == count
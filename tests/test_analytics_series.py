@@ -0,0 +1,275 @@
+"""
+EAS Station - Emergency Alert System
+Copyright (c) 2025 Timothy Kramer (KR8MER)
+
+This file is part of EAS Station.
+
+EAS Station is dual-licensed software:
+- GNU Affero General Public License v3 (AGPL-3.0) for open-source use
+- Commercial License for proprietary use
+
+You should have received a copy of both licenses with this software.
+For more information, see LICENSE and LICENSE-COMMERCIAL files.
+
+IMPORTANT: This software cannot be rebranded or have attribution removed.
+See NOTICE file for complete terms.
+
+Repository: https://github.com/KR8MER/eas-station
+"""
+
+"""Tests for batched trend analysis and anomaly detection across metric series."""
+
+import random
+import statistics
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+from flask import Flask
+from sqlalchemy import event
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+
+from app_core.analytics import anomaly_detector as anomaly_module
+from app_core.analytics import trend_analyzer as trend_module
+from app_core.analytics.anomaly_detector import AnomalyDetector
+from app_core.analytics.models import AnomalyRecord, MetricSnapshot, TrendRecord
+from app_core.analytics.series import (
+    batch_linear_regression,
+    batch_percentile_rank,
+    distinct_series_keys,
+    load_snapshot_series,
+    pad_series,
+)
+from app_core.analytics.trend_analyzer import TrendAnalyzer
+from app_core.extensions import db
+
+NOW = datetime(2025, 3, 10, 12, 0, tzinfo=timezone.utc)
+TABLES = [MetricSnapshot, TrendRecord, AnomalyRecord]
+
+
+@compiles(JSONB, "sqlite")
+def _jsonb_on_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+
+@pytest.fixture
+def app_context(tmp_path, monkeypatch):
+    app = Flask("analytics-series-test")
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'analytics.db'}",
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+    )
+    db.init_app(app)
+    monkeypatch.setattr(trend_module, "utc_now", lambda: NOW)
+    monkeypatch.setattr(anomaly_module, "utc_now", lambda: NOW)
+    with app.app_context():
+        for model in TABLES:
+            model.__table__.create(bind=db.engine)
+        yield app
+        db.session.remove()
+        for model in reversed(TABLES):
+            model.__table__.drop(bind=db.engine)
+
+
+def _snapshot(category, name, moment, value, entity_id=None):
+    return MetricSnapshot(
+        metric_category=category, metric_name=name, snapshot_time=moment,
+        window_start=moment, window_end=moment + timedelta(hours=1),
+        aggregation_period="hourly", value=value,
+        entity_id=entity_id, entity_type="source" if entity_id else None,
+    )
+
+
+def _seed(rng):
+    """Hourly snapshots over eight days with outliers, jumps and edge cases mixed in."""
+    rows = []
+    start = NOW - timedelta(days=8)
+    for hour in range(8 * 24):
+        moment = start + timedelta(hours=hour, minutes=rng.randint(0, 20))
+        rows.append(_snapshot("audio_health", "avg_health_score", moment, 80 + rng.gauss(0, 4) - hour * 0.05, "wx"))
+        rows.append(_snapshot("audio_health", "avg_health_score", moment, 60 + rng.gauss(0, 8), "noaa"))
+        rows.append(_snapshot("alert_delivery", "alert_volume", moment, float(rng.choice([0, 0, 1, 2, 3, 8]))))
+        rows.append(_snapshot("receiver_status", "availability_rate", moment, 100.0, "rx1"))
+    # Outliers and a sudden drop in the last day
+    rows.append(_snapshot("audio_health", "avg_health_score", NOW - timedelta(hours=5, minutes=30), 5.0, "wx"))
+    rows.append(_snapshot("audio_health", "avg_health_score", NOW - timedelta(hours=2, minutes=30), 140.0, "noaa"))
+    # Too few points for a trend or a baseline
+    rows.append(_snapshot("gpio_activity", "activation_count", NOW - timedelta(hours=1), 4.0))
+    rows.append(_snapshot("gpio_activity", "activation_count", NOW - timedelta(hours=2), 3.0))
+    db.session.add_all(rows)
+
+    # Two trends per audio series: a reversal for "wx" only
+    for entity_id, directions in (("wx", ("rising", "falling")), ("noaa", ("stable", "rising"))):
+        for age, direction in zip((2, 1), directions):
+            db.session.add(TrendRecord(
+                metric_category="audio_health", metric_name="avg_health_score",
+                analysis_time=NOW - timedelta(days=age), window_start=NOW - timedelta(days=age + 7),
+                window_end=NOW - timedelta(days=age), window_days=7, entity_id=entity_id,
+                entity_type="source", trend_direction=direction, trend_strength="moderate",
+                data_points=100, mean_value=70.0 + age,
+            ))
+    db.session.commit()
+
+
+def _series(category, name, entity_id, start, end, inclusive=True):
+    query = MetricSnapshot.query.filter(
+        MetricSnapshot.metric_category == category,
+        MetricSnapshot.metric_name == name,
+        MetricSnapshot.snapshot_time >= start,
+        (MetricSnapshot.snapshot_time <= end) if inclusive else (MetricSnapshot.snapshot_time < end),
+    )
+    if entity_id:
+        query = query.filter(MetricSnapshot.entity_id == entity_id)
+    return query.order_by(MetricSnapshot.snapshot_time).all()
+
+
+def _reference_trend(snapshots, window_start, window_days=7, forecast_days=7):
+    """The former per-metric, pure-Python trend arithmetic."""
+    x = [(s.snapshot_time.replace(tzinfo=timezone.utc) - window_start).total_seconds() for s in snapshots]
+    y = [s.value for s in snapshots]
+    n = len(x)
+    x_mean, y_mean = sum(x) / n, sum(y) / n
+    slope = sum((a - x_mean) * (b - y_mean) for a, b in zip(x, y)) / sum((a - x_mean) ** 2 for a in x)
+    intercept = y_mean - slope * x_mean
+    ss_tot = sum((b - y_mean) ** 2 for b in y)
+    ss_res = sum((b - (slope * a + intercept)) ** 2 for a, b in zip(x, y))
+    r_squared = max(0.0, 1 - ss_res / ss_tot) if ss_tot else 0.0
+    forecast_seconds = (NOW + timedelta(days=forecast_days) - window_start).total_seconds()
+    change = y[-1] - y[0]
+    return {
+        "slope": slope, "intercept": intercept, "r_squared": r_squared,
+        "mean_value": y_mean, "median_value": statistics.median(y), "stddev_value": statistics.stdev(y),
+        "min_value": min(y), "max_value": max(y), "absolute_change": change,
+        "percent_change": change / y[0] * 100 if y[0] else 0, "rate_per_day": change / window_days,
+        "forecast_value": slope * forecast_seconds + intercept, "data_points": n,
+    }
+
+
+def _reference_anomalies(keys, baseline_days=7, lookback_hours=24):
+    """(key, time, type, severity, z-score, percentile) the former per-metric detector reported."""
+    baseline_start = NOW - timedelta(days=baseline_days)
+    check_start = NOW - timedelta(hours=lookback_hours)
+    found = []
+    for category, name, entity_id in keys:
+        baseline = [s.value for s in _series(category, name, entity_id, baseline_start, check_start, False)]
+        if len(baseline) < 5 or len(set(baseline)) == 1:
+            continue
+        mean, stddev = sum(baseline) / len(baseline), statistics.stdev(baseline)
+        checks = _series(category, name, entity_id, check_start, NOW)
+        for s in checks:
+            z = (s.value - mean) / stddev
+            if abs(z) >= 2.0:
+                severity = "critical" if abs(z) >= 3.5 else "high" if abs(z) >= 3.0 else "medium" if abs(z) >= 2.5 else "low"
+                percentile = sum(1 for v in baseline if v < s.value) / len(baseline) * 100
+                found.append(((category, name, entity_id), s.snapshot_time, "outlier", severity, z, percentile))
+        flagged = {item[1] for item in found if item[0] == (category, name, entity_id)}
+        for prev, curr in zip(checks, checks[1:]):
+            if curr.snapshot_time in flagged or prev.value == 0:
+                continue
+            change = (curr.value - prev.value) / abs(prev.value)
+            if abs(change) >= 0.5:
+                severity = "critical" if abs(change) >= 1.0 else "high" if abs(change) >= 0.75 else "medium" if abs(change) >= 0.6 else "low"
+                found.append(((category, name, entity_id), curr.snapshot_time,
+                              "spike" if change > 0 else "drop", severity, None, None))
+    return found
+
+
+def test_batched_trends_match_per_metric_arithmetic(app_context):
+    _seed(random.Random(5))
+    statements = []
+    event.listen(db.engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+
+    assert TrendAnalyzer().analyze_all_metrics(window_days=7) == 4
+
+    # One distinct-keys query and one snapshot query for every series
+    assert len([s for s in statements if s.startswith("SELECT")]) == 2
+    window_start = NOW - timedelta(days=7)
+    trends = {(t.metric_category, t.metric_name, t.entity_id): t
+              for t in TrendRecord.query.filter(TrendRecord.analysis_time == NOW)}
+    assert set(trends) == {
+        ("audio_health", "avg_health_score", "wx"),
+        ("audio_health", "avg_health_score", "noaa"),
+        ("alert_delivery", "alert_volume", None),
+        ("receiver_status", "availability_rate", "rx1"),
+    }
+    for key, trend in trends.items():
+        expected = _reference_trend(_series(*key, window_start, NOW), window_start)
+        for field, value in expected.items():
+            assert getattr(trend, field) == pytest.approx(value, rel=1e-9, abs=1e-9), (key, field)
+        assert trend.entity_type == ("source" if key[2] else None)
+
+    assert trends[("audio_health", "avg_health_score", "wx")].slope < 0
+    assert trends[("receiver_status", "availability_rate", "rx1")].trend_strength == "stable"
+
+
+def test_single_metric_trend_uses_the_batch_path(app_context):
+    _seed(random.Random(6))
+    trend = TrendAnalyzer().analyze_metric_trend("audio_health", "avg_health_score", entity_id="noaa")
+    window_start = NOW - timedelta(days=7)
+    expected = _reference_trend(_series("audio_health", "avg_health_score", "noaa", window_start, NOW), window_start)
+    assert trend.slope == pytest.approx(expected["slope"])
+    assert TrendAnalyzer().analyze_metric_trend("gpio_activity", "activation_count") is None
+
+
+def test_batched_anomalies_match_per_metric_detection(app_context):
+    _seed(random.Random(7))
+    keys = distinct_series_keys()
+    expected = _reference_anomalies(keys)
+
+    assert AnomalyDetector().detect_all_anomalies(baseline_days=7) == len(expected) + 1
+
+    stored = AnomalyRecord.query.all()
+    found = {
+        ((a.metric_category, a.metric_name, a.entity_id), a.metric_time.replace(tzinfo=timezone.utc), a.anomaly_type): a
+        for a in stored if a.anomaly_type != "trend_break"
+    }
+    assert len(found) == len(expected)
+    for key, moment, anomaly_type, severity, z_score, percentile in expected:
+        anomaly = found[(key, moment.replace(tzinfo=timezone.utc), anomaly_type)]
+        assert anomaly.severity == severity
+        if z_score is not None:
+            assert anomaly.z_score == pytest.approx(z_score)
+            assert anomaly.percentile == pytest.approx(percentile)
+    assert {(a.entity_id, a.anomaly_type) for a in found.values()} >= {("wx", "outlier"), ("noaa", "outlier")}
+
+    # Only the reversal between two directional trends is a trend break
+    breaks = [a for a in stored if a.anomaly_type == "trend_break"]
+    assert [(a.entity_id, a.extra_metadata["previous_direction"], a.extra_metadata["current_direction"])
+            for a in breaks] == [("wx", "rising", "falling")]
+
+    # Nothing is recorded twice when detection runs again
+    assert AnomalyDetector().detect_all_anomalies(baseline_days=7) == 0
+    assert AnomalyRecord.query.count() == len(stored)
+
+
+def test_single_metric_anomalies_skip_constant_baselines(app_context):
+    _seed(random.Random(8))
+    detector = AnomalyDetector()
+    assert detector.detect_metric_anomalies("receiver_status", "availability_rate", entity_id="rx1") == []
+    assert detector.detect_metric_anomalies("gpio_activity", "activation_count") == []
+    assert detector.detect_metric_anomalies("audio_health", "avg_health_score", entity_id="wx")
+
+
+def test_entityless_series_cover_every_entity(app_context):
+    _seed(random.Random(9))
+    start = NOW - timedelta(days=1)
+    combined, wx = load_snapshot_series(
+        [("audio_health", "avg_health_score", None), ("audio_health", "avg_health_score", "wx")], start, NOW)
+    assert len(combined) == len(_series("audio_health", "avg_health_score", None, start, NOW))
+    assert len(wx) == len(_series("audio_health", "avg_health_score", "wx", start, NOW))
+    assert combined.times == sorted(combined.times)
+
+
+def test_batch_helpers_handle_ragged_rows():
+    x, lengths = pad_series([[0.0, 1.0, 2.0, 3.0], [5.0, 5.0], [1.0]])
+    y, _ = pad_series([[1.0, 3.0, 5.0, 7.0], [2.0, 4.0], [9.0]])
+    slope, intercept, r_squared = batch_linear_regression(x, y, lengths)
+    assert slope.tolist() == [2.0, 0.0, 0.0]
+    assert intercept.tolist() == [1.0, 3.0, 0.0]
+    assert r_squared.tolist() == [1.0, 0.0, 0.0]
+
+    baseline, baseline_lengths = pad_series([[1.0, 2.0, 3.0, 4.0], [10.0]])
+    ranks = batch_percentile_rank(np.array([3.5, 0.0, 11.0]), np.array([0, 0, 1]), baseline, baseline_lengths)
+    assert ranks.tolist() == [75.0, 0.0, 100.0]
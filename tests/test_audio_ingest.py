@@ -25,6 +25,8 @@ and metering components.
 """
 
 import logging
+import threading
+import tracemalloc
 import pytest
 import numpy as np
 import time
@@ -200,6 +202,59 @@ class TestAudioMeter:
         assert meter._peak_hold_start == 0.0
         assert np.all(meter._buffer == 0)
 
+    def test_block_metering_matches_per_sample_reference(self):
+        """Block processing must reproduce the original per-sample ring/peak logic."""
+        window = 1024
+        meter = AudioMeter(window_size=window, peak_hold_time=60.0)
+        ring = np.zeros(window, dtype=np.float32)
+        pos = 0
+        peak = -np.inf
+
+        rng = np.random.default_rng(7)
+        for size in (1, 100, 1023, 1024, 1025, 3000, 17, 4800):
+            chunk = (rng.standard_normal(size) * rng.uniform(0.01, 0.5)).astype(np.float32)
+            for sample in chunk:
+                ring[pos] = sample
+                pos = (pos + 1) % window
+                peak = max(peak, abs(sample))
+
+            metrics = meter.process_samples(chunk)
+
+            np.testing.assert_array_equal(meter._buffer, ring)
+            assert meter._buffer_pos == pos
+            assert metrics['peak_linear'] == pytest.approx(peak)
+            assert metrics['rms_linear'] == pytest.approx(np.sqrt(np.mean(ring.astype(np.float64) ** 2)), rel=1e-5)
+            assert metrics['instant_peak_dbfs'] == pytest.approx(20 * np.log10(np.max(np.abs(chunk))), abs=1e-4)
+
+    def test_clip_counting_and_ballistics(self):
+        """Clips are counted per chunk and in total; ballistics attack fast, release slow."""
+        meter = AudioMeter(window_size=1024, sample_rate=48000, attack_time=0.01, release_time=0.3)
+
+        clipped = np.array([1.0, -1.0, 0.5, 0.995] + [0.0] * 476, dtype=np.float32)
+        metrics = meter.process_samples(clipped)
+        assert metrics['clip_count'] == 3
+        assert meter.process_samples(clipped)['clips_total'] == 6
+
+        meter.reset()
+        loud = np.full(4800, 0.5, dtype=np.float32)  # 100 ms at -6 dBFS
+        quiet = np.zeros(4800, dtype=np.float32)
+
+        attack = meter.process_samples(loud)['ballistic_rms_dbfs']
+        release = meter.process_samples(quiet)['ballistic_rms_dbfs']
+
+        assert attack == pytest.approx(20 * np.log10(0.5), abs=0.1)
+        # 100 ms of silence against a 300 ms release drops ~3 dB, not to the floor
+        assert -10.0 < release < attack
+
+    def test_empty_chunk_does_not_raise(self):
+        meter = AudioMeter(window_size=256)
+        meter.process_samples(np.full(256, 0.25, dtype=np.float32))
+
+        metrics = meter.process_samples(np.array([], dtype=np.float32))
+
+        assert metrics['clip_count'] == 0
+        assert metrics['peak_linear'] == pytest.approx(0.25)
+
 
 class TestSilenceDetector:
     """Test silence detection."""
@@ -316,6 +371,17 @@ class TestAudioHealthMonitor:
         assert monitor.silence_detector is not None
         assert monitor._health_score == 100.0
 
+    def test_meter_uses_source_sample_rate(self):
+        """Meter ballistics follow the monitored source's sample rate."""
+        samples = np.full(1600, 0.5, dtype=np.float32)  # 100 ms at 16 kHz
+        monitor = AudioHealthMonitor("test_source", sample_rate=16000)
+        assert monitor.meter.sample_rate == 16000
+
+        level = monitor.process_samples(samples)['meter_levels']
+        expected = AudioMeter(sample_rate=16000).process_samples(samples)
+        assert level == expected
+        assert level != AudioMeter().process_samples(samples)
+
     def test_healthy_signal_processing(self):
         """Test processing healthy audio signal."""
         monitor = AudioHealthMonitor("test_source")
@@ -424,6 +490,104 @@ class TestAudioSourceAdapter:
             with pytest.raises(RuntimeError, match="SDR source not available"):
                 create_audio_source(config)
 
+    def test_visualization_rings_read_oldest_first(self):
+        """Circular waveform/spectrogram rings must read back in chronological order."""
+        adapter = DummyCaptureAdapter()
+        ramp = np.arange(5000, dtype=np.float32)
+        for start in range(0, 5000, 300):
+            adapter._update_waveform_buffer(ramp[start:start + 300])
+        np.testing.assert_array_equal(adapter.get_waveform_data(), ramp[-2048:])
+
+        t = np.arange(1024) / 44100.0
+        frames = [0.5 * np.sin(2 * np.pi * (200 + 40 * i) * t).astype(np.float32) for i in range(105)]
+        for frame in frames:
+            adapter._update_spectrogram_buffer(frame)
+
+        spectrogram = adapter.get_spectrogram_data()
+        assert spectrogram.shape == (100, 512)
+        for row, frame in zip(spectrogram[[0, -1]], (frames[5], frames[-1])):
+            magnitude_db = 20 * np.log10(np.maximum(np.abs(np.fft.rfft(frame * np.hamming(1024))), 1e-10))
+            expected = np.clip((magnitude_db + 120) / 120, 0, 1)[:512]
+            np.testing.assert_allclose(row, expected, atol=1e-5)
+
+    def test_metrics_update_in_place_and_snapshot_is_detached(self):
+        """Metric updates reuse the same object; snapshots are independent copies."""
+        adapter = DummyCaptureAdapter()
+        metrics = adapter.metrics
+        adapter.metrics.metadata['rbds_ps_name'] = 'KR8MER'
+
+        adapter._update_metrics(np.full(4096, 0.5, dtype=np.float32))
+        snapshot = adapter.get_metrics_snapshot()
+        adapter._last_metrics_update = 0.0
+        adapter._update_metrics(np.zeros((4096, 2), dtype=np.float32))
+
+        assert adapter.metrics is metrics
+        assert metrics.frames_captured == 8192
+        assert metrics.silence_detected
+        assert metrics.metadata['rbds_ps_name'] == 'KR8MER'
+        assert snapshot.frames_captured == 4096
+        assert snapshot.peak_level_db == pytest.approx(-6.02, abs=0.01)
+        assert snapshot.metadata is not metrics.metadata
+
+    def test_metadata_writers_and_capture_share_the_write_section(self):
+        """Metadata updates from other threads never tear a snapshot or the sequence."""
+        adapter = DummyCaptureAdapter()
+        chunk = np.full(1024, 0.25, dtype=np.float32)
+        stop = threading.Event()
+
+        def capture():
+            while not stop.is_set():
+                adapter._last_metrics_update = 0.0
+                adapter._update_metrics(chunk)
+
+        def rbds():
+            for value in range(2000):
+                with adapter.metrics_write() as metrics:
+                    metrics.metadata['rbds_pi_code'] = value
+                    metrics.metadata['rbds_last_updated'] = value
+
+        capture_thread = threading.Thread(target=capture)
+        capture_thread.start()
+        writer = threading.Thread(target=rbds)
+        writer.start()
+        try:
+            while writer.is_alive():
+                metadata = adapter.get_metrics_snapshot().metadata
+                assert metadata.get('rbds_pi_code') == metadata.get('rbds_last_updated')
+        finally:
+            writer.join()
+            stop.set()
+            capture_thread.join()
+
+        assert adapter._metrics_guard._sequence % 2 == 0
+        assert adapter.get_metrics_snapshot().metadata['rbds_pi_code'] == 1999
+
+    def test_update_metrics_steady_state_allocations(self):
+        """Per-chunk metric/visualization updates only allocate the FFT output."""
+        adapter = DummyCaptureAdapter()
+        chunk = (np.random.default_rng(1).standard_normal(4096) * 0.1).astype(np.float32)
+
+        def update():
+            adapter._last_metrics_update = 0.0
+            adapter._update_metrics(chunk)
+
+        update()  # warm up lazily created state
+        tracemalloc.start()
+        try:
+            baseline, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            for _ in range(50):
+                update()
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        # Nothing accumulates, and the transient high-water mark is the FFT's
+        # own buffers rather than window-sized temporaries plus a ~200 KiB
+        # spectrogram shift copy.
+        assert current - baseline < 2048
+        assert peak - baseline < 32 * 1024
+
 
 class TestAudioIngestController:
     """Test the main ingest controller."""
@@ -0,0 +1,367 @@
+"""
+EAS Station - Emergency Alert System
+Copyright (c) 2025 Timothy Kramer (KR8MER)
+
+This file is part of EAS Station.
+
+EAS Station is dual-licensed software:
+- GNU Affero General Public License v3 (AGPL-3.0) for open-source use
+- Commercial License for proprietary use
+
+You should have received a copy of both licenses with this software.
+For more information, see LICENSE and LICENSE-COMMERCIAL files.
+
+IMPORTANT: This software cannot be rebranded or have attribution removed.
+See NOTICE file for complete terms.
+
+Repository: https://github.com/KR8MER/eas-station
+"""
+
+"""Tests for the Redis Streams request/response audio command channel."""
+
+import json
+import threading
+import time
+
+import pytest
+import redis
+
+from app_core.audio import redis_commands
+from app_core.audio.latency_metrics import STAGE_AUDIO_COMMAND, get_latency_registry
+from app_core.audio.redis_commands import (
+    AUDIO_COMMAND_GROUP,
+    AUDIO_COMMAND_STREAM,
+    AudioCommandPublisher,
+    AudioCommandSubscriber,
+)
+
+
+class StreamsRedis:
+    """In-memory stand-in for the Redis Streams and list commands the channel uses."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._streams = {}
+        self._groups = {}
+        self._lists = {}
+        self._seq = 0
+
+    def ping(self):
+        return True
+
+    def xadd(self, name, fields, maxlen=None, approximate=True):
+        with self._cond:
+            self._seq += 1
+            entry_id = f"{self._seq}-0"
+            self._streams.setdefault(name, []).append((entry_id, dict(fields)))
+            self._cond.notify_all()
+            return entry_id
+
+    def xgroup_create(self, name, groupname, id='0', mkstream=False):
+        with self._cond:
+            if (name, groupname) in self._groups:
+                raise redis.ResponseError("BUSYGROUP Consumer Group name already exists")
+            self._streams.setdefault(name, [])
+            self._groups[(name, groupname)] = {'delivered': 0, 'pending': {}, 'delivered_at': {}}
+
+    def xreadgroup(self, groupname, consumername, streams, count=None, block=None):
+        (name, stream_id), = streams.items()
+        deadline = time.monotonic() + (block or 0) / 1000.0
+        with self._cond:
+            group = self._groups.get((name, groupname))
+            if group is None:
+                raise redis.ResponseError("NOGROUP No such consumer group")
+            while True:
+                entries = self._streams[name]
+                if stream_id == '0':
+                    found = [(entry_id, dict(entries[int(entry_id.split('-')[0]) - 1][1]))
+                             for entry_id, owner in group['pending'].items() if owner == consumername]
+                    return [[name, found[:count]]] if found else []
+                fresh = [entry for entry in entries if int(entry[0].split('-')[0]) > group['delivered']][:count]
+                if fresh:
+                    for entry_id, _fields in fresh:
+                        group['pending'][entry_id] = consumername
+                        group['delivered_at'][entry_id] = time.monotonic()
+                    group['delivered'] = int(fresh[-1][0].split('-')[0])
+                    return [[name, [(entry_id, dict(fields)) for entry_id, fields in fresh]]]
+                remaining = deadline - time.monotonic()
+                if block is None or remaining <= 0:
+                    return []
+                self._cond.wait(remaining)
+
+    def xautoclaim(self, name, groupname, consumername, min_idle_time, start_id='0-0', count=None):
+        with self._cond:
+            group = self._groups[(name, groupname)]
+            now = time.monotonic()
+            start = int(start_id.split('-')[0])
+            candidates = sorted(
+                (entry_id for entry_id in group['pending'] if int(entry_id.split('-')[0]) >= start),
+                key=lambda entry_id: int(entry_id.split('-')[0]),
+            )
+            claimed = []
+            for entry_id in candidates:
+                if count is not None and len(claimed) == count:
+                    return [entry_id, claimed, []]
+                if (now - group['delivered_at'][entry_id]) * 1000.0 >= min_idle_time:
+                    group['pending'][entry_id] = consumername
+                    group['delivered_at'][entry_id] = now
+                    claimed.append((entry_id, dict(self._streams[name][int(entry_id.split('-')[0]) - 1][1])))
+            return ['0-0', claimed, []]
+
+    def xclaim(self, name, groupname, consumername, min_idle_time, message_ids, justid=False):
+        with self._cond:
+            group = self._groups[(name, groupname)]
+            claimed = []
+            for entry_id in message_ids:
+                if entry_id in group['pending']:
+                    group['pending'][entry_id] = consumername
+                    group['delivered_at'][entry_id] = time.monotonic()
+                    claimed.append(entry_id)
+            return claimed
+
+    def owners(self):
+        with self._cond:
+            return sorted(owner for group in self._groups.values() for owner in group['pending'].values())
+
+    def xack(self, name, groupname, *ids):
+        with self._cond:
+            pending = self._groups[(name, groupname)]['pending']
+            return sum(1 for entry_id in ids if pending.pop(entry_id, None) is not None)
+
+    def lpush(self, name, *values):
+        with self._cond:
+            self._lists.setdefault(name, [])[0:0] = list(reversed(values))
+            self._cond.notify_all()
+            return len(self._lists[name])
+
+    def lindex(self, name, index):
+        with self._cond:
+            values = self._lists.get(name) or []
+            return values[index] if -len(values) <= index < len(values) else None
+
+    def expire(self, name, seconds):
+        return name in self._lists
+
+    def blpop(self, keys, timeout=0):
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                for key in keys:
+                    if self._lists.get(key):
+                        return key, self._lists[key].pop(0)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+    def pending_count(self):
+        with self._cond:
+            return sum(len(group['pending']) for group in self._groups.values())
+
+
+class FakeController:
+    def __init__(self, fail=False, delay=0.0):
+        self.started = []
+        self._sources = {}
+        self.fail = fail
+        self.delay = delay
+
+    def start_source(self, name):
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError(f"device for {name} is busy")
+        self.started.append(name)
+
+
+@pytest.fixture
+def client():
+    return StreamsRedis()
+
+
+@pytest.fixture(autouse=True)
+def _clean_registry():
+    get_latency_registry().reset()
+    yield
+    get_latency_registry().reset()
+
+
+def _run_subscriber(client, controller, consumer="audio-1"):
+    subscriber = AudioCommandSubscriber(controller, redis_client=client, consumer_name=consumer)
+    thread = threading.Thread(target=subscriber.start, daemon=True)
+    thread.start()
+    return subscriber, thread
+
+
+def _stop(subscriber, thread):
+    subscriber.stop()
+    thread.join(timeout=3.0)
+    assert not thread.is_alive()
+
+
+def test_round_trip_returns_execute_result(client):
+    controller = FakeController()
+    subscriber, thread = _run_subscriber(client, controller)
+    try:
+        result = AudioCommandPublisher(redis_client=client).start_source("wx-1")
+    finally:
+        _stop(subscriber, thread)
+
+    assert result['success'] is True
+    assert result['message'] == 'Started source wx-1'
+    assert controller.started == ["wx-1"]
+    assert 0.0 < result['latency_ms'] < 1000.0
+    assert client.pending_count() == 0
+    assert get_latency_registry().snapshot()[STAGE_AUDIO_COMMAND]["count"] == 1
+
+
+def test_failed_command_reports_real_error(client):
+    subscriber, thread = _run_subscriber(client, FakeController(fail=True))
+    try:
+        result = AudioCommandPublisher(redis_client=client).start_source("wx-1")
+    finally:
+        _stop(subscriber, thread)
+
+    assert result['success'] is False
+    assert 'device for wx-1 is busy' in result['message']
+
+
+def test_reply_wait_is_bounded_when_service_is_down(client):
+    started = time.monotonic()
+    result = AudioCommandPublisher(redis_client=client)._publish_command('source_start', {'source_name': 'wx-1'}, timeout=0.2)
+
+    assert time.monotonic() - started < 1.0
+    assert result['success'] is False
+    assert result['timed_out'] is True
+
+
+def test_commands_queued_during_restart_run_when_service_returns(client):
+    controller = FakeController()
+    # The group exists from the previous audio-service run
+    client.xgroup_create(AUDIO_COMMAND_STREAM, AUDIO_COMMAND_GROUP, id='0', mkstream=True)
+    AudioCommandPublisher(redis_client=client)._publish_command('source_start', {'source_name': 'wx-2'}, timeout=0.05)
+
+    subscriber, thread = _run_subscriber(client, controller)
+    try:
+        deadline = time.monotonic() + 3.0
+        while not controller.started and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        _stop(subscriber, thread)
+
+    assert controller.started == ["wx-2"]
+
+
+def test_unacknowledged_command_is_redelivered_after_crash(client):
+    controller = FakeController()
+    crashed = AudioCommandSubscriber(controller, redis_client=client, consumer_name="audio-1")
+    crashed._ensure_group()
+    client.xadd(AUDIO_COMMAND_STREAM, {
+        'command_id': 'abc', 'command': 'source_start', 'params': json.dumps({'source_name': 'wx-3'}),
+        'reply_to': redis_commands.reply_key('abc'), 'expires_at': repr(time.time() + 30),
+    })
+    # Delivered to the old process, which died before executing and acknowledging it
+    assert len(crashed._read_entries('>', None)) == 1
+
+    restarted = AudioCommandSubscriber(controller, redis_client=client, consumer_name="audio-1")
+    assert restarted._recover_pending() == 1
+    assert controller.started == ["wx-3"]
+    assert json.loads(client.blpop([redis_commands.reply_key('abc')], timeout=0.1)[1])['success'] is True
+    assert client.pending_count() == 0
+
+
+def test_expired_command_is_acknowledged_without_running(client):
+    controller = FakeController()
+    subscriber = AudioCommandSubscriber(controller, redis_client=client, consumer_name="audio-1")
+    subscriber._ensure_group()
+    client.xadd(AUDIO_COMMAND_STREAM, {
+        'command_id': 'old', 'command': 'source_start', 'params': json.dumps({'source_name': 'wx-4'}),
+        'reply_to': redis_commands.reply_key('old'), 'expires_at': repr(time.time() - 1),
+    })
+
+    assert subscriber.poll_once(block_ms=None) == 1
+    reply = json.loads(client.blpop([redis_commands.reply_key('old')], timeout=0.1)[1])
+    assert controller.started == []
+    assert reply['success'] is False and 'expired' in reply['message']
+    assert client.pending_count() == 0
+
+
+def test_commands_abandoned_by_a_dead_consumer_are_claimed_once_idle(client):
+    controller = FakeController()
+    dead = AudioCommandSubscriber(controller, redis_client=client, consumer_name="old-container")
+    dead._ensure_group()
+    for index in range(12):
+        command_id = f"lost-{index}"
+        client.xadd(AUDIO_COMMAND_STREAM, {
+            'command_id': command_id, 'command': 'source_start',
+            'params': json.dumps({'source_name': f'wx-{index}'}),
+            'reply_to': redis_commands.reply_key(command_id), 'expires_at': repr(time.time() + 30),
+        })
+    # Delivered to a container that was then recreated under a new hostname
+    assert len(dead._read_entries('>', None)) == 10
+
+    survivor = AudioCommandSubscriber(controller, redis_client=client, consumer_name="new-container")
+    assert survivor.poll_once(block_ms=None) == 2
+    # Not idle long enough: they may still be running on a live consumer
+    assert survivor._claim_abandoned(min_idle_ms=60_000) == 0
+    assert client.owners() == ["old-container"] * 10
+
+    time.sleep(0.06)
+    assert survivor._claim_abandoned(min_idle_ms=50) == 10
+    assert controller.started == [f"wx-{index}" for index in (10, 11, *range(10))]
+    assert client.pending_count() == 0
+
+
+def test_restart_recovers_own_and_abandoned_entries(client, monkeypatch):
+    monkeypatch.setattr(redis_commands, "PENDING_CLAIM_MIN_IDLE_MS", 0)
+    controller = FakeController()
+    client.xgroup_create(AUDIO_COMMAND_STREAM, AUDIO_COMMAND_GROUP, id='0', mkstream=True)
+    for consumer, source in (("audio-1", "wx-5"), ("gone", "wx-6")):
+        client.xadd(AUDIO_COMMAND_STREAM, {
+            'command_id': source, 'command': 'source_start', 'params': json.dumps({'source_name': source}),
+            'reply_to': redis_commands.reply_key(source), 'expires_at': repr(time.time() + 30),
+        })
+        AudioCommandSubscriber(controller, redis_client=client, consumer_name=consumer)._read_entries('>', None)
+
+    restarted = AudioCommandSubscriber(controller, redis_client=client, consumer_name="audio-1")
+    assert restarted._recover_pending() == 2
+    assert controller.started == ["wx-5", "wx-6"]
+    assert client.pending_count() == 0
+
+
+def test_running_command_is_not_claimed_by_another_consumer(client, monkeypatch):
+    monkeypatch.setattr(redis_commands, "PENDING_HEARTBEAT_INTERVAL", 0.02)
+    controller = FakeController(delay=0.3)
+    subscriber, thread = _run_subscriber(client, controller)
+    other = AudioCommandSubscriber(controller, redis_client=client, consumer_name="audio-2")
+    try:
+        result = {}
+        publish = threading.Thread(
+            target=lambda: result.update(AudioCommandPublisher(redis_client=client).start_source("wx-7")),
+        )
+        publish.start()
+        time.sleep(0.2)
+        # Idle since delivery would exceed 100 ms; the heartbeat keeps it fresh
+        assert other._claim_abandoned(min_idle_ms=100) == 0
+        publish.join(timeout=3.0)
+    finally:
+        _stop(subscriber, thread)
+
+    assert result['success'] is True
+    assert controller.started == ["wx-7"]
+
+
+def test_timed_out_reply_can_be_polled(client):
+    publisher = AudioCommandPublisher(redis_client=client)
+    queued = publisher.start_source("wx-8", timeout=0.05)
+    assert queued['timed_out'] is True
+    assert publisher.get_reply(queued['command_id']) is None
+
+    subscriber = AudioCommandSubscriber(FakeController(), redis_client=client, consumer_name="audio-1")
+    subscriber._ensure_group()
+    assert subscriber._recover_pending() == 0
+    assert subscriber.poll_once(block_ms=None) == 1
+
+    reply = publisher.get_reply(queued['command_id'])
+    assert reply['success'] is True
+    # Polling again returns the same reply until it expires
+    assert publisher.get_reply(queued['command_id']) == reply
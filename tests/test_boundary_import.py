@@ -0,0 +1,206 @@
+"""
+EAS Station - Emergency Alert System
+Copyright (c) 2025 Timothy Kramer (KR8MER)
+
+This file is part of EAS Station.
+
+EAS Station is dual-licensed software:
+- GNU Affero General Public License v3 (AGPL-3.0) for open-source use
+- Commercial License for proprietary use
+
+You should have received a copy of both licenses with this software.
+For more information, see LICENSE and LICENSE-COMMERCIAL files.
+
+IMPORTANT: This software cannot be rebranded or have attribution removed.
+See NOTICE file for complete terms.
+
+Repository: https://github.com/KR8MER/eas-station
+"""
+
+"""Tests for the streaming GeoJSON boundary importer."""
+
+import io
+import json
+import logging
+import time
+
+import pytest
+from flask import Flask
+from sqlalchemy import MetaData, Text, event
+
+from app_core import boundary_import
+from app_core.boundary_import import BoundaryImportJob, run_boundary_import, validate_geometry
+from app_core.extensions import db
+from app_core.models import Boundary
+from app_utils.optimized_parsing import JSONDecodeError, iter_json_array_items
+from webapp.admin import boundaries as boundaries_routes
+
+
+def _square(x, y, size=0.1):
+    return {
+        "type": "Polygon",
+        "coordinates": [[[x, y], [x + size, y], [x + size, y + size], [x, y + size], [x, y]]],
+    }
+
+
+def _feature(index, geometry=None):
+    return {
+        "type": "Feature",
+        "properties": {"NAME": f"County {index}", "STATEFP": "39"},
+        "geometry": geometry if geometry is not None else _square(-84 + index * 0.001, 41),
+    }
+
+
+def _collection(features):
+    return {"type": "FeatureCollection", "name": "test", "features": features}
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    app = Flask("boundary-import-test")
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'boundaries.db'}",
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+    )
+    db.init_app(app)
+    monkeypatch.setattr(boundary_import, "JOB_DIR", str(tmp_path / "jobs"))
+
+    with app.app_context():
+        @event.listens_for(db.engine, "connect")
+        def _spatial_stand_ins(dbapi_connection, connection_record):
+            # Stand-ins for the PostGIS functions; "reject" plays an invalid geometry
+            def geom_from_geojson(value):
+                if json.loads(value).get("reject"):
+                    raise ValueError("invalid GeoJSON geometry")
+                return value
+
+            dbapi_connection.create_function("ST_GeomFromGeoJSON", 1, geom_from_geojson)
+            dbapi_connection.create_function("ST_SetSRID", 2, lambda geom, srid: geom)
+            # Let SQLAlchemy manage transactions so SAVEPOINT works on pysqlite
+            dbapi_connection.isolation_level = None
+
+        @event.listens_for(db.engine, "begin")
+        def _begin(conn):
+            conn.exec_driver_sql("BEGIN")
+
+        metadata = MetaData()
+        table = Boundary.__table__.to_metadata(metadata)
+        table.c.geom.type = Text()
+        metadata.create_all(bind=db.engine)
+        yield app
+        db.session.remove()
+
+
+def _write(tmp_path, document, name="upload.geojson"):
+    path = tmp_path / name
+    path.write_text(json.dumps(document) if not isinstance(document, str) else document, encoding="utf-8")
+    return str(path)
+
+
+def _job(boundary_type="county"):
+    return BoundaryImportJob(job_id="test-job", boundary_type=boundary_type, display_label="County", filename="x")
+
+
+def test_json_array_items_stream_across_chunks():
+    document = {
+        "type": "FeatureCollection",
+        "crs": {"features": ["not these"]},
+        "features": [_feature(index) for index in range(40)] + [{"n": 1.25e3, "s": 'é \\" ]'}],
+        "bbox": [1, 2, 3, 4],
+    }
+    raw = b"\xef\xbb\xbf" + json.dumps(document, ensure_ascii=False).encode("utf-8")
+    for chunk_size in (1, 7, 4096):
+        assert list(iter_json_array_items(io.BytesIO(raw), "features", chunk_size=chunk_size)) == document["features"]
+
+    assert list(iter_json_array_items(io.StringIO('{"type": "FeatureCollection"}'), "features")) == []
+    with pytest.raises(JSONDecodeError):
+        list(iter_json_array_items(io.BytesIO(b'{"features": [{"a": 1}, {"b": '), "features"))
+    with pytest.raises(JSONDecodeError):
+        list(iter_json_array_items(io.BytesIO(b"[1, 2]"), "features"))
+
+
+def test_validate_geometry_reports_structural_problems():
+    assert validate_geometry(_square(0, 0)) is None
+    assert validate_geometry({"type": "LineString", "coordinates": [[0, 0], [1, 1]]}) is None
+    assert validate_geometry({"type": "GeometryCollection", "geometries": [_square(0, 0)]}) is None
+    assert validate_geometry(None) == "No geometry"
+    assert "not closed" in validate_geometry({"type": "Polygon", "coordinates": [[[0, 0], [1, 0], [1, 1], [0, 1]]]})
+    assert "four positions" in validate_geometry({"type": "Polygon", "coordinates": [[[0, 0], [1, 0], [0, 0]]]})
+    assert "position" in validate_geometry({"type": "Point", "coordinates": ["a", 1]})
+    assert "Unsupported" in validate_geometry({"type": "Circle", "coordinates": [0, 0]})
+
+
+def test_import_batches_inserts_and_isolates_bad_features(app, tmp_path):
+    features = [_feature(index) for index in range(1, 1201)]
+    features[9]["geometry"] = None
+    features[499]["geometry"] = dict(_square(0, 0), reject=True)
+    path = _write(tmp_path, _collection(features))
+
+    statements = []
+
+    @event.listens_for(db.engine, "before_cursor_execute")
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO boundaries"):
+            statements.append(executemany)
+
+    job = run_boundary_import(_job(), path, batch_size=500)
+
+    assert job.status == "completed"
+    assert (job.features_read, job.boundaries_added, job.error_count) == (1200, 1198, 2)
+    assert job.errors[0] == "Feature 10: No geometry"
+    assert job.errors[1].startswith("Feature 500: ")
+    assert db.session.query(Boundary.id).count() == 1198
+    names = {name for (name,) in db.session.query(Boundary.name)}
+    assert "County 1" in names and "County 500" not in names
+
+    # Three multi-row batches; the first, holding feature 500, retried row by row
+    assert statements.count(True) == 3
+    assert statements.count(False) == 500
+
+    saved = BoundaryImportJob.load("test-job").to_dict()
+    assert saved["percent"] == 100 and saved["success"] == "Successfully uploaded 1198 County boundaries"
+    assert saved["warning"] == "2 features had errors"
+
+
+def test_malformed_file_rolls_back_the_whole_import(app, tmp_path):
+    text = json.dumps(_collection([_feature(index) for index in range(1, 30)]))
+    path = _write(tmp_path, text[: len(text) - 200])
+
+    job = run_boundary_import(_job(), path, batch_size=10)
+
+    assert job.status == "failed"
+    assert job.message.startswith("Invalid GeoJSON format")
+    assert job.boundaries_added == 0
+    assert db.session.query(Boundary.id).count() == 0
+    assert BoundaryImportJob.load("test-job").to_dict()["error"] == job.message
+
+
+def test_upload_returns_job_handle_and_reports_progress(app, tmp_path):
+    boundaries_routes.register_boundary_routes(app, logging.getLogger("boundary-import-test"))
+    client = app.test_client()
+    body = json.dumps(_collection([_feature(index) for index in range(1, 51)])).encode("utf-8")
+
+    response = client.post(
+        "/admin/upload_boundaries",
+        data={"boundary_type": "county", "file": (io.BytesIO(body), "counties.geojson")},
+        content_type="multipart/form-data",
+    )
+    assert response.status_code == 202
+    accepted = response.get_json()
+    assert accepted["status"] == "accepted"
+
+    deadline = time.monotonic() + 10
+    status = client.get(accepted["status_url"]).get_json()
+    while not status["finished"] and time.monotonic() < deadline:
+        time.sleep(0.05)
+        status = client.get(accepted["status_url"]).get_json()
+
+    assert status["status"] == "completed"
+    assert status["boundaries_added"] == status["total_features"] == 50
+    assert db.session.query(Boundary.id).count() == 50
+    assert client.get("/admin/boundary_imports/unknown").status_code == 404
+    assert client.post(
+        "/admin/upload_boundaries",
+        data={"boundary_type": "county", "file": (io.BytesIO(body), "counties.json")},
+        content_type="multipart/form-data",
+    ).status_code == 400
@@ -0,0 +1,274 @@
+"""
+EAS Station - Emergency Alert System
+Copyright (c) 2025 Timothy Kramer (KR8MER)
+
+This file is part of EAS Station.
+
+EAS Station is dual-licensed software:
+- GNU Affero General Public License v3 (AGPL-3.0) for open-source use
+- Commercial License for proprietary use
+
+You should have received a copy of both licenses with this software.
+For more information, see LICENSE and LICENSE-COMMERCIAL files.
+
+IMPORTANT: This software cannot be rebranded or have attribution removed.
+See NOTICE file for complete terms.
+
+Repository: https://github.com/KR8MER/eas-station
+"""
+
+"""Tests for the materialized /stats dashboard snapshot."""
+
+import json
+import logging
+import random
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from flask import Flask
+from sqlalchemy import MetaData, Text, event, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+
+from app_core import alerts as alerts_module
+from app_core import dashboard_stats as dashboard_stats_module
+from app_core.dashboard_stats import DashboardStatsSnapshot
+from app_core.extensions import db
+from app_core.models import Boundary, CAPAlert, Intersection, PollHistory
+from webapp import routes_public
+
+NOW = datetime(2025, 3, 10, 12, 0, tzinfo=timezone.utc)
+EVENTS = ["Tornado Warning", "Flood Warning", "Winter Storm Watch", "Required Weekly Test"]
+SEVERITIES = ["Extreme", "Severe", "Moderate", None]
+
+
+@compiles(JSONB, "sqlite")
+def _jsonb_on_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    app = Flask("dashboard-stats-test")
+    app.secret_key = "test"
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'stats.db'}",
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+    )
+    db.init_app(app)
+    monkeypatch.setattr(dashboard_stats_module, "utc_now", lambda: NOW)
+    monkeypatch.setattr(alerts_module, "utc_now", lambda: NOW)
+
+    with app.app_context():
+        # SQLite has no spatial types here; the dashboard never reads geometry
+        metadata = MetaData()
+        for model in (Boundary, CAPAlert, Intersection, PollHistory):
+            table = model.__table__.to_metadata(metadata)
+            for column in table.columns:
+                if column.name == "geom":
+                    column.type = Text()
+        metadata.create_all(bind=db.engine)
+        yield app
+        db.session.remove()
+
+
+def _alert_row(index, rng):
+    sent = NOW - timedelta(hours=rng.randrange(0, 24 * 400), minutes=rng.randrange(60))
+    expires = None if index % 9 == 0 else sent + timedelta(hours=rng.choice([-1, 1, 3, 12, 48]))
+    return {
+        "id": index,
+        "identifier": f"alert-{index}",
+        "sent": sent,
+        "expires": expires,
+        "status": "Expired" if index % 7 == 0 else "Actual",
+        "message_type": "Alert",
+        "scope": "Public",
+        "event": rng.choice(EVENTS),
+        "severity": rng.choice(SEVERITIES),
+        "source": "noaa",
+        "updated_at": NOW - timedelta(days=1),
+    }
+
+
+def _insert(table, rows):
+    db.session.execute(table.insert(), rows)
+    db.session.commit()
+
+
+def _seed(alert_count=600, seed=11):
+    rng = random.Random(seed)
+    _insert(Boundary.__table__, [
+        {"id": index, "name": f"Boundary {index}", "type": "county" if index % 2 else "fire"}
+        for index in range(1, 21)
+    ])
+    _insert(CAPAlert.__table__, [_alert_row(index, rng) for index in range(1, alert_count + 1)])
+    _insert(Intersection.__table__, [
+        {"cap_alert_id": rng.randrange(1, alert_count + 1), "boundary_id": rng.randrange(1, 21)}
+        for _ in range(alert_count)
+    ])
+    _insert(PollHistory.__table__, [
+        {"timestamp": NOW - timedelta(minutes=index), "status": "ERROR" if index % 5 == 0 else "SUCCESS",
+         "execution_time_ms": 100 + index, "error_message": "timeout" if index % 5 == 0 else None}
+        for index in range(1, 31)
+    ])
+    return rng
+
+
+def _reference():
+    """Recompute the dashboard aggregates straight from the tables."""
+    rows = db.session.query(
+        CAPAlert.sent, CAPAlert.expires, CAPAlert.status, CAPAlert.severity, CAPAlert.event
+    ).all()
+    durations = Counter()
+    hours = [0] * 24
+    for sent, expires, _, _, event_name in rows:
+        hours[sent.hour] += 1
+        if expires is not None and expires > sent:
+            durations[event_name] += 1
+    affected = Counter(boundary_id for (boundary_id,) in db.session.query(Intersection.boundary_id))
+    return {
+        "total_alerts": len(rows),
+        "active_alerts": alerts_module.get_active_alerts_query().count(),
+        "expired_alerts": alerts_module.get_expired_alerts_query().count(),
+        "by_status": Counter(status for _, _, status, _, _ in rows),
+        "by_severity": Counter(severity for _, _, _, severity, _ in rows if severity is not None),
+        "by_hour": hours,
+        "duration_counts": durations,
+        "top_boundary_count": affected.most_common(1)[0][1],
+    }
+
+
+def _assert_matches_reference(stats):
+    reference = _reference()
+    assert stats["total_alerts"] == reference["total_alerts"]
+    assert stats["active_alerts"] == reference["active_alerts"]
+    assert stats["expired_alerts"] == reference["expired_alerts"]
+    assert {row["status"]: row["count"] for row in stats["alert_by_status"]} == reference["by_status"]
+    assert {row["severity"]: row["count"] for row in stats["alert_by_severity"]} == reference["by_severity"]
+    assert stats["alert_by_hour"] == reference["by_hour"]
+    assert {row["event"]: row["count"] for row in stats["duration_stats"]} == reference["duration_counts"]
+    assert stats["most_affected_boundaries"][0]["count"] == reference["top_boundary_count"]
+
+
+def _count_queries():
+    statements = []
+
+    @event.listens_for(db.engine, "before_cursor_execute")
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    return statements
+
+
+def test_snapshot_matches_direct_aggregates(app):
+    _seed()
+    stats = DashboardStatsSnapshot(recent_limit=100).get()
+
+    _assert_matches_reference(stats)
+    assert stats["total_boundaries"] == 20
+    assert {row["type"]: row["count"] for row in stats["boundary_stats"]} == {"county": 10, "fire": 10}
+    assert sum(stats["alert_by_dow"]) == sum(stats["alert_by_month"]) == 600
+    assert len(stats["alert_events"]) == 100
+    sent = [event_row["sent"] for event_row in stats["alert_events"]]
+    assert sent == sorted(sent, reverse=True)
+    assert stats["polling"]["total_runs"] == 30
+    assert stats["polling"]["failed_runs"] == 6
+    assert stats["polling"]["last_error"] == "timeout"
+
+
+def test_poll_touches_recompute_alerts_with_a_fixed_number_of_queries(app):
+    rng = _seed()
+    snapshot = DashboardStatsSnapshot(refresh_interval=0, count_check_interval=3600)
+    snapshot.get()
+    queries = _count_queries()
+
+    # Nothing changed: one stamp query of index-backed maxima, no counts
+    snapshot.get()
+    assert len(queries) == 1
+    assert "count(cap_alerts.id)" not in queries[0]
+
+    # The poller touches updated_at of every alert still in its feed
+    db.session.execute(update(CAPAlert.__table__).values(updated_at=NOW))
+    db.session.commit()
+    queries.clear()
+    stats = snapshot.get()
+    # Stamp, grouped categories, time buckets, expiry counts, future expiries, recent list
+    assert len(queries) == 6
+    assert snapshot.alert_recomputes == 2
+    _assert_matches_reference(stats)
+
+    _insert(CAPAlert.__table__, [_alert_row(index, rng) for index in range(601, 651)])
+    _insert(Intersection.__table__, [{"cap_alert_id": 601, "boundary_id": 3}] * 5)
+    queries.clear()
+    stats = snapshot.get()
+
+    # Same alert queries for 650 rows as for 600, plus the intersection count and new rows
+    assert len(queries) == 8
+    assert (snapshot.full_builds, snapshot.incremental_refreshes) == (1, 2)
+    _assert_matches_reference(stats)
+
+
+def test_updated_and_deleted_alerts_rebuild_the_aggregates(app):
+    _seed()
+    snapshot = DashboardStatsSnapshot(refresh_interval=0, count_check_interval=0)
+    snapshot.get()
+
+    db.session.execute(
+        update(CAPAlert.__table__).where(CAPAlert.__table__.c.id <= 50)
+        .values(status="Expired", updated_at=NOW)
+    )
+    db.session.commit()
+    _assert_matches_reference(snapshot.get())
+
+    db.session.execute(Intersection.__table__.delete().where(Intersection.__table__.c.boundary_id == 1))
+    db.session.execute(CAPAlert.__table__.delete().where(CAPAlert.__table__.c.id > 500))
+    db.session.commit()
+    _assert_matches_reference(snapshot.get())
+
+    # Time alone moves alerts from active to expired without touching the database
+    _insert(CAPAlert.__table__, [dict(_alert_row(9000, random.Random(1)), sent=NOW, expires=NOW + timedelta(hours=2))])
+    now, later = snapshot.get(), snapshot.get(NOW + timedelta(hours=3))
+    assert (later["active_alerts"], later["expired_alerts"]) == (now["active_alerts"] - 1, now["expired_alerts"] + 1)
+
+
+def test_stats_page_is_served_from_memory_with_etag(app, monkeypatch):
+    _seed(alert_count=2000)
+    snapshot = DashboardStatsSnapshot(refresh_interval=3600)
+    monkeypatch.setattr(routes_public, "get_dashboard_stats_snapshot", lambda: snapshot)
+    monkeypatch.setattr(
+        routes_public, "render_template", lambda name, **context: json.dumps(context, default=str)
+    )
+    routes_public.register(app, logging.getLogger("dashboard-stats-test"))
+    client = app.test_client()
+    queries = _count_queries()
+
+    started = time.perf_counter()
+    first = client.get("/stats")
+    first_latency = time.perf_counter() - started
+    first_queries = len(queries)
+    assert first.status_code == 200
+    assert json.loads(first.data)["total_alerts"] == 2000
+    etag = first.headers["ETag"]
+
+    queries.clear()
+    started = time.perf_counter()
+    for _ in range(5):
+        assert client.get("/stats").status_code == 200
+    cached_latency = (time.perf_counter() - started) / 5
+    assert queries == []
+    assert first_queries >= 5
+    assert cached_latency < first_latency
+
+    not_modified = client.get("/stats", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.data == b""
+    assert queries == []
+
+    _insert(CAPAlert.__table__, [_alert_row(2001, random.Random(1))])
+    snapshot.invalidate()
+    changed = client.get("/stats", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert json.loads(changed.data)["total_alerts"] == 2001
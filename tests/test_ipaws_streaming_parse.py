@@ -0,0 +1,149 @@
+"""
+EAS Station - Emergency Alert System
+Copyright (c) 2025 Timothy Kramer (KR8MER)
+
+This file is part of EAS Station.
+
+EAS Station is dual-licensed software:
+- GNU Affero General Public License v3 (AGPL-3.0) for open-source use
+- Commercial License for proprietary use
+
+You should have received a copy of both licenses with this software.
+For more information, see LICENSE and LICENSE-COMMERCIAL files.
+
+IMPORTANT: This software cannot be rebranded or have attribution removed.
+See NOTICE file for complete terms.
+
+Repository: https://github.com/KR8MER/eas-station
+"""
+
+"""Tests for incremental IPAWS feed parsing."""
+
+import logging
+
+import pytest
+
+from app_utils import optimized_parsing
+from app_utils.optimized_parsing import iter_xml_elements, parse_xml_string
+from poller.cap_poller import CAPPoller
+
+CAP_NS = "urn:oasis:names:tc:emergency:cap:1.2"
+NS = {"feed": "http://gov.fema.ipaws.services/feed", "cap": CAP_NS}
+
+
+def _alert_xml(index: int) -> str:
+    identifier = "" if index == 3 else f"urn:oid:2.49.0.1.840.0.{index:06d}"
+    return f"""
+  <alert xmlns="{CAP_NS}">
+    <identifier>{identifier}</identifier>
+    <sender>w-nws.webmaster@noaa.gov</sender>
+    <sent>2025-01-15T10:{index % 60:02d}:00-05:00</sent>
+    <status>Actual</status><msgType>Alert</msgType><scope>Public</scope>
+    <info>
+      <language>es-US</language><category>Met</category><event>Aviso</event>
+    </info>
+    <info>
+      <language>en-US</language><category>Met</category><event>Flood Warning {index}</event>
+      <urgency>Expected</urgency><severity>Severe</severity><certainty>Likely</certainty>
+      <headline>Flood Warning {index}</headline>
+      <parameter><valueName>VTEC</valueName><value>/O.NEW.KCLE.FL.W.{index:04d}/</value></parameter>
+      <resource><resourceDesc>Audio</resourceDesc><mimeType>text/plain</mimeType><uri>https://example.test/{index}</uri></resource>
+      <area>
+        <areaDesc>Putnam, OH</areaDesc>
+        <polygon>41.0,-84.1 41.1,-84.0 41.0,-83.9 41.0,-84.1</polygon>
+        <circle>41.05,-84.05 {1 + index % 5}</circle>
+        <geocode><valueName>SAME</valueName><value>0391{index % 100:02d}</value></geocode>
+        <geocode><valueName>UGC</valueName><value>OHC137</value></geocode>
+      </area>
+    </info>
+  </alert>"""
+
+
+def _feed(count: int) -> bytes:
+    alerts = "".join(_alert_xml(index) for index in range(count))
+    return f'<?xml version="1.0" encoding="UTF-8"?><ns1:alerts xmlns:ns1="{NS["feed"]}">{alerts}</ns1:alerts>'.encode()
+
+
+@pytest.fixture
+def poller():
+    poller = object.__new__(CAPPoller)
+    poller.logger = logging.getLogger("test_ipaws_streaming_parse")
+    poller._known_ipaws_alerts = set()
+    poller._ipaws_alerts_seen = set()
+    poller.last_unchanged_skipped = 0
+    return poller
+
+
+def _tree_based(poller, payload):
+    """The former whole-document parse, as the reference."""
+    root = parse_xml_string(payload)
+    return [poller._convert_cap_alert(alert, NS) for alert in root.findall(".//cap:alert", NS)]
+
+
+def test_streaming_parse_matches_tree_parse(poller):
+    payload = _feed(12)
+
+    alerts = poller._parse_ipaws_xml_feed(payload)
+
+    assert alerts == _tree_based(poller, payload)
+    assert len(alerts) == 12
+    assert alerts[0]["properties"]["event"] == "Flood Warning 0"
+    assert alerts[0]["geometry"]["type"] == "MultiPolygon"
+    assert alerts[3]["properties"]["identifier"].startswith("ipaws_")
+    assert poller._parse_ipaws_xml_feed(payload.decode()) == alerts
+
+
+@pytest.mark.parametrize("use_lxml", [True, False])
+def test_elements_are_released_as_parsing_advances(monkeypatch, use_lxml):
+    if use_lxml and not optimized_parsing._HAS_LXML:
+        pytest.skip("lxml not installed")
+    monkeypatch.setattr(optimized_parsing, "_HAS_LXML", use_lxml)
+
+    live = []
+    for alert in iter_xml_elements(_feed(500), f"{{{CAP_NS}}}alert"):
+        # Alerts already handed out are detached; only the parser's read-ahead is attached
+        live.append(len(alert.getparent()) if use_lxml else None)
+        assert alert.find("cap:info", NS) is not None
+    assert len(live) == 500
+    if use_lxml:
+        assert max(live) < 50
+
+
+def test_truncated_feed_keeps_alerts_before_the_error(poller, caplog):
+    payload = _feed(5)
+    truncated = payload[: payload.index(b"Flood Warning 3")]
+
+    with caplog.at_level(logging.ERROR):
+        alerts = poller._parse_ipaws_xml_feed(truncated)
+
+    assert [a["properties"]["event"] for a in alerts] == [f"Flood Warning {i}" for i in range(3)]
+    assert "XML parse error" in caplog.text
+
+
+def test_known_alerts_are_skipped_before_conversion(poller, monkeypatch):
+    payload = _feed(6)
+    first = poller._parse_ipaws_xml_feed(payload)
+    for alert in first[:4]:
+        poller._remember_ipaws_alert(alert)
+
+    converted = []
+    original = CAPPoller._convert_cap_alert
+    monkeypatch.setattr(
+        CAPPoller, "_convert_cap_alert",
+        lambda self, elem, ns: converted.append(elem.findtext("cap:identifier", namespaces=ns)) or original(self, elem, ns),
+    )
+
+    poller._ipaws_alerts_seen = set()
+    poller.last_unchanged_skipped = 0
+    second = poller._parse_ipaws_xml_feed(payload)
+
+    # Alert 3 has no identifier, so it is never treated as known
+    assert [a["properties"]["event"] for a in second] == ["Flood Warning 3", "Flood Warning 4", "Flood Warning 5"]
+    assert poller.last_unchanged_skipped == 3
+    assert len(converted) == 3
+
+    # Messages that leave the feed are forgotten by fetch_cap_alerts' pruning
+    poller._ipaws_alerts_seen = set()
+    poller._parse_ipaws_xml_feed(_feed(2))
+    poller._known_ipaws_alerts &= poller._ipaws_alerts_seen
+    assert len(poller._known_ipaws_alerts) == 2
@@ -0,0 +1,187 @@
+"""
+EAS Station - Emergency Alert System
+Copyright (c) 2025 Timothy Kramer (KR8MER)
+
+This file is part of EAS Station.
+
+EAS Station is dual-licensed software:
+- GNU Affero General Public License v3 (AGPL-3.0) for open-source use
+- Commercial License for proprietary use
+
+You should have received a copy of both licenses with this software.
+For more information, see LICENSE and LICENSE-COMMERCIAL files.
+
+IMPORTANT: This software cannot be rebranded or have attribution removed.
+See NOTICE file for complete terms.
+
+Repository: https://github.com/KR8MER/eas-station
+"""
+
+"""Tests for per-stage pipeline latency histograms and the /metrics endpoint."""
+
+import json
+import logging
+import threading
+import time
+
+import numpy as np
+import pytest
+from flask import Flask
+
+from app_core.audio import latency_metrics
+from app_core.audio.eas_monitor import EASAlert, create_fips_filtering_callback
+from app_core.audio.latency_metrics import (
+    STAGE_EMIT_ALERT,
+    STAGE_END_TO_END,
+    STAGE_FIPS_FILTER,
+    STAGE_STORE_RECEIVED_ALERT,
+    LatencyHistogram,
+    LatencyRegistry,
+    get_latency_registry,
+    merge_snapshots,
+    render_prometheus,
+)
+from app_core.audio.streaming_same_decoder import StreamingSAMEDecoder
+from app_utils import utc_now
+from app_utils.eas_fsk import SAME_BAUD, SAME_MARK_FREQ, SAME_SPACE_FREQ, generate_fsk_samples
+
+
+@pytest.fixture(autouse=True)
+def _clean_registry():
+    get_latency_registry().reset()
+    yield
+    get_latency_registry().reset()
+
+
+def test_histogram_buckets_are_upper_inclusive():
+    histogram = LatencyHistogram("stage", buckets=(0.01, 0.1))
+    for value in (0.005, 0.01, 0.05, 0.1, 2.0):
+        histogram.observe(value)
+
+    snapshot = histogram.snapshot()
+    assert snapshot["counts"] == [2, 2, 1]
+    assert snapshot["count"] == 5
+    assert snapshot["sum"] == pytest.approx(2.165)
+
+
+def test_concurrent_writers_lose_no_observations():
+    histogram = LatencyHistogram("stage")
+
+    def writer():
+        for _ in range(10000):
+            histogram.observe(0.002)
+
+    threads = [threading.Thread(target=writer) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert histogram.snapshot()["count"] == 40000
+
+
+def test_observe_overhead_is_negligible():
+    histogram = LatencyHistogram("stage")
+    iterations = 20000
+    started = time.perf_counter()
+    for _ in range(iterations):
+        histogram.observe(0.0042)
+    per_call = (time.perf_counter() - started) / iterations
+
+    # One observation per 100 ms audio chunk; even 20 us would be 0.02% of real time.
+    assert per_call < 20e-6
+
+
+def test_render_prometheus_text_format():
+    registry = LatencyRegistry(buckets=(0.001, 0.01))
+    registry.observe("decode", 0.0005)
+    registry.observe("decode", 0.005)
+
+    text = render_prometheus(registry.snapshot())
+
+    assert "# TYPE eas_pipeline_stage_latency_seconds histogram" in text
+    assert 'eas_pipeline_stage_latency_seconds_bucket{stage="decode",le="0.001"} 1' in text
+    assert 'eas_pipeline_stage_latency_seconds_bucket{stage="decode",le="0.01"} 2' in text
+    assert 'eas_pipeline_stage_latency_seconds_bucket{stage="decode",le="+Inf"} 2' in text
+    assert 'eas_pipeline_stage_latency_seconds_count{stage="decode"} 2' in text
+    assert text.endswith("\n")
+
+
+def test_merge_snapshots_sums_processes():
+    first = LatencyRegistry()
+    second = LatencyRegistry()
+    first.observe("decode", 0.001)
+    second.observe("decode", 0.002)
+    second.observe("playout_start", 0.5)
+
+    merged = merge_snapshots([first.snapshot(), json.loads(json.dumps(second.snapshot())), None])
+
+    assert merged["decode"]["count"] == 2
+    assert merged["decode"]["sum"] == pytest.approx(0.003)
+    assert merged["playout_start"]["count"] == 1
+
+
+def test_decoder_stamps_header_start_and_times_emit():
+    bits = []
+    for byte in [0xAB] * 16 + [ord(c) for c in "ZCZC-WXR-TOR-039137+0030-1231200-KR8MER  -"]:
+        bits.extend((byte >> i) & 1 for i in range(8))
+    audio = np.asarray(
+        generate_fsk_samples(bits, 16000, SAME_BAUD, SAME_MARK_FREQ, SAME_SPACE_FREQ, 16000),
+        dtype=np.float32,
+    ) / 32768.0
+
+    alerts = []
+    before = time.monotonic()
+    decoder = StreamingSAMEDecoder(16000, alert_callback=alerts.append)
+    decoder.process_samples(np.concatenate([audio, np.zeros(1600, dtype=np.float32)]))
+
+    assert len(alerts) == 1
+    assert before <= alerts[0].started_at <= time.monotonic()
+    assert get_latency_registry().snapshot()[STAGE_EMIT_ALERT]["count"] == 1
+
+
+def test_fips_callback_records_filter_store_and_end_to_end():
+    forwarded = []
+    callback = create_fips_filtering_callback(["039137"], forwarded.append, logging.getLogger("test"))
+    alert = EASAlert(
+        timestamp=utc_now(),
+        raw_text="ZCZC-WXR-TOR-039137+0030-1231200-KR8MER  -",
+        headers=[{"fields": {"event_code": "TOR", "originator": "WXR", "locations": [{"code": "039137"}]}}],
+        confidence=0.9,
+        duration_seconds=0.0,
+        source_name="test",
+        header_started_at=time.monotonic() - 0.25,
+    )
+
+    callback(alert)
+
+    snapshot = get_latency_registry().snapshot()
+    assert forwarded == [alert]
+    assert snapshot[STAGE_FIPS_FILTER]["count"] == 1
+    assert snapshot[STAGE_STORE_RECEIVED_ALERT]["count"] == 1
+    assert snapshot[STAGE_END_TO_END]["count"] == 1
+    assert snapshot[STAGE_END_TO_END]["sum"] >= 0.25
+
+
+def test_metrics_endpoint_merges_audio_service_snapshot(monkeypatch):
+    import app_core.redis_client
+    from webapp import routes_monitoring
+
+    remote = LatencyRegistry()
+    remote.observe("decode", 0.003)
+
+    class FakeRedis:
+        def hget(self, key, field):
+            assert (key, field) == ("eas:metrics", "latency_histograms")
+            return json.dumps(remote.snapshot()).encode("utf-8")
+
+    monkeypatch.setattr(app_core.redis_client, "get_redis_client", lambda *a, **k: FakeRedis())
+    latency_metrics.observe_latency("decode", 0.001)
+
+    app = Flask("metrics-test")
+    routes_monitoring.register(app, logging.getLogger("metrics-test"))
+    response = app.test_client().get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+    assert 'eas_pipeline_stage_latency_seconds_count{stage="decode"} 2' in response.get_data(as_text=True)
@@ -0,0 +1,311 @@
+"""
+EAS Station - Emergency Alert System
+Copyright (c) 2025 Timothy Kramer (KR8MER)
+
+This file is part of EAS Station.
+
+EAS Station is dual-licensed software:
+- GNU Affero General Public License v3 (AGPL-3.0) for open-source use
+- Commercial License for proprietary use
+
+You should have received a copy of both licenses with this software.
+For more information, see LICENSE and LICENSE-COMMERCIAL files.
+
+IMPORTANT: This software cannot be rebranded or have attribution removed.
+See NOTICE file for complete terms.
+
+Repository: https://github.com/KR8MER/eas-station
+"""
+
+"""Tests for the fenced master lease used by the audio-service workers."""
+
+import threading
+import time
+
+import pytest
+
+from app_core.audio import worker_coordinator_redis as coordinator
+from app_core.audio.worker_coordinator_redis import MasterLease
+
+TTL = 0.6
+
+
+class LeaseRedis:
+    """In-memory Redis for the lease scripts: key expiry, BLPOP and metrics writes.
+
+    Each registered script runs under one lock, as Redis runs a script
+    atomically; the fake carries the same semantics as the Lua source.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._values = {}
+        self._expires = {}
+        self._lists = {}
+        self.metrics_writes = []  # (fencing token, owner) of every accepted write
+        self.published = []
+
+    def _live(self, key):
+        expires = self._expires.get(key)
+        if expires is not None and time.monotonic() >= expires:
+            self._values.pop(key, None)
+            self._lists.pop(key, None)
+            self._expires.pop(key, None)
+        return self._values.get(key)
+
+    def _pexpire(self, key, ms):
+        self._expires[key] = time.monotonic() + int(ms) / 1000.0
+
+    def get(self, key):
+        with self._cond:
+            return self._live(key)
+
+    def hgetall(self, key):
+        with self._cond:
+            return dict(self._live(key) or {})
+
+    def blpop(self, keys, timeout=0):
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                for key in keys:
+                    self._live(key)
+                    if self._lists.get(key):
+                        return key, self._lists[key].pop(0)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+    def pipeline(self):
+        return _Pipeline(self)
+
+    def register_script(self, source):
+        handler = {
+            coordinator.ACQUIRE_SCRIPT: self._acquire,
+            coordinator.REFRESH_SCRIPT: self._refresh,
+            coordinator.RELEASE_SCRIPT: self._release,
+            coordinator.WRITE_METRICS_SCRIPT: self._write_metrics,
+        }[source]
+
+        def run(keys=(), args=(), client=None):
+            with self._cond:
+                return handler(list(keys), [str(arg) for arg in args])
+        return run
+
+    def _acquire(self, keys, args):
+        if self._live(keys[0]) is not None:
+            return [0, int((self._expires[keys[0]] - time.monotonic()) * 1000)]
+        token = int(self._values.get(keys[1], 0)) + 1
+        self._values[keys[1]] = str(token)
+        self._values[keys[0]] = f"{token}:{args[0]}"
+        self._pexpire(keys[0], args[1])
+        return [token, int(args[1])]
+
+    def _refresh(self, keys, args):
+        if self._live(keys[0]) == args[0]:
+            self._pexpire(keys[0], args[1])
+            return 1
+        return 0
+
+    def _release(self, keys, args):
+        if self._live(keys[0]) != args[0]:
+            return 0
+        del self._values[keys[0]]
+        self._lists.setdefault(keys[1], []).insert(0, args[0])
+        self._pexpire(keys[1], args[1])
+        self._cond.notify_all()
+        return 1
+
+    def _write_metrics(self, keys, args):
+        if self._live(keys[0]) != args[0]:
+            return 0
+        fields = args[3:]
+        self._values[keys[1]] = dict(zip(fields[::2], fields[1::2]))
+        self._expires[keys[1]] = time.monotonic() + int(args[1])
+        self.published.append(args[2])
+        token, owner = args[0].split(":", 1)
+        self.metrics_writes.append((int(token), owner))
+        return 1
+
+
+class _Pipeline:
+    """Buffers SETEX calls until ``execute()``, like a redis-py pipeline."""
+
+    def __init__(self, redis_fake):
+        self._redis = redis_fake
+        self._pending = []
+
+    def setex(self, key, seconds, value):
+        self._pending.append((key, seconds, value))
+
+    def execute(self):
+        with self._redis._cond:
+            for key, seconds, value in self._pending:
+                self._redis._values[key] = value
+                self._redis._expires[key] = time.monotonic() + seconds
+        self._pending = []
+
+
+@pytest.fixture
+def fake_redis():
+    return LeaseRedis()
+
+
+def _watch_for_split_brain(leases, stop):
+    """Sample every lease on one clock reading; return the worst overlap seen."""
+    worst = [0]
+
+    def run():
+        while not stop.is_set():
+            now = time.monotonic()
+            worst[0] = max(worst[0], sum(lease.held(now) for lease in leases))
+            time.sleep(0.002)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread, worst
+
+
+def test_stalled_master_is_fenced_off_and_standby_takes_over(fake_redis):
+    primary = MasterLease(fake_redis, owner_id="worker-a", ttl_seconds=TTL)
+    standby = MasterLease(fake_redis, owner_id="worker-b", ttl_seconds=TTL)
+    assert primary.acquire()
+    assert not standby.acquire()
+
+    stop = threading.Event()
+    stall = {}
+    results = {}
+
+    def primary_metrics():
+        # The heartbeat thread stalls (GC pause, blocked I/O) between its lease
+        # refresh and the metrics write, for three times the lease TTL
+        if len(fake_redis.metrics_writes) == 2 and not stall:
+            stall["started"] = time.monotonic()
+            time.sleep(3 * TTL)
+        return {"worker": "a"}
+
+    def primary_heartbeat():
+        primary.run_heartbeat(primary_metrics, stop, interval=TTL / 4)
+        results["primary_stopped"] = time.monotonic()
+
+    def standby_worker():
+        assert standby.wait(timeout=5.0)
+        results["standby_acquired"] = time.monotonic()
+        standby.run_heartbeat(lambda: {"worker": "b"}, stop, interval=TTL / 4)
+
+    watcher, worst = _watch_for_split_brain([primary, standby], stop)
+    threads = [threading.Thread(target=primary_heartbeat, daemon=True),
+               threading.Thread(target=standby_worker, daemon=True)]
+    for thread in threads:
+        thread.start()
+    time.sleep(3 * TTL + 0.8)
+    stop.set()
+    for thread in threads + [watcher]:
+        thread.join(timeout=2.0)
+
+    # Failover took about one lease TTL from the moment the master stalled
+    failover = results["standby_acquired"] - stall["started"]
+    assert TTL * 0.9 <= failover < TTL + 0.25, failover
+
+    # Never two masters at once, and the stalled master's late write was rejected
+    assert worst[0] == 1
+    assert not primary.held()
+    assert "primary_stopped" in results
+    tokens = [token for token, _owner in fake_redis.metrics_writes]
+    assert tokens == sorted(tokens)
+    assert set(fake_redis.metrics_writes) == {(1, "worker-a"), (standby.token, "worker-b")}
+    assert fake_redis.metrics_writes.count((1, "worker-a")) == 2
+    assert fake_redis.hgetall(coordinator.METRICS_KEY)["worker"] == "b"
+
+
+def test_clean_exit_hands_over_without_waiting_for_ttl(fake_redis):
+    primary = MasterLease(fake_redis, owner_id="worker-a", ttl_seconds=30.0)
+    standby = MasterLease(fake_redis, owner_id="worker-b", ttl_seconds=30.0)
+    assert primary.acquire()
+    first_token = primary.token
+
+    acquired = {}
+
+    def standby_worker():
+        if standby.wait(timeout=5.0):
+            acquired["at"] = time.monotonic()
+
+    thread = threading.Thread(target=standby_worker, daemon=True)
+    thread.start()
+    time.sleep(0.2)
+    assert "at" not in acquired
+
+    released_at = time.monotonic()
+    assert primary.release()
+    thread.join(timeout=2.0)
+
+    assert acquired["at"] - released_at < 0.1
+    assert standby.held() and not primary.held()
+    assert standby.token == first_token + 1
+
+
+def test_stale_lease_cannot_refresh_release_or_write(fake_redis):
+    old = MasterLease(fake_redis, owner_id="worker-a", ttl_seconds=0.2)
+    new = MasterLease(fake_redis, owner_id="worker-b", ttl_seconds=0.2)
+    assert old.acquire()
+    time.sleep(0.25)
+    assert not old.held()
+    assert new.acquire()
+
+    # The old master wakes up: none of its calls touch the new lease
+    assert not old.write_metrics({"worker": "a"})
+    assert not old.refresh()
+    assert not old.release()
+    assert fake_redis.get(coordinator.MASTER_LOCK_KEY) == new.value
+    assert new.write_metrics({"worker": "b"})
+    assert fake_redis.metrics_writes == [(new.token, "worker-b")]
+
+
+def test_module_functions_use_the_fenced_lease(monkeypatch, fake_redis):
+    monkeypatch.setattr(coordinator, "_redis_client", fake_redis)
+    monkeypatch.setattr(coordinator, "_lease", None)
+    rival = MasterLease(fake_redis, owner_id="rival")
+
+    assert coordinator.try_acquire_master_lock()
+    assert coordinator.is_master_worker()
+    assert coordinator.get_fencing_token() == 1
+    assert not rival.acquire()
+
+    assert coordinator.write_shared_metrics({"status": {"ok": True}})
+    metrics = fake_redis.hgetall(coordinator.METRICS_KEY)
+    assert metrics["_fencing_token"] == "1"
+    assert metrics["status"] == '{"ok": true}'
+
+    coordinator.release_master_lock()
+    assert not coordinator.is_master_worker()
+    assert rival.acquire()
+    assert not coordinator.write_shared_metrics({"status": "stale"})
+
+
+def test_audio_service_publishes_metrics_through_its_lease(monkeypatch, fake_redis):
+    import audio_service
+
+    monkeypatch.setattr(audio_service, "get_redis_client", lambda: fake_redis)
+    monkeypatch.setattr(audio_service, "_audio_controller", None)
+    monkeypatch.setattr(audio_service, "_radio_manager", None)
+    lease = MasterLease(fake_redis, owner_id="audio-a", ttl_seconds=0.2)
+    monkeypatch.setattr(audio_service, "_master_lease", lease)
+
+    # Not master yet: nothing is written
+    audio_service.publish_metrics_to_redis({"worker": "a"})
+    assert fake_redis.metrics_writes == []
+
+    assert lease.acquire()
+    audio_service.publish_metrics_to_redis({"worker": "a"})
+    assert fake_redis.hgetall(coordinator.METRICS_KEY)["_fencing_token"] == "1"
+    assert fake_redis.published == [coordinator.METRICS_UPDATE_CHANNEL]
+
+    # After a stall past the TTL a successor owns the lease; the late publish is dropped
+    time.sleep(0.25)
+    successor = MasterLease(fake_redis, owner_id="audio-b", ttl_seconds=0.2)
+    assert successor.acquire()
+    assert successor.write_metrics({"worker": "b"})
+    audio_service.publish_metrics_to_redis({"worker": "a"})
+    assert fake_redis.hgetall(coordinator.METRICS_KEY)["worker"] == "b"
+    assert fake_redis.metrics_writes == [(1, "audio-a"), (2, "audio-b")]
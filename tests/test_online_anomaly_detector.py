@@ -0,0 +1,187 @@
+"""
+EAS Station - Emergency Alert System
+Copyright (c) 2025 Timothy Kramer (KR8MER)
+
+This file is part of EAS Station.
+
+EAS Station is dual-licensed software:
+- GNU Affero General Public License v3 (AGPL-3.0) for open-source use
+- Commercial License for proprietary use
+
+You should have received a copy of both licenses with this software.
+For more information, see LICENSE and LICENSE-COMMERCIAL files.
+
+IMPORTANT: This software cannot be rebranded or have attribution removed.
+See NOTICE file for complete terms.
+
+Repository: https://github.com/KR8MER/eas-station
+"""
+
+"""Replay tests for online anomaly detection on live metrics."""
+
+import math
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from flask import Flask
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+
+from app_core.analytics import anomaly_detector as anomaly_module
+from app_core.analytics.anomaly_detector import AnomalyDetector
+from app_core.analytics.models import AnomalyRecord, MetricSnapshot, TrendRecord
+from app_core.analytics.online_detector import SILENCE_FLOOR_DB, OnlineAnomalyDetector
+from app_core.extensions import db
+
+START = datetime(2025, 3, 10, tzinfo=timezone.utc)
+INTERVAL = 5.0  # audio-service metrics cadence
+DAYS = 4
+COLLAPSE = START + timedelta(days=3, hours=14, minutes=10)
+
+
+@compiles(JSONB, "sqlite")
+def _jsonb_on_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+
+def _replay(seed=1):
+    """(time, rms dBFS) every 5 s: diurnal swing, a 06-09 UTC programme level, then silence."""
+    rng = random.Random(seed)
+    moment = START
+    while moment < START + timedelta(days=DAYS):
+        if moment >= COLLAPSE:
+            level = float("-inf")
+        else:
+            hour = moment.hour + moment.minute / 60
+            level = -20 + 3 * math.sin(2 * math.pi * hour / 24) + (5 if 6 <= hour < 9 else 0) + rng.gauss(0, 1)
+        yield moment, level
+        moment += timedelta(seconds=INTERVAL)
+
+
+def _payload(moment, level, status="running"):
+    return {
+        "timestamp": moment.timestamp(),
+        "audio_controller": {"sources": {"wx": {"rms_level_db": level, "status": status}}},
+    }
+
+
+@pytest.fixture
+def app_context(tmp_path):
+    app = Flask("online-anomaly-test")
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'analytics.db'}",
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+    )
+    db.init_app(app)
+    with app.app_context():
+        for model in (MetricSnapshot, TrendRecord, AnomalyRecord):
+            model.__table__.create(bind=db.engine)
+        yield app
+        db.session.remove()
+
+
+def _run_online(samples):
+    detector = OnlineAnomalyDetector()
+    found = []
+    for moment, level in samples:
+        found.extend(detector.observe_metrics(_payload(moment, level)))
+    return found
+
+
+def _run_batch(samples, monkeypatch):
+    """Hourly snapshots of the same stream, checked on the scheduler's hourly tick."""
+    hours = {}
+    for moment, level in samples:
+        hour = moment.replace(minute=0, second=0, microsecond=0)
+        hours.setdefault(hour, []).append(level if math.isfinite(level) else SILENCE_FLOOR_DB)
+    db.session.add_all(
+        MetricSnapshot(
+            metric_category="audio_health", metric_name="rms_level_db",
+            snapshot_time=hour + timedelta(hours=1), window_start=hour, window_end=hour + timedelta(hours=1),
+            aggregation_period="hourly", value=sum(levels) / len(levels), entity_id="wx", entity_type="audio_source",
+        )
+        for hour, levels in hours.items()
+    )
+    db.session.commit()
+
+    found = []
+    detector = AnomalyDetector()
+    for hour in sorted(hours):
+        tick = hour + timedelta(hours=1)
+        monkeypatch.setattr(anomaly_module, "utc_now", lambda: tick)
+        found.extend((tick, anomaly) for anomaly in detector.detect_series_anomalies(
+            [("audio_health", "rms_level_db", "wx")]))
+    return found
+
+
+def test_replay_detects_collapse_in_seconds_with_fewer_false_positives(app_context, monkeypatch):
+    samples = list(_replay())
+
+    online = _run_online(samples)
+    batch = _run_batch(samples, monkeypatch)
+
+    def as_utc(moment):
+        return moment.replace(tzinfo=timezone.utc)
+
+    # Detection delay: first anomaly at or after the collapse
+    online_hits = [a for a in online if a.metric_time >= COLLAPSE]
+    batch_hits = [tick for tick, a in batch if as_utc(a.metric_time) >= COLLAPSE]
+    online_delay = (online_hits[0].metric_time - COLLAPSE).total_seconds()
+    batch_delay = (batch_hits[0] - COLLAPSE).total_seconds()
+    assert online_delay <= 4 * INTERVAL
+    assert batch_delay >= 45 * 60
+    assert online_hits[0].severity == "critical"
+    assert online_hits[0].z_score < 0
+    assert len(online_hits) == 1  # one record per excursion, not one per sample
+
+    # False positives: anomalies on healthy data.  The online detector only
+    # flags the 06:00/09:00 programme steps on the first day, before the
+    # hour-of-day profile has seen them; the batch detector keeps flagging them
+    online_false = [a for a in online if a.metric_time < COLLAPSE]
+    batch_false = [a for _, a in batch if as_utc(a.metric_time) < COLLAPSE]
+    assert all(a.metric_time < START + timedelta(days=1) for a in online_false)
+    assert len(online_false) / DAYS <= 1.0
+    assert len(online_false) < len(batch_false)
+
+
+def test_state_flapping_raises_once():
+    detector = OnlineAnomalyDetector(flap_transitions=4, flap_half_life_seconds=300)
+    moment = START
+    raised = []
+    for index in range(40):
+        status = "running" if index % 2 == 0 or index > 12 else "error"
+        raised.extend(detector.observe_metrics(_payload(moment, -20.0, status)))
+        moment += timedelta(seconds=INTERVAL)
+
+    flaps = [a for a in raised if a.anomaly_type == "pattern_violation"]
+    assert len(flaps) == 1
+    assert (flaps[0].metric_name, flaps[0].entity_id) == ("source_status", "wx")
+
+
+def test_receiver_signal_and_silence_floor():
+    detector = OnlineAnomalyDetector(warmup_samples=10)
+    rng = random.Random(3)
+    moment = START
+    for _ in range(50):
+        metrics = {
+            "timestamp": moment.timestamp(),
+            "radio_manager": {"receivers": {"rx1": {"signal_strength": 0.8 + rng.gauss(0, 0.02), "locked": True}}},
+        }
+        assert detector.observe_metrics(metrics) == []
+        moment += timedelta(seconds=INTERVAL)
+
+    raised = []
+    for _ in range(3):
+        raised.extend(detector.observe_metrics({
+            "timestamp": moment.timestamp(),
+            "radio_manager": {"receivers": {"rx1": {"signal_strength": 0.05, "locked": True}}},
+        }))
+        moment += timedelta(seconds=INTERVAL)
+    assert [(a.metric_category, a.metric_name, a.entity_id, a.entity_type) for a in raised] == [
+        ("receiver_status", "signal_strength", "rx1", "receiver")]
+
+    # Missing values are ignored; silent audio is scored at the floor
+    assert detector.observe("audio_health", "rms_level_db", None, moment.timestamp()) is None
+    assert detector.observe_metrics(_payload(moment, float("-inf"))) == []
+    assert detector._series[("audio_health", "rms_level_db", "wx")].mean == SILENCE_FLOOR_DB
@@ -0,0 +1,605 @@
+"""
+EAS Station - Emergency Alert System
+Copyright (c) 2025 Timothy Kramer (KR8MER)
+
+This file is part of EAS Station.
+
+EAS Station is dual-licensed software:
+- GNU Affero General Public License v3 (AGPL-3.0) for open-source use
+- Commercial License for proprietary use
+
+You should have received a copy of both licenses with this software.
+For more information, see LICENSE and LICENSE-COMMERCIAL files.
+
+IMPORTANT: This software cannot be rebranded or have attribution removed.
+See NOTICE file for complete terms.
+
+Repository: https://github.com/KR8MER/eas-station
+"""
+
+"""
+Micro-benchmarks for the hot audio, radio and decode paths.
+
+Every input is synthetic and seeded so runs are repeatable offline: SAME
+bursts rendered with ``eas_fsk``, FM-modulated IQ, and a canned NOAA CAP
+payload served by a fake HTTP session.  Run the suite and compare it with
+the committed baseline via ``scripts/run_benchmarks.py``; a plain
+``pytest`` run executes each benchmark a handful of times as a smoke test.
+"""
+
+import logging
+import struct
+import wave
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+from flask import Flask
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+
+from app_core.analytics import anomaly_detector as anomaly_module
+from app_core.analytics import trend_analyzer as trend_module
+from app_core.analytics.anomaly_detector import AnomalyDetector
+from app_core.analytics.models import AnomalyRecord, MetricSnapshot, TrendRecord
+from app_core.analytics.trend_analyzer import TrendAnalyzer
+from app_core.audio.broadcast_queue import BroadcastQueue
+from app_core.audio.ingest import AudioSourceAdapter, AudioSourceConfig, AudioSourceType
+from app_core.audio.metering import AudioMeter
+from app_core.audio.streaming_same_decoder import StreamingSAMEDecoder
+from app_core.extensions import db
+from app_core.radio.demodulation import DemodulatorConfig, FMDemodulator, _rbds_crc
+from app_core.radio.drivers import RTLSDRReceiver, _SoapySDRHandle
+from app_core.radio.manager import ReceiverConfig
+from app_utils.alert_relevance import CompiledRelevanceMatcher, RelevanceProfile
+from app_utils.eas_decode import decode_same_audio
+from app_utils.eas_fsk import (
+    SAME_BAUD,
+    SAME_MARK_FREQ,
+    SAME_SPACE_FREQ,
+    encode_same_bits,
+    generate_fsk_samples,
+)
+from poller.cap_poller import CAPPoller
+from scripts.run_benchmarks import compare
+
+pytestmark = pytest.mark.performance
+
+AUDIO_RATE = 16000
+IQ_RATE = 250000
+TEST_HEADER = "ZCZC-WXR-TOR-039137+0030-1231200-KR8MER  -"
+
+
+def _run(benchmark, target, *, setup=None, rounds=10):
+    """Run ``target`` under pytest-benchmark with a fixed, small round count."""
+    return benchmark.pedantic(target, setup=setup, rounds=rounds, iterations=1, warmup_rounds=1)
+
+
+def _noise(samples: int, level: float, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return (rng.standard_normal(samples) * level).astype(np.float32)
+
+
+def _same_burst(sample_rate: int = AUDIO_RATE) -> np.ndarray:
+    """One over-the-air SAME burst (0xAB preamble + header, LSB first, unframed)."""
+    bits = []
+    for byte in [0xAB] * 16 + [ord(c) for c in TEST_HEADER]:
+        bits.extend((byte >> i) & 1 for i in range(8))
+    samples = generate_fsk_samples(bits, sample_rate, SAME_BAUD, SAME_MARK_FREQ, SAME_SPACE_FREQ, 16000)
+    return np.asarray(samples, dtype=np.float32) / 32768.0
+
+
+def _fm_iq(seconds: float = 0.1) -> np.ndarray:
+    """Broadcast-FM IQ: 1 kHz programme tone plus a 19 kHz stereo pilot, 75 kHz deviation."""
+    t = np.arange(int(seconds * IQ_RATE)) / IQ_RATE
+    multiplex = 0.8 * np.sin(2 * np.pi * 1000.0 * t) + 0.1 * np.sin(2 * np.pi * 19000.0 * t)
+    phase = 2 * np.pi * 75000.0 * np.cumsum(multiplex) / IQ_RATE
+    return np.exp(1j * phase).astype(np.complex64)
+
+
+def _rbds_bits(seed: int = 4) -> np.ndarray:
+    """PS "KR8MER" and a RadioText, each group preceded by 50 bits of noise."""
+    rng = np.random.default_rng(seed)
+    radio_text = "EAS STATION RBDS BENCHMARK".ljust(64)
+    groups = [(0x1234, address, 0, (ord("KR8MER  "[2 * address]) << 8) | ord("KR8MER  "[2 * address + 1]))
+              for address in range(4)]
+    groups += [
+        (0x1234, (2 << 12) | segment,
+         (ord(radio_text[4 * segment]) << 8) | ord(radio_text[4 * segment + 1]),
+         (ord(radio_text[4 * segment + 2]) << 8) | ord(radio_text[4 * segment + 3]))
+        for segment in range(16)
+    ]
+    bits = []
+    for group in groups:
+        bits.extend(rng.integers(0, 2, 50).tolist())
+        for data, offset in zip(group, (0x0FC, 0x198, 0x168, 0x1B4)):
+            word = (data << 10) | (_rbds_crc(data << 10) ^ offset)
+            bits.extend((word >> (25 - i)) & 1 for i in range(26))
+    return np.array(bits, dtype=np.int64)
+
+
+def _rbds_multiplex_iq(seconds: float = 1.0) -> np.ndarray:
+    """Broadcast-FM IQ whose multiplex carries differentially-coded RBDS at 57 kHz."""
+    bits = _rbds_bits()
+    symbols = np.cumprod(np.where(bits == 1, -1.0, 1.0))
+    samples = int(seconds * IQ_RATE)
+    t = np.arange(samples) / IQ_RATE
+    baseband = symbols[(t * 1187.5).astype(int) % len(symbols)]
+    multiplex = (
+        0.6 * np.sin(2 * np.pi * 1000.0 * t)
+        + 0.1 * np.sin(2 * np.pi * 19000.0 * t)
+        + 0.1 * baseband * np.cos(2 * np.pi * 57000.0 * t)
+    )
+    phase = 2 * np.pi * 75000.0 * np.cumsum(multiplex) / IQ_RATE
+    return np.exp(1j * phase).astype(np.complex64)
+
+
+def _noaa_feature(index: int, same_code: str, ugc_code: str) -> dict:
+    identifier = f"urn:oid:2.49.0.1.840.0.{index:040x}.001.1"
+    return {
+        "id": f"https://api.weather.gov/alerts/{identifier}",
+        "type": "Feature",
+        "geometry": {
+            "type": "Polygon",
+            "coordinates": [[[-84.1, 40.7], [-84.0, 40.7], [-84.0, 40.8], [-84.1, 40.8], [-84.1, 40.7]]],
+        },
+        "properties": {
+            "id": identifier,
+            "areaDesc": "Putnam; Allen",
+            "geocode": {"SAME": [same_code], "UGC": [ugc_code]},
+            "sent": "2025-11-25T13:24:00-05:00",
+            "effective": "2025-11-25T13:24:00-05:00",
+            "onset": "2025-11-25T13:24:00-05:00",
+            "expires": "2025-11-25T20:00:00-05:00",
+            "status": "Actual",
+            "messageType": "Alert",
+            "category": "Met",
+            "severity": "Moderate",
+            "certainty": "Likely",
+            "urgency": "Expected",
+            "event": "Wind Advisory",
+            "senderName": "NWS Northern Indiana",
+            "headline": f"Wind Advisory issued November 25 #{index}",
+            "description": "Southwest winds 20 to 30 mph with gusts up to 50 mph.",
+            "instruction": "Use extra caution when driving.",
+            "response": "Execute",
+        },
+    }
+
+
+# A quarter of the features match the SAME code (stored), a quarter the UGC
+# zone (broadcast-only) and the rest are filtered out.
+CAP_PAYLOAD = {
+    "type": "FeatureCollection",
+    "features": [
+        _noaa_feature(
+            i,
+            "039137" if i % 4 == 0 else "018001",
+            "OHZ016" if i % 4 == 1 else "INZ005",
+        )
+        for i in range(60)
+    ],
+}
+
+
+def _ipaws_feed(count: int) -> bytes:
+    """An IPAWS feed of ``count`` CAP 1.2 alerts, each with a polygon and a circle."""
+    cap = "urn:oasis:names:tc:emergency:cap:1.2"
+    alerts = "".join(
+        f"<alert xmlns=\"{cap}\"><identifier>urn:oid:2.49.0.1.840.0.{i:06d}</identifier>"
+        f"<sender>w-nws.webmaster@noaa.gov</sender><sent>2025-11-25T13:{i % 60:02d}:00-05:00</sent>"
+        "<status>Actual</status><msgType>Alert</msgType><scope>Public</scope>"
+        f"<info><language>en-US</language><category>Met</category><event>Wind Advisory</event>"
+        f"<urgency>Expected</urgency><severity>Moderate</severity><certainty>Likely</certainty>"
+        f"<headline>Wind Advisory #{i}</headline><description>Southwest winds 20 to 30 mph.</description>"
+        f"<parameter><valueName>VTEC</valueName><value>/O.NEW.KIWX.WI.Y.{i:04d}/</value></parameter>"
+        "<area><areaDesc>Putnam; Allen</areaDesc>"
+        "<polygon>40.7,-84.1 40.7,-84.0 40.8,-84.0 40.8,-84.1 40.7,-84.1</polygon>"
+        "<circle>40.75,-84.05 5</circle>"
+        "<geocode><valueName>SAME</valueName><value>018001</value></geocode>"
+        "<geocode><valueName>UGC</valueName><value>INZ005</value></geocode></area></info></alert>"
+        for i in range(count)
+    )
+    return f'<ns1:alerts xmlns:ns1="http://gov.fema.ipaws.services/feed">{alerts}</ns1:alerts>'.encode()
+
+
+class _CannedResponse:
+    status_code = 200
+    headers: dict = {}
+
+    def json(self):
+        return CAP_PAYLOAD
+
+    def raise_for_status(self):
+        pass
+
+
+class _CannedSession:
+    def get(self, url, timeout=None):
+        return _CannedResponse()
+
+
+def _make_offline_poller() -> CAPPoller:
+    """Build a CAPPoller whose network and database side effects are no-ops."""
+    poller = object.__new__(CAPPoller)
+    poller.logger = logging.getLogger("test_performance_benchmarks")
+    poller.zone_codes = ["OHZ016", "OHC137"]
+    poller.same_codes = {"039137"}
+    poller.storage_zone_codes = ["OHC137"]
+    poller.county_upper = "PUTNAM"
+    poller.location_settings = {"zone_codes": ["OHZ016", "OHC137"], "timezone": "America/New_York"}
+    poller.location_name = "Putnam County"
+    poller.poller_mode = "NOAA"
+    poller.cap_endpoints = ["https://api.weather.gov/alerts/active?zone=OHZ016,OHC137"]
+    poller.session = _CannedSession()
+    poller._known_ipaws_alerts = set()
+    poller._ipaws_alerts_seen = set()
+    poller.last_unchanged_skipped = 0
+    poller._debug_records_enabled = False
+    poller.eas_broadcaster = None
+    poller.led_controller = None
+    poller._refresh_radio_configuration = lambda: None
+    poller.save_cap_alert = lambda parsed: (True, None, None)
+    poller._record_receiver_statuses = lambda *args, **kwargs: None
+    for name in (
+        "cleanup_old_poll_history",
+        "log_poll_history",
+        "persist_debug_records",
+        "cleanup_old_debug_records",
+        "log_system_event",
+    ):
+        setattr(poller, name, lambda *args, **kwargs: None)
+    return poller
+
+
+class _BenchmarkAdapter(AudioSourceAdapter):
+    """Adapter that never captures; only its metric bookkeeping is exercised."""
+
+    def __init__(self):
+        super().__init__(
+            AudioSourceConfig(source_type=AudioSourceType.FILE, name="bench", sample_rate=AUDIO_RATE)
+        )
+
+    def _start_capture(self) -> None:
+        pass
+
+    def _stop_capture(self) -> None:
+        pass
+
+    def _read_audio_chunk(self):
+        return None
+
+
+def test_streaming_same_decoder_burst(benchmark):
+    """One SAME header in two seconds of programme noise, fed in 100 ms chunks."""
+    audio = np.concatenate([_noise(AUDIO_RATE // 2, 0.02, 1), _same_burst(), _noise(AUDIO_RATE, 0.02, 2)])
+    chunks = [audio[i:i + 1600] for i in range(0, len(audio), 1600)]
+
+    def decode():
+        alerts = []
+        decoder = StreamingSAMEDecoder(AUDIO_RATE, alert_callback=alerts.append)
+        for chunk in chunks:
+            decoder.process_samples(chunk)
+        return alerts
+
+    alerts = _run(benchmark, decode)
+    assert [alert.message for alert in alerts] == [TEST_HEADER]
+
+
+def test_streaming_same_decoder_idle(benchmark):
+    """Ten seconds of dead air: the steady-state cost of monitoring one source."""
+    chunks = [_noise(1600, 0.05, seed) for seed in range(100)]
+    decoder = StreamingSAMEDecoder(AUDIO_RATE)
+
+    def decode():
+        for chunk in chunks:
+            decoder.process_samples(chunk)
+
+    _run(benchmark, decode)
+    assert decoder.alerts_detected == 0
+
+
+@pytest.mark.parametrize("enable_rbds", [False, True], ids=["stereo", "stereo_rbds"])
+def test_fm_demodulate(benchmark, enable_rbds):
+    """100 ms of 250 kS/s broadcast-FM IQ through the stereo demodulator."""
+    iq = _fm_iq()
+    demodulator = FMDemodulator(
+        DemodulatorConfig(
+            modulation_type="WFM",
+            sample_rate=IQ_RATE,
+            audio_sample_rate=44100,
+            stereo_enabled=True,
+            enable_rbds=enable_rbds,
+        )
+    )
+
+    audio, _ = _run(benchmark, demodulator.demodulate, setup=lambda: ((iq,), {}))
+    assert len(audio) == pytest.approx(4410, abs=2)
+
+
+def test_fm_demodulate_rbds_multiplex(benchmark):
+    """One second of an RBDS-carrying station, demodulated in 100 ms chunks."""
+    iq = _rbds_multiplex_iq()
+    chunks = [iq[i:i + IQ_RATE // 10] for i in range(0, len(iq), IQ_RATE // 10)]
+
+    def demodulate():
+        demodulator = FMDemodulator(
+            DemodulatorConfig(modulation_type="WFM", sample_rate=IQ_RATE, audio_sample_rate=44100, enable_rbds=True)
+        )
+        latest = None
+        for chunk in chunks:
+            _, rbds = demodulator.demodulate(chunk)
+            latest = rbds or latest
+        return latest
+
+    latest = _run(benchmark, demodulate, rounds=5)
+    assert latest.ps_name == "KR8MER"
+
+
+def test_rbds_block_sync(benchmark):
+    """Block sync/group assembly over a noisy bitstream, 119 bits (100 ms) per call."""
+    bits = _rbds_bits()
+    chunks = [bits[i:i + 119] for i in range(0, len(bits), 119)]
+
+    def decode():
+        demodulator = FMDemodulator(
+            DemodulatorConfig(modulation_type="WFM", sample_rate=IQ_RATE, enable_rbds=True)
+        )
+        latest = None
+        for chunk in chunks:
+            latest = demodulator._decode_rbds_groups(chunk) or latest
+        return latest
+
+    latest = _run(benchmark, decode)
+    assert latest.radio_text == "EAS STATION RBDS BENCHMARK"
+
+
+class _SyntheticSoapyDevice:
+    """readStream stand-in: fills the caller's buffer and stops the loop after ``reads``."""
+
+    class _Result:
+        def __init__(self, ret):
+            self.ret = ret
+
+    def __init__(self, receiver, reads):
+        self.receiver = receiver
+        self.reads = reads
+        self.count = 0
+        self.block = (0.5 * np.exp(2j * np.pi * 0.01 * np.arange(16384))).astype(np.complex64)
+
+    def readStream(self, stream, buffers, length):  # noqa: N802 - mimic Soapy API
+        self.count += 1
+        if self.count >= self.reads:
+            self.receiver._running.clear()
+        buffers[0][:length] = self.block[:length]
+        # A downstream consumer polling between reads, as the SDR audio source does
+        self.receiver.get_samples(4096)
+        return self._Result(length)
+
+
+def test_sdr_capture_loop(benchmark):
+    """500 x 16384-sample readStream calls at 2.4 MS/s through the receiver capture loop."""
+    receiver = RTLSDRReceiver(
+        ReceiverConfig(identifier="bench", driver="rtlsdr", frequency_hz=162_550_000, sample_rate=2_400_000)
+    )
+
+    def setup():
+        device = _SyntheticSoapyDevice(receiver, reads=500)
+        receiver._handle = _SoapySDRHandle(device, "stream", None, np)
+        receiver._initialize_sample_buffer(np)
+        receiver._running.set()
+        return (), {}
+
+    _run(benchmark, receiver._capture_loop, setup=setup)
+    assert receiver._handle.device.count == 500
+
+
+def test_broadcast_queue_publish(benchmark):
+    """Fan 200 chunks out to four subscribers, including the drop-oldest path."""
+    chunk = _noise(4096, 0.1, 3)
+    broadcast = BroadcastQueue(name="bench", max_queue_size=100)
+    subscribers = [broadcast.subscribe(f"sub-{i}") for i in range(4)]
+
+    def drain():
+        for subscriber in subscribers:
+            while not subscriber.empty():
+                subscriber.get_nowait()
+        return (), {}
+
+    def publish():
+        delivered = 0
+        for _ in range(200):
+            delivered += broadcast.publish(chunk)
+        return delivered
+
+    assert _run(benchmark, publish, setup=drain) == 800
+
+
+def test_audio_adapter_update_metrics(benchmark):
+    """Level metering plus waveform/spectrogram refresh for one 4096-sample chunk."""
+    adapter = _BenchmarkAdapter()
+    chunk = _noise(4096, 0.1, 4)
+
+    def update():
+        for _ in range(50):
+            adapter._last_metrics_update = 0.0
+            adapter._update_metrics(chunk)
+
+    _run(benchmark, update)
+    assert adapter.metrics.frames_captured > 0
+
+
+def test_audio_meter_process_samples(benchmark):
+    """Peak/RMS/clip/ballistic metering of one 100 ms chunk at 48 kHz."""
+    meter = AudioMeter(sample_rate=48000)
+    chunk = _noise(4800, 0.1, 5)
+
+    metrics = _run(benchmark, meter.process_samples, setup=lambda: ((chunk,), {}))
+    assert metrics['clip_count'] == 0
+
+
+def test_cap_poller_poll_and_process(benchmark):
+    """Relevance filtering and parsing of a 60-alert NOAA response."""
+    poller = _make_offline_poller()
+
+    stats = _run(benchmark, poller.poll_and_process)
+    assert stats["status"] == "SUCCESS"
+    assert stats["alerts_fetched"] == 60
+    assert stats["alerts_accepted"] == 30
+
+
+@pytest.mark.parametrize("repeat_poll", [False, True])
+def test_ipaws_feed_parse(benchmark, repeat_poll):
+    """Streaming conversion of a 2,000-alert IPAWS feed; a repeat poll skips known alerts."""
+    poller = _make_offline_poller()
+    feed = _ipaws_feed(2000)
+    if repeat_poll:
+        for alert in poller._parse_ipaws_xml_feed(feed):
+            poller._remember_ipaws_alert(alert)
+
+    alerts = _run(benchmark, poller._parse_ipaws_xml_feed, setup=lambda: ((feed,), {}), rounds=3)
+    assert len(alerts) == (0 if repeat_poll else 2000)
+
+
+def test_relevance_matcher_10000_alerts_50_profiles(benchmark):
+    """One fetch of 10,000 alerts matched against 50 station profiles."""
+    rng = np.random.default_rng(21)
+    profiles = [
+        RelevanceProfile(
+            name=f"station-{i}",
+            same_codes=frozenset(f"0{state:02d}{county:03d}" for county in rng.choice(np.arange(1, 200, 2), 3)),
+            zone_codes=frozenset(f"OHZ{zone:03d}" for zone in rng.integers(1, 200, 6)),
+            storage_zone_codes=frozenset(),
+        )
+        for i, state in enumerate(rng.choice([18, 26, 39, 42], 50))
+    ]
+    alerts = [
+        {"properties": {"geocode": {
+            "SAME": [f"0{state:02d}{county:03d}" for state, county in zip(
+                rng.choice([18, 26, 39, 42, 55], 3), rng.choice(np.append(np.arange(1, 200), 0), 3))],
+            "UGC": [f"OHZ{zone:03d}" for zone in rng.integers(1, 200, 4)],
+        }}}
+        for _ in range(10_000)
+    ]
+
+    results = _run(benchmark, lambda: CompiledRelevanceMatcher(profiles).match_alerts(alerts), rounds=3)
+    assert len(results) == 10_000
+    assert sum(map(len, results)) > 10_000
+
+
+def test_decode_same_audio(benchmark, tmp_path):
+    """Batch decode of a three-burst SAME WAV file at a known sample rate."""
+    bits = encode_same_bits(TEST_HEADER, include_preamble=True)
+    burst = generate_fsk_samples(bits, AUDIO_RATE, SAME_BAUD, SAME_MARK_FREQ, SAME_SPACE_FREQ, 20000)
+    gap = [0] * AUDIO_RATE
+    samples = burst + gap + burst + gap + burst
+    path = tmp_path / "same.wav"
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(AUDIO_RATE)
+        wav.writeframes(struct.pack(f"<{len(samples)}h", *samples))
+
+    result = _run(
+        benchmark, decode_same_audio, setup=lambda: ((str(path),), {"sample_rate": AUDIO_RATE}), rounds=3
+    )
+    assert result.headers
+    assert {header.header for header in result.headers} == {TEST_HEADER}
+
+
+@compiles(JSONB, "sqlite")
+def _jsonb_on_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+
+ANALYTICS_NOW = datetime(2025, 3, 17, tzinfo=timezone.utc)
+
+
+def _seed_analytics(series_count: int = 1000, metrics: int = 100):
+    """A week of hourly snapshots per series, and two earlier trends per series.
+
+    Every tenth series' trends reverse direction, so trend breaks are found.
+    """
+    rng = np.random.default_rng(13)
+    keys = [("receiver", f"metric_{index % metrics}", f"rx-{index // metrics}") for index in range(series_count)]
+    snapshots = []
+    trends = []
+    for index, (category, name, entity_id) in enumerate(keys):
+        points = int(rng.integers(120, 169))
+        values = 50 + rng.standard_normal(points) * 5 + np.linspace(0, rng.normal(), points)
+        for offset, value in enumerate(values.tolist()):
+            moment = ANALYTICS_NOW - timedelta(hours=points - 1 - offset)
+            snapshots.append({
+                "metric_category": category, "metric_name": name, "entity_id": entity_id,
+                "entity_type": "receiver", "snapshot_time": moment, "window_start": moment - timedelta(hours=1),
+                "window_end": moment, "aggregation_period": "hourly", "value": value,
+            })
+        directions = ("rising", "falling") if index % 10 == 0 else ("rising", "rising")
+        for days, direction in zip((2, 1), directions):
+            analysed = ANALYTICS_NOW - timedelta(days=days, minutes=30)
+            trends.append({
+                "metric_category": category, "metric_name": name, "entity_id": entity_id,
+                "analysis_time": analysed, "window_start": analysed - timedelta(days=7), "window_end": analysed,
+                "window_days": 7, "trend_direction": direction, "data_points": 168, "mean_value": 50.0 + days,
+            })
+    db.session.execute(MetricSnapshot.__table__.insert(), snapshots)
+    db.session.execute(TrendRecord.__table__.insert(), trends)
+    db.session.commit()
+    return keys
+
+
+def test_analytics_batch_1000_series(benchmark, tmp_path, monkeypatch):
+    """The scheduler's batch pass: anomalies (incl. trend breaks) then trends for 1,000 series."""
+    app = Flask("analytics-benchmark")
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'analytics.db'}",
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+    )
+    db.init_app(app)
+    monkeypatch.setattr(anomaly_module, "utc_now", lambda: ANALYTICS_NOW)
+    monkeypatch.setattr(trend_module, "utc_now", lambda: ANALYTICS_NOW)
+
+    with app.app_context():
+        for model in (MetricSnapshot, TrendRecord, AnomalyRecord):
+            model.__table__.create(bind=db.engine)
+        keys = _seed_analytics()
+
+        def reset():
+            # Each round starts from the seeded tables, as a fresh hourly pass would
+            AnomalyRecord.query.delete()
+            TrendRecord.query.filter(TrendRecord.analysis_time == ANALYTICS_NOW).delete()
+            db.session.commit()
+            db.session.expunge_all()
+            return (), {}
+
+        def analyze():
+            anomalies = AnomalyDetector().detect_series_anomalies(keys)
+            trends = TrendAnalyzer().analyze_series_trends(keys)
+            return anomalies, trends
+
+        anomalies, trends = _run(benchmark, analyze, setup=reset, rounds=3)
+        assert len(trends) == 1000
+        assert {trend.trend_direction for trend in trends} <= {"rising", "falling", "stable"}
+        breaks = [anomaly for anomaly in anomalies if anomaly.anomaly_type == "trend_break"]
+        assert len(breaks) == 100
+        assert 0 < len(anomalies) - len(breaks) < 1000 * 24
+        db.session.remove()
+
+
+def _report(**medians):
+    return {"benchmarks": [
+        {"name": name, "stats": {"min": value, "median": value, "mean": value, "stddev": 0.0, "rounds": 5}}
+        for name, value in medians.items()
+    ]}
+
+
+def test_compare_flags_regressions_past_threshold():
+    baseline = _report(test_fast=0.010, test_slow=0.100)
+    current = _report(test_fast=0.014, test_slow=0.110, test_new=0.001)
+
+    lines, regressions = compare(baseline, current, threshold=0.25)
+    assert regressions == ["test_fast"]
+    assert any(line.split()[:2] == ["NEW", "test_new:"] for line in lines)
+
+    _, regressions = compare(baseline, current, threshold=0.5, stat="median")
+    assert regressions == []
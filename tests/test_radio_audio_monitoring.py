@@ -212,6 +212,63 @@ def test_remove_radio_managed_audio_source_cleans_up(audio_app):
         assert "sdr-wx42" not in controller._sources
 
 
+class _QueuedPublisher:
+    """Publisher whose commands all stay queued past the request's reply wait."""
+
+    def __init__(self):
+        self.calls = []
+        self.replies = {}
+
+    def _queued(self, command, timeout):
+        self.calls.append((command, timeout))
+        return {'success': False, 'timed_out': True, 'command_id': f'{command}-1', 'message': 'no reply'}
+
+    def delete_source(self, source_name, timeout=None):
+        return self._queued('source_delete', timeout)
+
+    def start_source(self, source_name, timeout=None):
+        return self._queued('source_start', timeout)
+
+    def get_reply(self, command_id):
+        return self.replies.get(command_id)
+
+
+def test_remove_falls_back_locally_when_delete_times_out(audio_app, monkeypatch):
+    publisher = _QueuedPublisher()
+    monkeypatch.setattr(audio_admin, "get_audio_command_publisher", lambda: publisher)
+    with audio_app.app_context():
+        receiver = _create_receiver()
+        db.session.add(receiver)
+        db.session.commit()
+        audio_admin.ensure_sdr_audio_monitor_source(receiver, start_immediately=False, commit=True)
+
+        assert audio_admin.remove_radio_managed_audio_source("sdr-wx42") is True
+        assert publisher.calls == [('source_delete', audio_admin.REQUEST_REPLY_TIMEOUT)]
+        assert "sdr-wx42" not in audio_admin._get_audio_controller()._sources
+
+
+def test_start_route_answers_202_and_the_command_can_be_polled(audio_app, monkeypatch):
+    publisher = _QueuedPublisher()
+    monkeypatch.setattr(audio_admin, "get_audio_command_publisher", lambda: publisher)
+    with audio_app.app_context():
+        receiver = _create_receiver()
+        db.session.add(receiver)
+        db.session.commit()
+        audio_admin.ensure_sdr_audio_monitor_source(receiver, start_immediately=False, commit=True)
+
+    client = audio_app.test_client()
+    response = client.post("/api/audio/sources/sdr-wx42/start")
+    assert response.status_code == 202
+    assert publisher.calls == [('source_start', audio_admin.REQUEST_REPLY_TIMEOUT)]
+    status_url = response.get_json()["status_url"]
+
+    assert client.get(status_url).status_code == 202
+    publisher.replies['source_start-1'] = {'success': True, 'message': 'Started source sdr-wx42'}
+    done = client.get(status_url)
+    assert done.status_code == 200
+    assert done.get_json()["status"] == "completed"
+
+
 def test_sync_radio_manager_state_updates_audio_sources(audio_app, monkeypatch):
     class DummyReceiverInstance:
         def __init__(self, identifier: str) -> None:
@@ -236,3 +236,114 @@ def test_unknown_error_code_still_formats_message():
 
     annotated = _SoapySDRReceiver._annotate_lock_hint("generic error")
     assert annotated == "generic error"
+
+
+class _SyntheticIQDevice(_WorkingDevice):
+    """Produces a ramp (sample k has value k) so ordering and gaps are visible."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.produced = 0
+
+    def readStream(self, stream, buffers, length):  # noqa: N802 - mimic Soapy API
+        buffer = buffers[0]
+        buffer[:length] = np.arange(self.produced, self.produced + length, dtype=np.float32)
+        self.produced += length
+        time.sleep(0.005)
+        return _Result(length)
+
+
+def _install_synthetic_soapysdr(monkeypatch):
+    module = _SoapyModule()
+    module.SOAPY_SDR_RX = 1
+    module.SOAPY_SDR_CF32 = 2
+    module.Device = lambda args: _SyntheticIQDevice()
+    module.Device.enumerate = lambda: []
+    monkeypatch.setitem(sys.modules, "SoapySDR", module)
+
+
+def _assert_ramp(samples):
+    values = samples.real.astype(np.int64)
+    assert np.all(np.diff(values) == 1)
+    assert np.all(samples.imag == 0)
+
+
+def test_get_samples_returns_read_only_ring_views(monkeypatch):
+    _install_synthetic_soapysdr(monkeypatch)
+    receiver = RTLSDRReceiver(
+        ReceiverConfig(identifier="ring", driver="rtlsdr", frequency_hz=162_550_000, sample_rate=240_000)
+    )
+    receiver.start()
+
+    try:
+        deadline = time.time() + 2.0
+        while receiver.get_connection_health()["sample_ring"]["samples_received"] < 20000:
+            assert time.time() < deadline, "synthetic device produced no samples"
+            time.sleep(0.01)
+
+        views = 0
+        for _ in range(20):
+            samples = receiver.get_samples(4096)
+            _assert_ramp(samples)
+            if np.shares_memory(samples, receiver._sample_buffer):
+                assert not samples.flags.writeable
+                views += 1
+            time.sleep(0.002)
+
+        ring = receiver.get_connection_health()["sample_ring"]
+        # Only requests that straddle the ring's wrap point are copied
+        assert views == ring["views_served"] >= 15
+        assert ring["samples_copied"] == (20 - views) * 4096
+        assert ring["size"] % receiver._read_chunk_size == 0
+
+        # The whole ring is always copied: the next read overwrites its oldest samples
+        everything = receiver.get_samples()
+        assert len(everything) == ring["size"]
+        assert not np.shares_memory(everything, receiver._sample_buffer)
+        assert everything.flags.writeable
+    finally:
+        receiver.stop()
+
+
+def test_get_samples_copies_requests_the_next_read_would_overwrite():
+    receiver = RTLSDRReceiver(
+        ReceiverConfig(identifier="lifetime", driver="rtlsdr", frequency_hz=162_550_000, sample_rate=240_000)
+    )
+    receiver._initialize_sample_buffer(np)
+    receiver._handle = types.SimpleNamespace(numpy=np)
+    receiver._running.set()
+    size, chunk = receiver._sample_buffer_size, receiver._read_chunk_size
+
+    # Fill the ring so the writer is back at slot 0
+    receiver._sample_buffer[:] = np.arange(size, dtype=np.float32)
+    receiver._commit_samples(size)
+
+    nearly_all = receiver.get_samples(size - 1)
+    longest_view = receiver.get_samples(size - chunk)
+    expected = nearly_all.copy()
+
+    # One readStream into the next slot, as the capture loop does
+    receiver._sample_buffer[:chunk] = -1
+    receiver._commit_samples(chunk)
+
+    assert not np.shares_memory(nearly_all, receiver._sample_buffer)
+    assert np.array_equal(nearly_all, expected)
+    assert np.shares_memory(longest_view, receiver._sample_buffer)
+    _assert_ramp(longest_view)
+
+
+def test_pcm_capture_streams_ring_views_to_file(monkeypatch, tmp_path):
+    _install_synthetic_soapysdr(monkeypatch)
+    receiver = RTLSDRReceiver(
+        ReceiverConfig(identifier="cap", driver="rtlsdr", frequency_hz=162_550_000, sample_rate=240_000)
+    )
+    receiver.start()
+
+    try:
+        path = receiver.capture_to_file(0.5, tmp_path, "synthetic", mode="pcm")
+    finally:
+        receiver.stop()
+
+    interleaved = np.fromfile(path, dtype=np.float32)
+    assert len(interleaved) == 2 * 120_000
+    _assert_ramp(interleaved[0::2] + 1j * interleaved[1::2])
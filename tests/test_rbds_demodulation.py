@@ -26,7 +26,40 @@ ROOT = pathlib.Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from app_core.radio.demodulation import DemodulatorConfig, FMDemodulator  # noqa: E402
+from app_core.radio.demodulation import (  # noqa: E402
+    _RBDS_SYNDROME_HIGH,
+    _RBDS_SYNDROME_LOW,
+    DemodulatorConfig,
+    FMDemodulator,
+    _rbds_crc,
+)
+
+_OFFSET_WORDS = (0x0FC, 0x198, 0x168, 0x1B4)
+
+
+def _group_bits(blocks):
+    bits = []
+    for data, offset in zip(blocks, _OFFSET_WORDS):
+        word = (data << 10) | (_rbds_crc(data << 10) ^ offset)
+        bits.extend((word >> (25 - i)) & 1 for i in range(26))
+    return bits
+
+
+def _station_bits(ps="KR8MER  ", radio_text="EAS STATION"):
+    radio_text = radio_text.ljust(64)
+    bits = []
+    for address in range(4):
+        chars = (ord(ps[2 * address]) << 8) | ord(ps[2 * address + 1])
+        bits += _group_bits((0x1234, address, 0, chars))
+    for segment in range(16):
+        text = radio_text[segment * 4:segment * 4 + 4]
+        bits += _group_bits((
+            0x1234,
+            (2 << 12) | segment,
+            (ord(text[0]) << 8) | ord(text[1]),
+            (ord(text[2]) << 8) | ord(text[3]),
+        ))
+    return bits
 
 
 def _make_demodulator():
@@ -39,21 +72,58 @@ def _make_demodulator():
     return FMDemodulator(config)
 
 
-def test_rbds_symbol_to_bit_handles_differential_bpsk():
+def test_rbds_symbols_to_bits_handles_differential_bpsk():
     demod = _make_demodulator()
 
     samples = np.array([0.25, 0.3, -0.2, -0.18, 0.5, -0.4], dtype=np.float32)
-    bits = [demod._rbds_symbol_to_bit(float(sample)) for sample in samples]
 
-    assert bits == [0, 0, 1, 0, 1, 1]
+    assert demod._rbds_symbols_to_bits(samples).tolist() == [0, 0, 1, 0, 1, 1]
+    assert demod._rbds_prev_symbol == -1.0
 
 
-def test_rbds_symbol_to_bit_handles_zero_crossings():
+def test_rbds_symbols_to_bits_handles_zero_crossings():
     demod = _make_demodulator()
 
     zero_crossing = np.array([0.0, -0.01, 0.02], dtype=np.float32)
-    bits = [demod._rbds_symbol_to_bit(float(sample)) for sample in zero_crossing]
 
-    assert bits[0] == 0
-    assert bits[1] == 1
-    assert bits[2] == 1
+    assert demod._rbds_symbols_to_bits(zero_crossing).tolist() == [0, 1, 1]
+
+
+def test_rbds_symbols_to_bits_is_independent_of_run_boundaries():
+    samples = np.random.default_rng(3).standard_normal(500)
+    expected = []
+    previous = 1.0
+    for sample in samples:
+        symbol = 1.0 if sample >= 0 else -1.0
+        expected.append(int(symbol != previous))
+        previous = symbol
+
+    demod = _make_demodulator()
+    bits = np.concatenate([demod._rbds_symbols_to_bits(part) for part in np.array_split(samples, 7)])
+
+    assert bits.tolist() == expected
+    assert demod._rbds_prev_symbol == previous
+
+
+def test_rbds_syndrome_tables_match_bitwise_crc():
+    for data in (0x0000, 0x0001, 0x1234, 0x8000, 0xFFFF, 0xA5C3):
+        assert _RBDS_SYNDROME_HIGH[data >> 8] ^ _RBDS_SYNDROME_LOW[data & 0xFF] == _rbds_crc(data << 10)
+
+
+def test_rbds_block_sync_decodes_ps_and_radio_text_across_chunks():
+    rng = np.random.default_rng(11)
+    noise = rng.integers(0, 2, 61).tolist()
+    # A corrupted group mid-stream must drop sync and re-acquire on the next A block
+    corrupted = _group_bits((0x1234, 0, 0, 0x4142))
+    corrupted[30] ^= 1
+    bits = np.array(noise + corrupted + _station_bits(), dtype=np.int64)
+
+    demod = _make_demodulator()
+    latest = None
+    for chunk in np.array_split(bits, 37):
+        latest = demod._decode_rbds_groups(chunk) or latest
+
+    assert latest is not None
+    assert latest.pi_code == "1234"
+    assert latest.ps_name == "KR8MER"
+    assert latest.radio_text == "EAS STATION"
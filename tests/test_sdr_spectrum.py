@@ -0,0 +1,234 @@
+"""
+EAS Station - Emergency Alert System
+Copyright (c) 2025 Timothy Kramer (KR8MER)
+
+This file is part of EAS Station.
+
+EAS Station is dual-licensed software:
+- GNU Affero General Public License v3 (AGPL-3.0) for open-source use
+- Commercial License for proprietary use
+
+You should have received a copy of both licenses with this software.
+For more information, see LICENSE and LICENSE-COMMERCIAL files.
+
+IMPORTANT: This software cannot be rebranded or have attribution removed.
+See NOTICE file for complete terms.
+
+Repository: https://github.com/KR8MER/eas-station
+"""
+
+"""Tests for the averaged Welch PSD / waterfall engine used by SDR receivers."""
+
+import json
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app_core.radio.drivers import RTLSDRReceiver
+from app_core.radio.manager import ReceiverConfig
+from app_core.radio.spectrum import SpectrumConfig, WelchSpectrumEngine
+
+SAMPLE_RATE = 2_048_000  # 1 kHz bins with a 2048-point FFT
+BUFFER = 16384
+
+
+def _tone(frequency: float, amplitude: float, start: int, count: int = BUFFER) -> np.ndarray:
+    n = np.arange(start, start + count)
+    return (amplitude * np.exp(2j * np.pi * frequency * n / SAMPLE_RATE)).astype(np.complex64)
+
+
+def _noise(count: int, level: float, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return ((rng.standard_normal(count) + 1j * rng.standard_normal(count)) * level / np.sqrt(2)).astype(np.complex64)
+
+
+def _feed(engine, make_buffer, seconds: float, sample_rate: int = SAMPLE_RATE, buffer: int = BUFFER):
+    """Feed buffers with a simulated clock; return the number of frames produced."""
+    frames = 0
+    reads = int(seconds * sample_rate / buffer)
+    for i in range(reads):
+        frames += engine.process(make_buffer(i), now=i * buffer / sample_rate)
+    return frames
+
+
+@pytest.mark.parametrize(
+    "frequency, amplitude, tolerance_db",
+    [
+        (125_000.0, 0.5, 0.05),  # on a bin centre
+        (-37_300.0, 0.1, 1.5),  # between bins: Hann scalloping loss is at most 1.42 dB
+    ],
+)
+def test_known_tone_frequency_and_level(frequency, amplitude, tolerance_db):
+    engine = WelchSpectrumEngine()
+    _feed(engine, lambda i: _tone(frequency, amplitude, i * BUFFER), 1.0)
+
+    average_db = engine.get_average_db()
+    offsets = engine.frequency_offsets(SAMPLE_RATE)
+    peak_bin = int(np.argmax(average_db))
+
+    assert abs(offsets[peak_bin] - frequency) <= 1000.0
+    assert average_db[peak_bin] == pytest.approx(20 * np.log10(amplitude), abs=tolerance_db)
+
+
+def test_averaging_smooths_noise_floor():
+    def floor_spread(averaging):
+        engine = WelchSpectrumEngine(SpectrumConfig(averaging=averaging))
+        _feed(engine, lambda i: _noise(BUFFER, 0.01, i), 2.0)
+        return float(np.std(engine.get_average_db()))
+
+    assert floor_spread(0.2) < 0.6 * floor_spread(1.0)
+
+
+def test_frame_rate_and_fft_budget_do_not_follow_capture_rate():
+    config = SpectrumConfig(display_rate_hz=10.0, max_segments_per_frame=4)
+    for sample_rate in (1_024_000, 8_192_000):
+        engine = WelchSpectrumEngine(config)
+        frames = _feed(engine, lambda i: _noise(BUFFER, 0.01, i), 5.0, sample_rate=sample_rate)
+        stats = engine.get_stats()
+
+        assert 45 <= frames <= 50
+        assert stats["segments"] <= 4 * (frames + 1)
+        assert stats["cpu_seconds"] > 0.0
+
+
+def test_peak_hold_decays_after_tone_stops():
+    engine = WelchSpectrumEngine(SpectrumConfig(peak_decay_db_per_s=10.0))
+    _feed(engine, lambda i: _tone(50_000.0, 0.5, i * BUFFER), 0.5)
+    peak_bin = int(np.argmax(engine.get_peak_hold_db()))
+    held = float(engine.get_peak_hold_db()[peak_bin])
+
+    reads = int(2.0 * SAMPLE_RATE / BUFFER)
+    for i in range(reads):
+        engine.process(_noise(BUFFER, 0.001, i), now=0.5 + i * BUFFER / SAMPLE_RATE)
+
+    after = float(engine.get_peak_hold_db()[peak_bin])
+    assert after < held
+    assert after == pytest.approx(held - 20.0, abs=2.0)
+    assert after > float(engine.get_average_db()[peak_bin]) + 5.0
+
+
+def test_waterfall_is_decimated_and_oldest_first():
+    engine = WelchSpectrumEngine(SpectrumConfig(display_rate_hz=8.0, waterfall_bins=256, waterfall_history=8))
+    # One read per display frame, each louder than the last
+    for frame in range(13):
+        engine.process(_tone(0.0, 0.01 * (frame + 1), 0), now=frame * 0.125)
+
+    waterfall = engine.get_waterfall()
+    assert waterfall.shape == (8, 256)
+    dc_levels = waterfall[:, 128]
+    assert np.all(np.diff(dc_levels) > 0)
+
+
+class _CountingLock:
+    """Wraps a lock and counts acquisitions."""
+
+    def __init__(self, lock):
+        self._lock = lock
+        self.acquisitions = 0
+
+    def __enter__(self):
+        self.acquisitions += 1
+        return self._lock.__enter__()
+
+    def __exit__(self, *exc):
+        return self._lock.__exit__(*exc)
+
+
+def test_snapshot_takes_all_traces_from_one_frame():
+    engine = WelchSpectrumEngine(SpectrumConfig(display_rate_hz=8.0, waterfall_bins=256, waterfall_history=8))
+    assert engine.get_snapshot() is None
+
+    for frame in range(5):
+        engine.process(_tone(0.0, 0.01 * (frame + 1), 0), now=frame * 0.125)
+    lock = _CountingLock(engine._lock)
+    engine._lock = lock
+
+    snapshot = engine.get_snapshot()
+
+    assert lock.acquisitions == 1
+    assert snapshot.frames == engine.get_stats()["frames"]
+    assert snapshot.average_db is engine.get_average_db()
+    assert snapshot.peak_db is engine.get_peak_hold_db()
+    assert np.array_equal(snapshot.waterfall_db, engine.get_waterfall())
+    assert snapshot.waterfall_db.shape == (snapshot.frames, 256)
+
+
+def test_short_buffers_are_carried_into_full_segments():
+    engine = WelchSpectrumEngine()
+    for i in range(64):
+        engine.process(_tone(10_000.0, 0.5, i * 500, count=500), now=i * 0.01)
+
+    average_db = engine.get_average_db()
+    assert average_db is not None
+    assert engine.frequency_offsets(SAMPLE_RATE)[int(np.argmax(average_db))] == pytest.approx(10_000.0)
+
+
+def test_receiver_publishes_averaged_spectrum_and_stats(monkeypatch):
+    clock = iter(np.arange(0.0, 10.0, 0.05))
+    monkeypatch.setattr("app_core.radio.spectrum.time.monotonic", lambda: float(next(clock)))
+    receiver = RTLSDRReceiver(
+        ReceiverConfig(identifier="psd", driver="rtlsdr", frequency_hz=162_550_000, sample_rate=SAMPLE_RATE)
+    )
+    assert receiver.get_spectrum() is None
+
+    for i in range(40):
+        receiver._compute_spectrum(_tone(200_000.0, 0.5, i * BUFFER), np)
+
+    spectrum = receiver.get_spectrum()
+    assert spectrum is not None and len(spectrum) == 2048
+    assert max(spectrum) == pytest.approx(100.0 - 6.02, abs=0.1)
+    assert receiver.get_connection_health()["spectrum"]["segments"] > 0
+
+
+class _SpectrumRedis:
+    """Records the SETEX calls of a metrics publish."""
+
+    def __init__(self):
+        self.values = {}
+
+    def pipeline(self):
+        return self
+
+    def setex(self, key, seconds, value):
+        self.values[key] = json.loads(value)
+
+    def execute(self):
+        return []
+
+
+def test_service_publishes_waterfall_with_average_and_peak(monkeypatch):
+    import audio_service
+
+    clock = iter(np.arange(0.0, 10.0, 0.05))
+    monkeypatch.setattr("app_core.radio.spectrum.time.monotonic", lambda: float(next(clock)))
+    receiver = RTLSDRReceiver(
+        ReceiverConfig(identifier="psd", driver="rtlsdr", frequency_hz=162_550_000, sample_rate=SAMPLE_RATE)
+    )
+    for i in range(40):
+        receiver._compute_spectrum(_tone(200_000.0, 0.5, i * BUFFER), np)
+    receiver._running.set()
+
+    redis_fake = _SpectrumRedis()
+    monkeypatch.setattr(audio_service, "get_redis_client", lambda: redis_fake)
+    monkeypatch.setattr(audio_service, "_audio_controller", None)
+    monkeypatch.setattr(audio_service, "_radio_manager", SimpleNamespace(_receivers={"psd": receiver}))
+    monkeypatch.setattr(audio_service, "_master_lease", SimpleNamespace(held=lambda: True, write_metrics=lambda m: True))
+
+    engine = receiver.get_spectrum_engine()
+    lock = _CountingLock(engine._lock)
+    engine._lock = lock
+
+    audio_service.publish_metrics_to_redis({})
+
+    # Average, peak and waterfall are read together, not across frames
+    assert lock.acquisitions == 1
+    payload = redis_fake.values["eas:spectrum:psd"]
+    rows = receiver.get_spectrum_engine().get_waterfall()
+    assert payload["waterfall_rows"] == len(payload["waterfall"]) == rows.shape[0] > 0
+    assert payload["waterfall_bins"] == len(payload["waterfall"][0]) == 512
+    assert len(payload["spectrum"]) == len(payload["peak_hold"]) == 2048
+    # The tone's column is the brightest in the newest row, on the spectrum's scale
+    newest = np.array(payload["waterfall"][-1])
+    assert int(np.argmax(newest)) == int(np.argmax(rows[-1]))
+    assert 0.0 <= newest.min() and newest.max() <= 1.0
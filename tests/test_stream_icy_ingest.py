@@ -0,0 +1,275 @@
+"""
+EAS Station - Emergency Alert System
+Copyright (c) 2025 Timothy Kramer (KR8MER)
+
+This file is part of EAS Station.
+
+EAS Station is dual-licensed software:
+- GNU Affero General Public License v3 (AGPL-3.0) for open-source use
+- Commercial License for proprietary use
+
+You should have received a copy of both licenses with this software.
+For more information, see LICENSE and LICENSE-COMMERCIAL files.
+
+IMPORTANT: This software cannot be rebranded or have attribution removed.
+See NOTICE file for complete terms.
+
+Repository: https://github.com/KR8MER/eas-station
+"""
+
+"""Tests for single-connection ICY demultiplexing in the stream source adapter."""
+
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pytest
+
+from app_core.audio.ingest import AudioSourceConfig, AudioSourceType
+from app_core.audio.sources import IcyStreamDemuxer, StreamSourceAdapter
+
+METAINT = 4000
+SAMPLE_RATE = 16000
+
+# Stands in for FFmpeg: the canned stream body is already s16le PCM, so the
+# "decoder" copies stdin to stdout and any leaked metadata byte shows up in the audio.
+_PASSTHROUGH_DECODER = [
+    sys.executable,
+    '-c',
+    'import os\nwhile True:\n    d = os.read(0, 65536)\n    if not d:\n        break\n    os.write(1, d)\n',
+]
+
+
+def _metadata_block(text: str) -> bytes:
+    payload = text.encode('utf-8')
+    length = -(-len(payload) // 16)
+    return bytes([length]) + payload.ljust(length * 16, b'\x00')
+
+
+def _icy_body(audio: bytes, titles) -> bytes:
+    """Interleave ICY blocks every METAINT bytes; blocks without a title are empty."""
+    body = bytearray()
+    for index, start in enumerate(range(0, len(audio), METAINT)):
+        body += audio[start:start + METAINT]
+        if start + METAINT <= len(audio):
+            title = titles[index] if index < len(titles) else None
+            body += _metadata_block(f"StreamTitle='{title}';") if title else b'\x00'
+    return bytes(body)
+
+
+def _pcm(seconds: float) -> bytes:
+    rng = np.random.default_rng(7)
+    return (rng.standard_normal(int(seconds * SAMPLE_RATE)) * 3000).astype(np.int16).tobytes()
+
+
+class _IcyServer:
+    def __init__(self, body: bytes, hold_open: bool):
+        self.connections = 0
+        self.icy_requested = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.connections += 1
+                server.icy_requested.append(self.headers.get('Icy-MetaData'))
+                self.send_response(200)
+                self.send_header('Content-Type', 'audio/mpeg')
+                self.send_header('icy-metaint', str(METAINT))
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                    self.wfile.flush()
+                    while hold_open and not server.closing.is_set():
+                        time.sleep(0.05)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def log_message(self, *args):
+                pass
+
+        self.closing = threading.Event()
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/stream"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.closing.set()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def _adapter(url: str, monkeypatch) -> StreamSourceAdapter:
+    adapter = StreamSourceAdapter(AudioSourceConfig(
+        source_type=AudioSourceType.STREAM,
+        name="icy-test",
+        sample_rate=SAMPLE_RATE,
+        buffer_size=1000,
+        device_params={'stream_url': url},
+    ))
+    monkeypatch.setattr(adapter, '_build_ffmpeg_command', lambda: list(_PASSTHROUGH_DECODER))
+    return adapter
+
+
+def _collect(adapter: StreamSourceAdapter, samples: int, timeout: float = 10.0) -> np.ndarray:
+    chunks = []
+    deadline = time.monotonic() + timeout
+    while sum(len(c) for c in chunks) < samples and time.monotonic() < deadline:
+        chunk = adapter.get_audio_chunk(timeout=0.2)
+        if chunk is not None:
+            chunks.append(chunk)
+    return np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
+
+
+def test_demuxer_handles_arbitrary_chunk_boundaries():
+    audio = bytes(random.Random(1).getrandbits(8) for _ in range(5 * METAINT + 123))
+    body = _icy_body(audio, ["One", None, "Two - Three", None, "Four"])
+
+    rng = random.Random(2)
+    demuxer = IcyStreamDemuxer(METAINT)
+    out = bytearray()
+    titles = []
+    pos = 0
+    while pos < len(body):
+        step = rng.choice([1, 7, 16, 999, 4096])
+        chunk_audio, chunk_titles = demuxer.feed(body[pos:pos + step])
+        out += chunk_audio
+        titles += chunk_titles
+        pos += step
+
+    assert bytes(out) == audio
+    assert titles == ["StreamTitle='One';", "StreamTitle='Two - Three';", "StreamTitle='Four';"]
+
+
+def test_demuxer_passes_through_without_metaint():
+    assert IcyStreamDemuxer(0).feed(b'\x01\x02\x03') == (b'\x01\x02\x03', [])
+
+
+def test_stream_uses_one_connection_for_audio_and_metadata(monkeypatch):
+    audio = _pcm(2.0)
+    server = _IcyServer(_icy_body(audio, ["Artist - Song"]), hold_open=True)
+    adapter = _adapter(server.url, monkeypatch)
+    try:
+        assert adapter.start()
+        decoded = _collect(adapter, len(audio) // 2)
+        metadata = adapter.get_metrics_snapshot().metadata
+    finally:
+        stop_started = time.monotonic()
+        adapter.stop()
+        stop_seconds = time.monotonic() - stop_started
+        server.close()
+
+    expected = np.frombuffer(audio, dtype=np.int16).astype(np.float32) / 32768.0
+    assert len(decoded) == len(expected)
+    np.testing.assert_array_equal(decoded, expected[:len(decoded)])
+    assert server.connections == 1
+    assert server.icy_requested == ['1']
+    assert metadata['connections'] == 1
+    assert metadata['icy']['supported'] is True
+    assert metadata['icy']['metaint'] == METAINT
+    assert metadata['song'] == 'Artist - Song'
+    # Stopping must not wait for the idle connection's read timeout
+    assert stop_seconds < 1.5
+
+
+def test_stream_reconnects_after_server_closes(monkeypatch):
+    audio = _pcm(0.5)
+    server = _IcyServer(_icy_body(audio, ["First"]), hold_open=False)
+    adapter = _adapter(server.url, monkeypatch)
+    adapter._reconnect_delay_seconds = 0.2
+    try:
+        assert adapter.start()
+        deadline = time.monotonic() + 10.0
+        while server.connections < 2 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        decoded = _collect(adapter, len(audio) // 2 + 1000, timeout=5.0)
+    finally:
+        adapter.stop()
+        server.close()
+
+    assert server.connections >= 2
+    # The decoder keeps running across reconnects; the audio continues seamlessly
+    expected = np.frombuffer(audio + audio, dtype=np.int16).astype(np.float32) / 32768.0
+    np.testing.assert_array_equal(decoded, expected[:len(decoded)])
+
+
+def test_start_requires_http_url():
+    adapter = StreamSourceAdapter(AudioSourceConfig(
+        source_type=AudioSourceType.STREAM,
+        name="bad",
+        device_params={'stream_url': 'rtsp://example.com/stream'},
+    ))
+    with pytest.raises(ValueError):
+        adapter._start_capture()
+
+
+class _PlaylistServer:
+    """Serves fixed playlist documents and records every requested path."""
+
+    def __init__(self, documents):
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests.append(self.path)
+                body = documents.get(self.path)
+                if body is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/vnd.apple.mpegurl')
+                self.end_headers()
+                self.wfile.write(body.encode('utf-8'))
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.base = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def test_hls_playlist_is_opened_by_ffmpeg_not_piped():
+    server = _PlaylistServer({
+        '/live/index.m3u8': '#EXTM3U\n#EXT-X-TARGETDURATION:6\n#EXTINF:6.0,\nseg1.ts\n#EXTINF:6.0,\nseg2.ts\n',
+        '/radio.m3u': '#EXTM3U\nhttp://icecast.example.com:8000/wx.mp3\n',
+    })
+    try:
+        hls = StreamSourceAdapter(AudioSourceConfig(
+            source_type=AudioSourceType.STREAM,
+            name="hls-test",
+            device_params={'stream_url': f"{server.base}/live/index.m3u8"},
+        ))
+        url = hls._resolve_stream_url(hls._stream_url)
+        hls._resolved_stream_url = url
+
+        icy = StreamSourceAdapter(AudioSourceConfig(
+            source_type=AudioSourceType.STREAM,
+            name="m3u-test",
+            device_params={'stream_url': f"{server.base}/radio.m3u"},
+        ))
+        icy._resolved_stream_url = icy._resolve_stream_url(icy._stream_url)
+    finally:
+        server.close()
+
+    # The media playlist URL itself goes to FFmpeg, with reconnects; segments are not fetched here
+    assert url == f"{server.base}/live/index.m3u8"
+    command = hls._build_ffmpeg_command()
+    assert command[command.index('-i') + 1] == url
+    assert '-reconnect' in command and '-reconnect_streamed' in command
+    assert 'pipe:0' not in command
+    assert server.requests == ['/live/index.m3u8', '/radio.m3u']
+
+    # A plain M3U list still resolves to the Icecast URL, demultiplexed through the pipe
+    assert icy._resolved_stream_url == 'http://icecast.example.com:8000/wx.mp3'
+    command = icy._build_ffmpeg_command()
+    assert command[command.index('-i') + 1] == 'pipe:0'
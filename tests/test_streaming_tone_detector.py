@@ -0,0 +1,203 @@
+"""
+EAS Station - Emergency Alert System
+Copyright (c) 2025 Timothy Kramer (KR8MER)
+
+This file is part of EAS Station.
+
+EAS Station is dual-licensed software:
+- GNU Affero General Public License v3 (AGPL-3.0) for open-source use
+- Commercial License for proprietary use
+
+You should have received a copy of both licenses with this software.
+For more information, see LICENSE and LICENSE-COMMERCIAL files.
+
+IMPORTANT: This software cannot be rebranded or have attribution removed.
+See NOTICE file for complete terms.
+
+Repository: https://github.com/KR8MER/eas-station
+"""
+
+"""
+Unit tests for StreamingToneDetector
+
+Covers EBS two-tone / NWS 1050 Hz start and stop events, chunk-size
+independence, rejection of SAME FSK, and the per-source CPU budget.
+"""
+
+import numpy as np
+import pytest
+
+from app_core.audio.eas_monitor import ContinuousEASMonitor
+from app_core.audio.streaming_tone_detector import StreamingToneDetector
+from app_utils.eas_fsk import (
+    SAME_BAUD,
+    SAME_MARK_FREQ,
+    SAME_SPACE_FREQ,
+    encode_same_bits,
+    generate_fsk_samples,
+)
+
+SAMPLE_RATE = 16000
+
+
+def _noise(seconds: float, level: float = 0.01, seed: int = 1) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return (rng.standard_normal(int(seconds * SAMPLE_RATE)) * level).astype(np.float32)
+
+
+def _tone(freqs, seconds: float, amplitude: float = 0.3) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    signal = sum(amplitude * np.sin(2 * np.pi * f * t) for f in freqs)
+    return signal.astype(np.float32)
+
+
+def _feed(detector: StreamingToneDetector, audio: np.ndarray, chunk: int = 1600):
+    events = []
+    for i in range(0, len(audio), chunk):
+        events.extend(detector.process_samples(audio[i:i + chunk]))
+    return events
+
+
+class TestStreamingToneDetector:
+    """Test suite for StreamingToneDetector."""
+
+    def test_ebs_two_tone_start_and_stop(self):
+        audio = np.concatenate([_noise(1.0), _tone([853.0, 960.0], 2.0), _noise(1.0, seed=2)])
+        detector = StreamingToneDetector(sample_rate=SAMPLE_RATE, source_name="wxr")
+
+        events = _feed(detector, audio)
+
+        assert [(e.tone_type, e.event) for e in events] == [('ebs', 'start'), ('ebs', 'stop')]
+        start, stop = events
+        assert start.source_name == "wxr"
+        assert start.sample_offset == pytest.approx(SAMPLE_RATE, abs=SAMPLE_RATE * 0.1)
+        assert stop.duration_seconds == pytest.approx(2.0, abs=0.15)
+        assert stop.timestamp > start.timestamp
+        assert detector.get_active_tones() == []
+
+    def test_nws_tone_requires_minimum_duration(self):
+        short = np.concatenate([_noise(0.5), _tone([1050.0], 1.0), _noise(1.0, seed=3)])
+        detector = StreamingToneDetector(sample_rate=SAMPLE_RATE)
+        assert _feed(detector, short) == []
+
+        long = np.concatenate([_noise(0.5), _tone([1050.0], 3.0), _noise(1.0, seed=4)])
+        detector = StreamingToneDetector(sample_rate=SAMPLE_RATE)
+        events = _feed(detector, long)
+        assert [(e.tone_type, e.event) for e in events] == [('nws', 'start'), ('nws', 'stop')]
+
+    def test_tone_reported_while_still_on_air(self):
+        detector = StreamingToneDetector(sample_rate=SAMPLE_RATE)
+        events = _feed(detector, np.concatenate([_noise(0.5), _tone([853.0, 960.0], 1.0)]))
+
+        assert [e.event for e in events] == ['start']
+        assert detector.get_active_tones() == ['ebs']
+
+    def test_results_independent_of_chunk_size(self):
+        audio = np.concatenate([_noise(0.5), _tone([1050.0], 2.5), _noise(1.0, seed=5)])
+
+        offsets = []
+        for chunk in (37, 1600, 4096):
+            detector = StreamingToneDetector(sample_rate=SAMPLE_RATE)
+            offsets.append([(e.event, e.sample_offset) for e in _feed(detector, audio, chunk)])
+
+        assert offsets[0] == offsets[1] == offsets[2]
+
+    def test_same_fsk_burst_not_reported(self):
+        bits = encode_same_bits("ZCZC-WXR-TOR-039137+0030-1231200-KR8MER  -", include_preamble=True)
+        fsk = np.asarray(
+            generate_fsk_samples(bits, SAMPLE_RATE, SAME_BAUD, SAME_MARK_FREQ, SAME_SPACE_FREQ, 16000),
+            dtype=np.float32,
+        ) / 32768.0
+        detector = StreamingToneDetector(sample_rate=SAMPLE_RATE)
+
+        assert _feed(detector, np.concatenate([fsk, fsk, fsk])) == []
+
+    def test_reset_clears_state(self):
+        detector = StreamingToneDetector(sample_rate=SAMPLE_RATE)
+        _feed(detector, _tone([853.0, 960.0], 1.0))
+        assert detector.get_active_tones() == ['ebs']
+
+        detector.reset()
+
+        stats = detector.get_stats()
+        assert stats['samples_processed'] == 0
+        assert stats['events_emitted'] == 0
+        assert detector.get_active_tones() == []
+
+    def test_cpu_cost_per_source_is_bounded(self):
+        """Ten minutes of audio must cost a tiny fraction of real time."""
+        detector = StreamingToneDetector(sample_rate=SAMPLE_RATE)
+        chunk = _noise(0.1, level=0.1)
+        for _ in range(6000):
+            detector.process_samples(chunk)
+
+        stats = detector.get_stats()
+        assert stats['windows_analyzed'] == 6000
+        # Measured ~0.2% of one x86 core; allow generous headroom for slow CI
+        # and ARM hosts while still catching an accidental O(n^2) regression.
+        assert stats['cpu_percent_of_realtime'] < 5.0
+
+
+class DummyAudioManager:
+    """Dummy audio manager that reports a fixed source name."""
+    def __init__(self):
+        self.sample_rate = SAMPLE_RATE
+        self.source = "primary"
+
+    def get_active_source(self):
+        return self.source
+
+
+def test_monitor_keeps_tone_state_per_source():
+    manager = DummyAudioManager()
+    received = []
+    monitor = ContinuousEASMonitor(
+        audio_manager=manager,
+        save_audio_files=False,
+        tone_callback=received.append,
+    )
+
+    monitor._get_tone_detector().process_samples(_tone([853.0, 960.0], 1.0))
+    manager.source = "backup"
+    monitor._get_tone_detector().process_samples(_noise(1.0))
+
+    stats = monitor.get_tone_stats()
+    assert set(stats) == {"primary", "backup"}
+    assert stats["backup"]["active_tones"] == []
+    assert monitor.get_status()["recent_tone_events"][0]["tone_type"] == 'ebs'
+
+
+def test_monitor_failover_closes_tone_on_previous_source():
+    manager = DummyAudioManager()
+    received = []
+    monitor = ContinuousEASMonitor(
+        audio_manager=manager,
+        save_audio_files=False,
+        tone_callback=received.append,
+    )
+
+    monitor._get_tone_detector().process_samples(_tone([853.0, 960.0], 1.0))
+    manager.source = "backup"
+    monitor._get_tone_detector().process_samples(_noise(1.0))
+
+    assert [(e.source_name, e.event) for e in received] == [("primary", "start"), ("primary", "stop")]
+    assert received[1].duration_seconds == pytest.approx(1.0, abs=0.15)
+    assert monitor.get_tone_stats()["primary"]["active_tones"] == []
+
+    # Failing back starts a fresh segment rather than resuming the old tone
+    manager.source = "primary"
+    monitor._get_tone_detector().process_samples(_noise(1.0))
+    assert len(received) == 2
+
+
+def test_close_emits_stop_for_open_tone_and_drops_partial_window():
+    detector = StreamingToneDetector(sample_rate=SAMPLE_RATE)
+    _feed(detector, _tone([1050.0], 2.55), chunk=SAMPLE_RATE // 4)
+    assert detector.get_active_tones() == ['nws']
+
+    events = detector.close()
+
+    assert [(e.tone_type, e.event) for e in events] == [('nws', 'stop')]
+    assert detector.get_active_tones() == []
+    assert detector.close() == []
+    assert detector.get_stats()['events_emitted'] == 2
@@ -0,0 +1,187 @@
+"""
+EAS Station - Emergency Alert System
+Copyright (c) 2025 Timothy Kramer (KR8MER)
+
+This file is part of EAS Station.
+
+EAS Station is dual-licensed software:
+- GNU Affero General Public License v3 (AGPL-3.0) for open-source use
+- Commercial License for proprietary use
+
+You should have received a copy of both licenses with this software.
+For more information, see LICENSE and LICENSE-COMMERCIAL files.
+
+IMPORTANT: This software cannot be rebranded or have attribution removed.
+See NOTICE file for complete terms.
+
+Repository: https://github.com/KR8MER/eas-station
+"""
+
+"""Tests for the vector tile endpoint and its cache keys."""
+
+import logging
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from flask import Flask
+from sqlalchemy import MetaData, Text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from werkzeug.datastructures import MultiDict
+
+from app_core import vector_tiles
+from app_core.cache import cache
+from app_core.extensions import db
+from app_core.models import Boundary, CAPAlert
+from app_core.vector_tiles import TileRequest, build_tile_query, simplify_tolerance
+
+NOW = datetime(2025, 3, 10, 12, 0, 30, tzinfo=timezone.utc)
+
+
+@compiles(JSONB, "sqlite")
+def _jsonb_on_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    app = Flask("vector-tiles-test")
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'tiles.db'}",
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+    )
+    db.init_app(app)
+    cache.init_app(app, config={"CACHE_TYPE": "SimpleCache"})
+    monkeypatch.setattr(vector_tiles, "utc_now", lambda: NOW)
+    vector_tiles.invalidate_tile_version()
+
+    with app.app_context():
+        # SQLite has no spatial types here; tile rendering itself is stubbed
+        metadata = MetaData()
+        for model in (Boundary, CAPAlert):
+            table = model.__table__.to_metadata(metadata)
+            for column in table.columns:
+                if column.name == "geom":
+                    column.type = Text()
+        metadata.create_all(bind=db.engine)
+        db.session.execute(Boundary.__table__.insert(), [
+            {"id": 1, "name": "Putnam", "type": "county"},
+            {"id": 2, "name": "Ottawa REC", "type": "electric"},
+        ])
+        db.session.commit()
+        yield app
+        db.session.remove()
+    vector_tiles.invalidate_tile_version()
+
+
+@pytest.fixture
+def rendered(monkeypatch):
+    calls = []
+
+    def _render(tile, now=None):
+        calls.append(tile)
+        return f"tile:{tile.z}/{tile.x}/{tile.y}:{','.join(tile.layers)}".encode("utf-8")
+
+    monkeypatch.setattr(vector_tiles, "render_tile", _render)
+    return calls
+
+
+def _compile(tile):
+    statement, params = build_tile_query(tile, NOW)
+    return str(statement.compile(dialect=postgresql.dialect())), params
+
+
+def test_tile_request_validates_and_normalizes_arguments():
+    tile = TileRequest.from_args(8, 66, 95, MultiDict([
+        ("layers", "alerts, Boundaries"),
+        ("boundary_type", "County,electric"),
+        ("boundary_type", "county"),
+        ("alert_status", "EXPIRED"),
+    ]))
+    assert tile.layers == ("boundaries", "alerts")
+    assert tile.boundary_types == ("county", "electric")
+    assert tile.alert_status == "expired"
+
+    assert TileRequest.from_args(0, 0, 0, {}).layers == ("boundaries", "alerts")
+    for z, x, y, args in (
+        (23, 0, 0, {}),
+        (2, 4, 0, {}),
+        (2, 0, -1, {}),
+        (2, 0, 0, {"layers": "roads"}),
+        (2, 0, 0, {"alert_status": "pending"}),
+    ):
+        with pytest.raises(ValueError):
+            TileRequest.from_args(z, x, y, args)
+
+
+def test_query_simplifies_by_zoom_and_filters_layers():
+    sql, params = _compile(TileRequest(6, 16, 23, layers=("boundaries",), boundary_types=("county",)))
+    assert "ST_AsMVT(boundary_rows, 'boundaries'" in sql
+    assert "alert_rows" not in sql
+    assert "lower(b.type) IN" in sql
+    assert params["boundary_types"] == ["county"]
+    assert params["tolerance"] == pytest.approx(simplify_tolerance(6))
+    # Rows are picked by the buffered envelope, matching the clip box
+    assert "ST_Transform(ST_Expand(ST_TileEnvelope(%(z)s, %(x)s, %(y)s), %(buffer_m)s), 4326)" in sql
+    assert "b.geom && bounds.geom4326" in sql
+    assert simplify_tolerance(7) == pytest.approx(simplify_tolerance(6) / 2)
+
+    sql, params = _compile(TileRequest(6, 16, 23, layers=("alerts",), alert_status="active"))
+    assert "boundary_rows" not in sql
+    assert "a.expires > %(now)s" in sql and "a.status != 'Expired'" in sql
+    assert params["now"] == NOW
+
+    sql, _ = _compile(TileRequest(6, 16, 23, alert_status="all"))
+    assert "a.expires >" not in sql and "a.expires <" in sql  # only the is_expired attribute
+    assert "lower(b.type) IN" not in sql
+
+
+def test_cache_key_tracks_data_version_and_alert_expiry():
+    tile = TileRequest(5, 8, 11)
+    assert tile.cache_key("v1", NOW) == tile.cache_key("v1", NOW + timedelta(seconds=20))
+    assert tile.cache_key("v1", NOW) != tile.cache_key("v1", NOW + timedelta(minutes=1))
+    assert tile.cache_key("v1", NOW) != tile.cache_key("v2", NOW)
+
+    # Boundaries alone do not change with time
+    boundaries = TileRequest(5, 8, 11, layers=("boundaries",))
+    assert boundaries.cache_key("v1", NOW) == boundaries.cache_key("v1", NOW + timedelta(hours=1))
+
+
+def test_tiles_are_cached_until_the_data_changes(app, rendered):
+    tile = TileRequest(9, 133, 190)
+    first, etag = vector_tiles.get_vector_tile(tile)
+    again, same_etag = vector_tiles.get_vector_tile(tile)
+    assert first == again and etag == same_etag
+    assert len(rendered) == 1
+
+    db.session.execute(Boundary.__table__.insert(), [{"id": 3, "name": "Allen", "type": "county"}])
+    db.session.commit()
+    # The version is re-read at most every VERSION_CHECK_SECONDS
+    assert vector_tiles.get_vector_tile(tile)[1] == etag
+    vector_tiles.invalidate_tile_version()
+    assert vector_tiles.get_vector_tile(tile)[1] != etag
+    assert len(rendered) == 2
+
+
+def test_tile_route_serves_conditional_mvt(app, rendered):
+    from webapp.admin import api
+
+    api.register_api_routes(app, logging.getLogger("vector-tiles-test"))
+    client = app.test_client()
+
+    response = client.get("/api/tiles/9/133/190.mvt?layers=boundaries&boundary_type=county")
+    assert response.status_code == 200
+    assert response.mimetype == "application/vnd.mapbox-vector-tile"
+    assert response.data == b"tile:9/133/190:boundaries"
+    assert rendered[0].boundary_types == ("county",)
+
+    not_modified = client.get(
+        "/api/tiles/9/133/190.mvt?layers=boundaries&boundary_type=county",
+        headers={"If-None-Match": response.headers["ETag"]},
+    )
+    assert not_modified.status_code == 304
+    assert len(rendered) == 1
+
+    assert client.get("/api/tiles/3/9/0.mvt").status_code == 400
+    assert client.get("/api/tiles/3/1/0.mvt?alert_status=soon").status_code == 400
@@ -0,0 +1,190 @@
+"""
+EAS Station - Emergency Alert System
+Copyright (c) 2025 Timothy Kramer (KR8MER)
+
+This file is part of EAS Station.
+
+EAS Station is dual-licensed software:
+- GNU Affero General Public License v3 (AGPL-3.0) for open-source use
+- Commercial License for proprietary use
+
+You should have received a copy of both licenses with this software.
+For more information, see LICENSE and LICENSE-COMMERCIAL files.
+
+IMPORTANT: This software cannot be rebranded or have attribution removed.
+See NOTICE file for complete terms.
+
+Repository: https://github.com/KR8MER/eas-station
+"""
+
+"""Tests for the write-behind sink used by high-volume log tables."""
+
+import time
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, create_engine, event, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app_core.write_behind import WriteBehindSink, close_write_behind_sinks, get_write_behind_sink
+
+metadata = MetaData()
+system_log = Table(
+    "system_log", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("level", String(20), nullable=False),
+    Column("message", String(200)),
+    Column("timestamp", DateTime, default=lambda: datetime.now(timezone.utc)),
+)
+poll_history = Table(
+    "poll_history", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("status", String(20)),
+)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'logs.db'}")
+    metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+def _count(engine, table):
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(table)).scalar()
+
+
+def _insert_statements(engine):
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("INSERT"):
+            statements.append(statement)
+
+    return statements
+
+
+def test_rows_are_written_in_batches(engine):
+    statements = _insert_statements(engine)
+    sink = WriteBehindSink(engine, flush_interval=0.2, batch_size=100)
+
+    for index in range(250):
+        assert sink.submit(system_log, {"level": "INFO", "message": f"event {index}"})
+    sink.submit(poll_history, {"status": "SUCCESS"})
+    assert sink.flush(timeout=5)
+
+    assert _count(engine, system_log) == 250
+    assert _count(engine, poll_history) == 1
+    assert len(statements) <= 8  # a handful of multi-row inserts, not 251
+    with engine.connect() as conn:
+        assert conn.execute(select(system_log.c.timestamp).limit(1)).scalar() is not None
+
+    stats = sink.stats()
+    assert (stats["submitted"], stats["written"], stats["dropped"], stats["failed"]) == (251, 251, 0, 0)
+    sink.close()
+
+
+def test_full_queue_drops_instead_of_blocking(engine):
+    sink = WriteBehindSink(engine, max_queue=5)
+    sink._ensure_started = lambda: None  # no worker: the queue only fills
+
+    accepted = [sink.submit(system_log, {"level": "INFO"}) for _ in range(8)]
+    assert accepted == [True] * 5 + [False] * 3
+    assert sink.stats()["dropped"] == 3
+    assert sink.stats()["queue_depth"] == 5
+
+    sink.close()
+    assert _count(engine, system_log) == 5
+    assert sink.submit(system_log, {"level": "INFO"}) is False
+
+
+def test_close_flushes_pending_rows(engine):
+    sink = WriteBehindSink(engine, flush_interval=30)
+    for _ in range(10):
+        sink.submit(system_log, {"level": "WARNING", "message": "shutdown"})
+    sink.close(timeout=5)
+    assert _count(engine, system_log) == 10
+
+
+def test_failing_table_does_not_lose_other_rows(engine):
+    sink = WriteBehindSink(engine, flush_interval=0.1)
+    sink.submit(system_log, {"level": None})  # violates NOT NULL
+    sink.submit(poll_history, {"status": "SUCCESS"})
+    assert sink.flush(timeout=5)
+
+    stats = sink.stats()
+    assert (stats["written"], stats["failed"]) == (1, 1)
+    assert stats["last_error"].startswith("system_log")
+    assert _count(engine, poll_history) == 1
+    sink.close()
+
+
+def test_late_batches_are_counted_as_delayed(engine):
+    sink = WriteBehindSink(engine, delay_warning_seconds=0.05)
+    sink._ensure_started = lambda: None
+    sink.submit(system_log, {"level": "INFO"})
+    time.sleep(0.1)
+    assert sink.flush(timeout=5)
+
+    stats = sink.stats()
+    assert stats["delayed"] == 1
+    assert stats["max_delay_seconds"] >= 0.1
+
+
+def test_shared_sink_per_engine(engine):
+    try:
+        sink = get_write_behind_sink(engine)
+        assert get_write_behind_sink(engine) is sink
+        sink.submit(system_log, {"level": "INFO"})
+    finally:
+        close_write_behind_sinks()
+    assert _count(engine, system_log) == 1
+    assert get_write_behind_sink(engine) is not sink
+    close_write_behind_sinks()
+
+
+def test_batched_throughput_beats_per_row_commits(engine):
+    rows = [{"level": "INFO", "message": f"event {index}"} for index in range(2000)]
+
+    session = sessionmaker(bind=engine)()
+    started = time.perf_counter()
+    for row in rows:
+        session.execute(system_log.insert().values(**row))
+        session.commit()
+    per_row = time.perf_counter() - started
+    session.close()
+
+    sink = WriteBehindSink(engine, flush_interval=0.05)
+    started = time.perf_counter()
+    for row in rows:
+        sink.submit(system_log, row)
+    assert sink.flush(timeout=30)
+    batched = time.perf_counter() - started
+    sink.close()
+
+    assert _count(engine, system_log) == 4000
+    assert batched * 3 < per_row
+
+
+def test_poller_close_leaves_the_shared_sink_running(engine):
+    from poller.cap_poller import CAPPoller
+
+    try:
+        sink = get_write_behind_sink(engine)
+        poller = CAPPoller.__new__(CAPPoller)
+        poller._log_sink = sink
+        poller.led_controller = None
+        sink.submit(poll_history, {"status": "SUCCESS"})
+        poller.close()
+        assert _count(engine, poll_history) == 1
+
+        # Another holder of the same sink (e.g. GPIO activation logging) keeps writing
+        assert get_write_behind_sink(engine) is sink
+        assert sink.submit(system_log, {"level": "INFO", "message": "relay on"})
+        assert sink.flush(timeout=5)
+        assert _count(engine, system_log) == 1
+    finally:
+        close_write_behind_sinks()
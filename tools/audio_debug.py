@@ -86,7 +86,7 @@ class AudioDebugger:
             return False
 
         # Create health monitor
-        health_monitor = AudioHealthMonitor(config.name)
+        health_monitor = AudioHealthMonitor(config.name, sample_rate=config.sample_rate)
         
         # Add alert callback
         def alert_callback(alert):
@@ -151,7 +151,7 @@ class StreamTestHarness:
             "max_http_buffer": max_http_buffer,
             "max_pcm_buffer": max_pcm_buffer,
             "errors": errors,
-            "metadata": source.metrics.metadata or {},
+            "metadata": source.get_metrics_snapshot().metadata or {},
         })
 
 
@@ -56,6 +56,7 @@ from app_core.alerts import (
     get_expired_alerts_query,
     load_alert_plain_text_map,
 )
+from app_core.vector_tiles import TileRequest, get_vector_tile
 from app_utils import is_alert_expired
 from app_utils.pdf_generator import generate_pdf_document
 from app_utils.optimized_parsing import json_loads, json_dumps
@@ -788,6 +789,30 @@ def get_boundaries():
         api_bp.logger.error('Error fetching boundaries: %s', exc, exc_info=True)
         return jsonify({'error': 'Failed to retrieve boundaries'}), 500
 
+@api_bp.route('/api/tiles/<int:z>/<int:x>/<int:y>.mvt')
+def get_map_tile(z, x, y):
+    """Boundary and alert geometry for one map tile as a Mapbox Vector Tile.
+
+    Query parameters: ``layers`` (``boundaries``, ``alerts``),
+    ``boundary_type`` (repeatable) and ``alert_status``
+    (``active``, ``expired`` or ``all``).
+    """
+    try:
+        tile = TileRequest.from_args(z, x, y, request.args)
+    except ValueError as exc:
+        return jsonify({'error': str(exc)}), 400
+
+    try:
+        data, etag = get_vector_tile(tile)
+    except Exception as exc:
+        api_bp.logger.error('Error rendering tile %s/%s/%s: %s', z, x, y, exc, exc_info=True)
+        return jsonify({'error': 'Failed to render tile'}), 500
+
+    response = Response(data, mimetype='application/vnd.mapbox-vector-tile')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'public, max-age=60'
+    return response.make_conditional(request)
+
 @api_bp.route('/api/system_status')
 @cache.cached(timeout=10, key_prefix='system_status')
 def api_system_status():
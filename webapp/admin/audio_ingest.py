@@ -30,7 +30,7 @@ import requests
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple
 
-from flask import Blueprint, Flask, jsonify, render_template, request, current_app, Response, stream_with_context
+from flask import Blueprint, Flask, jsonify, render_template, request, current_app, Response, stream_with_context, url_for
 from sqlalchemy import desc
 from werkzeug.exceptions import BadRequest
 
@@ -46,7 +46,7 @@ from app_core.models import (
 from app_core.audio import AudioIngestController
 from app_core.audio.ingest import AudioSourceConfig, AudioSourceType, AudioSourceStatus
 from app_core.audio.sources import create_audio_source
-from app_core.audio.redis_commands import get_audio_command_publisher
+from app_core.audio.redis_commands import REQUEST_REPLY_TIMEOUT, get_audio_command_publisher
 from app_core.audio.mount_points import generate_mount_point, StreamFormat
 from app_utils import utc_now
 
@@ -323,6 +323,8 @@ def _initialize_auto_streaming() -> None:
                 icecast_admin_user=auto_config.admin_user,
                 icecast_admin_password=auto_config.admin_password,
                 default_bitrate=128,
+                low_latency=auto_config.low_latency,
+                max_latency_ms=auto_config.max_latency_ms,
                 enabled=True,
                 audio_controller=controller
             )
@@ -376,6 +378,8 @@ def _reload_auto_streaming_from_env() -> None:
                 icecast_admin_user=auto_config.admin_user,
                 icecast_admin_password=auto_config.admin_password,
                 default_bitrate=128,
+                low_latency=auto_config.low_latency,
+                max_latency_ms=auto_config.max_latency_ms,
                 enabled=True,
                 audio_controller=controller
             )
@@ -609,16 +613,20 @@ def remove_radio_managed_audio_source(
         return False
 
     # Notify sdr-service to remove the source via Redis
+    removed_remotely = False
     try:
         publisher = get_audio_command_publisher()
-        result = publisher.delete_source(source_name)
+        result = publisher.delete_source(source_name, timeout=REQUEST_REPLY_TIMEOUT)
         if result.get('success'):
+            removed_remotely = True
             logger.info(f"Sent source_delete command to sdr-service for {source_name}")
         else:
-            logger.warning(f"Failed to send source_delete to sdr-service: {result.get('message')}")
+            logger.warning(f"sdr-service did not confirm source_delete for {source_name}: {result.get('message')}")
     except Exception as exc:
         logger.warning('Failed to notify sdr-service about removing %s: %s', source_name, exc)
-        # Fall back to local controller if Redis communication fails
+
+    if not removed_remotely:
+        # Fall back to local controller if sdr-service failed or did not reply in time
         controller = _audio_controller
         if controller and source_name in controller._sources:
             controller.remove_source(source_name)
@@ -779,15 +787,21 @@ def ensure_sdr_audio_monitor_source(
                 'device_params': device_params,
             }
             
-            # Send add_source command (sdr-service will create adapter and start it)
-            result = publisher.add_source(source_config)
-            if result.get('success'):
+            # Send add_source then source_start; both share one reply budget so the
+            # request never waits longer than REQUEST_REPLY_TIMEOUT
+            deadline = time.monotonic() + REQUEST_REPLY_TIMEOUT
+            result = publisher.add_source(source_config, timeout=REQUEST_REPLY_TIMEOUT)
+            if result.get('success') or result.get('timed_out'):
                 logger.info(f"Sent source_add command to sdr-service for {source_name}")
-                # Also send start command to ensure it starts
-                start_result = publisher.start_source(source_name)
+                # The stream is consumed in order, so a queued start runs after the add
+                start_result = publisher.start_source(
+                    source_name, timeout=max(0.0, deadline - time.monotonic())
+                )
                 if start_result.get('success'):
                     started = True
                     logger.info(f"Sent source_start command to sdr-service for {source_name}")
+                elif start_result.get('timed_out'):
+                    logger.info(f"source_start for {source_name} is still queued on sdr-service")
                 else:
                     logger.warning(f"Failed to send source_start to sdr-service: {start_result.get('message')}")
             else:
@@ -822,15 +836,15 @@ def ensure_sdr_audio_monitor_source(
                 )
 
                 adapter = create_audio_source(runtime_config)
-                metadata = adapter.metrics.metadata or {}
-                metadata.update({k: v for k, v in _base_radio_metadata(receiver, source_name).items() if v is not None})
-                metadata.setdefault('carrier_present', None)
-                metadata.setdefault('squelch_state', 'open' if not squelch_enabled else 'pending')
-                metadata.setdefault('squelch_last_rms_db', None)
-                metadata.setdefault('carrier_alarm', False)
-                metadata.setdefault('rbds_program_type_name', None)
-                metadata.setdefault('rbds_last_updated', None)
-                adapter.metrics.metadata = metadata
+                with adapter.metrics_write() as metrics:
+                    metadata = metrics.metadata
+                    metadata.update({k: v for k, v in _base_radio_metadata(receiver, source_name).items() if v is not None})
+                    metadata.setdefault('carrier_present', None)
+                    metadata.setdefault('squelch_state', 'open' if not squelch_enabled else 'pending')
+                    metadata.setdefault('squelch_last_rms_db', None)
+                    metadata.setdefault('carrier_alarm', False)
+                    metadata.setdefault('rbds_program_type_name', None)
+                    metadata.setdefault('rbds_last_updated', None)
                 controller.add_source(adapter)
 
                 started = controller.start_source(source_name)
@@ -946,14 +960,13 @@ def _restore_audio_source_from_db_config(
 
     adapter = create_audio_source(runtime_config)
 
-    metadata = adapter.metrics.metadata or {}
     device_params = config_params.get('device_params')
     if isinstance(device_params, dict):
-        for key, value in device_params.items():
-            if value is None:
-                continue
-            metadata.setdefault(str(key), value)
-    adapter.metrics.metadata = metadata
+        with adapter.metrics_write() as metrics:
+            for key, value in device_params.items():
+                if value is None:
+                    continue
+                metrics.metadata.setdefault(str(key), value)
 
     controller.add_source(adapter)
 
@@ -1077,9 +1090,11 @@ def _serialize_audio_source(
 
     # Check if Icecast streaming is available for this source
     icecast_url = _get_icecast_stream_url(source_name)
+    # One consistent copy; the capture thread keeps updating adapter.metrics
+    live_metrics = adapter.get_metrics_snapshot()
 
     metadata = _merge_metadata(
-        adapter.metrics.metadata if adapter.metrics else None,
+        live_metrics.metadata,
         latest_metric.source_metadata if latest_metric else None,
         {
             'stream_url': icecast_url,
@@ -1104,16 +1119,16 @@ def _serialize_audio_source(
     } if icecast_stats else None
 
     metrics_payload = None
-    if adapter.metrics:
+    if live_metrics:
         metrics_payload = {
-            'timestamp': adapter.metrics.timestamp,
-            'peak_level_db': _sanitize_float(adapter.metrics.peak_level_db),
-            'rms_level_db': _sanitize_float(adapter.metrics.rms_level_db),
-            'sample_rate': adapter.metrics.sample_rate,
-            'channels': adapter.metrics.channels,
-            'frames_captured': adapter.metrics.frames_captured,
-            'silence_detected': _sanitize_bool(adapter.metrics.silence_detected),
-            'buffer_utilization': _sanitize_float(adapter.metrics.buffer_utilization),
+            'timestamp': live_metrics.timestamp,
+            'peak_level_db': _sanitize_float(live_metrics.peak_level_db),
+            'rms_level_db': _sanitize_float(live_metrics.rms_level_db),
+            'sample_rate': live_metrics.sample_rate,
+            'channels': live_metrics.channels,
+            'frames_captured': live_metrics.frames_captured,
+            'silence_detected': _sanitize_bool(live_metrics.silence_detected),
+            'buffer_utilization': _sanitize_float(live_metrics.buffer_utilization),
             'metadata': metadata,
         }
     elif latest_metric:
@@ -1739,20 +1754,28 @@ def api_start_audio_source(source_name: str):
         # Publish command to audio-service via Redis
         try:
             publisher = get_audio_command_publisher()
-            result = publisher.start_source(source_name)
+            result = publisher.start_source(source_name, timeout=REQUEST_REPLY_TIMEOUT)
 
             if result['success']:
-                logger.info('Published start command for audio source: %s', source_name)
+                logger.info('audio-service ran start command for audio source: %s', source_name)
                 return jsonify({
-                    'message': f'Start command sent to audio-service for source: {source_name}',
-                    'command_id': result.get('command_id')
+                    'message': result.get('message'),
+                    'command_id': result.get('command_id'),
+                    'latency_ms': result.get('latency_ms'),
                 })
+            elif result.get('timed_out'):
+                logger.info('Start command for %s still queued on audio-service', source_name)
+                return jsonify({
+                    'message': f'Start command for {source_name} queued',
+                    'command_id': result.get('command_id'),
+                    'status_url': url_for('audio_ingest.api_audio_command_status', command_id=result.get('command_id')),
+                }), 202
             else:
-                logger.error('Failed to publish start command: %s', result.get('message'))
+                logger.error('Start command failed: %s', result.get('message'))
                 return jsonify({'error': result.get('message')}), 500
 
         except Exception as e:
-            logger.error('Redis Pub/Sub unavailable, cannot send start command: %s', e)
+            logger.error('Redis unavailable, cannot send start command: %s', e)
             return jsonify({
                 'error': 'Audio service communication unavailable',
                 'hint': 'Check Redis connection and audio-service container status'
@@ -1781,20 +1804,28 @@ def api_stop_audio_source(source_name: str):
         # Publish command to audio-service via Redis
         try:
             publisher = get_audio_command_publisher()
-            result = publisher.stop_source(source_name)
+            result = publisher.stop_source(source_name, timeout=REQUEST_REPLY_TIMEOUT)
 
             if result['success']:
-                logger.info('Published stop command for audio source: %s', source_name)
+                logger.info('audio-service ran stop command for audio source: %s', source_name)
                 return jsonify({
-                    'message': f'Stop command sent to audio-service for source: {source_name}',
-                    'command_id': result.get('command_id')
+                    'message': result.get('message'),
+                    'command_id': result.get('command_id'),
+                    'latency_ms': result.get('latency_ms'),
                 })
+            elif result.get('timed_out'):
+                logger.info('Stop command for %s still queued on audio-service', source_name)
+                return jsonify({
+                    'message': f'Stop command for {source_name} queued',
+                    'command_id': result.get('command_id'),
+                    'status_url': url_for('audio_ingest.api_audio_command_status', command_id=result.get('command_id')),
+                }), 202
             else:
-                logger.error('Failed to publish stop command: %s', result.get('message'))
+                logger.error('Stop command failed: %s', result.get('message'))
                 return jsonify({'error': result.get('message')}), 500
 
         except Exception as e:
-            logger.error('Redis Pub/Sub unavailable, cannot send stop command: %s', e)
+            logger.error('Redis unavailable, cannot send stop command: %s', e)
             return jsonify({
                 'error': 'Audio service communication unavailable',
                 'hint': 'Check Redis connection and audio-service container status'
@@ -1804,6 +1835,21 @@ def api_stop_audio_source(source_name: str):
         logger.error('Error stopping audio source %s: %s', source_name, exc)
         return jsonify({'error': str(exc)}), 500
 
+@audio_ingest_bp.route('/api/audio/commands/<command_id>', methods=['GET'])
+def api_audio_command_status(command_id: str):
+    """Result of a queued audio-service command (202 while it has not run yet)."""
+    try:
+        reply = get_audio_command_publisher().get_reply(command_id)
+    except Exception as e:
+        logger.error('Redis unavailable, cannot read command %s: %s', command_id, e)
+        return jsonify({'error': 'Audio service communication unavailable'}), 503
+
+    if reply is None:
+        return jsonify({'command_id': command_id, 'status': 'pending'}), 202
+    reply['command_id'] = command_id
+    reply['status'] = 'completed'
+    return jsonify(reply), 200 if reply.get('success') else 500
+
 @audio_ingest_bp.route('/api/audio/metrics', methods=['GET'])
 def api_get_audio_metrics():
     """Get real-time metrics for all audio sources."""
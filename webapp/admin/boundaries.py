@@ -21,9 +21,10 @@ from __future__ import annotations
 
 """Administrative routes and helpers for managing boundary data."""
 
+import tempfile
 from typing import Any, Dict, Iterable, List, Optional, Set
 
-from flask import Blueprint, Flask, current_app, jsonify, request
+from flask import Blueprint, Flask, current_app, jsonify, request, url_for
 from sqlalchemy import func, text
 
 from app_core.boundaries import (
@@ -36,6 +37,8 @@ from app_core.boundaries import (
     get_field_mappings,
     normalize_boundary_type,
 )
+from app_core.boundary_import import BoundaryImportJob, insert_boundary_features, start_boundary_import
+from app_core.dashboard_stats import invalidate_dashboard_stats
 from app_core.extensions import db
 from app_core.models import Boundary, SystemLog
 from app_utils import (
@@ -44,7 +47,7 @@ from app_utils import (
     local_now,
     utc_now,
 )
-from app_utils.optimized_parsing import json_loads, json_dumps, JSONDecodeError
+from app_utils.optimized_parsing import json_loads, JSONDecodeError
 
 # Create Blueprint for boundary routes
 boundaries_bp = Blueprint('boundaries', __name__)
@@ -495,7 +498,11 @@ def preview_geojson():
 
 @boundaries_bp.route("/admin/upload_boundaries", methods=["POST"])
 def upload_boundaries():
-    """Upload GeoJSON boundary file with enhanced processing."""
+    """Start a background import of a GeoJSON boundary file.
+
+    Returns 202 with a job handle at once; poll ``status_url`` for progress
+    and the result.
+    """
 
     try:
         if "file" not in request.files:
@@ -512,79 +519,50 @@ def upload_boundaries():
         if not file.filename.lower().endswith(".geojson"):
             return jsonify({"error": "File must be a GeoJSON file"}), 400
 
-        try:
-            geojson_data = json_loads(file.read().decode("utf-8"))
-        except JSONDecodeError:
-            return jsonify({"error": "Invalid GeoJSON format"}), 400
-
-        features = geojson_data.get("features", [])
-        boundaries_added = 0
-        errors: List[str] = []
-
-        for i, feature in enumerate(features):
-            try:
-                properties = feature.get("properties", {}) or {}
-                geometry = feature.get("geometry")
-
-                if not geometry:
-                    errors.append(f"Feature {i + 1}: No geometry")
-                    continue
-
-                name, description = extract_name_and_description(
-                    properties, boundary_type
-                )
-
-                geometry_json = json_dumps(geometry)
-
-                boundary = Boundary(
-                    name=name,
-                    type=boundary_type,
-                    description=description,
-                    created_at=utc_now(),
-                    updated_at=utc_now(),
-                )
-
-                boundary.geom = db.session.execute(
-                    text("SELECT ST_SetSRID(ST_GeomFromGeoJSON(:geom), 4326)"),
-                    {"geom": geometry_json},
-                ).scalar()
-
-                db.session.add(boundary)
-                boundaries_added += 1
-
-            except Exception as exc:  # pragma: no cover - defensive
-                errors.append(f"Feature {i + 1}: {exc}")
+        # Stream the upload to disk; the import reads it back feature by feature
+        with tempfile.NamedTemporaryFile(suffix=".geojson", delete=False) as temp_file:
+            file.save(temp_file)
+            temp_path = temp_file.name
 
         try:
-            db.session.commit()
-            current_app.logger.info(
-                "Successfully uploaded %s %s boundaries",
-                boundaries_added,
+            job = start_boundary_import(
+                current_app._get_current_object(),
+                temp_path,
+                boundary_type,
                 boundary_label,
+                file.filename,
             )
-        except Exception as exc:  # pragma: no cover - defensive
-            db.session.rollback()
-            return jsonify({"error": f"Database error: {exc}"}), 500
-
-        response_data = {
-            "success": (
-                f"Successfully uploaded {boundaries_added} {boundary_label} boundaries"
+        except RuntimeError as exc:  # pragma: no cover - defensive
+            current_app.logger.error("Failed to start boundary import: %s", exc)
+            return jsonify({"error": "Unable to start the import. Please try again."}), 500
+
+        return (
+            jsonify(
+                {
+                    "status": "accepted",
+                    "job_id": job.job_id,
+                    "status_url": url_for(
+                        "boundaries.boundary_import_status", job_id=job.job_id
+                    ),
+                    "normalized_type": boundary_type,
+                    "display_label": boundary_label,
+                }
             ),
-            "boundaries_added": boundaries_added,
-            "total_features": len(features),
-            "errors": errors[:10] if errors else [],
-            "normalized_type": boundary_type,
-            "display_label": boundary_label,
-        }
-
-        if errors:
-            response_data["warning"] = f"{len(errors)} features had errors"
-
-        return jsonify(response_data)
+            202,
+        )
     except Exception as exc:  # pragma: no cover - defensive
         current_app.logger.error("Error uploading boundaries: %s", exc)
         return jsonify({"error": f"Upload failed: {exc}"}), 500
 
+@boundaries_bp.route("/admin/boundary_imports/<job_id>", methods=["GET"])
+def boundary_import_status(job_id: str):
+    """Progress and result of a boundary import started by ``upload_boundaries``."""
+
+    job = BoundaryImportJob.load(job_id)
+    if job is None:
+        return jsonify({"error": "Import job not found"}), 404
+    return jsonify(job.to_dict())
+
 @boundaries_bp.route("/admin/list_shapefiles", methods=["GET"])
 def list_shapefiles():
     """List available shapefiles in the server directory."""
@@ -708,56 +686,24 @@ def upload_shapefile():
                 "error": "Either file upload or shapefile_path must be provided"
             }), 400
 
-        # Now process the GeoJSON using existing logic
+        # Now process the GeoJSON using the batched importer
         features = geojson_data.get("features", [])
-        boundaries_added = 0
-        errors: List[str] = []
-
-        for i, feature in enumerate(features):
-            try:
-                properties = feature.get("properties", {}) or {}
-                geometry = feature.get("geometry")
-
-                if not geometry:
-                    errors.append(f"Feature {i + 1}: No geometry")
-                    continue
-
-                name, description = extract_name_and_description(
-                    properties, boundary_type
-                )
-
-                geometry_json = json_dumps(geometry)
-
-                boundary = Boundary(
-                    name=name,
-                    type=boundary_type,
-                    description=description,
-                    created_at=utc_now(),
-                    updated_at=utc_now(),
-                )
-
-                boundary.geom = db.session.execute(
-                    text("SELECT ST_SetSRID(ST_GeomFromGeoJSON(:geom), 4326)"),
-                    {"geom": geometry_json},
-                ).scalar()
-
-                db.session.add(boundary)
-                boundaries_added += 1
-
-            except Exception as exc:
-                errors.append(f"Feature {i + 1}: {exc}")
 
         try:
+            stats = insert_boundary_features(features, boundary_type)
             db.session.commit()
             current_app.logger.info(
                 "Successfully uploaded %s %s boundaries from shapefile",
-                boundaries_added,
+                stats.boundaries_added,
                 boundary_label,
             )
         except Exception as exc:
             db.session.rollback()
             return jsonify({"error": f"Database error: {exc}"}), 500
 
+        boundaries_added = stats.boundaries_added
+        errors = stats.errors
+
         response_data = {
             "success": (
                 f"Successfully uploaded {boundaries_added} {boundary_label} "
@@ -770,8 +716,8 @@ def upload_shapefile():
             "display_label": boundary_label,
         }
 
-        if errors:
-            response_data["warning"] = f"{len(errors)} features had errors"
+        if stats.error_count:
+            response_data["warning"] = f"{stats.error_count} features had errors"
 
         return jsonify(response_data)
 
@@ -819,6 +765,7 @@ def clear_boundaries(boundary_type: str):
         )
         db.session.add(log_entry)
         db.session.commit()
+        invalidate_dashboard_stats()
 
         return jsonify({"success": message, "deleted_count": deleted_count})
     except Exception as exc:  # pragma: no cover - defensive
@@ -869,6 +816,7 @@ def clear_all_boundaries():
         )
         db.session.add(log_entry)
         db.session.commit()
+        invalidate_dashboard_stats()
 
         return jsonify({"success": "All boundaries cleared", "deleted_count": deleted_count})
     except Exception as exc:  # pragma: no cover - defensive
@@ -29,6 +29,7 @@ from flask import Flask, jsonify
 from sqlalchemy import func
 
 from app_core.alerts import calculate_alert_intersections, get_active_alerts_query
+from app_core.dashboard_stats import invalidate_dashboard_stats
 from app_core.extensions import db
 from app_core.models import Boundary, CAPAlert, Intersection, SystemLog
 from app_utils import utc_now
@@ -88,6 +89,7 @@ def fix_county_intersections():
                 total_updated += 1
 
         db.session.commit()
+        invalidate_dashboard_stats()
 
         return jsonify(
             {
@@ -138,6 +140,7 @@ def recalculate_intersections():
                 )
 
         db.session.commit()
+        invalidate_dashboard_stats()
 
         message = (
             "Recalculated intersections for {alerts_processed} alerts, created "
@@ -212,6 +215,7 @@ def calculate_intersections_for_alert(alert_id: int):
                     intersections_with_area += 1
 
         db.session.commit()
+        invalidate_dashboard_stats()
 
         return jsonify(
             {
@@ -294,6 +298,7 @@ def calculate_all_intersections():
         )
         db.session.add(log_entry)
         db.session.commit()
+        invalidate_dashboard_stats()
 
         return jsonify(
             {
@@ -370,6 +375,7 @@ def calculate_single_alert(alert_id: int):
                 current_app.logger.warning(error_msg)
 
         db.session.commit()
+        invalidate_dashboard_stats()
 
         return jsonify(
             {
@@ -40,6 +40,7 @@ from app_core.alerts import (
     calculate_alert_intersections,
     parse_noaa_cap_alert,
 )
+from app_core.dashboard_stats import invalidate_dashboard_stats
 from app_core.extensions import db
 from app_core.led import ensure_led_tables
 from app_core.location import (
@@ -1175,6 +1176,7 @@ def admin_alert_detail(alert_id: int):
             )
             db.session.add(log_entry)
             db.session.commit()
+            invalidate_dashboard_stats()
 
             current_app.logger.info("Admin deleted alert %s (%s)", identifier, alert_id)
             return jsonify(
@@ -1280,6 +1282,7 @@ def admin_alert_detail(alert_id: int):
         )
         db.session.add(log_entry)
         db.session.commit()
+        invalidate_dashboard_stats()
 
         current_app.logger.info(
             "Admin updated alert %s fields: %s",
@@ -228,8 +228,8 @@ def register_eas_monitor_routes(app: Flask, logger_instance) -> None:
 
         POST body: {"action": "start" or "stop"}
 
-        In separated architecture, this sends a command to audio-service via Redis
-        Pub/Sub to control the EAS monitor running there.
+        In separated architecture, this sends a command to audio-service via the
+        Redis Streams command channel and returns the result it reports.
         """
         try:
             payload = request.get_json() or {}
@@ -241,42 +241,50 @@ def register_eas_monitor_routes(app: Flask, logger_instance) -> None:
                     "error": "Invalid action. Must be 'start' or 'stop'"
                 }), 400
 
-            # Send command to audio-service via Redis Pub/Sub
-            from app_core.audio.redis_commands import get_audio_command_publisher
+            # Send command to audio-service via Redis Streams and wait for its reply
+            from app_core.audio.redis_commands import REQUEST_REPLY_TIMEOUT, get_audio_command_publisher
 
             try:
                 publisher = get_audio_command_publisher()
 
                 if action == "start":
-                    result = publisher.start_eas_monitor()
+                    result = publisher.start_eas_monitor(timeout=REQUEST_REPLY_TIMEOUT)
                     if result.get('success'):
                         return jsonify({
                             "success": True,
                             "action": "start",
-                            "message": "EAS monitor start command sent to audio-service",
-                            "command_id": result.get('command_id')
+                            "message": result.get('message'),
+                            "command_id": result.get('command_id'),
+                            "latency_ms": result.get('latency_ms'),
                         })
                     else:
                         return jsonify({
                             "success": False,
                             "action": "start",
-                            "message": result.get('message', 'Failed to send start command')
-                        }), 500
+                            "message": result.get('message', 'Failed to send start command'),
+                            "command_id": result.get('command_id'),
+                            "pending": bool(result.get('timed_out')),
+                            "status_url": f"/api/audio/commands/{result.get('command_id')}",
+                        }), 202 if result.get('timed_out') else 500
                 else:  # stop
-                    result = publisher.stop_eas_monitor()
+                    result = publisher.stop_eas_monitor(timeout=REQUEST_REPLY_TIMEOUT)
                     if result.get('success'):
                         return jsonify({
                             "success": True,
                             "action": "stop",
-                            "message": "EAS monitor stop command sent to audio-service",
-                            "command_id": result.get('command_id')
+                            "message": result.get('message'),
+                            "command_id": result.get('command_id'),
+                            "latency_ms": result.get('latency_ms'),
                         })
                     else:
                         return jsonify({
                             "success": False,
                             "action": "stop",
-                            "message": result.get('message', 'Failed to send stop command')
-                        }), 500
+                            "message": result.get('message', 'Failed to send stop command'),
+                            "command_id": result.get('command_id'),
+                            "pending": bool(result.get('timed_out')),
+                            "status_url": f"/api/audio/commands/{result.get('command_id')}",
+                        }), 202 if result.get('timed_out') else 500
 
             except Exception as redis_error:
                 logger.error(f"Redis communication failed: {redis_error}")
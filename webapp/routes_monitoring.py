@@ -21,6 +21,7 @@ from __future__ import annotations
 
 """Public monitoring and utility endpoints for the Flask app."""
 
+import json
 import os
 import shutil
 import subprocess
@@ -38,6 +39,7 @@ from app_core.models import RadioReceiver
 from app_core.radio import ensure_radio_tables
 from app_core.led import LED_AVAILABLE
 from app_core.location import get_location_settings
+from app_core.audio.latency_metrics import get_latency_registry, merge_snapshots, render_prometheus
 from app_utils import get_location_timezone_name, local_now, utc_now
 from app_utils.versioning import get_git_metadata, get_git_tree_state
 
@@ -514,5 +516,28 @@ def register(app: Flask, logger) -> None:
 
         return jsonify({"receivers": payload, "count": len(payload)})
 
+    @app.route("/metrics")
+    def prometheus_metrics():
+        """Per-stage pipeline latency histograms in Prometheus text format.
+
+        Merges this process's histograms with the snapshot the audio service
+        publishes in the ``eas:metrics`` Redis hash.
+        """
+
+        snapshots = [get_latency_registry().snapshot()]
+        try:
+            from app_core.redis_client import get_redis_client
+
+            raw = get_redis_client().hget("eas:metrics", "latency_histograms")
+            if raw:
+                if isinstance(raw, bytes):
+                    raw = raw.decode("utf-8")
+                snapshots.append(json.loads(raw))
+        except Exception as exc:
+            route_logger.debug("Audio service latency histograms unavailable: %s", exc)
+
+        body = render_prometheus(merge_snapshots(snapshots))
+        return body, 200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+
 
 __all__ = ["register"]
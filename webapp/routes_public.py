@@ -22,27 +22,29 @@ from __future__ import annotations
 """Public-facing Flask routes extracted from the historical app module."""
 
 import json
-from collections import defaultdict
 from html import escape
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
-from flask import Flask, render_template, request, url_for, Response
-from sqlalchemy import func, or_
+from flask import Flask, Response, make_response, render_template, request, session, url_for
+from sqlalchemy import or_
 
-from app_core.alerts import get_active_alerts_query, get_expired_alerts_query
+from app_core.alert_pagination import count_alerts, paginate_keyset
+from app_core.dashboard_stats import (
+    dashboard_etag,
+    empty_dashboard_stats,
+    get_dashboard_stats_snapshot,
+)
 from app_core.eas_storage import get_eas_static_prefix, format_local_datetime
 from app_core.extensions import db
 from app_core.models import (
     AudioAlert,
     AudioHealthStatus,
     AudioSourceMetrics,
-    Boundary,
     CAPAlert,
     EASDecodedAudio,
     EASMessage,
     GPIOActivationLog,
-    Intersection,
     ManualEASActivation,
     PollDebugRecord,
     PollHistory,
@@ -175,417 +177,29 @@ def register(app: Flask, logger) -> None:
     @app.route("/stats")
     def stats():
         try:
-            stats_data: Dict[str, Any] = {}
-
-            try:
-                stats_data.update(
-                    {
-                        "total_boundaries": Boundary.query.count(),
-                        "total_alerts": CAPAlert.query.count(),
-                        "active_alerts": get_active_alerts_query().count(),
-                        "expired_alerts": get_expired_alerts_query().count(),
-                    }
-                )
-            except Exception as exc:
-                db.session.rollback()
-                route_logger.error("Error getting basic counts: %s", exc)
-                stats_data.update(
-                    {
-                        "total_boundaries": 0,
-                        "total_alerts": 0,
-                        "active_alerts": 0,
-                        "expired_alerts": 0,
-                    }
-                )
-
-            try:
-                boundary_stats = (
-                    db.session.query(
-                        Boundary.type, func.count(Boundary.id).label("count")
-                    )
-                    .group_by(Boundary.type)
-                    .all()
-                )
-                stats_data["boundary_stats"] = [
-                    {"type": boundary_type, "count": count}
-                    for boundary_type, count in boundary_stats
-                ]
-            except Exception as exc:
-                db.session.rollback()
-                route_logger.error("Error getting boundary stats: %s", exc)
-                stats_data["boundary_stats"] = []
-
-            try:
-                alert_by_status = (
-                    db.session.query(
-                        CAPAlert.status, func.count(CAPAlert.id).label("count")
-                    )
-                    .group_by(CAPAlert.status)
-                    .all()
-                )
-                stats_data["alert_by_status"] = [
-                    {"status": status, "count": count}
-                    for status, count in alert_by_status
-                ]
-
-                alert_by_severity = (
-                    db.session.query(
-                        CAPAlert.severity, func.count(CAPAlert.id).label("count")
-                    )
-                    .filter(CAPAlert.severity.isnot(None))
-                    .group_by(CAPAlert.severity)
-                    .all()
-                )
-                stats_data["alert_by_severity"] = [
-                    {"severity": severity, "count": count}
-                    for severity, count in alert_by_severity
-                ]
-
-                alert_by_event = (
-                    db.session.query(
-                        CAPAlert.event, func.count(CAPAlert.id).label("count")
-                    )
-                    .group_by(CAPAlert.event)
-                    .order_by(func.count(CAPAlert.id).desc())
-                    .limit(10)
-                    .all()
-                )
-                stats_data["alert_by_event"] = [
-                    {"event": event, "count": count}
-                    for event, count in alert_by_event
-                ]
-            except Exception as exc:
-                db.session.rollback()
-                route_logger.error("Error getting alert category stats: %s", exc)
-                stats_data.update(
-                    {
-                        "alert_by_status": [],
-                        "alert_by_severity": [],
-                        "alert_by_event": [],
-                    }
-                )
-
-            try:
-                alert_by_hour = (
-                    db.session.query(
-                        func.extract("hour", CAPAlert.sent).label("hour"),
-                        func.count(CAPAlert.id).label("count"),
-                    )
-                    .group_by(func.extract("hour", CAPAlert.sent))
-                    .all()
-                )
-
-                hourly_data = [0] * 24
-                for hour, count in alert_by_hour:
-                    if hour is not None:
-                        hourly_data[int(hour)] = count
-                stats_data["alert_by_hour"] = hourly_data
-
-                alert_by_dow = (
-                    db.session.query(
-                        func.extract("dow", CAPAlert.sent).label("dow"),
-                        func.count(CAPAlert.id).label("count"),
-                    )
-                    .group_by(func.extract("dow", CAPAlert.sent))
-                    .all()
-                )
-
-                dow_data = [0] * 7
-                for dow, count in alert_by_dow:
-                    if dow is not None:
-                        dow_data[int(dow)] = count
-                stats_data["alert_by_dow"] = dow_data
-
-                alert_by_month = (
-                    db.session.query(
-                        func.extract("month", CAPAlert.sent).label("month"),
-                        func.count(CAPAlert.id).label("count"),
-                    )
-                    .group_by(func.extract("month", CAPAlert.sent))
-                    .all()
-                )
-
-                monthly_data = [0] * 12
-                for month, count in alert_by_month:
-                    if month is not None:
-                        monthly_data[int(month) - 1] = count
-                stats_data["alert_by_month"] = monthly_data
-
-                alert_by_year = (
-                    db.session.query(
-                        func.extract("year", CAPAlert.sent).label("year"),
-                        func.count(CAPAlert.id).label("count"),
-                    )
-                    .group_by(func.extract("year", CAPAlert.sent))
-                    .order_by(func.extract("year", CAPAlert.sent))
-                    .all()
-                )
-                stats_data["alert_by_year"] = [
-                    {"year": int(year), "count": count}
-                    for year, count in alert_by_year
-                    if year
-                ]
-            except Exception as exc:
-                db.session.rollback()
-                route_logger.error("Error getting time-based stats: %s", exc)
-                stats_data.update(
-                    {
-                        "alert_by_hour": [0] * 24,
-                        "alert_by_dow": [0] * 7,
-                        "alert_by_month": [0] * 12,
-                        "alert_by_year": [],
-                    }
-                )
-
+            snapshot = get_dashboard_stats_snapshot()
             try:
-                most_affected = (
-                    db.session.query(
-                        Boundary.name,
-                        Boundary.type,
-                        func.count(Intersection.id).label("alert_count"),
-                    )
-                    .join(Intersection, Boundary.id == Intersection.boundary_id)
-                    .group_by(Boundary.id, Boundary.name, Boundary.type)
-                    .order_by(func.count(Intersection.id).desc())
-                    .limit(10)
-                    .all()
-                )
-                stats_data["most_affected_boundaries"] = [
-                    {"name": name, "type": b_type, "count": count}
-                    for name, b_type, count in most_affected
-                ]
+                snapshot_etag = snapshot.etag()
+                # The page also shows the viewer's navigation and CSRF token
+                etag = dashboard_etag(snapshot_etag, sorted(session.items()))
+                if etag in request.if_none_match:
+                    response = make_response("", 304)
+                    response.set_etag(etag)
+                    response.headers["Cache-Control"] = "private, no-cache"
+                    return response
+                stats_data = snapshot.get()
             except Exception as exc:
                 db.session.rollback()
-                route_logger.error("Error getting affected boundaries: %s", exc)
-                stats_data["most_affected_boundaries"] = []
-
-            try:
-                durations = (
-                    db.session.query(
-                        CAPAlert.event,
-                        (
-                            func.extract("epoch", CAPAlert.expires)
-                            - func.extract("epoch", CAPAlert.sent)
-                        ).label("duration_seconds"),
-                    )
-                    .filter(
-                        CAPAlert.expires.isnot(None),
-                        CAPAlert.sent.isnot(None),
-                    )
-                    .all()
-                )
-
-                duration_by_event: Dict[str, List[float]] = defaultdict(list)
-                for event, duration in durations:
-                    if duration and duration > 0:
-                        duration_by_event[event].append(duration / 3600)
-
-                stats_data["duration_stats"] = [
-                    {
-                        "event": event,
-                        "count": len(values),
-                        "average": round(sum(values) / len(values), 2) if values else 0,
-                        "minimum": round(min(values), 2) if values else 0,
-                        "maximum": round(max(values), 2) if values else 0,
-                    }
-                    for event, values in sorted(
-                        duration_by_event.items(), key=lambda item: sum(item[1]), reverse=True
-                    )
-                ]
-            except Exception as exc:
-                db.session.rollback()
-                route_logger.error("Error calculating duration stats: %s", exc)
-                stats_data["duration_stats"] = []
-
-            try:
-                recent_alerts = (
-                    db.session.query(
-                        CAPAlert.id,
-                        CAPAlert.identifier,
-                        CAPAlert.sent,
-                        CAPAlert.expires,
-                        CAPAlert.severity,
-                        CAPAlert.status,
-                        CAPAlert.event,
-                        CAPAlert.source,
-                    )
-                    .order_by(CAPAlert.sent.desc())
-                    .limit(2500)
-                    .all()
-                )
-
-                severities: set[str] = set()
-                statuses: set[str] = set()
-                events: set[str] = set()
-                daily_totals: Dict[str, int] = defaultdict(int)
-                hourly_matrix = [[0 for _ in range(24)] for _ in range(7)]
-                alert_events: List[Dict[str, Any]] = []
-
-                for (
-                    alert_id,
-                    identifier,
-                    sent,
-                    expires,
-                    severity,
-                    status,
-                    event,
-                    source,
-                ) in recent_alerts:
-                    if severity:
-                        severities.add(severity)
-                    if status:
-                        statuses.add(status)
-                    if event:
-                        events.add(event)
-
-                    if sent:
-                        day_key = sent.date().isoformat()
-                        daily_totals[day_key] += 1
-                        dow_index = ((sent.weekday() + 1) % 7)
-                        hour = sent.hour
-                        hourly_matrix[dow_index][hour] += 1
-
-                    alert_events.append(
-                        {
-                            "id": alert_id,
-                            "identifier": identifier,
-                            "sent": sent.isoformat() if sent else None,
-                            "expires": expires.isoformat() if expires else None,
-                            "severity": severity or "Unknown",
-                            "status": status or "Unknown",
-                            "event": event or "Unknown",
-                            "source": source or "Unknown",
-                        }
-                    )
-
-                sorted_daily = sorted(daily_totals.items())
-                daily_alerts = [
-                    {"date": day, "count": count} for day, count in sorted_daily
-                ]
-
-                stats_data["alert_events"] = alert_events
-                stats_data["filter_options"] = {
-                    "severities": sorted(severities),
-                    "statuses": sorted(statuses),
-                    "events": sorted(events),
-                }
-                stats_data["daily_alerts"] = daily_alerts
-                stats_data["recent_by_day"] = daily_alerts[-30:]
-                stats_data["dow_hour_matrix"] = hourly_matrix
-            except Exception as exc:
-                db.session.rollback()
-                route_logger.error("Error preparing alert events for stats: %s", exc)
-                stats_data["alert_events"] = []
-                stats_data["filter_options"] = {
-                    "severities": [],
-                    "statuses": [],
-                    "events": [],
-                }
-                stats_data["daily_alerts"] = []
-                stats_data["recent_by_day"] = []
-                stats_data["dow_hour_matrix"] = [[0 for _ in range(24)] for _ in range(7)]
-
-            try:
-                polling_records = (
-                    PollHistory.query.order_by(PollHistory.timestamp.desc())
-                    .limit(200)
-                    .all()
-                )
-                if polling_records:
-                    total_runs = len(polling_records)
-                    success_values = {"success", "ok", "completed"}
-                    successes = sum(
-                        1
-                        for record in polling_records
-                        if (record.status or "").lower() in success_values
-                        and not record.error_message
-                    )
-                    failures = sum(
-                        1
-                        for record in polling_records
-                        if (record.status or "").lower() not in success_values
-                        or bool(record.error_message)
-                    )
-                    avg_execution = (
-                        sum(record.execution_time_ms or 0 for record in polling_records)
-                        / total_runs
-                    )
-                    last_run = polling_records[0]
-                    last_error = next(
-                        (record for record in polling_records if record.error_message),
-                        None,
-                    )
-                    recent_runs = [
-                        {
-                            "timestamp": record.timestamp.isoformat()
-                            if record.timestamp
-                            else None,
-                            "status": record.status,
-                            "alerts_fetched": record.alerts_fetched,
-                            "alerts_new": record.alerts_new,
-                            "alerts_updated": record.alerts_updated,
-                            "error": record.error_message,
-                            "execution_time_ms": record.execution_time_ms,
-                            "data_source": record.data_source,
-                        }
-                        for record in polling_records[:10]
-                    ]
-
-                    stats_data["polling"] = {
-                        "success_rate": successes / total_runs if total_runs else 0,
-                        "total_runs": total_runs,
-                        "failed_runs": failures,
-                        "average_execution_ms": avg_execution,
-                        "last_run_status": last_run.status if last_run else None,
-                        "last_run_timestamp": last_run.timestamp.isoformat()
-                        if last_run and last_run.timestamp
-                        else None,
-                        "last_error": last_error.error_message if last_error else None,
-                        "last_error_timestamp": last_error.timestamp.isoformat()
-                        if last_error and last_error.timestamp
-                        else None,
-                        "recent_runs": recent_runs,
-                    }
-                else:
-                    stats_data["polling"] = {
-                        "success_rate": 0,
-                        "total_runs": 0,
-                        "failed_runs": 0,
-                        "recent_runs": [],
-                    }
-            except Exception as exc:
-                db.session.rollback()
-                route_logger.error("Error calculating polling metrics: %s", exc)
-                stats_data["polling"] = {
-                    "success_rate": 0,
-                    "total_runs": 0,
-                    "failed_runs": 0,
-                    "recent_runs": [],
-                }
-
-            stats_data.setdefault("boundary_stats", [])
-            stats_data.setdefault("alert_by_status", [])
-            stats_data.setdefault("alert_by_severity", [])
-            stats_data.setdefault("alert_by_event", [])
-            stats_data.setdefault("alert_by_hour", [0] * 24)
-            stats_data.setdefault("alert_by_dow", [0] * 7)
-            stats_data.setdefault("alert_by_month", [0] * 12)
-            stats_data.setdefault("alert_by_year", [])
-            stats_data.setdefault("most_affected_boundaries", [])
-            stats_data.setdefault("duration_stats", [])
-            stats_data.setdefault("avg_durations", stats_data.get("duration_stats", []))
-            stats_data.setdefault("recent_by_day", [])
-            stats_data.setdefault("alert_events", [])
-            stats_data.setdefault("daily_alerts", [])
-            stats_data.setdefault("dow_hour_matrix", [[0] * 24 for _ in range(7)])
-            stats_data.setdefault("lifecycle_timeline", [])
-            stats_data.setdefault(
-                "filter_options",
-                {"severities": [], "statuses": [], "events": []},
-            )
-            stats_data.setdefault("polling", {})
-
-            return render_template("stats.html", **stats_data)
+                route_logger.error("Error getting dashboard statistics: %s", exc)
+                snapshot_etag = None
+                stats_data = empty_dashboard_stats()
+
+            response = make_response(render_template("stats.html", **stats_data))
+            if snapshot_etag is not None:
+                # Rendering may have started the session (CSRF token), so hash it afterwards
+                response.set_etag(dashboard_etag(snapshot_etag, sorted(session.items())))
+                response.headers["Cache-Control"] = "private, no-cache"
+            return response
         except Exception as exc:  # pragma: no cover - fallback content
             db.session.rollback()
             route_logger.error("Error loading statistics: %s", exc)
@@ -698,50 +312,15 @@ def register(app: Flask, logger) -> None:
                     or_(CAPAlert.expires.is_(None), CAPAlert.expires > utc_now())
                 ).filter(CAPAlert.status != "Expired")
 
-            query = query.order_by(CAPAlert.sent.desc())
-
-            try:
-                pagination = query.paginate(page=page, per_page=per_page, error_out=False)
-                alerts_list = pagination.items
-            except Exception as exc:
-                route_logger.warning("Pagination error: %s", exc)
-                total_count = query.count()
-                offset = (page - 1) * per_page
-                alerts_list = query.offset(offset).limit(per_page).all()
-
-                class MockPagination:
-                    def __init__(self, page_num: int, page_size: int, total: int, items):
-                        self.page = page_num
-                        self.per_page = page_size
-                        self.total = total
-                        self.items = items
-                        self.pages = (
-                            (total + page_size - 1) // page_size if page_size > 0 else 1
-                        )
-                        self.has_prev = page_num > 1
-                        self.has_next = page_num < self.pages
-                        self.prev_num = page_num - 1 if self.has_prev else None
-                        self.next_num = page_num + 1 if self.has_next else None
-
-                    def iter_pages(
-                        self,
-                        left_edge: int = 2,
-                        left_current: int = 2,
-                        right_current: int = 3,
-                        right_edge: int = 2,
-                    ):
-                        last = self.pages
-                        for num in range(1, last + 1):
-                            if (
-                                num <= left_edge
-                                or (self.page - left_current - 1 < num < self.page + right_current)
-                                or num > last - right_edge
-                            ):
-                                yield num
-                            elif num == left_edge + 1 or num == self.page + right_current:
-                                yield None
-
-                pagination = MockPagination(page, per_page, total_count, alerts_list)
+            cursor = request.args.get("cursor", "").strip() or None
+            before = request.args.get("before", "").strip() or None
+            total = count_alerts(query, [
+                search, status_filter, severity_filter, event_filter, source_filter, show_expired,
+            ])
+            pagination = paginate_keyset(
+                query, per_page=per_page, after=cursor, before=before, page=page, total=total
+            )
+            alerts_list = pagination.items
 
             audio_map: Dict[int, List[Dict[str, Any]]] = {}
             if alerts_list:
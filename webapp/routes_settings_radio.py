@@ -1277,6 +1277,10 @@ def register(app: Flask, logger) -> None:
                             "freq_max": spectrum_payload.get('freq_max', receiver.frequency_hz + (receiver.sample_rate / 2) if receiver.sample_rate else 0),
                             "fft_size": spectrum_payload.get('fft_size', 2048),
                             "spectrum": spectrum_payload.get('spectrum', []),
+                            "peak_hold": spectrum_payload.get('peak_hold', []),
+                            "waterfall": spectrum_payload.get('waterfall', []),
+                            "level_min_dbfs": spectrum_payload.get('level_min_dbfs'),
+                            "level_max_dbfs": spectrum_payload.get('level_max_dbfs'),
                             "timestamp": spectrum_payload.get('timestamp', time.time()),
                             "source": "redis",
                             "status": "available"